@@ -0,0 +1,3 @@
+"""
+Benchmarks reproduzíveis do backend (executar a partir da pasta backend)
+"""
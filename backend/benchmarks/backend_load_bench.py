@@ -0,0 +1,136 @@
+"""
+Teste de carga do backend inteiro contra o Firestore e o Auth em memória.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.backend_load_bench --fans 2000 --requests 200 --latency-ms 5
+    python -m benchmarks.backend_load_bench --concurrency 8 --save benchmarks/baselines/backend_load.json
+
+Sobe o app Flask com `firebase_provider.override()` apontando para o
+`FakeFirestoreClient` e o `FakeAuthClient` (com a latência por RPC pedida),
+popula `fans` com documentos sintéticos e dispara requisições reais pelo
+`test_client` em cada rota. Reporta p50/p95 por rota e quantas chamadas ao
+Firestore e ao Auth cada requisição fez, o que deixa à vista rotas que fazem
+leituras demais ou em série.
+"""
+import argparse
+import logging
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.fan_codec_bench import make_fan_document
+from benchmarks.harness import environment_info, report
+from src.infrastructure.config.firebase import firebase_provider
+from src.infrastructure.fakes.fake_auth import FakeAuthClient
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+
+
+def seed(db: FakeFirestoreClient, auth_client: FakeAuthClient, fans: int) -> List[str]:
+    rng = random.Random(42)
+    documents = {}
+    for index in range(fans):
+        data = make_fan_document(rng, index, trusted=True)
+        documents[data['user_id']] = data
+        auth_client.add_user(data['user_id'], data['email'], display_name=data['name'])
+    db.load('fans', documents)
+    auth_client.add_user('admin', 'admin@example.com', custom_claims={'admin': True})
+    return list(documents)
+
+
+def _headers(uid: str) -> Dict[str, str]:
+    return {'Authorization': f'Bearer {FakeAuthClient.id_token(uid)}'}
+
+
+def build_scenarios(uids: List[str]) -> Dict[str, Callable[[Any, random.Random], Any]]:
+    return {
+        'GET /api/users/profile': lambda client, rng: client.get(
+            '/api/users/profile', headers=_headers(rng.choice(uids))),
+        'PUT /api/users/profile': lambda client, rng: client.put(
+            '/api/users/profile', headers=_headers(rng.choice(uids)),
+            json={'phone': f'119{rng.randrange(10 ** 8):08d}', 'favorite_games': ['CS2', 'Valorant']}),
+        'GET /api/analytics/overview': lambda client, rng: client.get(
+            '/api/analytics/overview', headers=_headers(rng.choice(uids))),
+        'GET /api/fans?limit=50': lambda client, rng: client.get(
+            '/api/fans?limit=50&fields=name,email', headers=_headers('admin')),
+    }
+
+
+def run_scenario(app, request: Callable, requests: int, concurrency: int) -> List[float]:
+    def worker(seed_value: int, count: int) -> List[float]:
+        rng = random.Random(seed_value)
+        client = app.test_client()
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            response = request(client, rng)
+            timings.append((time.perf_counter() - started) * 1000.0)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{response.status_code}: {response.get_data(as_text=True)[:200]}")
+        return timings
+
+    shares = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        parts = executor.map(worker, range(concurrency), shares)
+        return [timing for part in parts for timing in part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do backend com Firestore/Auth em memória")
+    parser.add_argument("--fans", type=int, default=2000, help="documentos em `fans`")
+    parser.add_argument("--requests", type=int, default=200, help="requisições por rota")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="latência por RPC do Firestore")
+    parser.add_argument("--auth-latency-ms", type=float, default=20.0, help="latência por chamada do Auth")
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+    db = FakeFirestoreClient(latency=args.latency_ms / 1000.0)
+    auth_client = FakeAuthClient(latency=args.auth_latency_ms / 1000.0)
+    uids = seed(db, auth_client, args.fans)
+
+    results = {}
+    with firebase_provider.override(firestore=db, auth=auth_client):
+        from src.main.app import app
+
+        for name, request in build_scenarios(uids).items():
+            db.reset_counters()
+            auth_client.calls.clear()
+            started = time.perf_counter()
+            timings = np.array(run_scenario(app, request, args.requests, args.concurrency))
+            elapsed = time.perf_counter() - started
+            counters = db.counters()
+            results[name] = {
+                "requests": args.requests,
+                "p50_ms": round(float(np.percentile(timings, 50)), 3),
+                "p95_ms": round(float(np.percentile(timings, 95)), 3),
+                "requests_per_s": round(args.requests / elapsed, 1),
+                "firestore_calls_per_request": round(sum(counters['calls'].values()) / args.requests, 2),
+                "firestore_reads_per_request": round(counters['reads'] / args.requests, 2),
+                "firestore_writes_per_request": round(counters['writes'] / args.requests, 2),
+                "auth_calls_per_request": round(sum(auth_client.calls.values()) / args.requests, 2),
+                "firestore_calls": counters['calls'],
+            }
+
+    header = f"{'route':<30} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>8} {'fs calls':>9} {'reads':>7} {'auth':>6}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<30} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['requests_per_s']:>8.1f} "
+              f"{r['firestore_calls_per_request']:>9.2f} {r['firestore_reads_per_request']:>7.2f} "
+              f"{r['auth_calls_per_request']:>6.2f}")
+
+    meta = {**environment_info(), "fans": args.fans, "latency_ms": args.latency_ms,
+            "auth_latency_ms": args.auth_latency_ms, "concurrency": args.concurrency}
+    return report(args, results, meta)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark do pipeline de `document_service`.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.document_service_bench --save benchmarks/baselines/document_service.json
+    python -m benchmarks.document_service_bench --compare benchmarks/baselines/document_service.json --threshold 0.2
+
+Mede base64_to_image, pdf_to_image, extract_face_from_image,
+compare_faces_simple e analyze_document sobre entradas sintéticas JPEG, PNG e
+PDF em várias resoluções, com e sem face. Com --compare, termina com código 1
+se alguma etapa ficar mais lenta que o baseline além do limite.
+"""
+import argparse
+import base64
+import contextlib
+import os
+import sys
+
+from benchmarks.fixtures import RESOLUTIONS, make_fixture, make_selfie_image, encode_image
+from benchmarks.harness import measure, format_table, report
+
+FORMATS = ("jpeg", "png", "pdf")
+
+
+def build_cases(resolutions, formats):
+    from src.services import document_service as ds
+
+    selfie_raw = encode_image(make_selfie_image(), "jpeg")
+    selfie = {"content": "data:image/jpeg;base64," + base64.b64encode(selfie_raw).decode("ascii")}
+    selfie_image, _ = ds.base64_to_image(selfie["content"])
+    selfie_face = ds.extract_face_from_image(selfie_image)
+
+    cases = {}
+    for res_name in resolutions:
+        resolution = RESOLUTIONS[res_name]
+        for with_face in (True, False):
+            face_label = "face" if with_face else "noface"
+
+            for fmt in formats:
+                if fmt == "pdf" and not ds.pdf_support():
+                    continue
+                raw, data_url = make_fixture(fmt, resolution, with_face)
+                suffix = f"{fmt}/{res_name}/{face_label}"
+                file_name = f"documento.{'jpg' if fmt == 'jpeg' else fmt}"
+
+                cases[f"base64_to_image/{suffix}"] = lambda u=data_url: ds.base64_to_image(u)
+                if fmt == "pdf":
+                    cases[f"pdf_to_image/{suffix}"] = lambda r=raw: ds.pdf_to_image(r)
+
+                document = {"content": data_url, "file_name": file_name}
+                cases[f"analyze_document/{suffix}"] = (
+                    lambda d=document, s=(selfie if with_face else None): ds.analyze_document(d, s)
+                )
+
+            _, jpeg_url = make_fixture("jpeg", resolution, with_face)
+            image, _ = ds.base64_to_image(jpeg_url)
+            cases[f"extract_face_from_image/{res_name}/{face_label}"] = lambda i=image: ds.extract_face_from_image(i)
+
+            doc_face = ds.extract_face_from_image(image)
+            if doc_face is not None and selfie_face is not None:
+                cases[f"compare_faces_simple/{res_name}"] = (
+                    lambda a=doc_face, b=selfie_face: ds.compare_faces_simple(a, b)
+                )
+
+    return cases
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline de análise de documentos")
+    parser.add_argument("--repeat", type=int, default=10, help="execuções medidas por caso")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--resolutions", default=",".join(RESOLUTIONS), help="subconjunto de: " + ",".join(RESOLUTIONS))
+    parser.add_argument("--formats", default=",".join(FORMATS))
+    parser.add_argument("--filter", default="", help="só executa casos que contenham este texto")
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    resolutions = [r for r in args.resolutions.split(",") if r]
+    formats = [f for f in args.formats.split(",") if f]
+    unknown = set(resolutions) - set(RESOLUTIONS)
+    if unknown:
+        parser.error(f"resoluções desconhecidas: {', '.join(sorted(unknown))}")
+
+    results = {}
+    # O document_service imprime bastante; descartamos a saída durante as medições
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        cases = build_cases(resolutions, formats)
+        for key, fn in cases.items():
+            if args.filter and args.filter not in key:
+                continue
+            results[key] = measure(fn, repeat=args.repeat, warmup=args.warmup)
+
+    print(format_table(results))
+
+    return report(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Microbenchmark da hidratação de documentos `fans` em `Fan`.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.fan_codec_bench --docs 2000
+    python -m benchmarks.fan_codec_bench --save benchmarks/baselines/fan_codec.json
+
+Compara a conversão usada antes do codec (reconstrução do `Address` seguida de
+`Fan(**data)`) com o `fan_codec`: validação pelo TypeAdapter, caminho rápido
+com `model_construct` para documentos com `schema_version` e `decode_many`.
+Os documentos são sintéticos e usam `DatetimeWithNanoseconds`, como o cliente
+do Firestore devolve.
+"""
+import argparse
+import random
+import sys
+from datetime import timezone
+
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+
+from benchmarks.harness import measure, report
+from src.domain.entities.fan import Fan, Address
+from src.infrastructure.repositories import fan_codec
+
+
+class _Snapshot:
+    def __init__(self, doc_id, data):
+        self.id = doc_id
+        self.exists = True
+        self._data = data
+
+    def to_dict(self):
+        return dict(self._data)
+
+
+def _timestamp(rng):
+    return DatetimeWithNanoseconds(2024, rng.randint(1, 12), rng.randint(1, 28), rng.randint(0, 23),
+                                   rng.randint(0, 59), tzinfo=timezone.utc)
+
+
+def make_fan_document(rng: random.Random, index: int, trusted: bool, items: int = 1) -> dict:
+    """Synthetic fan document; `items` sets how many documents/accounts/purchases it carries"""
+    data = {
+        'user_id': f'uid-{index}',
+        'name': f'Fan {index}',
+        'email': f'fan{index}@example.com',
+        'phone': '11999999999',
+        'cpf': '12345678909',
+        'birth_date': _timestamp(rng),
+        'created_at': _timestamp(rng),
+        'updated_at': _timestamp(rng),
+        'address': {'street': 'Rua Exemplo', 'number': str(index), 'city': 'São Paulo',
+                    'state': 'SP', 'postal_code': '01000-000', 'country': 'Brasil'},
+        'favorite_games': rng.sample(['CS:GO', 'Valorant', 'League of Legends', 'Dota 2'], 2),
+        'favorite_teams': ['FURIA'],
+        'documents': [{'doc_type': 'RG', 'doc_number': f'{index:09d}-{n}', 'verified': True,
+                       'uploaded_at': _timestamp(rng)} for n in range(items)],
+        'social_media': [{'platform': f'platform{n}', 'profile_url': f'https://x.com/fan{index}',
+                          'connected': True, 'last_sync': _timestamp(rng)} for n in range(items)],
+        'purchases': [{'id': f'p{index}-{n}', 'item_name': 'Camisa', 'amount': 249.9,
+                       'purchase_date': _timestamp(rng)} for n in range(items)],
+        'purchase_count': items,
+        'total_spent': 249.9 * items,
+        'profile_completeness': 80,
+    }
+    if trusted:
+        data[fan_codec.SCHEMA_VERSION_FIELD] = fan_codec.SCHEMA_VERSION
+    return data
+
+
+def legacy_decode(doc_id, data):
+    # Conversão anterior ao codec: Address reconstruído e validação completa do Fan
+    fan_data = dict(data)
+    fan_data['id'] = doc_id
+    if fan_data.get('address'):
+        fan_data['address'] = Address(**fan_data['address'])
+    return Fan(**fan_data)
+
+
+# Perfis recém-criados, com poucas listas preenchidas, e perfis com histórico
+SHAPES = {"light": 0, "typical": 1, "heavy": 5}
+
+
+def build_cases(docs: int, items: int):
+    rng = random.Random(42)
+    legacy_docs = [(f'uid-{i}', make_fan_document(rng, i, trusted=False, items=items)) for i in range(docs)]
+    trusted_docs = [(doc_id, {**data, fan_codec.SCHEMA_VERSION_FIELD: fan_codec.SCHEMA_VERSION})
+                    for doc_id, data in legacy_docs]
+    legacy_snapshots = [_Snapshot(doc_id, data) for doc_id, data in legacy_docs]
+    trusted_snapshots = [_Snapshot(doc_id, data) for doc_id, data in trusted_docs]
+
+    return {
+        "legacy_fan_init": lambda: [legacy_decode(doc_id, data) for doc_id, data in legacy_docs],
+        "codec_validated": lambda: [fan_codec.decode(doc_id, data) for doc_id, data in legacy_docs],
+        "codec_trusted": lambda: [fan_codec.decode(doc_id, data) for doc_id, data in trusted_docs],
+        "codec_decode_many_validated": lambda: fan_codec.decode_many(legacy_snapshots),
+        "codec_decode_many_trusted": lambda: fan_codec.decode_many(trusted_snapshots),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark da hidratação Firestore -> Fan")
+    parser.add_argument("--docs", type=int, default=2000, help="documentos por execução")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="subconjunto de: " + ",".join(SHAPES))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    shapes = [shape for shape in args.shapes.split(",") if shape]
+    unknown = set(shapes) - set(SHAPES)
+    if unknown:
+        parser.error(f"formatos desconhecidos: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for shape in shapes:
+        for case, fn in build_cases(args.docs, SHAPES[shape]).items():
+            result = measure(fn, repeat=args.repeat, warmup=args.warmup)
+            result["docs"] = args.docs
+            result["docs_per_s"] = round(args.docs / (result["p50_ms"] / 1000.0))
+            results[f"{shape}/{case}"] = result
+
+    header = f"{'case':<38} {'p50 ms':>9} {'p95 ms':>9} {'docs/s':>10} {'vs legacy':>10}"
+    print(header)
+    print("-" * len(header))
+    for key, r in results.items():
+        legacy = results[key.split("/")[0] + "/legacy_fan_init"]["docs_per_s"]
+        print(f"{key:<38} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['docs_per_s']:>10} "
+              f"{r['docs_per_s'] / legacy:>9.1f}x")
+
+    return report(args, results)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Geração de entradas sintéticas para os benchmarks: imagens de documento em
+várias resoluções, com ou sem face, codificadas como JPEG, PNG ou PDF.
+
+Os PDFs são montados localmente (uma página com a imagem JPEG embutida via
+DCTDecode), sem depender do PyMuPDF para gerá-los.
+"""
+import base64
+from typing import Tuple
+
+import numpy as np
+import cv2
+
+RESOLUTIONS = {
+    "small": (640, 480),
+    "medium": (1280, 960),
+    "large": (2480, 3508),
+}
+
+
+def _face_patch(size: int) -> np.ndarray:
+    """Draw a grayscale face that the Haar frontal face cascade detects"""
+    height = width = size * 2
+    img = np.full((height, width), 200, np.float32)
+    cx, cy = width // 2, height // 2
+    s = size / 100.0
+    yy, xx = np.mgrid[0:height, 0:width]
+
+    def ellipse(x, y, rx, ry):
+        return ((xx - x) / (rx * s)) ** 2 + ((yy - y) / (ry * s)) ** 2 <= 1
+
+    img[ellipse(cx, cy, 40, 52)] = 180
+    for dx in (-16, 16):
+        img[ellipse(cx + dx * s, cy - 12 * s, 10, 6)] = 30
+        img[ellipse(cx + dx * s, cy - 24 * s, 12, 3)] = 50
+    img[ellipse(cx + 3 * s, cy + 10 * s, 4, 3)] = 120
+    img[ellipse(cx, cy + 28 * s, 14, 4)] = 70
+    img[ellipse(cx, cy - 40 * s, 44, 22) & (yy < cy - 34 * s)] = 20
+
+    return cv2.GaussianBlur(img, (0, 0), 3 * s).astype(np.uint8)
+
+
+def make_document_image(width: int, height: int, with_face: bool, seed: int = 0) -> np.ndarray:
+    """Build a BGR document-like image with text lines and, optionally, a face"""
+    rng = np.random.default_rng(seed)
+    background = np.array([150, 200, 170], dtype=np.uint8)
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = background
+    noise = rng.integers(-8, 9, size=(height, width, 1), dtype=np.int16)
+    image = np.clip(image.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+    scale = max(0.4, width / 1600.0)
+    step = max(12, int(40 * scale))
+    text_x = int(width * 0.4) if with_face else int(width * 0.05)
+    for y in range(step * 2, height - step, step):
+        cv2.putText(image, "REPUBLICA FEDERATIVA DO BRASIL 0123456789", (text_x, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7 * scale, (30, 30, 30), max(1, int(2 * scale)))
+
+    if with_face:
+        face_size = max(40, min(width, height) // 6)
+        patch = cv2.cvtColor(_face_patch(face_size), cv2.COLOR_GRAY2BGR)
+        top = max(0, height // 2 - face_size)
+        left = max(0, int(width * 0.05))
+        h, w = patch.shape[:2]
+        h, w = min(h, height - top), min(w, width - left)
+        image[top:top + h, left:left + w] = patch[:h, :w]
+
+    return image
+
+
+def make_selfie_image(size: int = 640) -> np.ndarray:
+    patch = _face_patch(size // 2)
+    return cv2.cvtColor(cv2.resize(patch, (size, size)), cv2.COLOR_GRAY2BGR)
+
+
+def encode_image(image: np.ndarray, fmt: str) -> bytes:
+    ext = ".jpg" if fmt in ("jpeg", "jpg", "pdf") else ".png"
+    ok, buffer = cv2.imencode(ext, image, [cv2.IMWRITE_JPEG_QUALITY, 90] if ext == ".jpg" else [])
+    if not ok:
+        raise ValueError(f"Falha ao codificar imagem como {fmt}")
+    return buffer.tobytes()
+
+
+def build_pdf(jpeg_bytes: bytes, width: int, height: int, page_width: int = None, page_height: int = None) -> bytes:
+    """Wrap a JPEG in a single-page PDF, writing the xref table by hand"""
+    page_width = page_width or width
+    page_height = page_height or height
+    content = f"q {page_width} 0 0 {page_height} 0 0 cm /Im0 Do Q".encode("ascii")
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {page_width} {page_height}] "
+         f"/Resources << /XObject << /Im0 4 0 R >> >> /Contents 5 0 R >>").encode("ascii"),
+        (f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+         f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+         f"/Length {len(jpeg_bytes)} >>\nstream\n").encode("ascii") + jpeg_bytes + b"\nendstream",
+        f"<< /Length {len(content)} >>\nstream\n".encode("ascii") + content + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    return bytes(out)
+
+
+def make_fixture(fmt: str, resolution: Tuple[int, int], with_face: bool, seed: int = 0) -> Tuple[bytes, str]:
+    """Return (raw bytes, data URL) for a synthetic document"""
+    width, height = resolution
+    image = make_document_image(width, height, with_face, seed)
+
+    if fmt == "pdf":
+        # PDF usa pontos; a página tem 1/3 do tamanho em pixels porque pdf_to_image renderiza com zoom 3x
+        raw = build_pdf(encode_image(image, "jpeg"), width, height, width // 3, height // 3)
+        mime = "application/pdf"
+    else:
+        raw = encode_image(image, fmt)
+        mime = "image/jpeg" if fmt == "jpeg" else "image/png"
+
+    return raw, f"data:{mime};base64,{base64.b64encode(raw).decode('ascii')}"
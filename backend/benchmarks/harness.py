@@ -0,0 +1,160 @@
+"""
+Utilitários de medição compartilhados pelos benchmarks: latência (p50/p95),
+pico de RSS, alocações rastreadas pelo tracemalloc e baselines em JSON.
+"""
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, Any, List, Optional
+
+import numpy as np
+
+
+def _reset_peak_rss() -> bool:
+    # No Linux, escrever "5" em clear_refs zera o VmHWM do processo
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb() -> float:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024.0
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def measure(fn: Callable[[], Any], repeat: int = 10, warmup: int = 1) -> Dict[str, Any]:
+    """Run fn repeatedly and return latency, peak RSS and allocation stats"""
+    for _ in range(warmup):
+        fn()
+
+    gc.collect()
+    per_stage_rss = _reset_peak_rss()
+    timings: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    peak_rss = _peak_rss_mb()
+
+    # Alocações medidas em uma execução separada, pois o tracemalloc distorce a latência
+    gc.collect()
+    tracemalloc.start()
+    before_blocks = sys.getallocatedblocks()
+    fn()
+    _, alloc_peak = tracemalloc.get_traced_memory()
+    after_blocks = sys.getallocatedblocks()
+    tracemalloc.stop()
+
+    samples = np.array(timings)
+    return {
+        "repeat": repeat,
+        "p50_ms": round(float(np.percentile(samples, 50)), 3),
+        "p95_ms": round(float(np.percentile(samples, 95)), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "peak_rss_mb": round(peak_rss, 1),
+        "peak_rss_scope": "stage" if per_stage_rss else "process",
+        "alloc_peak_kb": round(alloc_peak / 1024.0, 1),
+        "alloc_net_blocks": after_blocks - before_blocks,
+    }
+
+
+def environment_info() -> Dict[str, Any]:
+    info = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "created_at": datetime.now().isoformat(),
+    }
+    try:
+        import cv2
+        info["opencv"] = cv2.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, Any]] = None):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta or environment_info(), "results": results}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], threshold: float = 0.2,
+            metrics=("p50_ms", "p95_ms")) -> List[Dict[str, Any]]:
+    """Return the metrics that got slower than the baseline by more than threshold"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if not previous:
+            continue
+        for metric in metrics:
+            old, new = previous.get(metric), current.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if change > threshold:
+                regressions.append({
+                    "case": key,
+                    "metric": metric,
+                    "baseline": old,
+                    "current": new,
+                    "change": round(change, 3),
+                })
+    return regressions
+
+
+def report(args, results: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> int:
+    """
+    Handle --save and --compare/--threshold for a benchmark script; returns the
+    exit code (1 when there are regressions)
+    """
+    if args.save:
+        save_baseline(args.save, results, meta)
+        print(f"\nBaseline salvo em {args.save}")
+
+    if args.compare:
+        regressions = compare(results, load_baseline(args.compare), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressão(ões) acima de {args.threshold:.0%}:")
+            for r in regressions:
+                print(f"  {r['case']} {r['metric']}: {r['baseline']:.2f} -> {r['current']:.2f} ms (+{r['change']:.0%})")
+            return 1
+        print(f"\nNenhuma regressão acima de {args.threshold:.0%}")
+
+    return 0
+
+
+def format_table(results: Dict[str, Dict[str, Any]]) -> str:
+    header = f"{'case':<52} {'p50 ms':>9} {'p95 ms':>9} {'rss MB':>8} {'alloc KB':>10}"
+    lines = [header, "-" * len(header)]
+    for key in sorted(results):
+        r = results[key]
+        lines.append(f"{key:<52} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                     f"{r['peak_rss_mb']:>8.1f} {r['alloc_peak_kb']:>10.1f}")
+    return "\n".join(lines)
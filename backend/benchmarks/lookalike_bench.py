@@ -0,0 +1,106 @@
+"""
+Consulta de fãs parecidos sobre uma base sintética.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.lookalike_bench --fans 1000000 --queries 50
+    python -m benchmarks.lookalike_bench --fans 200000 --save benchmarks/baselines/lookalike.json
+
+Gera fãs com jogos, times, estado, cidade e contas seguidas em distribuição
+de cauda longa (poucos atributos muito comuns, muitos raros), monta o
+`LookalikeIndex` e mede a montagem, a carga do `.npz` e as consultas top-k
+para uma semente e para um grupo de 10 sementes.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List, Set
+
+import numpy as np
+
+from benchmarks.harness import environment_info, report
+from src.infrastructure.segments.lookalike_index import LookalikeIndex
+
+STATES = ['SP', 'RJ', 'MG', 'RS', 'PR', 'BA', 'PE', 'CE', 'SC', 'GO']
+
+
+def make_fans(count: int, seed: int = 42) -> List[Set[str]]:
+    rng = np.random.default_rng(seed)
+    # Zipf truncado: o atributo 0 é o mais comum
+    games = np.minimum(rng.zipf(1.6, (count, 3)), 60)
+    teams = np.minimum(rng.zipf(1.4, (count, 2)), 200)
+    follows = np.minimum(rng.zipf(1.3, (count, 6)), 20000)
+    states = np.minimum(rng.zipf(1.5, count), len(STATES)) - 1
+    cities = rng.integers(0, 40, count)
+    sizes = rng.integers(0, 7, count)
+
+    fans = []
+    for i in range(count):
+        features = {f'game:{g}' for g in games[i, :1 + sizes[i] % 3]}
+        features.update(f'team:{t}' for t in teams[i, :sizes[i] % 2 + 1])
+        features.update(f'follows:account{a}' for a in follows[i, :sizes[i]])
+        features.add(f'state:{STATES[states[i]]}')
+        features.add(f'city:{STATES[states[i]]}-{cities[i]}')
+        fans.append(features)
+    return fans
+
+
+def timed(fn, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    timings = np.array(timings)
+    return {
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consulta de fãs parecidos (TF-IDF + cosseno top-k)")
+    parser.add_argument("--fans", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=50, help="consultas por caso")
+    parser.add_argument("--limit", type=int, default=1000, help="k do top-k")
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    fans = make_fans(args.fans)
+    ids = [f'uid-{i:08d}' for i in range(args.fans)]
+    rng = random.Random(42)
+    results = {}
+
+    started = time.perf_counter()
+    index = LookalikeIndex.build(zip(ids, fans))
+    results['build'] = {"p50_ms": round((time.perf_counter() - started) * 1000.0, 1), "p95_ms": None}
+    del fans
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'lookalike.npz')
+        index.save(path)
+        results['load'] = timed(lambda: LookalikeIndex.load(path), 3)
+
+    results[f'top-{args.limit} (1 seed)'] = timed(lambda: index.similar([rng.choice(ids)], args.limit), args.queries)
+    results[f'top-{args.limit} (10 seeds)'] = timed(
+        lambda: index.similar(rng.sample(ids, 10), args.limit), args.queries)
+
+    print(f"{args.fans} fãs, {len(index.features)} atributos, {len(index.data)} entradas não nulas\n")
+    header = f"{'case':<24} {'p50 ms':>10} {'p95 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        p95 = f"{r['p95_ms']:>10.3f}" if r['p95_ms'] is not None else f"{'-':>10}"
+        print(f"{name:<24} {r['p50_ms']:>10.3f} {p95}")
+
+    meta = {**environment_info(), "fans": args.fans, "limit": args.limit}
+    return report(args, results, meta)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Vazão dos repositórios de fãs: SQLite contra o Firestore em memória.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.repository_bench --fans 5000 --ops 2000
+    python -m benchmarks.repository_bench --threads 8 --latency-ms 5 --save benchmarks/baselines/repository.json
+
+Popula os dois backends com os mesmos fãs sintéticos e roda, em cada um, as
+operações do `FanRepository` usadas pelo app: leitura por id, leitura em
+lote, compra (acréscimo com contadores) e unidade de trabalho. O
+`FakeFirestoreClient` aceita latência por RPC (`--latency-ms`), o que dá uma
+ideia do ganho de rodar dev/CI ou análises sobre o SQLite local.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.fan_codec_bench import make_fan_document
+from benchmarks.harness import environment_info, report
+from src.domain.entities.fan import Purchase
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories import fan_codec
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_fan_repository import SqliteFanRepository
+
+
+def build_operations(uids: List[str]) -> Dict[str, Callable]:
+    def rename(fan):
+        fan.name = f'Fan {random.random():.6f}'
+
+    return {
+        'find_by_id': lambda repository, rng: repository.find_by_id(rng.choice(uids)),
+        'find_many(50)': lambda repository, rng: repository.find_many(rng.sample(uids, 50)),
+        'add_purchase': lambda repository, rng: repository.add_purchase(
+            rng.choice(uids), Purchase(item_name='Ingresso', amount=120.0)),
+        'unit_of_work': lambda repository, rng: repository.run_in_unit_of_work(rng.choice(uids), rename, 10),
+    }
+
+
+def run(repository, operation: Callable, ops: int, threads: int) -> List[float]:
+    def worker(seed_value: int, count: int) -> List[float]:
+        rng = random.Random(seed_value)
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            operation(repository, rng)
+            timings.append((time.perf_counter() - started) * 1000.0)
+        return timings
+
+    shares = [ops // threads + (1 if i < ops % threads else 0) for i in range(threads)]
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return [timing for part in executor.map(worker, range(threads), shares) for timing in part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Vazão dos repositórios de fãs (SQLite x Firestore em memória)")
+    parser.add_argument("--fans", type=int, default=5000)
+    parser.add_argument("--ops", type=int, default=2000, help="operações por caso")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="latência por RPC do Firestore em memória")
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(42)
+    documents = {}
+    for index in range(args.fans):
+        data = make_fan_document(rng, index, trusted=True)
+        documents[data['user_id']] = data
+    uids = list(documents)
+
+    firestore = FakeFirestoreClient(latency=args.latency_ms / 1000.0)
+    firestore.load('fans', documents)
+
+    with tempfile.TemporaryDirectory() as directory:
+        sqlite = SqliteDatabase(os.path.join(directory, 'fans.sqlite3'))
+        sqlite_repository = SqliteFanRepository(sqlite)
+        sqlite_repository.save_many(fan_codec.decode(uid, data) for uid, data in documents.items())
+
+        backends = {
+            'firestore-fake': FirestoreFanRepository(db=firestore, stats=FirestoreFanStatsRepository(firestore)),
+            'sqlite': sqlite_repository,
+        }
+        results = {}
+        for operation_name, operation in build_operations(uids).items():
+            for backend, repository in backends.items():
+                started = time.perf_counter()
+                timings = np.array(run(repository, operation, args.ops, args.threads))
+                elapsed = time.perf_counter() - started
+                results[f"{operation_name} [{backend}]"] = {
+                    "ops": args.ops,
+                    "p50_ms": round(float(np.percentile(timings, 50)), 4),
+                    "p95_ms": round(float(np.percentile(timings, 95)), 4),
+                    "ops_per_s": round(args.ops / elapsed, 1),
+                }
+        sqlite.close()
+
+    header = f"{'case':<36} {'p50 ms':>9} {'p95 ms':>9} {'ops/s':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(f"{name:<36} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['ops_per_s']:>10.1f}")
+
+    meta = {**environment_info(), "fans": args.fans, "threads": args.threads, "latency_ms": args.latency_ms}
+    return report(args, results, meta)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
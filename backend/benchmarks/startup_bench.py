@@ -0,0 +1,111 @@
+"""
+Benchmark de inicialização do app.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.startup_bench --runs 5
+    python -m benchmarks.startup_bench --modes lazy --top 25 --save /tmp/startup.json
+
+Cada execução roda `import src.main.app` em um processo novo com
+`python -X importtime`, para cada STARTUP_MODE. Reporta p50/p95 do tempo de
+import e os módulos mais caros (tempo acumulado e próprio, em ms).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+HEAVY_MODULES = ("cv2", "numpy", "PIL.Image", "fitz", "grpc")
+
+CHILD_CODE = (
+    "import sys, time, json; t = time.perf_counter(); import src.main.app; "
+    "elapsed = (time.perf_counter() - t) * 1000; "
+    f"heavy = [m for m in {HEAVY_MODULES!r} if m in sys.modules]; "
+    "print(json.dumps({'import_ms': elapsed, 'heavy': heavy}))"
+)
+
+
+def parse_importtime(stderr: str):
+    """Parse `-X importtime` output into {module: (self_us, cumulative_us)}"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cumulative_us, name = [part.strip() for part in rest.split("|")]
+            modules[name] = (int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+    return modules
+
+
+def run_once(mode: str):
+    env = dict(os.environ, STARTUP_MODE=mode)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", CHILD_CODE],
+        capture_output=True, text=True, env=env, cwd=os.getcwd()
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Falha ao importar o app no modo {mode}:\n{proc.stderr[-2000:]}")
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    return result["import_ms"], result["heavy"], parse_importtime(proc.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do app")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", default="lazy,preload")
+    parser.add_argument("--top", type=int, default=15, help="quantidade de módulos listados")
+    parser.add_argument("--save", help="salva os resultados em JSON")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for mode in [m for m in args.modes.split(",") if m]:
+        totals = []
+        per_module = defaultdict(list)
+        heavy = set()
+        for _ in range(args.runs):
+            import_ms, heavy_loaded, modules = run_once(mode)
+            heavy.update(heavy_loaded)
+            totals.append(import_ms)
+            for name, (self_us, cumulative_us) in modules.items():
+                per_module[name].append((self_us, cumulative_us))
+
+        samples = np.array(totals)
+        modules_ms = {
+            name: {
+                "self_ms": round(float(np.median([v[0] for v in values])) / 1000, 2),
+                "cumulative_ms": round(float(np.median([v[1] for v in values])) / 1000, 2),
+            }
+            for name, values in per_module.items()
+        }
+        report[mode] = {
+            "p50_ms": round(float(np.percentile(samples, 50)), 1),
+            "p95_ms": round(float(np.percentile(samples, 95)), 1),
+            "modules_loaded": len(modules_ms),
+            "heavy_modules_loaded": sorted(heavy),
+            "modules": modules_ms,
+        }
+
+        print(f"\n== STARTUP_MODE={mode}: import p50 {report[mode]['p50_ms']} ms, "
+              f"p95 {report[mode]['p95_ms']} ms, {len(modules_ms)} módulos")
+        print(f"   módulos pesados carregados: {', '.join(report[mode]['heavy_modules_loaded']) or 'nenhum'}")
+        print(f"   {'módulo':<50} {'acumulado ms':>13} {'próprio ms':>11}")
+        ranked = sorted(modules_ms.items(), key=lambda item: item[1]["cumulative_ms"], reverse=True)
+        for name, stats in ranked[:args.top]:
+            print(f"   {name:<50} {stats['cumulative_ms']:>13.1f} {stats['self_ms']:>11.1f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\nResultados salvos em {args.save}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""
+Consultas no repositório de usuários em memória com muitos usuários.
+
+Uso (a partir da pasta backend):
+
+    python -m benchmarks.user_repository_bench --users 1000000
+    python -m benchmarks.user_repository_bench --users 200000 --save benchmarks/baselines/user_repository.json
+
+Popula o `InMemoryUserRepository` e mede p50/p95 de busca por id, por e-mail
+e de uma página de `find_page`, além da memória por usuário. Para
+comparação, roda as mesmas buscas na versão anterior do repositório (um dict
+de modelos `User`, com busca por e-mail percorrendo todos os usuários).
+"""
+import argparse
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.harness import environment_info, report
+from src.domain.entities.user import User
+from src.infrastructure.repositories.user_repository_impl import InMemoryUserRepository
+
+
+class LegacyUserRepository:
+    """The repository as it was: a plain dict of User models"""
+
+    def __init__(self):
+        self.users: Dict[str, User] = {}
+
+    def create(self, user: User) -> User:
+        user.id = user.id or str(uuid.uuid4())
+        user.created_at = datetime.now()
+        self.users[user.id] = user
+        return user
+
+    def find_by_id(self, user_id: str):
+        return self.users.get(user_id)
+
+    def find_by_email(self, email: str):
+        return next((user for user in self.users.values() if user.email == email), None)
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def populate(repository, users: int) -> Dict[str, float]:
+    before = _rss_mb()
+    started = time.perf_counter()
+    for index in range(users):
+        repository.create(User(id=f'user-{index}', name=f'Fan {index}', email=f'fan{index}@example.com',
+                               password='x' * 60))
+    elapsed = time.perf_counter() - started
+    return {"load_s": round(elapsed, 2), "bytes_per_user": round((_rss_mb() - before) * 1024 * 1024 / users)}
+
+
+def time_lookups(lookup: Callable[[random.Random], object], ops: int) -> Dict[str, float]:
+    rng = random.Random(7)
+    timings: List[float] = []
+    for _ in range(ops):
+        started = time.perf_counter()
+        lookup(rng)
+        timings.append((time.perf_counter() - started) * 1000.0)
+    samples = np.array(timings)
+    return {
+        "ops": ops,
+        "p50_ms": round(float(np.percentile(samples, 50)), 4),
+        "p95_ms": round(float(np.percentile(samples, 95)), 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas no repositório de usuários em memória")
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--ops", type=int, default=10_000, help="buscas por caso")
+    parser.add_argument("--legacy-ops", type=int, default=20, help="buscas por e-mail na versão anterior (lineares)")
+    parser.add_argument("--skip-legacy", action="store_true")
+    parser.add_argument("--save", help="salva os resultados como baseline JSON")
+    parser.add_argument("--compare", help="compara com um baseline JSON salvo anteriormente")
+    parser.add_argument("--threshold", type=float, default=0.2, help="piora relativa tolerada (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    n = args.users
+    results = {}
+
+    repository = InMemoryUserRepository()
+    load = populate(repository, n)
+    ordered = repository.find_page(n)
+    results["find_by_id [indexed]"] = {**load, **time_lookups(
+        lambda rng: repository.find_by_id(f'user-{rng.randrange(n)}'), args.ops)}
+    results["find_by_email [indexed]"] = time_lookups(
+        lambda rng: repository.find_by_email(f'FAN{rng.randrange(n)}@example.com'), args.ops)
+
+    def page(rng):
+        last = ordered[rng.randrange(n)]
+        return repository.find_page(100, (last.created_at, last.id))
+
+    results["find_page(100) [indexed]"] = time_lookups(page, args.ops)
+    del repository, ordered
+
+    if not args.skip_legacy:
+        legacy = LegacyUserRepository()
+        load = populate(legacy, n)
+        results["find_by_id [legacy]"] = {**load, **time_lookups(
+            lambda rng: legacy.find_by_id(f'user-{rng.randrange(n)}'), args.ops)}
+        results["find_by_email [legacy]"] = time_lookups(
+            lambda rng: legacy.find_by_email(f'fan{rng.randrange(n)}@example.com'), args.legacy_ops)
+
+    header = f"{'case':<28} {'p50 ms':>10} {'p95 ms':>10} {'load s':>8} {'B/user':>8}"
+    print(f"{n} usuários")
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        load_s = f"{r['load_s']:.2f}" if 'load_s' in r else ''
+        per_user = str(r.get('bytes_per_user', ''))
+        print(f"{name:<28} {r['p50_ms']:>10.4f} {r['p95_ms']:>10.4f} {load_s:>8} {per_user:>8}")
+
+    return report(args, results, {**environment_info(), "users": n})
+
+
+if __name__ == "__main__":
+    sys.exit(main())
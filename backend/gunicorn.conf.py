@@ -0,0 +1,19 @@
+"""
+Configuração do gunicorn.
+
+Com STARTUP_MODE=preload o app é carregado no master (preload_app) e o estado
+somente leitura é aquecido uma única vez antes do fork. Os clientes gRPC do
+Firestore são descartados em post_fork para que cada worker crie os seus.
+"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = os.getenv('STARTUP_MODE', 'lazy').lower() == 'preload'
+
+
+def post_fork(server, worker):
+    from src.infrastructure.config.firebase import firebase_provider
+    firebase_provider.reset()
+    server.log.info(f"Worker {worker.pid} pronto (preload={preload_app})")
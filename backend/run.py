@@ -3,12 +3,13 @@ import sys
 # Adiciona o diretório atual ao caminho de importação
 sys.path.append(os.path.abspath("."))
 
-from src.main.app import app
 from dotenv import load_dotenv
 
-# Carrega variáveis de ambiente
+# Carrega variáveis de ambiente antes do app, que lê STARTUP_MODE no import
 load_dotenv()
 
+from src.main.app import app
+
 if __name__ == "__main__":
     # Obtém configurações do ambiente ou usa valores padrão
     host = os.getenv("HOST", "0.0.0.0")
@@ -1,4 +1,4 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Callable
 from datetime import datetime
 import os
 import uuid
@@ -6,17 +6,25 @@ import requests
 from io import BytesIO
 from PIL import Image
 
-from src.domain.entities.fan import Fan, Document, SocialMedia, EsportsActivity, EventInterest, Purchase
+from src.domain.catalog.interest_catalog import get_catalog
+from src.domain.entities.fan import Fan, Document, SocialMedia, EsportsActivity, EventInterest, Purchase, replace_by_platform
+from src.domain.entities.job import Job
 from src.domain.usecases.fan_usecase import FanUseCase
 from src.domain.repositories.fan_repository import FanRepository
-from src.infrastructure.config.firebase import FirebaseApp
+from src.domain.repositories.job_queue import JobQueue
+from src.domain.rules import profile_completeness
+from src.infrastructure.config.firebase import get_bucket
+
+# Tipos de job em segundo plano (ver `job_handlers`)
+VERIFY_DOCUMENT = 'verify_document'
+VERIFY_ESPORTS_PROFILE = 'verify_esports_profile'
 
 
 class FanUseCaseImpl(FanUseCase):
-    def __init__(self, fan_repository: FanRepository):
+    def __init__(self, fan_repository: FanRepository, job_queue: Optional[JobQueue] = None):
         self.fan_repository = fan_repository
-        self.firebase = FirebaseApp()
-        self.bucket = self.firebase.bucket
+        # Com uma fila, as verificações saem da requisição e rodam no worker
+        self.job_queue = job_queue
     
     def create_profile(self, fan_data: Dict[str, Any]) -> Fan:
         """Create a new fan profile"""
@@ -25,7 +33,7 @@ class FanUseCaseImpl(FanUseCase):
             fan = Fan(**fan_data)
             
             # Calcular completude do perfil
-            fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
+            self._refresh_completeness(fan)
             
             # Salvar no repositório
             return self.fan_repository.create(fan)
@@ -38,27 +46,24 @@ class FanUseCaseImpl(FanUseCase):
     
     def update_profile(self, user_id: str, fan_data: Dict[str, Any]) -> Fan:
         """Update fan profile data"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
-        # Atualizar campos
-        for key, value in fan_data.items():
-            if hasattr(fan, key) and key not in ['id', 'user_id', 'created_at']:
-                setattr(fan, key, value)
-        
-        # Recalcular completude
-        fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
+        def work(fan: Fan) -> Fan:
+            # Atualizar campos
+            for key, value in fan_data.items():
+                if hasattr(fan, key) and key not in ['id', 'user_id', 'created_at']:
+                    setattr(fan, key, value)
+            
+            # Recalcular completude
+            self._refresh_completeness(fan, fan_data.keys())
+            return fan
         
-        # Salvar no repositório
-        return self.fan_repository.update(fan)
+        # Uma leitura e uma escrita só com os campos alterados
+        return self.fan_repository.run_in_unit_of_work(user_id, work)
     
     def _upload_file_to_storage(self, file_data: bytes, path: str, content_type: str = 'application/octet-stream') -> str:
         """Upload file to Firebase Storage and return public URL"""
         try:
             # Criar referência para o arquivo
-            blob = self.bucket.blob(path)
+            blob = get_bucket().blob(path)
             
             # Fazer upload
             blob.upload_from_string(file_data, content_type=content_type)
@@ -72,55 +77,70 @@ class FanUseCaseImpl(FanUseCase):
     
     def upload_document(self, user_id: str, doc_type: str, doc_number: str, file_data: bytes) -> Document:
         """Upload a document for verification"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
         # Criar path para o arquivo
         path = f"documents/{user_id}/{doc_type.lower()}_{uuid.uuid4()}.jpg"
+        uploaded = {}
         
-        # Fazer upload do arquivo
-        try:
-            document_url = self._upload_file_to_storage(file_data, path, 'image/jpeg')
+        def work(fan: Fan) -> Document:
+            # Fazer upload do arquivo só uma vez, mesmo se a unidade de trabalho for repetida
+            if 'url' not in uploaded:
+                uploaded['url'] = self._upload_file_to_storage(file_data, path, 'image/jpeg')
             
             # Criar documento
             document = Document(
                 doc_type=doc_type,
                 doc_number=doc_number,
                 verified=False,
-                document_url=document_url
+                document_url=uploaded['url']
             )
             
             # Adicionar ao perfil
-            updated_fan = self.fan_repository.add_document(fan.id, document)
+            fan.documents = fan.documents + [document]
             
-            # Iniciar verificação assíncrona (em uma implementação real, isto seria uma tarefa de fundo)
-            self.verify_document_async(fan.id, doc_number)
+            # Sem fila, a verificação roda aqui mesmo, na mesma escrita
+            if self.job_queue is None:
+                self._apply_document_verification(fan, doc_number)
+            self._refresh_completeness(fan, {'documents'})
             
             return document
-            
+        
+        try:
+            # Perfil lido uma vez e gravado uma vez
+            document = self.fan_repository.run_in_unit_of_work(user_id, work)
         except Exception as e:
             raise ValueError(f"Error uploading document: {str(e)}")
+        
+        if self.job_queue is not None:
+            self.verify_document_async(user_id, doc_number)
+        return document
     
-    def verify_document_async(self, fan_id: str, doc_id: str):
-        """Simulate async document verification with AI (in real implementation this would be a background task)"""
-        try:
-            # Simular verificação por AI (em uma implementação real, isto chamaria um serviço de IA)
-            # Aqui estamos apenas simulando um resultado positivo após 'processamento'
-            is_valid = True
-            
-            # Atualizar documento como verificado
-            self.fan_repository.verify_document(fan_id, doc_id, is_valid)
-            
-            # Recalcular completude do perfil
-            fan = self.fan_repository.find_by_id(fan_id)
-            if fan:
-                fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
-                self.fan_repository.update(fan)
-                
-        except Exception as e:
-            print(f"Error in document verification: {e}")
+    def _apply_document_verification(self, fan: Fan, doc_number: str):
+        """Simulate AI document verification on the in-memory fan"""
+        # Simular verificação por AI (em uma implementação real, isto chamaria um serviço de IA)
+        # Aqui estamos apenas simulando um resultado positivo após 'processamento'
+        is_valid = True
+        
+        for doc in fan.documents:
+            if doc.doc_number == doc_number:
+                doc.verified = is_valid
+                doc.verified_at = datetime.now() if is_valid else None
+    
+    def run_document_verification(self, fan_id: str, doc_id: str):
+        """Verify a document and store the result; errors propagate so the job is retried"""
+        def work(fan: Fan):
+            if not any(doc.doc_number == doc_id for doc in fan.documents):
+                raise ValueError(f"Document {doc_id} not found for fan {fan_id}")
+            self._apply_document_verification(fan, doc_id)
+            self._refresh_completeness(fan, {'documents'})
+        
+        self.fan_repository.run_in_unit_of_work(fan_id, work)
+    
+    def verify_document_async(self, fan_id: str, doc_id: str) -> Optional[Job]:
+        """Queue the document verification; without a queue it runs inline"""
+        if self.job_queue is None:
+            self.run_document_verification(fan_id, doc_id)
+            return None
+        return self.job_queue.enqueue(VERIFY_DOCUMENT, {'fan_id': fan_id, 'doc_id': doc_id})
     
     def verify_document(self, doc_id: str) -> bool:
         """Manually verify a document (would be done by AI in real implementation)"""
@@ -130,11 +150,6 @@ class FanUseCaseImpl(FanUseCase):
     
     def connect_social_media(self, user_id: str, platform: str, profile_url: str, access_token: str = None) -> SocialMedia:
         """Connect a social media account"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
         # Extrair username do profile_url (simplificação)
         username = profile_url.split('/')[-1]
         
@@ -147,25 +162,23 @@ class FanUseCaseImpl(FanUseCase):
             last_sync=datetime.now()
         )
         
-        # Adicionar ao perfil
-        updated_fan = self.fan_repository.add_social_media(fan.id, social_media)
-        
-        # Sincronizar dados (em uma implementação real, isto seria assíncrono)
-        self.sync_social_media_data(user_id, platform)
+        def work(fan: Fan):
+            # Adicionar ao perfil (substitui a conta anterior da mesma plataforma)
+            fan.social_media = replace_by_platform(fan.social_media, social_media)
+            
+            # Sincronizar dados (em uma implementação real, isto seria assíncrono)
+            self._sync_social_media(fan, platform)
+            
+            # Recalcular completude
+            self._refresh_completeness(fan, {'social_media', 'favorite_teams'})
         
-        # Recalcular completude
-        updated_fan.profile_completeness = self._calculate_profile_completeness_for_fan(updated_fan)
-        self.fan_repository.update(updated_fan)
+        # Conexão, sincronização e completude em uma leitura e uma escrita
+        self.fan_repository.run_in_unit_of_work(user_id, work)
         
         return social_media
     
-    def sync_social_media_data(self, user_id: str, platform: str) -> Dict[str, Any]:
-        """Sync data from connected social media"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
+    def _sync_social_media(self, fan: Fan, platform: str) -> List[str]:
+        """Apply data synced from a connected platform to the in-memory fan"""
         # Encontrar conta de mídia social
         social_media = None
         for sm in fan.social_media:
@@ -191,19 +204,22 @@ class FanUseCaseImpl(FanUseCase):
         else:
             esports_teams = ["FURIA"]
         
-        # Atualizar times favoritos
-        for team in esports_teams:
-            if team not in fan.favorite_teams:
-                fan.favorite_teams.append(team)
+        # Atualizar times favoritos (sem repetir o mesmo time com outra grafia)
+        fan.favorite_teams = get_catalog().merge('team', fan.favorite_teams, esports_teams)
         
         # Atualizar data de sincronização
-        for sm in fan.social_media:
-            if sm.platform == platform:
-                sm.last_sync = datetime.now()
-                break
+        social_media.last_sync = datetime.now()
+        
+        return esports_teams
+    
+    def sync_social_media_data(self, user_id: str, platform: str) -> Dict[str, Any]:
+        """Sync data from connected social media"""
+        def work(fan: Fan) -> List[str]:
+            teams = self._sync_social_media(fan, platform)
+            self._refresh_completeness(fan, {'social_media', 'favorite_teams'})
+            return teams
         
-        # Salvar mudanças
-        self.fan_repository.update(fan)
+        esports_teams = self.fan_repository.run_in_unit_of_work(user_id, work)
         
         return {
             "synced_data": {
@@ -214,11 +230,6 @@ class FanUseCaseImpl(FanUseCase):
     
     def add_esports_profile(self, user_id: str, platform: str, profile_url: str, username: str) -> EsportsActivity:
         """Add an esports profile for verification"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
         # Criar objeto de perfil de esports
         profile = EsportsActivity(
             platform=platform,
@@ -228,162 +239,116 @@ class FanUseCaseImpl(FanUseCase):
             verified=False
         )
         
-        # Adicionar ao perfil
-        updated_fan = self.fan_repository.add_esports_profile(fan.id, profile)
+        def work(fan: Fan):
+            # Adicionar ao perfil (substitui o perfil anterior da mesma plataforma)
+            fan.esports_profiles = replace_by_platform(fan.esports_profiles, profile)
+            
+            # Sem fila, a verificação roda aqui mesmo, na mesma escrita
+            if self.job_queue is None:
+                self._apply_esports_verification(fan, platform)
+            self._refresh_completeness(fan, {'esports_profiles', 'favorite_games'})
         
-        # Iniciar verificação (em uma implementação real, isto seria assíncrono)
-        self.verify_esports_profile_async(fan.id, platform)
+        self.fan_repository.run_in_unit_of_work(user_id, work)
         
+        if self.job_queue is not None:
+            self.verify_esports_profile_async(user_id, platform)
         return profile
     
-    def verify_esports_profile_async(self, fan_id: str, platform: str):
-        """Simulate async esports profile verification with AI"""
-        try:
-            # Simular verificação por AI
-            # Aqui estamos apenas simulando um resultado positivo após 'processamento'
-            is_valid = True
-            
-            # Buscar perfil
-            fan = self.fan_repository.find_by_id(fan_id)
-            if not fan:
-                return
-            
-            # Encontrar perfil de esports
-            for profile in fan.esports_profiles:
-                if profile.platform == platform:
-                    # Simular jogos detectados
-                    if platform == "twitch":
-                        profile.games = ["CS:GO", "Valorant", "League of Legends"]
-                    elif platform == "steam":
-                        profile.games = ["CS:GO", "Dota 2"]
-                    else:
-                        profile.games = ["League of Legends"]
-                    
-                    # Adicionar jogos aos favoritos
-                    for game in profile.games:
-                        if game not in fan.favorite_games:
-                            fan.favorite_games.append(game)
-                    
-                    break
-            
-            # Atualizar perfil como verificado
-            self.fan_repository.verify_esports_profile(fan_id, platform, is_valid)
-            
-            # Recalcular completude do perfil
-            fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
-            self.fan_repository.update(fan)
+    def _apply_esports_verification(self, fan: Fan, platform: str):
+        """Simulate AI esports profile verification on the in-memory fan"""
+        # Simular verificação por AI
+        # Aqui estamos apenas simulando um resultado positivo após 'processamento'
+        is_valid = True
+        
+        # Encontrar perfil de esports
+        for profile in fan.esports_profiles:
+            if profile.platform == platform:
+                # Simular jogos detectados
+                if platform == "twitch":
+                    profile.games = ["CS:GO", "Valorant", "League of Legends"]
+                elif platform == "steam":
+                    profile.games = ["CS:GO", "Dota 2"]
+                else:
+                    profile.games = ["League of Legends"]
                 
-        except Exception as e:
-            print(f"Error in esports profile verification: {e}")
+                # Adicionar jogos aos favoritos
+                fan.favorite_games = get_catalog().merge('game', fan.favorite_games, profile.games)
+                
+                profile.verified = is_valid
+                break
+    
+    def run_esports_verification(self, fan_id: str, platform: str):
+        """Verify an esports profile and store the result; errors propagate so the job is retried"""
+        def work(fan: Fan):
+            if not any(profile.platform == platform for profile in fan.esports_profiles):
+                raise ValueError(f"Esports profile {platform} not found for fan {fan_id}")
+            self._apply_esports_verification(fan, platform)
+            self._refresh_completeness(fan, {'esports_profiles', 'favorite_games'})
+        
+        self.fan_repository.run_in_unit_of_work(fan_id, work)
+    
+    def verify_esports_profile_async(self, fan_id: str, platform: str) -> Optional[Job]:
+        """Queue the esports profile verification; without a queue it runs inline"""
+        if self.job_queue is None:
+            self.run_esports_verification(fan_id, platform)
+            return None
+        return self.job_queue.enqueue(VERIFY_ESPORTS_PROFILE, {'fan_id': fan_id, 'platform': platform})
+    
+    def job_handlers(self) -> Dict[str, Callable[[Dict[str, Any]], None]]:
+        """Background job handlers, by job type, for the worker"""
+        return {
+            VERIFY_DOCUMENT: lambda payload: self.run_document_verification(payload['fan_id'], payload['doc_id']),
+            VERIFY_ESPORTS_PROFILE: lambda payload: self.run_esports_verification(payload['fan_id'], payload['platform']),
+        }
     
     def verify_esports_profile(self, user_id: str, platform: str) -> bool:
         """Manually verify an esports profile"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
+        # Verificação na mesma unidade de trabalho da leitura do perfil;
+        # falha com ValueError se o perfil não existir
+        def work(fan: Fan):
+            self._apply_esports_verification(fan, platform)
+            self._refresh_completeness(fan, {'esports_profiles', 'favorite_games'})
         
-        # Iniciar verificação assíncrona
-        self.verify_esports_profile_async(fan.id, platform)
+        self.fan_repository.run_in_unit_of_work(user_id, work)
         
         return True
     
     def add_event_interest(self, user_id: str, event_data: Dict[str, Any]) -> EventInterest:
         """Add an event interest"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
         # Criar objeto de interesse em evento
         event_interest = EventInterest(**event_data)
         
-        # Adicionar ao perfil
-        fan.event_interests.append(event_interest)
-        
-        # Recalcular completude
-        fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
-        
-        # Salvar
-        self.fan_repository.update(fan)
+        # Um registro na linha do tempo do fã mais o contador do perfil, sem ler
+        # o perfil (o id é o UID); interesses em eventos não entram na completude
+        self.fan_repository.add_event_interest(user_id, event_interest)
         
         return event_interest
     
     def add_purchase(self, user_id: str, purchase_data: Dict[str, Any]) -> Purchase:
         """Record a purchase"""
-        # Buscar perfil existente
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
         # Criar objeto de compra
         purchase = Purchase(**purchase_data)
         
-        # Adicionar ao perfil
-        fan.purchases.append(purchase)
-        
-        # Recalcular completude
-        fan.profile_completeness = self._calculate_profile_completeness_for_fan(fan)
-        
-        # Salvar
-        self.fan_repository.update(fan)
+        # Gravar a compra na linha do tempo e incrementar os contadores do perfil
+        # na mesma escrita atômica; compras não entram na completude do perfil
+        self.fan_repository.add_purchase(user_id, purchase)
         
         return purchase
     
-    def _calculate_profile_completeness_for_fan(self, fan: Fan) -> int:
-        """Calculate profile completeness percentage for a Fan object"""
-        total_points = 0
-        max_points = 100
-        
-        # Informações básicas (50 pontos)
-        if fan.name:
-            total_points += 10
-        if fan.email:
-            total_points += 5
-        if fan.phone:
-            total_points += 5
-        if fan.birth_date:
-            total_points += 5
-        if fan.address:
-            total_points += 10
-        if fan.cpf:
-            total_points += 5
-        if fan.profile_image_url:
-            total_points += 10
-            
-        # Documentos verificados (10 pontos)
-        if any(doc.verified for doc in fan.documents):
-            total_points += 10
-            
-        # Redes sociais conectadas (15 pontos)
-        social_media_points = min(15, len([sm for sm in fan.social_media if sm.connected]) * 5)
-        total_points += social_media_points
-        
-        # Perfis de esports verificados (15 pontos)
-        esports_points = min(15, len([p for p in fan.esports_profiles if p.verified]) * 5)
-        total_points += esports_points
-        
-        # Interesses e preferências (10 pontos)
-        if fan.favorite_games:
-            total_points += min(5, len(fan.favorite_games))
-        if fan.favorite_teams:
-            total_points += min(5, len(fan.favorite_teams))
-            
-        return min(100, total_points)
+    def _refresh_completeness(self, fan: Fan, changed_fields: Optional[Iterable[str]] = None) -> int:
+        """Update the completeness score, re-evaluating only rules tied to changed_fields"""
+        fan.profile_completeness, fan.completeness_contributions = profile_completeness.rescore(
+            fan, fan.completeness_contributions, changed_fields
+        )
+        return fan.profile_completeness
     
     def calculate_profile_completeness(self, user_id: str) -> int:
         """Calculate profile completeness percentage"""
-        fan = self.fan_repository.find_by_user_id(user_id)
-        if not fan:
-            raise ValueError(f"Fan profile not found for user ID: {user_id}")
-        
-        completeness = self._calculate_profile_completeness_for_fan(fan)
-        
-        # Atualizar o valor no perfil
-        fan.profile_completeness = completeness
-        self.fan_repository.update(fan)
+        def work(fan: Fan) -> int:
+            # Recalcula todas as regras; o valor só é gravado se mudou
+            return self._refresh_completeness(fan, None)
         
-        return completeness
+        return self.fan_repository.run_in_unit_of_work(user_id, work)
     
     def get_fan_analytics(self, user_id: str) -> Dict[str, Any]:
         """Get analytics about fan preferences and activities"""
@@ -395,11 +360,12 @@ class FanUseCaseImpl(FanUseCase):
         verified_documents = len([doc for doc in fan.documents if doc.verified])
         connected_platforms = len([sm for sm in fan.social_media if sm.connected])
         verified_esports = len([p for p in fan.esports_profiles if p.verified])
-        total_purchases = len(fan.purchases)
-        total_events = len(fan.event_interests)
         
-        # Calcular gasto total
-        total_spent = sum(purchase.amount for purchase in fan.purchases)
+        # Totais mantidos no perfil a cada registro; as compras e os eventos em
+        # si ficam nas linhas do tempo e não são lidos aqui
+        total_purchases = fan.purchase_count
+        total_events = fan.event_count
+        total_spent = fan.total_spent
         
         # Analíticos por tipo de interesse
         favorite_games_count = {}
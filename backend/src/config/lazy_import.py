@@ -0,0 +1,60 @@
+import importlib
+import logging
+import threading
+import time
+import types
+
+logger = logging.getLogger(__name__)
+
+
+class LazyModule(types.ModuleType):
+    """
+    Proxy que só importa o módulo real no primeiro acesso a um atributo.
+
+    Permite manter `np.array(...)` / `cv2.cvtColor(...)` no código sem pagar o
+    custo do import quando o módulo é carregado pelo app.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_lock'] = threading.Lock()
+        self.__dict__['_lazy_import_ms'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is not None:
+            return module
+
+        with self.__dict__['_lazy_lock']:
+            module = self.__dict__['_lazy_module']
+            if module is None:
+                started = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                elapsed = (time.perf_counter() - started) * 1000
+                self.__dict__['_lazy_import_ms'] = elapsed
+                self.__dict__['_lazy_module'] = module
+                logger.info(f"Módulo {self.__name__} importado em {elapsed:.1f} ms")
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__['_lazy_module'] is not None
+
+    @property
+    def import_ms(self):
+        return self.__dict__['_lazy_import_ms']
+
+    def available(self) -> bool:
+        try:
+            self._load()
+            return True
+        except ImportError:
+            return False
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
@@ -0,0 +1,169 @@
+"""
+Catálogo canônico de interesses (jogos e times) com resolução de apelidos.
+
+Cada item tem um id inteiro estável, um nome de exibição e apelidos.
+Nomes e apelidos são comparados por uma chave normalizada (sem acentos,
+maiúsculas, espaços nem pontuação), então "CSGO", "cs go", "CS:GO" e
+"Counter-Strike 2" resolvem para o mesmo id com uma consulta a dicionário.
+
+No Firestore as listas `favorite_games`/`favorite_teams` guardam ids para os
+itens do catálogo e o texto original para o que o catálogo não conhece; a
+entidade `Fan` e a API continuam trabalhando com nomes. O catálogo vem de
+`interests.json` (ou de `INTEREST_CATALOG_PATH`) e é carregado uma vez por
+processo. Ids nunca são reaproveitados: para retirar um item, mantenha-o.
+"""
+import json
+import os
+import unicodedata
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+StoredValue = Union[int, str]
+
+# Campos do Fan ligados a cada tipo do catálogo
+FIELD_KINDS: Dict[str, str] = {'favorite_games': 'game', 'favorite_teams': 'team'}
+
+_CACHE_SIZE = 50000
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'interests.json')
+
+
+def normalize(text: str) -> str:
+    """Lookup key: accents, case, spaces and punctuation removed"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if char.isalnum()).casefold()
+
+
+def _clean(text: str) -> str:
+    return ' '.join(text.split())
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    id: int
+    kind: str
+    name: str
+    aliases: Tuple[str, ...] = ()
+
+
+class InterestCatalog:
+    def __init__(self, entries: Iterable[CatalogEntry]):
+        self._by_id: Dict[Tuple[str, int], CatalogEntry] = {}
+        self._by_key: Dict[Tuple[str, str], int] = {}
+        self._cache: Dict[Tuple[str, StoredValue], Tuple] = {}
+
+        for entry in entries:
+            if (entry.kind, entry.id) in self._by_id:
+                raise ValueError(f"Duplicate {entry.kind} id {entry.id}")
+            self._by_id[(entry.kind, entry.id)] = entry
+
+            for spelling in (entry.name,) + tuple(entry.aliases):
+                key = (entry.kind, normalize(spelling))
+                if self._by_key.setdefault(key, entry.id) != entry.id:
+                    raise ValueError(f"'{spelling}' is ambiguous between {entry.kind} ids "
+                                     f"{self._by_key[key]} and {entry.id}")
+
+    @classmethod
+    def from_mapping(cls, data: Mapping[str, List[Mapping]]) -> 'InterestCatalog':
+        return cls(
+            CatalogEntry(int(item['id']), kind, item['name'], tuple(item.get('aliases') or ()))
+            for kind, items in data.items()
+            for item in items
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'InterestCatalog':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_mapping(json.load(f))
+
+    def entries(self, kind: str) -> List[CatalogEntry]:
+        return [entry for (entry_kind, _), entry in sorted(self._by_id.items()) if entry_kind == kind]
+
+    def _lookup(self, kind: str, value: StoredValue) -> Tuple[Optional[StoredValue], Optional[StoredValue], Optional[str]]:
+        """(comparison key, stored value, display name) for one value, memoized"""
+        cache_key = (kind, value)
+        try:
+            return self._cache[cache_key]
+        except (KeyError, TypeError):
+            pass
+
+        item_id = None
+        if isinstance(value, int) and not isinstance(value, bool):
+            item_id = value if (kind, value) in self._by_id else None
+        elif isinstance(value, str):
+            item_id = self._by_key.get((kind, normalize(value)))
+
+        if item_id is not None:
+            result = (item_id, item_id, self._by_id[(kind, item_id)].name)
+        elif isinstance(value, str) and value.strip():
+            text = _clean(value)
+            result = (normalize(text) or text, text, text)
+        else:
+            result = (None, None, None)
+
+        if isinstance(value, (int, str)):
+            # Texto livre também passa por aqui; limita o cache
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            self._cache[cache_key] = result
+        return result
+
+    def resolve(self, kind: str, value: StoredValue) -> Optional[int]:
+        """Catalog id for a name, alias or id; None when unknown"""
+        key, stored, _ = self._lookup(kind, value)
+        return stored if isinstance(stored, int) else None
+
+    def name(self, kind: str, value: StoredValue) -> Optional[str]:
+        """Display name: the catalog name when known, else the cleaned text"""
+        return self._lookup(kind, value)[2]
+
+    def key(self, kind: str, value: StoredValue) -> Optional[StoredValue]:
+        """Comparison key: the id for catalog items, the normalized text otherwise"""
+        return self._lookup(kind, value)[0]
+
+    def _unique(self, kind: str, values: Iterable[StoredValue], position: int) -> List:
+        seen = set()
+        result = []
+        for value in values or ():
+            entry = self._lookup(kind, value)
+            if entry[0] is not None and entry[0] not in seen:
+                seen.add(entry[0])
+                result.append(entry[position])
+        return result
+
+    def encode(self, kind: str, values: Iterable[StoredValue]) -> List[StoredValue]:
+        """Names/aliases/ids to stored values: ids when known, text otherwise; deduplicated"""
+        return self._unique(kind, values, 1)
+
+    def decode(self, kind: str, values: Iterable[StoredValue]) -> List[str]:
+        """Stored values (or raw names) to canonical display names; deduplicated"""
+        return self._unique(kind, values, 2)
+
+    def merge(self, kind: str, current: Iterable[StoredValue], additions: Iterable[StoredValue]) -> List[str]:
+        """`current` plus the `additions` it does not have yet, as display names"""
+        return self.decode(kind, list(current or ()) + list(additions or ()))
+
+
+@lru_cache(maxsize=None)
+def get_catalog() -> InterestCatalog:
+    """Process-wide catalog, loaded once"""
+    return InterestCatalog.from_file(os.getenv('INTEREST_CATALOG_PATH', _DEFAULT_PATH))
+
+
+def encode_fields(data: Dict[str, object]) -> Dict[str, object]:
+    """Replace catalog-backed lists in a document/update dict with stored values (in place)"""
+    catalog = get_catalog()
+    for field, kind in FIELD_KINDS.items():
+        if isinstance(data.get(field), list):
+            data[field] = catalog.encode(kind, data[field])
+    return data
+
+
+def decode_fields(data: Dict[str, object]) -> Dict[str, object]:
+    """Replace stored catalog lists in a document dict with display names (in place)"""
+    catalog = get_catalog()
+    for field, kind in FIELD_KINDS.items():
+        if isinstance(data.get(field), list):
+            data[field] = catalog.decode(kind, data[field])
+    return data
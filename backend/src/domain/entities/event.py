@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import datetime
+import uuid
+
+
+class Event(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    title: str
+    description: Optional[str] = None
+    game: Optional[str] = None  # nome ou apelido do catálogo de interesses
+    teams: List[str] = []
+    city: Optional[str] = None
+    state: Optional[str] = None  # UF; vazio para eventos online
+    postal_code: Optional[str] = None  # CEP do local, usado pelo índice geográfico
+    online: bool = False
+    starts_at: datetime
+    image_url: Optional[str] = None
+    
+    # Metadados
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+import uuid
 
 
 class Address(BaseModel):
@@ -14,6 +15,51 @@ class Address(BaseModel):
     country: str = "Brasil"
 
 
+class Document(BaseModel):
+    doc_type: str  # RG, CNH, comprovante de residência...
+    doc_number: str
+    verified: bool = False
+    document_url: Optional[str] = None
+    uploaded_at: datetime = Field(default_factory=datetime.now)
+    verified_at: Optional[datetime] = None
+
+
+class SocialMedia(BaseModel):
+    platform: str
+    profile_url: str
+    username: Optional[str] = None
+    connected: bool = False
+    last_sync: Optional[datetime] = None
+
+
+class EsportsActivity(BaseModel):
+    platform: str  # twitch, steam, faceit...
+    profile_url: str
+    username: Optional[str] = None
+    games: List[str] = []
+    verified: bool = False
+
+
+def replace_by_platform(items: list, item) -> list:
+    """Replace the entry of the same platform, or append a new one"""
+    return [existing for existing in items if existing.platform != item.platform] + [item]
+
+
+class EventInterest(BaseModel):
+    event_name: str
+    event_date: Optional[datetime] = None
+    location: Optional[str] = None
+    attended: bool = False
+
+
+class Purchase(BaseModel):
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)  # id do documento em fans/{uid}/purchases
+    item_name: str
+    amount: float
+    category: Optional[str] = None
+    purchase_date: datetime = Field(default_factory=datetime.now)
+
+
 class Fan(BaseModel):
     id: Optional[str] = None
     user_id: str  # Firebase Auth UID
@@ -29,10 +75,27 @@ class Fan(BaseModel):
     favorite_teams: Optional[List[str]] = []
     recent_events: Optional[List[str]] = []
     
+    # Documentos, contas conectadas e atividades
+    documents: List[Document] = []
+    social_media: List[SocialMedia] = []
+    esports_profiles: List[EsportsActivity] = []
+    
+    # Legado: compras e interesses em eventos ficam nas subcoleções
+    # `purchases` e `events` do fã (ver migrate_fan_timelines)
+    event_interests: List[EventInterest] = []
+    purchases: List[Purchase] = []
+    
+    # Contadores mantidos no servidor (Increment) a cada compra ou evento registrado
+    purchase_count: int = 0
+    total_spent: float = 0.0
+    event_count: int = 0
+    
     # Metadados
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     
     # Dados do perfil
     profile_completeness: int = 0  # Porcentagem de preenchimento do perfil
-    profile_image_base64: Optional[str] = None  # Imagem do perfil em formato base64 
\ No newline at end of file
+    completeness_contributions: Dict[str, int] = {}  # Pontos por regra de completude
+    profile_image_base64: Optional[str] = None  # Imagem do perfil em formato base64
+    profile_image_url: Optional[str] = None 
\ No newline at end of file
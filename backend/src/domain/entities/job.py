@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+from datetime import datetime
+
+# Ciclo de vida: queued -> running -> succeeded, ou de volta a queued (nova
+# tentativa com backoff) até esgotar as tentativas, quando vai para dead
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+DEAD = 'dead'
+
+
+class Job(BaseModel):
+    id: str
+    type: str
+    payload: Dict[str, Any] = {}
+    status: str = QUEUED
+    attempts: int = 0
+    max_attempts: int = 5
+    run_after: datetime = Field(default_factory=datetime.now)
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional
+
+from src.domain.entities.event import Event
+
+
+class EventRepository(ABC):
+    """Catalog of events shown on the Events page"""
+
+    @abstractmethod
+    def save(self, event: Event) -> Event:
+        """Create or replace the event with `event.id`"""
+        pass
+
+    @abstractmethod
+    def find_by_id(self, event_id: str) -> Optional[Event]:
+        pass
+
+    @abstractmethod
+    def find_many(self, event_ids: List[str]) -> List[Event]:
+        """Existing events among `event_ids`, in the same order"""
+        pass
+
+    @abstractmethod
+    def delete(self, event_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def list_upcoming(self, after: datetime, limit: int = 50) -> List[Event]:
+        """Events starting at or after `after`, soonest first"""
+        pass
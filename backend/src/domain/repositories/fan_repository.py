@@ -0,0 +1,112 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List, Callable, Tuple, TypeVar
+
+from src.domain.entities.fan import Fan, Document, EventInterest, Purchase
+
+T = TypeVar('T')
+
+
+class ConcurrentUpdateError(Exception):
+    """The fan changed in storage after the unit of work loaded it"""
+
+
+class FanUnitOfWork(ABC):
+    """
+    Loads one Fan aggregate, lets the caller change it in memory and
+    persists only the changed fields in a single write on commit.
+
+    Usage:
+        with repository.unit_of_work(fan_id) as uow:
+            uow.fan.name = "Novo nome"
+    """
+
+    fan: Fan
+
+    @abstractmethod
+    def commit(self) -> Fan:
+        pass
+
+    def __enter__(self) -> 'FanUnitOfWork':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        return False
+
+
+class FanRepository(ABC):
+    @abstractmethod
+    def create(self, fan: Fan) -> Fan:
+        """Store a new fan; raises ValueError if the fan already exists"""
+        pass
+
+    @abstractmethod
+    def find_by_id(self, fan_id: str) -> Optional[Fan]:
+        pass
+
+    @abstractmethod
+    def find_by_user_id(self, user_id: str) -> Optional[Fan]:
+        pass
+
+    @abstractmethod
+    def find_many(self, fan_ids: List[str]) -> List[Fan]:
+        """Bulk read; missing ids are skipped"""
+        pass
+
+    @abstractmethod
+    def update(self, fan: Fan) -> Fan:
+        pass
+
+    @abstractmethod
+    def update_profile(self, user_id: str, profile_data: Dict[str, Any]) -> Fan:
+        pass
+
+    @abstractmethod
+    def unit_of_work(self, fan_id: str) -> FanUnitOfWork:
+        """Load the fan (one read) for in-memory changes committed in one write"""
+        pass
+
+    def run_in_unit_of_work(self, fan_id: str, work: Callable[[Fan], T], max_attempts: int = 3) -> T:
+        """Run `work` on the loaded fan and commit, reloading and retrying on conflicts"""
+        for attempt in range(1, max_attempts + 1):
+            try:
+                with self.unit_of_work(fan_id) as uow:
+                    result = work(uow.fan)
+                return result
+            except ConcurrentUpdateError:
+                if attempt == max_attempts:
+                    raise
+
+    @abstractmethod
+    def update_fields(self, fan_id: str, fields: Dict[str, Any]) -> None:
+        """Write only the given top-level fields, without reading the fan"""
+        pass
+
+    # Acréscimos às listas do perfil: cada um é uma única escrita, sem leitura
+
+    @abstractmethod
+    def add_document(self, fan_id: str, document: Document) -> None:
+        pass
+
+    @abstractmethod
+    def add_event_interest(self, fan_id: str, event_interest: EventInterest) -> None:
+        pass
+
+    @abstractmethod
+    def add_purchase(self, fan_id: str, purchase: Purchase) -> None:
+        pass
+
+    # Linhas do tempo: compras e interesses em eventos ficam fora do documento
+    # do fã, cada um em seu registro, lidos em páginas do mais recente ao mais
+    # antigo. O cursor devolvido é opaco; None indica a última página
+
+    @abstractmethod
+    def list_purchases(self, fan_id: str, limit: int = 20,
+                       cursor: Optional[str] = None) -> Tuple[List[Purchase], Optional[str]]:
+        pass
+
+    @abstractmethod
+    def list_event_interests(self, fan_id: str, limit: int = 20,
+                             cursor: Optional[str] = None) -> Tuple[List[EventInterest], Optional[str]]:
+        pass
@@ -0,0 +1,37 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Mapping
+
+from src.domain.rules import fan_stats
+
+
+class FanStatsRepository(ABC):
+    """Materialized aggregates of the whole fan base (see `domain.rules.fan_stats`)"""
+
+    @abstractmethod
+    def record(self, delta: Mapping[str, Any]) -> None:
+        """Apply a delta produced by `fan_stats.delta` on its own"""
+        pass
+
+    @abstractmethod
+    def totals(self) -> Dict[str, Any]:
+        """Current aggregates, in the `fan_stats.empty()` shape"""
+        pass
+
+    @abstractmethod
+    def replace(self, totals: Mapping[str, Any]) -> None:
+        """Overwrite the aggregates (used by the rebuild job)"""
+        pass
+
+    def get_overview(self, limit: int = 10) -> Dict[str, Any]:
+        """Dashboard summary: totals, top games/teams and fans per state"""
+        totals = self.totals()
+        fans = totals['fans']
+        return {
+            'total_fans': fans,
+            'total_purchases': totals['purchases'],
+            'total_spent': totals['total_spent'],
+            'average_spent_per_fan': round(totals['total_spent'] / fans, 2) if fans else 0.0,
+            'top_games': fan_stats.top(totals['games'], limit),
+            'top_teams': fan_stats.top(totals['teams'], limit),
+            'fans_by_state': {item['name']: item['fans'] for item in fan_stats.top(totals['states'], len(totals['states']))},
+        }
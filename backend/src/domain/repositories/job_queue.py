@@ -0,0 +1,48 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.domain.entities.job import Job
+
+
+class JobQueue(ABC):
+    """Persistent queue of background jobs, claimed by workers under a lease"""
+
+    @abstractmethod
+    def enqueue(self, job_type: str, payload: Dict[str, Any], max_attempts: int = 5, delay: float = 0.0) -> Job:
+        pass
+
+    @abstractmethod
+    def claim(self, job_types: Iterable[str], worker_id: str, lease_seconds: float) -> Optional[Job]:
+        """Mark the next ready job of these types as running, or None if there is none"""
+        pass
+
+    @abstractmethod
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        """Mark as succeeded; False (nothing changed) if `worker_id` no longer holds the lease"""
+        pass
+
+    @abstractmethod
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float) -> Optional[Job]:
+        """
+        Requeue after `retry_delay` seconds, or move to the dead-letter list once
+        out of attempts; None (nothing changed) if `worker_id` no longer holds the lease
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        pass
+
+    @abstractmethod
+    def dead_letters(self, limit: int = 100) -> List[Job]:
+        pass
+
+    @abstractmethod
+    def retry(self, job_id: str) -> Job:
+        """Put a dead job back in the queue with fresh attempts"""
+        pass
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        pass
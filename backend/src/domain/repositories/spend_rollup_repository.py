@@ -0,0 +1,32 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.domain.rules import spend_buckets
+
+
+class SpendRollupRepository(ABC):
+    """Spend per day, month and lifetime, per fan and for the whole base (see `domain.rules.spend_buckets`)"""
+
+    @abstractmethod
+    def record(self, fan_id: str, amount: float, when: datetime) -> None:
+        """Add one purchase to the fan's and the global buckets"""
+        pass
+
+    @abstractmethod
+    def series(self, granularity: str, periods: Sequence[str], fan_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Amount and count for each period, in the given order (zeros for periods without purchases)"""
+        pass
+
+    def by_month(self, months: int = 12, fan_id: Optional[str] = None,
+                 now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """The last `months` months, oldest first"""
+        return self.series(spend_buckets.MONTH, spend_buckets.last_months(now or datetime.now(), months), fan_id)
+
+    def by_day(self, days: int = 30, fan_id: Optional[str] = None,
+               now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """The last `days` days, oldest first"""
+        return self.series(spend_buckets.DAY, spend_buckets.last_days(now or datetime.now(), days), fan_id)
+
+    def lifetime(self, fan_id: Optional[str] = None) -> Dict[str, Any]:
+        return self.series(spend_buckets.LIFETIME, [spend_buckets.LIFETIME_PERIOD], fan_id)[0]
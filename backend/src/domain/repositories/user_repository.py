@@ -0,0 +1,38 @@
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.domain.entities.user import User
+
+
+class UserRepository(ABC):
+    @abstractmethod
+    def create(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    def find_by_id(self, user_id: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def find_by_email(self, email: str) -> Optional[User]:
+        """E-mails are unique, compared case-insensitively"""
+        pass
+
+    @abstractmethod
+    def find_all(self) -> List[User]:
+        """Every user, ordered by (created_at, id)"""
+        pass
+
+    @abstractmethod
+    def find_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[User]:
+        """Up to `limit` users after the (created_at, id) cursor, in find_all order"""
+        pass
+
+    @abstractmethod
+    def update(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: str) -> bool:
+        pass
@@ -0,0 +1,109 @@
+"""
+Agregados da base de fãs (jogos e times favoritos, fãs por estado, gastos).
+
+Cada fã contribui com uma parcela fixa para os agregados: 1 fã, 1 em cada
+jogo/time favorito (sem repetição), 1 no estado do endereço e o total de
+compras/gastos. Uma escrita de perfil altera os agregados exatamente pela
+diferença entre a contribuição depois e antes dela, o que permite manter
+contadores materializados com incrementos, sem reler a coleção. As funções
+aceitam tanto um `Fan` quanto o dicionário do documento no Firestore.
+"""
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from src.domain.catalog.interest_catalog import get_catalog
+from src.domain.rules.fields import field_value
+
+# Contadores escalares e mapas nome -> contagem
+SCALARS: Tuple[str, ...] = ('fans', 'purchases', 'total_spent')
+MAPS: Tuple[str, ...] = ('games', 'teams', 'states')
+
+# Campos do documento dos quais a contribuição depende
+SOURCE_FIELDS = ('favorite_games', 'favorite_teams', 'address', 'purchase_count', 'total_spent', 'purchases')
+
+
+def _purchases(source: Any) -> Tuple[int, float]:
+    count, spent = field_value(source, 'purchase_count'), field_value(source, 'total_spent')
+    if count is not None and spent is not None:
+        return int(count), float(spent)
+    # Documentos antigos sem os contadores: soma a lista de compras
+    purchases = field_value(source, 'purchases') or []
+    return len(purchases), float(sum(field_value(item, 'amount') or 0 for item in purchases))
+
+
+def empty() -> Dict[str, Any]:
+    return {'fans': 0, 'purchases': 0, 'total_spent': 0.0, 'games': {}, 'teams': {}, 'states': {}}
+
+
+def contribution(source: Any) -> Dict[str, Any]:
+    """What one fan adds to the aggregates"""
+    if source is None:
+        return empty()
+
+    catalog = get_catalog()
+    state = field_value(field_value(source, 'address') or {}, 'state')
+    state = state.strip().upper() if isinstance(state, str) else None
+    purchases, spent = _purchases(source)
+
+    return {
+        'fans': 1,
+        'purchases': purchases,
+        'total_spent': spent,
+        # Nomes canônicos do catálogo: grafias diferentes contam como um só item
+        'games': {name: 1 for name in catalog.decode('game', field_value(source, 'favorite_games'))},
+        'teams': {name: 1 for name in catalog.decode('team', field_value(source, 'favorite_teams'))},
+        'states': {state: 1} if state else {},
+    }
+
+
+def delta(before: Optional[Any], after: Optional[Any]) -> Dict[str, Any]:
+    """
+    Change to the aggregates caused by a write that turned `before` into
+    `after` (None for a document that did not exist / was deleted). Only
+    non-zero entries are kept; an empty dict means nothing to write.
+    """
+    return difference(contribution(before), contribution(after))
+
+
+def difference(old: Mapping[str, Any], new: Mapping[str, Any]) -> Dict[str, Any]:
+    """`new - old` for two contributions, keeping only non-zero entries"""
+    result: Dict[str, Any] = {}
+
+    for name in SCALARS:
+        change = new[name] - old[name]
+        if change:
+            result[name] = round(change, 2) if isinstance(change, float) else change
+
+    for name in MAPS:
+        keys = set(old[name]) | set(new[name])
+        changes = {key: new[name].get(key, 0) - old[name].get(key, 0) for key in keys}
+        changes = {key: value for key, value in changes.items() if value}
+        if changes:
+            result[name] = changes
+
+    return result
+
+
+def accumulate(totals: Dict[str, Any], part: Mapping[str, Any]) -> Dict[str, Any]:
+    """Add a contribution, delta or stored shard into `totals` (in place)"""
+    for name in SCALARS:
+        totals[name] = totals.get(name, 0) + (part.get(name) or 0)
+    for name in MAPS:
+        counts = totals.setdefault(name, {})
+        for key, value in (part.get(name) or {}).items():
+            counts[key] = counts.get(key, 0) + value
+    return totals
+
+
+def merge(parts: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    totals = empty()
+    for part in parts:
+        accumulate(totals, part)
+    totals['total_spent'] = round(totals['total_spent'], 2)
+    return totals
+
+
+def top(counts: Mapping[str, int], limit: int) -> List[Dict[str, Any]]:
+    """Most frequent names first; ties by name. Zeroed counters are dropped"""
+    ranked = sorted(((name, count) for name, count in counts.items() if count > 0),
+                    key=lambda item: (-item[1], item[0]))
+    return [{'name': name, 'fans': count} for name, count in ranked[:limit]]
@@ -0,0 +1,13 @@
+"""
+Leitura de campos do fã que serve tanto para um `Fan` (ou seus submodelos)
+quanto para o dicionário do documento no Firestore, como as regras de
+completude, os agregados e os índices recebem.
+"""
+from typing import Any, Mapping
+
+
+def field_value(source: Any, name: str, default=None):
+    """Value of `name` in a mapping or an attribute of an object; `default` when absent"""
+    if isinstance(source, Mapping):
+        return source.get(name, default)
+    return getattr(source, name, default)
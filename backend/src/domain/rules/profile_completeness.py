@@ -0,0 +1,131 @@
+"""
+Completude do perfil do fã como uma tabela de regras ponderadas.
+
+Cada regra declara os campos de primeiro nível de que depende e quantos
+pontos vale no máximo. O fan guarda a contribuição de cada regra em
+`completeness_contributions`; depois de uma alteração só as regras ligadas
+aos campos alterados são reavaliadas. As regras aceitam tanto um `Fan`
+quanto o dicionário do documento no Firestore.
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, Optional, Tuple
+
+from src.domain.rules.fields import field_value
+
+MAX_SCORE = 100
+
+
+def _count(source: Any, field: str, flag: str) -> int:
+    return sum(1 for item in (field_value(source, field) or []) if field_value(item, flag))
+
+
+@dataclass(frozen=True)
+class CompletenessRule:
+    """
+    `measure` returns a non-negative count (1/0 for presence checks); each
+    unit is worth `step` points up to `levels` units, so the rule is worth at
+    most `step * levels` points.
+    """
+    name: str
+    fields: FrozenSet[str]
+    measure: Callable[[Any], int]
+    step: int
+    levels: int = 1
+
+    @property
+    def points(self) -> int:
+        return self.step * self.levels
+
+    def score(self, source: Any) -> int:
+        return self.step * min(self.levels, max(0, int(self.measure(source))))
+
+
+def _filled(name: str, points: int, *fields: str) -> CompletenessRule:
+    """Full points when any of the fields has a value"""
+    return CompletenessRule(name, frozenset(fields),
+                            lambda source: 1 if any(field_value(source, f) for f in fields) else 0, points)
+
+
+RULES: Tuple[CompletenessRule, ...] = (
+    # Informações básicas (50 pontos)
+    _filled('name', 10, 'name'),
+    _filled('email', 5, 'email'),
+    _filled('phone', 5, 'phone'),
+    _filled('birth_date', 5, 'birth_date'),
+    _filled('address', 10, 'address'),
+    _filled('cpf', 5, 'cpf'),
+    # `has_profile_image` acompanha `profile_image_base64` em toda escrita da imagem
+    _filled('profile_image', 10, 'profile_image_url', 'has_profile_image', 'profile_image_base64'),
+
+    # Documentos verificados (10 pontos)
+    CompletenessRule('verified_document', frozenset({'documents'}),
+                     lambda source: _count(source, 'documents', 'verified'), step=10),
+
+    # Redes sociais conectadas (15 pontos)
+    CompletenessRule('social_media', frozenset({'social_media'}),
+                     lambda source: _count(source, 'social_media', 'connected'), step=5, levels=3),
+
+    # Perfis de esports verificados (15 pontos)
+    CompletenessRule('esports_profiles', frozenset({'esports_profiles'}),
+                     lambda source: _count(source, 'esports_profiles', 'verified'), step=5, levels=3),
+
+    # Interesses e preferências (10 pontos)
+    CompletenessRule('favorite_games', frozenset({'favorite_games'}),
+                     lambda source: len(field_value(source, 'favorite_games') or []), step=1, levels=5),
+    CompletenessRule('favorite_teams', frozenset({'favorite_teams'}),
+                     lambda source: len(field_value(source, 'favorite_teams') or []), step=1, levels=5),
+)
+
+
+def _index(rules: Iterable[CompletenessRule]) -> Dict[str, List[CompletenessRule]]:
+    index: Dict[str, List[CompletenessRule]] = {}
+    for rule in rules:
+        for field in rule.fields:
+            index.setdefault(field, []).append(rule)
+    return index
+
+
+_RULES_BY_FIELD = _index(RULES)
+
+# Campos que afetam a completude (útil para decidir se vale recalcular)
+SCORED_FIELDS: FrozenSet[str] = frozenset(_RULES_BY_FIELD)
+
+# Campos a ler quando o documento vem com field mask: a imagem inline (até
+# ~1 MB) fica de fora, e a presença dela vem de `has_profile_image`
+MASK_FIELDS: FrozenSet[str] = SCORED_FIELDS - {'profile_image_base64'}
+
+
+def total(contributions: Mapping[str, int]) -> int:
+    return min(MAX_SCORE, sum(contributions.get(rule.name, 0) for rule in RULES))
+
+
+def score(source: Any) -> Tuple[int, Dict[str, int]]:
+    """Evaluate every rule; returns (score, contributions)"""
+    contributions = {rule.name: rule.score(source) for rule in RULES}
+    return total(contributions), contributions
+
+
+def rescore(source: Any, contributions: Optional[Mapping[str, int]],
+            changed_fields: Optional[Iterable[str]]) -> Tuple[int, Dict[str, int]]:
+    """
+    Re-evaluate only the rules that depend on `changed_fields`.
+
+    Rules without a stored contribution (new fans, or rules added after the
+    fan was last scored) are evaluated too. `changed_fields=None` means
+    "unknown" and evaluates everything.
+    """
+    if changed_fields is None or not contributions:
+        return score(source)
+
+    updated = dict(contributions)
+    pending = {rule.name: rule for rule in RULES if rule.name not in updated}
+    for field in changed_fields:
+        for rule in _RULES_BY_FIELD.get(field, ()):
+            pending[rule.name] = rule
+
+    for name, rule in pending.items():
+        updated[name] = rule.score(source)
+
+    # Regras removidas da tabela deixam de contar
+    updated = {rule.name: updated[rule.name] for rule in RULES}
+    return total(updated), updated
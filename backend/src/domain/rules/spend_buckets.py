@@ -0,0 +1,66 @@
+"""
+Baldes de gasto por período (dia, mês e total), por fã e da base inteira.
+
+Cada compra soma o valor e 1 compra em três baldes do fã e nos mesmos três
+da base: o do dia e o do mês da data da compra e o total. Os períodos são
+chaves de texto que ordenam cronologicamente (`2024-05-17`, `2024-05`,
+`all`), então "o último ano mês a mês" é uma lista de 12 chaves conhecidas
+de antemão, lidas diretamente pelo id, sem consulta.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+DAY = 'day'
+MONTH = 'month'
+LIFETIME = 'lifetime'
+GRANULARITIES = (DAY, MONTH, LIFETIME)
+
+LIFETIME_PERIOD = 'all'
+
+Bucket = Tuple[str, str]  # (granularidade, período)
+
+
+def period(granularity: str, when: date) -> str:
+    if granularity == DAY:
+        return when.strftime('%Y-%m-%d')
+    if granularity == MONTH:
+        return when.strftime('%Y-%m')
+    if granularity == LIFETIME:
+        return LIFETIME_PERIOD
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+def buckets(when: date) -> List[Bucket]:
+    """The day, month and lifetime buckets a purchase made at `when` falls into"""
+    return [(granularity, period(granularity, when)) for granularity in GRANULARITIES]
+
+
+def month_of(day: str) -> str:
+    return day[:7]
+
+
+def last_months(now: date, count: int) -> List[str]:
+    """The `count` months up to and including the one of `now`, oldest first"""
+    index = now.year * 12 + now.month - 1
+    return [f"{i // 12:04d}-{i % 12 + 1:02d}" for i in range(index - count + 1, index + 1)]
+
+
+def last_days(now: date, count: int) -> List[str]:
+    """The `count` days up to and including `now`, oldest first"""
+    ordinal = now.toordinal()
+    return [date.fromordinal(i).isoformat() for i in range(ordinal - count + 1, ordinal + 1)]
+
+
+def is_open(granularity: str, key: str, now: datetime) -> bool:
+    """Whether the period can still receive purchases made now (the current day/month, or lifetime)"""
+    return granularity == LIFETIME or key == period(granularity, now)
+
+
+def aggregate(purchases: Iterable[Tuple[float, date]]) -> Dict[Bucket, Tuple[float, int]]:
+    """(amount, when) pairs to the total amount and count per bucket"""
+    totals: Dict[Bucket, Tuple[float, int]] = {}
+    for amount, when in purchases:
+        for bucket in buckets(when):
+            spent, count = totals.get(bucket, (0.0, 0))
+            totals[bucket] = (spent + amount, count + 1)
+    return totals
@@ -0,0 +1,58 @@
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any
+
+from src.domain.entities.fan import Fan, Document, SocialMedia, EsportsActivity, EventInterest, Purchase
+
+
+class FanUseCase(ABC):
+    @abstractmethod
+    def create_profile(self, fan_data: Dict[str, Any]) -> Fan:
+        pass
+
+    @abstractmethod
+    def get_profile(self, user_id: str) -> Optional[Fan]:
+        pass
+
+    @abstractmethod
+    def update_profile(self, user_id: str, fan_data: Dict[str, Any]) -> Fan:
+        pass
+
+    @abstractmethod
+    def upload_document(self, user_id: str, doc_type: str, doc_number: str, file_data: bytes) -> Document:
+        pass
+
+    @abstractmethod
+    def verify_document(self, doc_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def connect_social_media(self, user_id: str, platform: str, profile_url: str, access_token: str = None) -> SocialMedia:
+        pass
+
+    @abstractmethod
+    def sync_social_media_data(self, user_id: str, platform: str) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def add_esports_profile(self, user_id: str, platform: str, profile_url: str, username: str) -> EsportsActivity:
+        pass
+
+    @abstractmethod
+    def verify_esports_profile(self, user_id: str, platform: str) -> bool:
+        pass
+
+    @abstractmethod
+    def add_event_interest(self, user_id: str, event_data: Dict[str, Any]) -> EventInterest:
+        pass
+
+    @abstractmethod
+    def add_purchase(self, user_id: str, purchase_data: Dict[str, Any]) -> Purchase:
+        pass
+
+    @abstractmethod
+    def calculate_profile_completeness(self, user_id: str) -> int:
+        pass
+
+    @abstractmethod
+    def get_fan_analytics(self, user_id: str) -> Dict[str, Any]:
+        pass
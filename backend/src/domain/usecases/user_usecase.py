@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+from src.domain.entities.user import User
+
+
+class UserUseCase(ABC):
+    @abstractmethod
+    def create(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        pass
+
+    @abstractmethod
+    def get_all(self) -> List[User]:
+        pass
+
+    @abstractmethod
+    def update(self, user: User) -> User:
+        pass
+
+    @abstractmethod
+    def delete(self, user_id: str) -> bool:
+        pass
@@ -1,59 +1,165 @@
-import firebase_admin
-from firebase_admin import credentials, auth, firestore, storage
+"""
+Provedor único dos clientes Firebase do processo.
+
+Concentra a inicialização do app Firebase (credenciais vindas das variáveis de
+ambiente) e entrega clientes Firestore, Auth e Storage compartilhados,
+criados no primeiro uso. O canal gRPC do Firestore é o da própria biblioteca,
+que já liga keepalive (30 s) e tira o limite de tamanho das mensagens. Depois
+de um fork os clientes são descartados, e cada processo filho cria os seus.
+Para testes e benchmarks, `override()` injeta implementações locais no lugar
+dos clientes reais.
+"""
+import logging
 import os
-from pathlib import Path
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+import firebase_admin
+from firebase_admin import credentials
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
 
-class FirebaseApp:
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super(FirebaseApp, cls).__new__(cls)
-            cls._instance._initialize_app()
-        return cls._instance
-    
-    def _initialize_app(self):
-        try:
-            # Carrega as variáveis de ambiente
-            load_dotenv()
-            
-            if not firebase_admin._apps:
-                # Usa as variáveis de ambiente para configurar as credenciais
-                firebase_credentials = {
-                    "type": "service_account",
-                    "project_id": os.getenv("FIREBASE_PROJECT_ID"),
-                    "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID"),
-                    "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n") if os.getenv("FIREBASE_PRIVATE_KEY") else None,
-                    "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
-                    "client_id": os.getenv("FIREBASE_CLIENT_ID"),
-                    "auth_uri": os.getenv("FIREBASE_AUTH_URI", "https://accounts.google.com/o/oauth2/auth"),
-                    "token_uri": os.getenv("FIREBASE_TOKEN_URI", "https://oauth2.googleapis.com/token"),
-                    "auth_provider_x509_cert_url": os.getenv("FIREBASE_AUTH_PROVIDER_CERT_URL", "https://www.googleapis.com/oauth2/v1/certs"),
-                    "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_CERT_URL"),
-                    "universe_domain": "googleapis.com"
-                }
-                
-                # Valida informações críticas
-                if not firebase_credentials["project_id"] or not firebase_credentials["private_key"]:
-                    raise ValueError("Credenciais do Firebase incompletas nas variáveis de ambiente")
-                
+
+def _credentials_from_env() -> Dict[str, Any]:
+    return {
+        "type": "service_account",
+        "project_id": os.getenv("FIREBASE_PROJECT_ID"),
+        "private_key_id": os.getenv("FIREBASE_PRIVATE_KEY_ID"),
+        "private_key": os.getenv("FIREBASE_PRIVATE_KEY").replace("\\n", "\n") if os.getenv("FIREBASE_PRIVATE_KEY") else None,
+        "client_email": os.getenv("FIREBASE_CLIENT_EMAIL"),
+        "client_id": os.getenv("FIREBASE_CLIENT_ID"),
+        "auth_uri": os.getenv("FIREBASE_AUTH_URI", "https://accounts.google.com/o/oauth2/auth"),
+        "token_uri": os.getenv("FIREBASE_TOKEN_URI", "https://oauth2.googleapis.com/token"),
+        "auth_provider_x509_cert_url": os.getenv("FIREBASE_AUTH_PROVIDER_CERT_URL", "https://www.googleapis.com/oauth2/v1/certs"),
+        "client_x509_cert_url": os.getenv("FIREBASE_CLIENT_CERT_URL"),
+        "universe_domain": "googleapis.com"
+    }
+
+
+def _firestore_client(app: firebase_admin.App):
+    # Cliente próprio do provedor, e não o `firebase_admin.firestore.client(app)`,
+    # que fica guardado no app e sobreviveria ao reset depois de um fork
+    from google.cloud import firestore
+
+    return firestore.Client(credentials=app.credential.get_credential(), project=app.project_id)
+
+
+class FirebaseProvider:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._app: Optional[firebase_admin.App] = None
+        self._clients: Dict[str, Any] = {}
+        self._overrides: Dict[str, Any] = {}
+        self._pid = os.getpid()
+
+    def initialize(self) -> firebase_admin.App:
+        """Initialize the Firebase app from environment credentials (idempotent)"""
+        if self._app is not None:
+            return self._app
+
+        with self._lock:
+            if self._app is not None:
+                return self._app
+
+            try:
+                load_dotenv()
+            except Exception as e:
+                logger.warning(f"Erro ao carregar .env: {e}")
+
+            if firebase_admin._apps:
+                logger.info("Firebase já inicializado")
+                self._app = firebase_admin.get_app()
+                return self._app
+
+            logger.info("Inicializando Firebase com credenciais de variáveis de ambiente")
+            firebase_credentials = _credentials_from_env()
+
+            # Valida informações críticas
+            if not firebase_credentials["project_id"] or not firebase_credentials["private_key"]:
+                raise ValueError("Credenciais do Firebase incompletas nas variáveis de ambiente")
+
+            try:
                 cred = credentials.Certificate(firebase_credentials)
-                self.app = firebase_admin.initialize_app(cred, {
+                self._app = firebase_admin.initialize_app(cred, {
                     'storageBucket': os.getenv('FIREBASE_STORAGE_BUCKET', 'know-your-fan.appspot.com')
                 })
-                print("Firebase initialized successfully")
-            else:
-                self.app = firebase_admin.get_app()
-                print("Using existing Firebase app")
-        except Exception as e:
-            print(f"Error initializing Firebase: {e}")
-            self.app = None
-    
-    def verify_id_token(self, id_token):
+            except Exception as e:
+                logger.error(f"Erro ao inicializar o Firebase: {str(e)}")
+                raise
+
+            logger.info("Firebase inicializado com sucesso")
+            return self._app
+
+    def _get(self, name: str, factory):
+        if name in self._overrides:
+            return self._overrides[name]
+
+        if self._pid != os.getpid():
+            self.reset()
+
+        client = self._clients.get(name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = factory(self.initialize())
+                    self._clients[name] = client
+        return client
+
+    def firestore(self):
+        """Process-wide Firestore client (one gRPC channel, kept alive between requests)"""
+        return self._get('firestore', _firestore_client)
+
+    def auth(self):
+        """Process-wide Firebase Auth client (keeps its HTTP session between calls)"""
+        from firebase_admin import auth
+        return self._get('auth', auth.Client)
+
+    def bucket(self):
+        """Default Cloud Storage bucket of the Firebase app"""
+        from firebase_admin import storage
+        return self._get('bucket', lambda app: storage.bucket(app=app))
+
+    def reset(self):
+        """Drop cached clients; the next call opens new connections"""
+        self._lock = threading.RLock()
+        self._clients = {}
+        self._pid = os.getpid()
+
+    @contextmanager
+    def override(self, **clients):
+        """Temporarily replace clients, e.g. override(firestore=FakeFirestoreClient())"""
+        unknown = set(clients) - {'firestore', 'auth', 'bucket'}
+        if unknown:
+            raise ValueError(f"Clientes desconhecidos: {', '.join(sorted(unknown))}")
+
+        previous = dict(self._overrides)
+        self._overrides.update(clients)
         try:
-            return auth.verify_id_token(id_token)
-        except Exception as e:
-            print(f"Error verifying token: {e}")
-            return None 
\ No newline at end of file
+            yield self
+        finally:
+            self._overrides = previous
+
+
+firebase_provider = FirebaseProvider()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=firebase_provider.reset)
+
+
+def initialize_firebase() -> firebase_admin.App:
+    return firebase_provider.initialize()
+
+
+def get_firestore():
+    return firebase_provider.firestore()
+
+
+def get_auth():
+    return firebase_provider.auth()
+
+
+def get_bucket():
+    return firebase_provider.bucket()
@@ -0,0 +1,158 @@
+"""
+Cliente Firebase Auth em memória, par do `FakeFirestoreClient`.
+
+Cobre as chamadas feitas pelo backend (criação, leitura e atualização de
+usuários, custom claims, tokens e `import_users`). Tokens de id são
+`fake-id-token:<uid>`, gerados por `id_token()`. Como no Firestore falso, as
+chamadas são contadas em `calls` e podem ter latência injetada.
+"""
+import threading
+import time
+import uuid
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from firebase_admin import auth
+
+_TOKEN_PREFIX = 'fake-id-token:'
+
+
+class FakeUserRecord:
+    def __init__(self, uid: str, email: Optional[str] = None, display_name: Optional[str] = None,
+                 email_verified: bool = False, disabled: bool = False, custom_claims: Optional[Dict] = None,
+                 photo_url: Optional[str] = None, phone_number: Optional[str] = None):
+        self.uid = uid
+        self.email = email
+        self.display_name = display_name
+        self.email_verified = email_verified
+        self.disabled = disabled
+        self.custom_claims = custom_claims
+        self.photo_url = photo_url
+        self.phone_number = phone_number
+
+
+class FakeAuthClient:
+    def __init__(self, latency: float = 0.0, sleep: Callable[[float], None] = time.sleep):
+        self.latency = latency
+        self._sleep = sleep
+        self._lock = threading.RLock()
+        self._users: Dict[str, FakeUserRecord] = {}
+        self.calls: Counter = Counter()
+
+    def _call(self, name: str):
+        with self._lock:
+            self.calls[name] += 1
+        if self.latency > 0:
+            self._sleep(self.latency)
+
+    def _by_email(self, email: Optional[str]) -> Optional[FakeUserRecord]:
+        if not email:
+            return None
+        return next((user for user in self._users.values() if user.email == email.lower()), None)
+
+    def _get(self, uid: str) -> FakeUserRecord:
+        user = self._users.get(uid)
+        if user is None:
+            raise auth.UserNotFoundError(f"No user record found for the provided user ID: {uid}")
+        return user
+
+    # Utilitários de teste
+
+    @staticmethod
+    def id_token(uid: str) -> str:
+        """ID token accepted by verify_id_token() for `uid`"""
+        return f"{_TOKEN_PREFIX}{uid}"
+
+    def add_user(self, uid: str, email: Optional[str] = None, **fields) -> FakeUserRecord:
+        """Seed a user directly (not counted as a call)"""
+        with self._lock:
+            user = FakeUserRecord(uid, email.lower() if email else None, **fields)
+            self._users[uid] = user
+            return user
+
+    # API usada pelo backend
+
+    def create_user(self, uid: Optional[str] = None, email: Optional[str] = None, password: Optional[str] = None,
+                    display_name: Optional[str] = None, email_verified: bool = False, **kwargs) -> FakeUserRecord:
+        self._call('create_user')
+        with self._lock:
+            if self._by_email(email) is not None:
+                raise auth.EmailAlreadyExistsError("The user with the provided email already exists", None, None)
+            uid = uid or uuid.uuid4().hex[:28]
+            if uid in self._users:
+                raise auth.UidAlreadyExistsError("The user with the provided uid already exists", None, None)
+            return self.add_user(uid, email, display_name=display_name, email_verified=email_verified)
+
+    def get_user(self, uid: str) -> FakeUserRecord:
+        self._call('get_user')
+        with self._lock:
+            return self._get(uid)
+
+    def get_user_by_email(self, email: str) -> FakeUserRecord:
+        self._call('get_user_by_email')
+        with self._lock:
+            user = self._by_email(email)
+        if user is None:
+            raise auth.UserNotFoundError(f"No user record found for the provided email: {email}")
+        return user
+
+    def update_user(self, uid: str, **kwargs) -> FakeUserRecord:
+        self._call('update_user')
+        with self._lock:
+            user = self._get(uid)
+            for name, value in kwargs.items():
+                if name == 'password':
+                    continue
+                if name == 'email' and value:
+                    value = value.lower()
+                setattr(user, name, value)
+            return user
+
+    def delete_user(self, uid: str):
+        self._call('delete_user')
+        with self._lock:
+            self._get(uid)
+            del self._users[uid]
+
+    def set_custom_user_claims(self, uid: str, custom_claims: Optional[Dict[str, Any]]):
+        self._call('set_custom_user_claims')
+        with self._lock:
+            self._get(uid).custom_claims = custom_claims
+
+    def list_users(self, page_token: Optional[str] = None, max_results: int = 1000):
+        self._call('list_users')
+        with self._lock:
+            users = sorted(self._users.values(), key=lambda user: user.uid)
+        return SimpleNamespace(users=users, iterate_all=lambda: iter(users))
+
+    def create_custom_token(self, uid: str, developer_claims: Optional[Dict] = None) -> bytes:
+        self._call('create_custom_token')
+        return f"fake-custom-token:{uid}".encode('utf-8')
+
+    def verify_id_token(self, id_token: str, check_revoked: bool = False, **kwargs) -> Dict[str, Any]:
+        self._call('verify_id_token')
+        if not isinstance(id_token, str) or not id_token.startswith(_TOKEN_PREFIX):
+            raise auth.InvalidIdTokenError("Invalid fake ID token")
+        uid = id_token[len(_TOKEN_PREFIX):]
+        with self._lock:
+            user = self._get(uid)
+        return {'uid': uid, 'user_id': uid, 'email': user.email, **(user.custom_claims or {})}
+
+    def import_users(self, users: Iterable, hash_alg=None):
+        """Like auth.import_users: overwrites by uid, rejects e-mails owned by another uid"""
+        self._call('import_users')
+        users = list(users)
+        if len(users) > 1000:
+            raise ValueError("Users must not have more than 1000 entries.")
+
+        errors: List[SimpleNamespace] = []
+        with self._lock:
+            for index, record in enumerate(users):
+                owner = self._by_email(record.email)
+                if owner is not None and owner.uid != record.uid:
+                    errors.append(SimpleNamespace(index=index, reason='EMAIL_EXISTS'))
+                    continue
+                self.add_user(record.uid, record.email, display_name=record.display_name,
+                              email_verified=bool(record.email_verified))
+        return SimpleNamespace(errors=errors, failure_count=len(errors), success_count=len(users) - len(errors))
@@ -0,0 +1,1008 @@
+"""
+Cliente Firestore em memória para testes, benchmarks e testes de carga.
+
+Implementa a parte da API do `google.cloud.firestore.Client` usada pelo
+backend: coleções e subcoleções, documentos (`get`/`set`/`create`/`update`/
+`delete`, com `merge` e field paths), consultas com `where` (inclusive
+`FieldFilter`, `Or` e `And`), `order_by`, `limit`, `offset`, `select` e
+cursores, agregações (`count`/`sum`/`avg`), `get_all`, WriteBatches atômicas,
+transações compatíveis com `firestore.transactional` (com controle otimista:
+um documento lido que mudou antes do commit aborta e repete a transação),
+pré-condições (`write_option`) e as transformações `Increment`, `ArrayUnion`,
+`ArrayRemove`, `Maximum`, `Minimum`, `SERVER_TIMESTAMP` e `DELETE_FIELD`.
+
+As datas voltam como `DatetimeWithNanoseconds` em UTC, como no cliente real,
+e valores de tipos diferentes são ordenados na ordem de tipos do Firestore.
+Documentos sem o campo de um `order_by` ou de um filtro ficam fora da
+consulta.
+
+Cada chamada que no cliente real é uma RPC (`get`, `batch_get`, `run_query`,
+`run_aggregation`, `commit`, `begin_transaction`, `rollback`) é contada em
+`calls` e pode ter latência injetada (`latency`, em segundos, fixa ou por
+tipo de RPC, mais `latency_per_document` por documento lido ou escrito).
+Leituras e escritas de documentos são contadas como o Firestore cobra: uma
+consulta sem resultados custa uma leitura.
+
+Uso com o provedor de clientes:
+
+    from src.infrastructure.config.firebase import firebase_provider
+    from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+
+    with firebase_provider.override(firestore=FakeFirestoreClient(latency=0.005)):
+        ...
+"""
+import copy
+import itertools
+import random
+import string
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+
+from google.api_core import exceptions
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from google.cloud.firestore_v1 import transforms
+from google.cloud.firestore_v1.base_query import BaseCompositeFilter, FieldFilter
+
+ASCENDING = 'ASCENDING'
+DESCENDING = 'DESCENDING'
+
+MAX_BATCH_WRITES = 500
+
+_AUTO_ID_CHARS = string.ascii_letters + string.digits
+
+_INEQUALITY_OPS = {'<', '<=', '>', '>=', '!=', 'not-in'}
+
+
+class _Missing:
+    pass
+
+
+_MISSING = _Missing()
+
+
+# Valores: normalização, comparação e field paths
+
+
+def _timestamp(value: datetime) -> DatetimeWithNanoseconds:
+    # O cliente real trata datas sem fuso como UTC e devolve tudo em UTC, com precisão de microssegundo
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    value = value.astimezone(timezone.utc)
+    return DatetimeWithNanoseconds(value.year, value.month, value.day, value.hour, value.minute, value.second,
+                                   value.microsecond, tzinfo=timezone.utc)
+
+
+def _normalize(value):
+    """Stored form of a plain value (dates in UTC, tuples as lists, deep copies)"""
+    if isinstance(value, datetime):
+        return _timestamp(value)
+    if isinstance(value, date):
+        raise TypeError(f"Cannot convert to a Firestore Value: {value!r} (use datetime)")
+    if isinstance(value, Mapping):
+        return {str(key): _normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+    if isinstance(value, FakeDocumentReference):
+        return value
+    return copy.deepcopy(value)
+
+
+def _type_rank(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return 1
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, datetime):
+        return 3
+    if isinstance(value, str):
+        return 4
+    if isinstance(value, bytes):
+        return 5
+    if isinstance(value, FakeDocumentReference):
+        return 6
+    if isinstance(value, list):
+        return 8
+    if isinstance(value, Mapping):
+        return 9
+    return 7  # GeoPoint e afins
+
+
+def sort_key(value):
+    """Total order over Firestore values (type order first, then value)"""
+    rank = _type_rank(value)
+    if rank == 0:
+        return (0,)
+    if rank == 2 and value != value:  # NaN vem antes dos outros números
+        return (2, float('-inf'), 0)
+    if rank == 2:
+        return (2, value, 1)
+    if rank == 3:
+        return (3, _timestamp(value))
+    if rank == 6:
+        return (6, value.path)
+    if rank == 8:
+        return (8, tuple(sort_key(item) for item in value))
+    if rank == 9:
+        return (9, tuple((key, sort_key(value[key])) for key in sorted(value)))
+    if rank == 7:
+        return (7, repr(value))
+    return (rank, value)
+
+
+def split_field_path(path: str) -> List[str]:
+    """'a.b' -> ['a', 'b']; backtick-quoted segments may contain dots"""
+    if '`' not in path:
+        return path.split('.')
+    parts, current, quoted, escaped = [], [], False, False
+    for char in path:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\' and quoted:
+            escaped = True
+        elif char == '`':
+            quoted = not quoted
+        elif char == '.' and not quoted:
+            parts.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append(''.join(current))
+    return parts
+
+
+def _lookup(data: Mapping, parts: Sequence[str]):
+    for part in parts:
+        if not isinstance(data, Mapping) or part not in data:
+            return _MISSING
+        data = data[part]
+    return data
+
+
+def get_field(data: Mapping, path: str):
+    """Value at a field path, or the _MISSING marker"""
+    return _lookup(data, split_field_path(path))
+
+
+def _project(data: Mapping, paths: Iterable[str]) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    for path in paths:
+        parts = split_field_path(path)
+        value = _lookup(data, parts)
+        if value is _MISSING:
+            continue
+        target = result
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = copy.deepcopy(value)
+    return result
+
+
+# Escritas
+
+
+def _apply_leaf(container: Dict[str, Any], key: str, value, commit_time: datetime):
+    if value is transforms.DELETE_FIELD:
+        container.pop(key, None)
+    elif value is transforms.SERVER_TIMESTAMP:
+        container[key] = commit_time
+    elif isinstance(value, transforms.Increment):
+        current = container.get(key)
+        if isinstance(current, (int, float)) and not isinstance(current, bool):
+            container[key] = current + value.value
+        else:
+            container[key] = value.value
+    elif isinstance(value, (transforms.Maximum, transforms.Minimum)):
+        current = container.get(key)
+        if not isinstance(current, (int, float)) or isinstance(current, bool):
+            container[key] = value.value
+        else:
+            pick = max if isinstance(value, transforms.Maximum) else min
+            container[key] = pick(current, value.value)
+    elif isinstance(value, transforms.ArrayUnion):
+        current = container.get(key)
+        current = list(current) if isinstance(current, list) else []
+        for item in _normalize(list(value.values)):
+            if item not in current:
+                current.append(item)
+        container[key] = current
+    elif isinstance(value, transforms.ArrayRemove):
+        current = container.get(key)
+        removed = _normalize(list(value.values))
+        container[key] = [item for item in current if item not in removed] if isinstance(current, list) else []
+    else:
+        container[key] = _normalize(value)
+
+
+def _merge_into(target: Dict[str, Any], data: Mapping[str, Any], commit_time: datetime):
+    """set(merge=True) semantics: nested maps are merged, everything else replaced"""
+    for key, value in data.items():
+        if isinstance(value, Mapping):
+            child = target.get(key)
+            if not isinstance(child, dict):
+                child = target[key] = {}
+            _merge_into(child, value, commit_time)
+        else:
+            _apply_leaf(target, key, value, commit_time)
+
+
+def _apply_at(target: Dict[str, Any], parts: Sequence[str], value, commit_time: datetime):
+    """update() semantics for one field path: the value at the path is replaced"""
+    for part in parts[:-1]:
+        child = target.get(part)
+        if not isinstance(child, dict):
+            if value is transforms.DELETE_FIELD:
+                return
+            child = target[part] = {}
+        target = child
+    if isinstance(value, Mapping):
+        target[parts[-1]] = {}
+        _merge_into(target[parts[-1]], value, commit_time)
+    else:
+        _apply_leaf(target, parts[-1], value, commit_time)
+
+
+class _Precondition:
+    def __init__(self, exists: Optional[bool] = None, last_update_time: Optional[datetime] = None):
+        self.exists = exists
+        self.last_update_time = last_update_time
+
+    def check(self, path: str, stored: Optional['_Stored']):
+        if self.exists is not None and self.exists != (stored is not None):
+            raise exceptions.FailedPrecondition(f"Precondition failed: {path} exists={stored is not None}")
+        if self.last_update_time is not None:
+            if stored is None or stored.update_time != _timestamp(self.last_update_time):
+                raise exceptions.FailedPrecondition(f"Precondition failed: {path} was updated")
+
+
+class _Stored:
+    __slots__ = ('data', 'create_time', 'update_time')
+
+    def __init__(self, data: Dict[str, Any], create_time: datetime, update_time: datetime):
+        self.data = data
+        self.create_time = create_time
+        self.update_time = update_time
+
+
+class _Write:
+    __slots__ = ('kind', 'reference', 'data', 'merge', 'option')
+
+    def __init__(self, kind: str, reference: 'FakeDocumentReference', data=None, merge=False, option=None):
+        self.kind = kind
+        self.reference = reference
+        self.data = data
+        self.merge = merge
+        self.option = option
+
+
+class FakeWriteResult:
+    def __init__(self, update_time: datetime):
+        self.update_time = update_time
+
+
+# Snapshots e referências
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference: 'FakeDocumentReference', data: Optional[Dict[str, Any]],
+                 create_time=None, update_time=None, read_time=None):
+        self.reference = reference
+        self._data = data
+        self.create_time = create_time
+        self.update_time = update_time
+        self.read_time = read_time
+
+    @property
+    def id(self) -> str:
+        return self.reference.id
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self) -> Optional[Dict[str, Any]]:
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path: str):
+        if self._data is None:
+            return None
+        value = get_field(self._data, field_path)
+        if value is _MISSING:
+            raise KeyError(field_path)
+        return copy.deepcopy(value)
+
+    def __repr__(self):
+        return f"FakeDocumentSnapshot({self.reference.path!r}, exists={self.exists})"
+
+
+class FakeDocumentReference:
+    def __init__(self, client: 'FakeFirestoreClient', path: str):
+        self._client = client
+        self.path = path
+
+    @property
+    def id(self) -> str:
+        return self.path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self) -> 'FakeCollectionReference':
+        return FakeCollectionReference(self._client, self.path.rsplit('/', 1)[0])
+
+    def collection(self, collection_id: str) -> 'FakeCollectionReference':
+        return FakeCollectionReference(self._client, f"{self.path}/{collection_id}")
+
+    def get(self, field_paths: Optional[Iterable[str]] = None, transaction: Optional['FakeTransaction'] = None):
+        return self._client._get_documents([self], field_paths, transaction, rpc='get')[0]
+
+    def set(self, document_data: Mapping[str, Any], merge: Union[bool, Sequence[str]] = False) -> FakeWriteResult:
+        return self._client._commit([_Write('set', self, document_data, merge)])[0]
+
+    def create(self, document_data: Mapping[str, Any]) -> FakeWriteResult:
+        return self._client._commit([_Write('create', self, document_data)])[0]
+
+    def update(self, field_updates: Mapping[str, Any], option: Optional[_Precondition] = None) -> FakeWriteResult:
+        return self._client._commit([_Write('update', self, field_updates, option=option)])[0]
+
+    def delete(self, option: Optional[_Precondition] = None):
+        return self._client._commit([_Write('delete', self, option=option)])[0].update_time
+
+    def __eq__(self, other):
+        return isinstance(other, FakeDocumentReference) and other.path == self.path
+
+    def __hash__(self):
+        return hash(self.path)
+
+    def __repr__(self):
+        return f"FakeDocumentReference({self.path!r})"
+
+
+# Consultas
+
+
+class FakeAggregationResult:
+    def __init__(self, alias: str, value):
+        self.alias = alias
+        self.value = value
+
+
+class FakeAggregationQuery:
+    def __init__(self, query: 'FakeQuery'):
+        self._query = query
+        self._aggregations: List[Tuple[str, Optional[str], str]] = []
+
+    def _add(self, kind: str, field: Optional[str], alias: Optional[str]) -> 'FakeAggregationQuery':
+        self._aggregations.append((kind, field, alias or f"field_{len(self._aggregations) + 1}"))
+        return self
+
+    def count(self, alias: Optional[str] = None):
+        return self._add('count', None, alias)
+
+    def sum(self, field_ref: str, alias: Optional[str] = None):
+        return self._add('sum', field_ref, alias)
+
+    def avg(self, field_ref: str, alias: Optional[str] = None):
+        return self._add('avg', field_ref, alias)
+
+    def get(self, transaction: Optional['FakeTransaction'] = None, **kwargs) -> List[List[FakeAggregationResult]]:
+        client = self._query._client
+        matches = self._query._matches(transaction)
+        # Agregações custam uma leitura por lote de até 1000 entradas do índice
+        client._rpc('run_aggregation', reads=max(1, -(-len(matches) // 1000)))
+
+        results = []
+        for kind, field, alias in self._aggregations:
+            if kind == 'count':
+                value = len(matches)
+            else:
+                numbers = [value for value in (get_field(data, field) for _, data, _ in matches)
+                           if isinstance(value, (int, float)) and not isinstance(value, bool)]
+                if kind == 'sum':
+                    value = sum(numbers)
+                else:
+                    value = sum(numbers) / len(numbers) if numbers else None
+            results.append(FakeAggregationResult(alias, value))
+        return [results]
+
+    def stream(self, transaction: Optional['FakeTransaction'] = None, **kwargs):
+        yield from self.get(transaction)
+
+
+class FakeQuery:
+    ASCENDING = ASCENDING
+    DESCENDING = DESCENDING
+
+    def __init__(self, client: 'FakeFirestoreClient', collection_path: str, filters: Tuple = (),
+                 orders: Tuple[Tuple[str, str], ...] = (), projection: Optional[Tuple[str, ...]] = None,
+                 limit: Optional[int] = None, offset: int = 0, start: Optional[Tuple] = None,
+                 end: Optional[Tuple] = None):
+        self._client = client
+        self._collection_path = collection_path
+        self._filters = filters
+        self._orders = orders
+        self._projection = projection
+        self._limit = limit
+        self._offset = offset
+        self._start = start  # (valores do cursor, inclusivo?)
+        self._end = end
+
+    def _copy(self, **changes) -> 'FakeQuery':
+        values = dict(filters=self._filters, orders=self._orders, projection=self._projection, limit=self._limit,
+                      offset=self._offset, start=self._start, end=self._end)
+        values.update(changes)
+        return FakeQuery(self._client, self._collection_path, **values)
+
+    def where(self, field_path: Optional[str] = None, op_string: Optional[str] = None, value=None, *,
+              filter=None) -> 'FakeQuery':
+        if filter is None:
+            if field_path is None or op_string is None:
+                raise ValueError("where() needs a field path and an operator, or filter=")
+            filter = FieldFilter(field_path, op_string, value)
+        elif field_path is not None:
+            raise ValueError("Pass either a filter or field_path/op_string/value, not both")
+        return self._copy(filters=self._filters + (filter,))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> 'FakeQuery':
+        if direction not in (ASCENDING, DESCENDING):
+            raise ValueError(f"Invalid direction: {direction}")
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def select(self, field_paths: Iterable[str]) -> 'FakeQuery':
+        return self._copy(projection=tuple(field_paths))
+
+    def limit(self, count: int) -> 'FakeQuery':
+        return self._copy(limit=count)
+
+    def offset(self, num_to_skip: int) -> 'FakeQuery':
+        return self._copy(offset=num_to_skip)
+
+    def start_at(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copy(start=(document_fields_or_snapshot, True))
+
+    def start_after(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copy(start=(document_fields_or_snapshot, False))
+
+    def end_at(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copy(end=(document_fields_or_snapshot, True))
+
+    def end_before(self, document_fields_or_snapshot) -> 'FakeQuery':
+        return self._copy(end=(document_fields_or_snapshot, False))
+
+    def count(self, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self).count(alias)
+
+    def sum(self, field_ref: str, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self).sum(field_ref, alias)
+
+    def avg(self, field_ref: str, alias: Optional[str] = None) -> FakeAggregationQuery:
+        return FakeAggregationQuery(self).avg(field_ref, alias)
+
+    # Avaliação
+
+    def _field_filters(self, node=None) -> Iterator[FieldFilter]:
+        for item in (self._filters if node is None else node.filters):
+            if isinstance(item, BaseCompositeFilter):
+                yield from self._field_filters(item)
+            else:
+                yield item
+
+    def _effective_orders(self) -> List[Tuple[str, str]]:
+        orders = list(self._orders)
+        if not orders:
+            # Sem order_by explícito o Firestore ordena pelos campos de desigualdade
+            for field_filter in self._field_filters():
+                if field_filter.op_string in _INEQUALITY_OPS and \
+                        field_filter.field_path not in (field for field, _ in orders):
+                    orders.append((field_filter.field_path, ASCENDING))
+        if not any(field == '__name__' for field, _ in orders):
+            orders.append(('__name__', orders[-1][1] if orders else ASCENDING))
+        return orders
+
+    @staticmethod
+    def _value_of(doc_id: str, data: Mapping, field: str):
+        return doc_id if field == '__name__' else get_field(data, field)
+
+    def _test(self, node, doc_id: str, data: Mapping) -> bool:
+        if isinstance(node, BaseCompositeFilter):
+            results = (self._test(child, doc_id, data) for child in node.filters)
+            return any(results) if node.operator.name == 'OR' else all(results)
+
+        value = self._value_of(doc_id, data, node.field_path)
+        if value is _MISSING:
+            return False
+        op, expected = node.op_string, node.value
+        if isinstance(expected, FakeDocumentReference) and node.field_path == '__name__':
+            expected = expected.id
+
+        if op == '==':
+            return sort_key(value) == sort_key(expected)
+        if op == '!=':
+            return value is not None and sort_key(value) != sort_key(expected)
+        if op in ('<', '<=', '>', '>='):
+            if _type_rank(value) != _type_rank(expected):
+                return False
+            left, right = sort_key(value), sort_key(expected)
+            return {'<': left < right, '<=': left <= right, '>': left > right, '>=': left >= right}[op]
+        if op == 'in':
+            return any(sort_key(value) == sort_key(item) for item in expected)
+        if op == 'not-in':
+            return value is not None and all(sort_key(value) != sort_key(item) for item in expected)
+        if op == 'array_contains':
+            return isinstance(value, list) and any(sort_key(item) == sort_key(expected) for item in value)
+        if op == 'array_contains_any':
+            wanted = {sort_key(item) for item in expected}
+            return isinstance(value, list) and any(sort_key(item) in wanted for item in value)
+        raise ValueError(f"Unsupported operator: {op}")
+
+    def _cursor_values(self, cursor, orders: List[Tuple[str, str]]) -> List:
+        if isinstance(cursor, FakeDocumentSnapshot):
+            data = cursor._data or {}
+            return [self._value_of(cursor.id, data, field) for field, _ in orders]
+        if isinstance(cursor, Mapping):
+            values = []
+            for field, _ in orders:
+                if field not in cursor:
+                    break
+                value = cursor[field]
+                if field == '__name__' and isinstance(value, FakeDocumentReference):
+                    value = value.id
+                elif field == '__name__' and isinstance(value, str) and '/' in value:
+                    value = value.rsplit('/', 1)[-1]
+                values.append(value)
+            unknown = set(cursor) - {field for field, _ in orders}
+            if unknown:
+                raise ValueError(f"Cursor fields must be order_by fields: {', '.join(sorted(unknown))}")
+            return values
+        values = list(cursor)
+        if len(values) > len(orders):
+            raise ValueError("Too many cursor values for the query's order_by")
+        return values
+
+    @staticmethod
+    def _compare(row_keys: Sequence, cursor_keys: Sequence, orders: List[Tuple[str, str]]) -> int:
+        """-1/0/1 of a row against a cursor prefix, honoring each order's direction"""
+        for row_key, cursor_key, (_, direction) in zip(row_keys, cursor_keys, orders):
+            if row_key != cursor_key:
+                result = -1 if row_key < cursor_key else 1
+                return -result if direction == DESCENDING else result
+        return 0
+
+    def _matches(self, transaction: Optional['FakeTransaction'] = None) -> List[Tuple[str, Dict, '_Stored']]:
+        """(id, data, stored) of every matching document, in query order, before limit/offset"""
+        client = self._client
+        orders = self._effective_orders()
+        with client._lock:
+            documents = client._collection(self._collection_path)
+            if self._filters == () and [field for field, _ in orders] == ['__name__'] and orders[0][1] == ASCENDING:
+                # Caminho rápido para a varredura paginada por id
+                ids = client._sorted_ids(self._collection_path)
+                lo, hi = 0, len(ids)
+                if self._start is not None:
+                    values = self._cursor_values(self._start[0], orders)
+                    if values:
+                        lo = (bisect_left if self._start[1] else bisect_right)(ids, values[0])
+                if self._end is not None:
+                    values = self._cursor_values(self._end[0], orders)
+                    if values:
+                        hi = (bisect_right if self._end[1] else bisect_left)(ids, values[0])
+                selected = ids[lo:hi]
+                if self._limit is not None:
+                    selected = selected[:self._offset + self._limit]
+                rows = [(doc_id, documents[doc_id].data, documents[doc_id]) for doc_id in selected]
+            else:
+                rows = []
+                for doc_id, stored in documents.items():
+                    data = stored.data
+                    if any(self._value_of(doc_id, data, field) is _MISSING for field, _ in orders):
+                        continue
+                    if all(self._test(node, doc_id, data) for node in self._filters):
+                        rows.append((doc_id, data, stored))
+
+                keys = {doc_id: [sort_key(self._value_of(doc_id, data, field)) for field, _ in orders]
+                        for doc_id, data, _ in rows}
+                for index in range(len(orders) - 1, -1, -1):
+                    rows.sort(key=lambda row: keys[row[0]][index], reverse=orders[index][1] == DESCENDING)
+
+                if self._start is not None:
+                    start = [sort_key(value) for value in self._cursor_values(self._start[0], orders)]
+                    lowest = 0 if self._start[1] else 1
+                    rows = [row for row in rows if self._compare(keys[row[0]], start, orders) >= lowest]
+                if self._end is not None:
+                    end = [sort_key(value) for value in self._cursor_values(self._end[0], orders)]
+                    highest = 0 if self._end[1] else -1
+                    rows = [row for row in rows if self._compare(keys[row[0]], end, orders) <= highest]
+
+            if transaction is not None:
+                for doc_id, _, stored in rows:
+                    transaction._track(f"{self._collection_path}/{doc_id}", stored)
+            return rows
+
+    def stream(self, transaction: Optional['FakeTransaction'] = None, **kwargs) -> Iterator[FakeDocumentSnapshot]:
+        client = self._client
+        rows = self._matches(transaction)
+        skipped = rows[:self._offset]
+        rows = rows[self._offset:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        if transaction is not None and self._limit is not None:
+            transaction._untrack(f"{self._collection_path}/{doc_id}" for doc_id, _, _ in skipped)
+
+        read_time = client._now()
+        snapshots = []
+        for doc_id, data, stored in rows:
+            data = _project(data, self._projection) if self._projection is not None else copy.deepcopy(data)
+            reference = FakeDocumentReference(client, f"{self._collection_path}/{doc_id}")
+            snapshots.append(FakeDocumentSnapshot(reference, data, stored.create_time, stored.update_time, read_time))
+
+        # Documentos pulados pelo offset também são cobrados
+        client._rpc('run_query', reads=max(1, len(snapshots) + len(skipped)))
+        return iter(snapshots)
+
+    def get(self, transaction: Optional['FakeTransaction'] = None, **kwargs) -> List[FakeDocumentSnapshot]:
+        return list(self.stream(transaction))
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, client: 'FakeFirestoreClient', path: str):
+        super().__init__(client, path)
+        self.path = path
+
+    @property
+    def id(self) -> str:
+        return self.path.rsplit('/', 1)[-1]
+
+    @property
+    def parent(self) -> Optional[FakeDocumentReference]:
+        if '/' not in self.path:
+            return None
+        return FakeDocumentReference(self._client, self.path.rsplit('/', 1)[0])
+
+    def document(self, document_id: Optional[str] = None) -> FakeDocumentReference:
+        if document_id is None:
+            document_id = ''.join(random.choice(_AUTO_ID_CHARS) for _ in range(20))
+        if not document_id or '/' in document_id:
+            raise ValueError(f"Invalid document id: {document_id!r}")
+        return FakeDocumentReference(self._client, f"{self.path}/{document_id}")
+
+    def add(self, document_data: Mapping[str, Any], document_id: Optional[str] = None):
+        reference = self.document(document_id)
+        result = reference.create(document_data)
+        return result.update_time, reference
+
+    def list_documents(self, page_size: Optional[int] = None) -> Iterator[FakeDocumentReference]:
+        with self._client._lock:
+            ids = list(self._client._sorted_ids(self.path))
+        self._client._rpc('list_documents', reads=max(1, len(ids)))
+        return iter([self.document(doc_id) for doc_id in ids])
+
+
+# Batches e transações
+
+
+class FakeWriteBatch:
+    def __init__(self, client: 'FakeFirestoreClient'):
+        self._client = client
+        self._writes: List[_Write] = []
+        self.write_results: Optional[List[FakeWriteResult]] = None
+        self.commit_time: Optional[datetime] = None
+
+    def _add(self, write: _Write):
+        if self.write_results is not None:
+            raise ValueError("Batch already committed")
+        if len(self._writes) >= self._client.max_batch_writes:
+            raise exceptions.InvalidArgument(f"A batch can contain at most {self._client.max_batch_writes} writes")
+        self._writes.append(write)
+
+    def set(self, reference: FakeDocumentReference, document_data: Mapping[str, Any],
+            merge: Union[bool, Sequence[str]] = False):
+        self._add(_Write('set', reference, document_data, merge))
+
+    def create(self, reference: FakeDocumentReference, document_data: Mapping[str, Any]):
+        self._add(_Write('create', reference, document_data))
+
+    def update(self, reference: FakeDocumentReference, field_updates: Mapping[str, Any],
+               option: Optional[_Precondition] = None):
+        self._add(_Write('update', reference, field_updates, option=option))
+
+    def delete(self, reference: FakeDocumentReference, option: Optional[_Precondition] = None):
+        self._add(_Write('delete', reference, option=option))
+
+    def __len__(self) -> int:
+        return len(self._writes)
+
+    def commit(self, **kwargs) -> List[FakeWriteResult]:
+        self.write_results = self._client._commit(self._writes)
+        self.commit_time = self.write_results[0].update_time if self.write_results else self._client._now()
+        return self.write_results
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Optimistic transaction: commit aborts (and `transactional` retries) if a read document changed"""
+
+    def __init__(self, client: 'FakeFirestoreClient', max_attempts: int = 5, read_only: bool = False):
+        super().__init__(client)
+        self._max_attempts = max_attempts
+        self._read_only = read_only
+        self._id: Optional[bytes] = None
+        self._reads: Dict[str, Optional[datetime]] = {}
+
+    @property
+    def id(self) -> Optional[bytes]:
+        return self._id
+
+    @property
+    def in_progress(self) -> bool:
+        return self._id is not None
+
+    def _add(self, write: _Write):
+        if self._read_only:
+            raise ValueError("Cannot perform write operation in read-only transaction.")
+        super()._add(write)
+
+    def _track(self, path: str, stored: Optional[_Stored]):
+        self._reads.setdefault(path, stored.update_time if stored is not None else None)
+
+    def _untrack(self, paths: Iterable[str]):
+        for path in paths:
+            self._reads.pop(path, None)
+
+    def _clean_up(self):
+        self._writes = []
+        self._reads = {}
+        self._id = None
+        self.write_results = None
+
+    def _begin(self, retry_id: Optional[bytes] = None):
+        if self.in_progress:
+            raise ValueError("Transaction already in progress")
+        self._client._rpc('begin_transaction')
+        self._id = next(self._client._transaction_ids).to_bytes(8, 'big')
+
+    def _rollback(self):
+        if not self.in_progress:
+            raise ValueError("Transaction not in progress")
+        try:
+            self._client._rpc('rollback')
+        finally:
+            self._clean_up()
+
+    def _commit(self) -> List[FakeWriteResult]:
+        if not self.in_progress:
+            raise ValueError("Transaction not in progress")
+        results = self._client._commit(self._writes, reads=self._reads)
+        self._clean_up()
+        return results
+
+    def commit(self, **kwargs):
+        raise ValueError("Use firestore.transactional (or _begin/_commit) with a FakeTransaction")
+
+    def get(self, ref_or_query, **kwargs):
+        if isinstance(ref_or_query, FakeDocumentReference):
+            return iter([ref_or_query.get(transaction=self)])
+        return ref_or_query.stream(transaction=self)
+
+    def get_all(self, references: Iterable[FakeDocumentReference], **kwargs):
+        return self._client.get_all(references, transaction=self, **kwargs)
+
+
+# Cliente
+
+
+class FakeFirestoreClient:
+    def __init__(self, latency: Union[float, Mapping[str, float]] = 0.0, latency_per_document: float = 0.0,
+                 max_batch_writes: int = MAX_BATCH_WRITES, project: str = 'fake-project',
+                 sleep: Callable[[float], None] = time.sleep):
+        self.project = project
+        self.latency = latency
+        self.latency_per_document = latency_per_document
+        self.max_batch_writes = max_batch_writes
+        self._sleep = sleep
+        self._lock = threading.RLock()
+        self._collections: Dict[str, Dict[str, _Stored]] = {}
+        self._sorted: Dict[str, List[str]] = {}
+        self._clock = datetime.now(timezone.utc)
+        self._transaction_ids = itertools.count(1)
+        self.calls: Counter = Counter()
+        self.reads = 0
+        self.writes = 0
+        self.deletes = 0
+
+    # Contadores e latência
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = Counter()
+            self.reads = self.writes = self.deletes = 0
+
+    def counters(self) -> Dict[str, Any]:
+        """Snapshot of RPC and billing counters"""
+        with self._lock:
+            return {'calls': dict(self.calls), 'reads': self.reads, 'writes': self.writes, 'deletes': self.deletes}
+
+    def _rpc(self, kind: str, reads: int = 0, writes: int = 0, deletes: int = 0):
+        with self._lock:
+            self.calls[kind] += 1
+            self.reads += reads
+            self.writes += writes
+            self.deletes += deletes
+        latency = self.latency.get(kind, 0.0) if isinstance(self.latency, Mapping) else self.latency
+        latency += self.latency_per_document * (reads + writes + deletes)
+        if latency > 0:
+            self._sleep(latency)
+
+    def _now(self) -> DatetimeWithNanoseconds:
+        # Relógio estritamente crescente: cada commit tem um update_time único
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            self._clock = max(now, self._clock + timedelta(microseconds=1))
+            return _timestamp(self._clock)
+
+    # Armazenamento
+
+    def _collection(self, path: str) -> Dict[str, _Stored]:
+        return self._collections.get(path, {})
+
+    def _sorted_ids(self, path: str) -> List[str]:
+        ids = self._sorted.get(path)
+        if ids is None:
+            ids = self._sorted[path] = sorted(self._collection(path))
+        return ids
+
+    def _stored(self, path: str) -> Optional[_Stored]:
+        collection, doc_id = path.rsplit('/', 1)
+        return self._collections.get(collection, {}).get(doc_id)
+
+    def _put(self, path: str, stored: Optional[_Stored]):
+        collection, doc_id = path.rsplit('/', 1)
+        documents = self._collections.setdefault(collection, {})
+        if stored is None:
+            if documents.pop(doc_id, None) is not None:
+                self._sorted.pop(collection, None)
+        else:
+            if doc_id not in documents:
+                self._sorted.pop(collection, None)
+            documents[doc_id] = stored
+
+    def _get_documents(self, references: Sequence[FakeDocumentReference], field_paths, transaction, rpc: str):
+        read_time = self._now()
+        snapshots = []
+        with self._lock:
+            for reference in references:
+                stored = self._stored(reference.path)
+                if transaction is not None:
+                    transaction._track(reference.path, stored)
+                if stored is None:
+                    snapshots.append(FakeDocumentSnapshot(reference, None, read_time=read_time))
+                    continue
+                data = _project(stored.data, field_paths) if field_paths is not None else copy.deepcopy(stored.data)
+                snapshots.append(FakeDocumentSnapshot(reference, data, stored.create_time, stored.update_time,
+                                                      read_time))
+        self._rpc(rpc, reads=max(1, len(snapshots)) if rpc == 'get' else len(snapshots))
+        return snapshots
+
+    def _commit(self, writes: Sequence[_Write], reads: Optional[Mapping[str, Optional[datetime]]] = None):
+        deletes = sum(1 for write in writes if write.kind == 'delete')
+        try:
+            with self._lock:
+                results = self._apply(writes, reads)
+        except exceptions.GoogleAPICallError:
+            # A RPC foi feita (e teve latência) mesmo quando o commit é rejeitado
+            self._rpc('commit')
+            raise
+        self._rpc('commit', writes=len(writes) - deletes, deletes=deletes)
+        return results
+
+    def _apply(self, writes: Sequence[_Write], reads: Optional[Mapping[str, Optional[datetime]]]):
+        """Validate and apply all writes atomically; caller holds the lock"""
+        if reads:
+            for path, update_time in reads.items():
+                stored = self._stored(path)
+                if (stored.update_time if stored is not None else None) != update_time:
+                    raise exceptions.Aborted(f"Transaction contention on {path}")
+
+        commit_time = self._now()
+        pending: Dict[str, Optional[_Stored]] = {}
+
+        for write in writes:
+            path = write.reference.path
+            stored = pending[path] if path in pending else self._stored(path)
+            if write.option is not None:
+                write.option.check(path, stored)
+
+            if write.kind == 'delete':
+                pending[path] = None
+                continue
+            if write.kind == 'create' and stored is not None:
+                raise exceptions.AlreadyExists(f"Document already exists: {path}")
+            if write.kind == 'update' and stored is None:
+                raise exceptions.NotFound(f"No document to update: {path}")
+
+            if write.kind == 'update':
+                data = copy.deepcopy(stored.data)
+                for field_path, value in write.data.items():
+                    _apply_at(data, split_field_path(field_path), value, commit_time)
+            elif write.kind == 'set' and write.merge is True:
+                data = copy.deepcopy(stored.data) if stored is not None else {}
+                _merge_into(data, write.data, commit_time)
+            elif write.kind == 'set' and write.merge:
+                data = copy.deepcopy(stored.data) if stored is not None else {}
+                for field_path in write.merge:
+                    parts = split_field_path(field_path)
+                    value = _lookup(write.data, parts)
+                    _apply_at(data, parts, transforms.DELETE_FIELD if value is _MISSING else value, commit_time)
+            else:
+                data = {}
+                _merge_into(data, write.data, commit_time)
+
+            created = stored.create_time if stored is not None else commit_time
+            pending[path] = _Stored(data, created, commit_time)
+
+        for path, stored in pending.items():
+            self._put(path, stored)
+        return [FakeWriteResult(commit_time) for _ in writes]
+
+    # API pública do cliente
+
+    def collection(self, *collection_path: str) -> FakeCollectionReference:
+        path = '/'.join(collection_path)
+        if path.count('/') % 2:
+            raise ValueError(f"Not a collection path: {path}")
+        return FakeCollectionReference(self, path)
+
+    def document(self, *document_path: str) -> FakeDocumentReference:
+        path = '/'.join(document_path)
+        if not path.count('/') % 2:
+            raise ValueError(f"Not a document path: {path}")
+        return FakeDocumentReference(self, path)
+
+    def get_all(self, references: Iterable[FakeDocumentReference], field_paths: Optional[Iterable[str]] = None,
+                transaction: Optional[FakeTransaction] = None, **kwargs) -> Iterator[FakeDocumentSnapshot]:
+        references = list(dict.fromkeys(references))
+        return iter(self._get_documents(references, field_paths, transaction, rpc='batch_get'))
+
+    def batch(self) -> FakeWriteBatch:
+        return FakeWriteBatch(self)
+
+    def transaction(self, max_attempts: int = 5, read_only: bool = False) -> FakeTransaction:
+        return FakeTransaction(self, max_attempts=max_attempts, read_only=read_only)
+
+    def write_option(self, **kwargs) -> _Precondition:
+        if len(kwargs) != 1 or not set(kwargs) <= {'exists', 'last_update_time'}:
+            raise TypeError("write_option takes exactly one of exists= or last_update_time=")
+        return _Precondition(**kwargs)
+
+    def collections(self) -> List[FakeCollectionReference]:
+        with self._lock:
+            return [FakeCollectionReference(self, path) for path in sorted(self._collections)
+                    if '/' not in path and self._collections[path]]
+
+    def close(self):
+        pass
+
+    # Utilitários de teste
+
+    def load(self, collection_path: str, documents: Mapping[str, Mapping[str, Any]]):
+        """Seed documents directly (not counted as writes, no latency)"""
+        with self._lock:
+            now = self._now()
+            for doc_id, data in documents.items():
+                stored = {}
+                _merge_into(stored, data, now)
+                self._put(f"{collection_path}/{doc_id}", _Stored(stored, now, now))
+
+    def dump(self, collection_path: str) -> Dict[str, Dict[str, Any]]:
+        """Current documents of a collection (not counted as reads)"""
+        with self._lock:
+            return {doc_id: copy.deepcopy(stored.data) for doc_id, stored in self._collection(collection_path).items()}
@@ -0,0 +1,84 @@
+"""
+Tabela estática de coordenadas por prefixo de CEP (os 5 primeiros dígitos).
+
+`cep_regions.csv` lista faixas de prefixos com a cidade, a UF e a coordenada
+de referência: primeiro a faixa de cada estado (coordenada no centro do
+estado), depois as faixas das capitais e das maiores cidades, que têm
+precedência. A tabela é carregada uma vez por processo em arrays NumPy
+densos de 100.000 posições (um por prefixo), então achar a coordenada de um
+CEP, ou de um array de CEPs, é indexar um array. Fora das cidades listadas a
+coordenada é a do estado: boa para raios de dezenas de quilômetros ao redor
+das capitais, grosseira no interior. Para uma tabela completa, aponte
+`CEP_REGIONS_PATH` para um CSV com as mesmas colunas.
+"""
+import csv
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from src.domain.catalog.interest_catalog import normalize
+
+PREFIXES = 100000
+
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cep_regions.csv')
+
+Coordinates = Tuple[float, float]
+
+
+def cep_prefix(value) -> Optional[int]:
+    """First 5 digits of a CEP ('01310-100', '01310100', 1310100) as an int"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        value = f"{value:08d}"
+    if not isinstance(value, str):
+        return None
+    digits = ''.join(char for char in value if char.isdigit())
+    return int(digits[:5]) if len(digits) == 8 else None
+
+
+class CepTable:
+    def __init__(self, rows):
+        self.lat = np.full(PREFIXES, np.nan, dtype=np.float64)
+        self.lon = np.full(PREFIXES, np.nan, dtype=np.float64)
+        # Prefixos com coordenada da cidade (os demais têm a do estado)
+        self.city_level = np.zeros(PREFIXES, dtype=bool)
+        self._cities: Dict[Tuple[str, str], Coordinates] = {}
+
+        # Faixas mais largas primeiro: as das cidades sobrescrevem a do estado
+        for row in sorted(rows, key=lambda row: int(row['start']) - int(row['end'])):
+            start, end = int(row['start']), int(row['end']) + 1
+            lat, lon, state = float(row['lat']), float(row['lon']), row['state'].strip().upper()
+            self.lat[start:end], self.lon[start:end] = lat, lon
+            self.city_level[start:end] = bool(row.get('city'))
+            if row.get('city'):
+                self._cities.setdefault((state, normalize(row['city'])), (lat, lon))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'CepTable':
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def by_prefix(self, prefix: Optional[int]) -> Optional[Coordinates]:
+        if prefix is None or not 0 <= prefix < PREFIXES or np.isnan(self.lat[prefix]):
+            return None
+        return float(self.lat[prefix]), float(self.lon[prefix])
+
+    def by_city(self, state: Optional[str], city: Optional[str]) -> Optional[Coordinates]:
+        if not isinstance(state, str) or not isinstance(city, str):
+            return None
+        return self._cities.get((state.strip().upper(), normalize(city)))
+
+    def locate(self, state: Optional[str] = None, city: Optional[str] = None,
+               postal_code=None) -> Optional[Coordinates]:
+        """Most precise coordinates known: the CEP's city, the named city, then the CEP's state"""
+        prefix = cep_prefix(postal_code)
+        if prefix is not None and self.city_level[prefix]:
+            return self.by_prefix(prefix)
+        return self.by_city(state, city) or self.by_prefix(prefix)
+
+
+@lru_cache(maxsize=None)
+def get_cep_table() -> CepTable:
+    """Process-wide table, loaded once"""
+    return CepTable.from_file(os.getenv('CEP_REGIONS_PATH', _DEFAULT_PATH))
@@ -0,0 +1,104 @@
+"""
+Carga e atualização dos índices geográficos de fãs e de eventos.
+
+O de fãs é montado por uma varredura paginada de `fans` lendo só `address`,
+e o de eventos pela consulta dos eventos que ainda não começaram. Os dois
+seguem os listeners por `updated_at` já usados pelo índice de segmentos e
+pelo recomendador de eventos (mudanças reaplicadas de forma idempotente). Cada
+processo (worker) tem os seus índices, criados no primeiro uso e descartados
+depois de um fork.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from src.infrastructure.geo.geo_index import GeoIndex
+from src.infrastructure.repositories.firestore_event_repository import EVENTS_COLLECTION, decode_event
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.infrastructure.segments import firestore_event_recommender, firestore_fan_segment_index
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def _fan_addresses(collection, page_size: int):
+    for snapshots in scan_pages(collection, ('address',), page_size):
+        for snapshot in snapshots:
+            yield snapshot.id, snapshot.to_dict() or {}
+
+
+def load_fan_geo_index(db=None, page_size: int = PAGE_SIZE) -> GeoIndex:
+    """Build the fan index from a full scan of `fans` (no listener)"""
+    if db is None:
+        from src.infrastructure.config.firebase import get_firestore
+        db = get_firestore()
+
+    started = time.perf_counter()
+    index = GeoIndex.build(_fan_addresses(db.collection('fans'), page_size))
+    logger.info(f"Índice geográfico de fãs: {len(index)} fãs em {time.perf_counter() - started:.1f}s")
+    return index
+
+
+def load_event_geo_index(db=None, now: Optional[datetime] = None) -> GeoIndex:
+    """Build the event index from the upcoming events (no listener)"""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    if db is None:
+        from src.infrastructure.config.firebase import get_firestore
+        db = get_firestore()
+
+    query = db.collection(EVENTS_COLLECTION).where(filter=FieldFilter('starts_at', '>=', now or datetime.now()))
+    return GeoIndex.build((snapshot.id, decode_event(snapshot)) for snapshot in query.stream())
+
+
+_fans: Optional[GeoIndex] = None
+_events: Optional[GeoIndex] = None
+_watches = []
+_lock = threading.Lock()
+
+
+def get_fan_geo_index() -> GeoIndex:
+    """Process-wide fan index, loaded on first use and kept current by a listener"""
+    global _fans
+    if _fans is None:
+        with _lock:
+            if _fans is None:
+                from src.infrastructure.config.firebase import get_firestore
+                db = get_firestore()
+                since = datetime.now() - firestore_fan_segment_index.WATCH_OVERLAP
+                index = load_fan_geo_index(db)
+                _watches.append(firestore_fan_segment_index.watch(db.collection('fans'), index, since))
+                _fans = index
+    return _fans
+
+
+def get_event_geo_index() -> GeoIndex:
+    """Process-wide event index, loaded on first use and kept current by a listener"""
+    global _events
+    if _events is None:
+        with _lock:
+            if _events is None:
+                from src.infrastructure.config.firebase import get_firestore
+                db = get_firestore()
+                since = datetime.now() - firestore_event_recommender.WATCH_OVERLAP
+                index = load_event_geo_index(db)
+                _watches.append(firestore_event_recommender.watch(db.collection(EVENTS_COLLECTION), index, since))
+                _events = index
+    return _events
+
+
+def _reset():
+    # Os listeners rodam em threads do processo pai; o filho cria os seus
+    global _fans, _events, _watches, _lock
+    _fans = None
+    _events = None
+    _watches = []
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,168 @@
+"""
+Índice geográfico em memória de fãs ou eventos, por estado → cidade →
+prefixo de CEP.
+
+Cada item (o documento de um fã, com `address`, ou um evento, com os campos
+de endereço no próprio documento) cai em um balde folha `(UF, cidade,
+prefixo)`. A folha tem uma coordenada, tirada da tabela de CEPs
+(`cep_table`), e o conjunto de ids que moram nela. Eventos online e endereços
+sem UF ficam de fora.
+
+Consultas por região (`region`) descem a árvore pelos dicionários. Consultas
+por raio (`within`) podam em dois níveis: cada estado guarda o centro e o
+raio das suas folhas, e só as folhas dos estados cujo círculo cruza o da
+consulta passam pelo haversine, vetorizado em NumPy. Todos os ids de uma folha
+estão à mesma distância, então o custo depende do número de folhas
+candidatas, não do número de itens.
+"""
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.domain.catalog.interest_catalog import normalize
+from src.domain.rules.fields import field_value
+from src.infrastructure.geo.cep_table import CepTable, cep_prefix, get_cep_table
+
+EARTH_RADIUS_KM = 6371.0088
+
+NO_PREFIX = -1
+
+Leaf = Tuple[str, str, int]  # (UF, cidade normalizada, prefixo de CEP ou -1)
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from one point to many (degrees)"""
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2, lon2 = np.radians(lats), np.radians(lons)
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def leaf_of(source: Any) -> Optional[Leaf]:
+    """Leaf bucket of a fan (address) or an event (own fields); None when it has no place"""
+    if source is None or field_value(source, 'online'):
+        return None
+    address = field_value(source, 'address')
+    address = source if address is None else address
+    state = field_value(address, 'state')
+    if not isinstance(state, str) or not state.strip():
+        return None
+    city = field_value(address, 'city')
+    prefix = cep_prefix(field_value(address, 'postal_code'))
+    return (state.strip().upper(), normalize(city) if isinstance(city, str) else '',
+            NO_PREFIX if prefix is None else prefix)
+
+
+class GeoIndex:
+    def __init__(self, table: Optional[CepTable] = None):
+        self.table = table or get_cep_table()
+        self._lock = threading.RLock()
+        self._leaf_of_item: Dict[str, int] = {}
+        self._leaf_ids: Dict[Leaf, int] = {}
+        self._leaves: List[Leaf] = []
+        self._members: List[Set[str]] = []
+        self._coordinates: List[Tuple[float, float]] = []
+        self._lat = np.zeros(0, dtype=np.float64)
+        self._lon = np.zeros(0, dtype=np.float64)
+        self._tree: Dict[str, Dict[str, Dict[int, int]]] = {}
+        # Por estado: (folhas com coordenada, centro, raio); refeito, com os
+        # arrays de coordenadas, quando surge uma folha
+        self._bounds: Optional[Dict[str, Tuple[np.ndarray, float, float, float]]] = None
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, Any]], table: Optional[CepTable] = None) -> 'GeoIndex':
+        """Bulk-build from (id, document or entity) pairs"""
+        index = cls(table)
+        for item_id, data in documents:
+            index.apply(item_id, data)
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._leaf_of_item)
+
+    def _leaf(self, key: Leaf) -> int:
+        leaf = self._leaf_ids.get(key)
+        if leaf is None:
+            leaf = len(self._leaves)
+            self._leaf_ids[key] = leaf
+            self._leaves.append(key)
+            self._members.append(set())
+            state, city, prefix = key
+            coordinates = self.table.locate(state, city, None if prefix == NO_PREFIX else f"{prefix:05d}000")
+            self._coordinates.append(coordinates or (np.nan, np.nan))
+            self._tree.setdefault(state, {}).setdefault(city, {})[prefix] = leaf
+            self._bounds = None
+        return leaf
+
+    def apply(self, item_id: str, data: Optional[Any]) -> None:
+        """Index the current location of an item; `data=None` removes it. Idempotent"""
+        with self._lock:
+            key = leaf_of(data)
+            old = self._leaf_of_item.get(item_id)
+            new = self._leaf(key) if key is not None else None
+            if old == new:
+                return
+            if old is not None:
+                self._members[old].discard(item_id)
+                del self._leaf_of_item[item_id]
+            if new is not None:
+                self._members[new].add(item_id)
+                self._leaf_of_item[item_id] = new
+
+    def region(self, state: str, city: Optional[str] = None, postal_code=None) -> List[str]:
+        """Ids in a state, optionally narrowed to a city and a CEP prefix"""
+        with self._lock:
+            cities = self._tree.get(state.strip().upper(), {})
+            if city is not None:
+                cities = {normalize(city): cities.get(normalize(city), {})}
+            prefix = cep_prefix(postal_code) if postal_code is not None else None
+            ids: List[str] = []
+            for prefixes in cities.values():
+                leaves = prefixes.values() if prefix is None else [prefixes[prefix]] if prefix in prefixes else []
+                for leaf in leaves:
+                    ids.extend(sorted(self._members[leaf]))
+            return ids
+
+    def _state_bounds(self) -> Dict[str, Tuple[np.ndarray, float, float, float]]:
+        if self._bounds is None:
+            coordinates = np.array(self._coordinates, dtype=np.float64).reshape(-1, 2)
+            self._lat, self._lon = coordinates[:, 0], coordinates[:, 1]
+            bounds = {}
+            for state, cities in self._tree.items():
+                leaves = np.array([leaf for prefixes in cities.values() for leaf in prefixes.values()], dtype=np.int64)
+                leaves = leaves[~np.isnan(self._lat[leaves])]
+                if len(leaves):
+                    lat, lon = float(self._lat[leaves].mean()), float(self._lon[leaves].mean())
+                    radius = float(haversine_km(lat, lon, self._lat[leaves], self._lon[leaves]).max())
+                    bounds[state] = (leaves, lat, lon, radius)
+            self._bounds = bounds
+        return self._bounds
+
+    def within(self, lat: float, lon: float, radius_km: float, limit: int = 100) -> Dict[str, Any]:
+        """Count and the `limit` nearest items within `radius_km` of (lat, lon), nearest first"""
+        with self._lock:
+            bounds = self._state_bounds()
+            states = list(bounds.values())
+            if states:
+                centers = haversine_km(lat, lon, np.array([b[1] for b in states]), np.array([b[2] for b in states]))
+                candidates = [b[0] for b, distance in zip(states, centers.tolist()) if distance - b[3] <= radius_km]
+            else:
+                candidates = []
+            leaves = np.concatenate(candidates) if candidates else np.zeros(0, dtype=np.int64)
+
+            distances = haversine_km(lat, lon, self._lat[leaves], self._lon[leaves])
+            inside = distances <= radius_km
+            leaves, distances = leaves[inside], distances[inside]
+            order = np.argsort(distances, kind='stable')
+
+            count = 0
+            items: List[Dict[str, Any]] = []
+            for leaf, distance in zip(leaves[order].tolist(), distances[order].tolist()):
+                members = self._members[leaf]
+                count += len(members)
+                if len(items) < limit:
+                    items.extend({'id': item_id, 'distance_km': round(distance, 2)}
+                                 for item_id in sorted(members)[:limit - len(items)])
+            return {'count': count, 'items': items}
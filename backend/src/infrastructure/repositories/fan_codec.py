@@ -0,0 +1,197 @@
+"""
+Conversão entre documentos do Firestore e a entidade `Fan`.
+
+Documentos gravados pelo próprio codec levam `schema_version`; esses são
+hidratados sem validação (o mesmo que `model_construct`, com o plano de campos
+pré-compilado), convertendo apenas datas e sub-modelos.
+Qualquer outro documento (versão antiga, escrito por outro serviço ou vindo
+do cliente) passa pelo `TypeAdapter` pré-compilado com validação completa.
+Jogos e times favoritos são gravados como ids do catálogo de interesses e
+voltam como nomes canônicos (ver `domain.catalog.interest_catalog`).
+"""
+import typing
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+from src.domain.catalog.interest_catalog import decode_fields, encode_fields
+from src.domain.entities.fan import Fan
+
+SCHEMA_VERSION = 1
+SCHEMA_VERSION_FIELD = 'schema_version'
+
+_FAN_ADAPTER = TypeAdapter(Fan)
+_FAN_LIST_ADAPTER = TypeAdapter(List[Fan])
+
+
+def to_datetime(value):
+    """Firestore/protobuf timestamps and ISO strings to datetime; other values unchanged"""
+    if value is None or isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    if hasattr(value, 'ToDatetime'):  # google.protobuf Timestamp
+        return value.ToDatetime(tzinfo=timezone.utc)
+    return value
+
+
+def _field_kind(annotation) -> Tuple[str, Optional[Type[BaseModel]]]:
+    """Classify a field annotation as 'model', 'model_list', 'datetime' or 'plain'"""
+    args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+    origin = typing.get_origin(annotation)
+
+    if origin is typing.Union and len(args) == 1:
+        return _field_kind(args[0])
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return 'model', annotation
+    if annotation is datetime:
+        return 'datetime', None
+    if origin in (list, List) and args and isinstance(args[0], type) and issubclass(args[0], BaseModel):
+        return 'model_list', args[0]
+    return 'plain', None
+
+
+def _default_maker(field) -> Callable[[], Any]:
+    if field.default_factory is not None:
+        return field.default_factory
+    default = field.default
+    if isinstance(default, (list, dict, set)):
+        return lambda: type(default)(default)
+    return lambda: default
+
+
+def _compile_constructor(model: Type[BaseModel]) -> Callable[[Dict[str, Any]], BaseModel]:
+    """
+    Build a trusted-data constructor for `model`.
+
+    Equivalent to `model.model_construct(**data)`, but the field plan (which
+    fields need date/sub-model conversion and how to fill defaults) is worked
+    out once here instead of on every call.
+    """
+    converters = {}
+    defaults = []
+    for name, field in model.model_fields.items():
+        kind, submodel = _field_kind(field.annotation)
+        if kind == 'datetime':
+            converters[name] = to_datetime
+        elif kind == 'model':
+            build = _compile_constructor(submodel)
+            converters[name] = lambda value, build=build: build(value) if isinstance(value, dict) else value
+        elif kind == 'model_list':
+            build = _compile_constructor(submodel)
+            converters[name] = lambda value, build=build: [build(item) for item in value]
+        if not field.is_required():
+            defaults.append((name, _default_maker(field)))
+
+    simple = (
+        not model.__pydantic_post_init__
+        and model.model_config.get('extra') != 'allow'
+        and all(field.alias is None and field.validation_alias is None for field in model.model_fields.values())
+    )
+    known = frozenset(model.model_fields)
+    converter_items = tuple(converters.items())
+    defaults = tuple(defaults)
+    field_count = len(known)
+    construct = model.model_construct
+    new = model.__new__
+    setattr_ = object.__setattr__
+
+    def build(data: Dict[str, Any]) -> BaseModel:
+        if data.keys() <= known:
+            values = data.copy()
+        else:
+            values = {key: value for key, value in data.items() if key in known}
+        for name, convert in converter_items:
+            value = values.get(name)
+            if value is not None:
+                values[name] = convert(value)
+        if not simple:
+            return construct(**values)
+
+        fields_set = set(values)
+        if len(values) < field_count:
+            for name, make_default in defaults:
+                if name not in values:
+                    values[name] = make_default()
+
+        instance = new(model)
+        setattr_(instance, '__dict__', values)
+        setattr_(instance, '__pydantic_fields_set__', fields_set)
+        setattr_(instance, '__pydantic_extra__', None)
+        setattr_(instance, '__pydantic_private__', None)
+        return instance
+
+    return build
+
+
+_construct_fan = _compile_constructor(Fan)
+
+
+def is_trusted(data: Dict[str, Any]) -> bool:
+    return data.get(SCHEMA_VERSION_FIELD) == SCHEMA_VERSION
+
+
+def decode(doc_id: Optional[str], data: Dict[str, Any]) -> Fan:
+    """Convert one Firestore document into a Fan"""
+    data = decode_fields({**data, 'id': doc_id})
+    if is_trusted(data):
+        return _construct_fan(data)
+    return _FAN_ADAPTER.validate_python(data)
+
+
+def decode_snapshot(snapshot) -> Optional[Fan]:
+    if not snapshot.exists:
+        return None
+    return decode(snapshot.id, snapshot.to_dict())
+
+
+def decode_many(snapshots: Iterable) -> List[Fan]:
+    """
+    Convert a bulk read into Fans, skipping missing documents.
+
+    Trusted documents are constructed directly; the rest are validated in a
+    single `List[Fan]` adapter call. Input order is preserved.
+    """
+    fans: List[Optional[Fan]] = []
+    untrusted_positions, untrusted_data = [], []
+
+    for snapshot in snapshots:
+        if not snapshot.exists:
+            continue
+        data = decode_fields({**snapshot.to_dict(), 'id': snapshot.id})
+        if is_trusted(data):
+            fans.append(_construct_fan(data))
+        else:
+            untrusted_positions.append(len(fans))
+            untrusted_data.append(data)
+            fans.append(None)
+
+    if untrusted_data:
+        for position, fan in zip(untrusted_positions, _FAN_LIST_ADAPTER.validate_python(untrusted_data)):
+            fans[position] = fan
+
+    return fans
+
+
+def validate(data: Dict[str, Any]) -> Fan:
+    """Validate untrusted input (request payloads, imports) into a Fan"""
+    return _FAN_ADAPTER.validate_python(decode_fields(dict(data)))
+
+
+def encode(fan: Fan, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Convert a Fan into Firestore data, optionally only some top-level fields"""
+    include = set(fields) if fields is not None else None
+    data = encode_fields(fan.model_dump(exclude_none=True, exclude={'id'}, include=include))
+    if include is None:
+        data[SCHEMA_VERSION_FIELD] = SCHEMA_VERSION
+    return data
+
+
+def mark_untrusted(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the schema marker in writes made outside this codec (e.g. raw profile updates)"""
+    from google.cloud.firestore_v1 import DELETE_FIELD
+    return {**fields, SCHEMA_VERSION_FIELD: DELETE_FIELD}
@@ -0,0 +1,17 @@
+"""
+Linhas do tempo do fã (compras e interesses em eventos), comuns aos
+repositórios do Firestore e do SQLite: um registro por item, ordenado por
+`recorded_at`.
+"""
+from datetime import datetime
+from typing import Any, Dict
+
+# Subcoleções de `fans/{uid}` no Firestore
+PURCHASES = 'purchases'
+EVENTS = 'events'
+RECORDED_AT = 'recorded_at'
+
+
+def timeline_entry(data: Dict[str, Any], recorded_at: datetime) -> Dict[str, Any]:
+    """Document of one timeline subcollection entry"""
+    return {**data, RECORDED_AT: recorded_at}
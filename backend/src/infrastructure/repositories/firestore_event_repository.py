@@ -0,0 +1,62 @@
+from datetime import datetime
+from typing import List, Optional
+
+from src.domain.entities.event import Event
+from src.domain.repositories.event_repository import EventRepository
+from src.infrastructure.config.firebase import get_firestore
+from src.infrastructure.repositories.fan_codec import to_datetime
+
+EVENTS_COLLECTION = 'events'
+
+# Um evento removido vira um marcador `{deleted: true, updated_at}`, sem os
+# demais campos: o listener das recomendações e do índice geográfico vê a
+# remoção pelo `updated_at`, e as consultas por `starts_at` deixam de achá-lo
+DELETED = 'deleted'
+
+
+def is_deleted(snapshot) -> bool:
+    """Whether the snapshot is missing or a deletion tombstone"""
+    return not snapshot.exists or bool((snapshot.to_dict() or {}).get(DELETED))
+
+
+def decode_event(snapshot) -> Event:
+    data = snapshot.to_dict() or {}
+    for field in ('starts_at', 'created_at', 'updated_at'):
+        if field in data:
+            data[field] = to_datetime(data[field])
+    return Event(**{**data, 'id': snapshot.id})
+
+
+class FirestoreEventRepository(EventRepository):
+    def __init__(self, db=None):
+        self.db = db or get_firestore()
+        self.collection = self.db.collection(EVENTS_COLLECTION)
+
+    def save(self, event: Event) -> Event:
+        # `updated_at` alimenta o listener que atualiza as recomendações
+        event.updated_at = datetime.now()
+        self.collection.document(event.id).set(event.model_dump(exclude={'id'}))
+        return event
+
+    def find_by_id(self, event_id: str) -> Optional[Event]:
+        snapshot = self.collection.document(event_id).get()
+        return None if is_deleted(snapshot) else decode_event(snapshot)
+
+    def find_many(self, event_ids: List[str]) -> List[Event]:
+        snapshots = self.db.get_all([self.collection.document(event_id) for event_id in event_ids])
+        found = {snapshot.id: decode_event(snapshot) for snapshot in snapshots if not is_deleted(snapshot)}
+        return [found[event_id] for event_id in event_ids if event_id in found]
+
+    def delete(self, event_id: str) -> bool:
+        doc_ref = self.collection.document(event_id)
+        if is_deleted(doc_ref.get()):
+            return False
+        doc_ref.set({DELETED: True, 'updated_at': datetime.now()})
+        return True
+
+    def list_upcoming(self, after: datetime, limit: int = 50) -> List[Event]:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (self.collection.where(filter=FieldFilter('starts_at', '>=', after))
+                 .order_by('starts_at').limit(limit))
+        return [decode_event(snapshot) for snapshot in query.stream()]
@@ -0,0 +1,181 @@
+"""
+Listagem paginada da coleção `fans` para o painel administrativo.
+
+Cada página é uma única consulta com `limit` e projeção (`select`): o
+Firestore devolve só os campos pedidos, e a próxima página começa depois do
+último documento da anterior (`start_after`), sem offset. Por isso memória e
+latência por página não dependem do tamanho da coleção. O cursor devolvido é
+opaco para o cliente: codifica o valor do campo de ordenação e o id do último
+documento.
+
+Filtros: igualdade no estado (`address.state`) e um intervalo em
+`profile_completeness` ou em `created_at` (um dos dois por consulta; o campo
+do intervalo passa a ser a ordenação). Combinar estado e intervalo exige o
+índice composto correspondente no Firestore.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from src.domain.catalog.interest_catalog import decode_fields
+from src.domain.entities.fan import Fan
+from src.infrastructure.config.firebase import get_firestore
+from src.infrastructure.repositories.fan_codec import to_datetime
+from src.infrastructure.repositories.page_cursor import encode_cursor, decode_cursor
+
+DEFAULT_FIELDS: Tuple[str, ...] = ('name', 'email', 'address', 'profile_completeness', 'created_at', 'updated_at')
+
+# A imagem em base64 pode ter centenas de KB por fã; fica fora das listagens
+LISTABLE_FIELDS = frozenset(Fan.model_fields) - {'id', 'profile_image_base64'}
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+def _jsonable(value):
+    value = to_datetime(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Mapping):
+        return {key: _jsonable(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_jsonable(item) for item in value]
+    return value
+
+
+def _int_arg(args: Mapping[str, str], name: str, low: int, high: int) -> Optional[int]:
+    raw = args.get(name)
+    if raw in (None, ''):
+        return None
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if not low <= value <= high:
+        raise ValueError(f"'{name}' must be between {low} and {high}")
+    return value
+
+
+def _date_arg(args: Mapping[str, str], name: str) -> Optional[datetime]:
+    raw = args.get(name)
+    if raw in (None, ''):
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an ISO 8601 date")
+
+
+@dataclass(frozen=True)
+class FanListQuery:
+    fields: Tuple[str, ...] = DEFAULT_FIELDS
+    limit: int = DEFAULT_LIMIT
+    state: Optional[str] = None
+    min_completeness: Optional[int] = None
+    max_completeness: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def __post_init__(self):
+        unknown = set(self.fields) - LISTABLE_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown or unlisted fields: {', '.join(sorted(unknown))}")
+        if not 1 <= self.limit <= MAX_LIMIT:
+            raise ValueError(f"'limit' must be between 1 and {MAX_LIMIT}")
+        completeness = self.min_completeness is not None or self.max_completeness is not None
+        created = self.created_after is not None or self.created_before is not None
+        if completeness and created:
+            raise ValueError("Filter by a completeness range or a created_at range, not both")
+
+    @classmethod
+    def from_args(cls, args: Mapping[str, str]) -> 'FanListQuery':
+        """Build from query-string arguments; raises ValueError on invalid input"""
+        fields = args.get('fields')
+        return cls(
+            fields=tuple(field.strip() for field in fields.split(',') if field.strip()) if fields else DEFAULT_FIELDS,
+            limit=_int_arg(args, 'limit', 1, MAX_LIMIT) or DEFAULT_LIMIT,
+            state=(args.get('state') or '').strip().upper() or None,
+            min_completeness=_int_arg(args, 'min_completeness', 0, 100),
+            max_completeness=_int_arg(args, 'max_completeness', 0, 100),
+            created_after=_date_arg(args, 'created_after'),
+            created_before=_date_arg(args, 'created_before'),
+        )
+
+    @property
+    def order_field(self) -> str:
+        if self.min_completeness is not None or self.max_completeness is not None:
+            return 'profile_completeness'
+        if self.created_after is not None or self.created_before is not None:
+            return 'created_at'
+        return '__name__'
+
+
+class FirestoreFanListing:
+    def __init__(self, db=None):
+        self.db = db or get_firestore()
+        self.collection = self.db.collection('fans')
+
+    def _query(self, query: FanListQuery, page_size: int):
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        filters = []
+        if query.state:
+            filters.append(FieldFilter('address.state', '==', query.state))
+        if query.min_completeness is not None:
+            filters.append(FieldFilter('profile_completeness', '>=', query.min_completeness))
+        if query.max_completeness is not None:
+            filters.append(FieldFilter('profile_completeness', '<=', query.max_completeness))
+        if query.created_after is not None:
+            filters.append(FieldFilter('created_at', '>=', query.created_after))
+        if query.created_before is not None:
+            filters.append(FieldFilter('created_at', '<', query.created_before))
+
+        firestore_query = self.collection
+        for field_filter in filters:
+            firestore_query = firestore_query.where(filter=field_filter)
+
+        # O campo de ordenação entra na projeção para montar o cursor
+        fields = set(query.fields) | ({query.order_field} - {'__name__'})
+        firestore_query = firestore_query.select(sorted(fields))
+        if query.order_field != '__name__':
+            firestore_query = firestore_query.order_by(query.order_field)
+        return firestore_query.order_by('__name__').limit(page_size)
+
+    def _row(self, snapshot, fields: Tuple[str, ...]) -> Dict[str, Any]:
+        data = decode_fields(snapshot.to_dict() or {})
+        row = {'id': snapshot.id}
+        row.update({field: _jsonable(data[field]) for field in fields if field in data})
+        return row
+
+    def _cursor(self, query: FanListQuery, snapshot) -> str:
+        value = snapshot.get(query.order_field) if query.order_field != '__name__' else None
+        return encode_cursor(query.order_field, value, snapshot.id)
+
+    def page(self, query: FanListQuery, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """One page of fans plus the cursor of the next one (None on the last page)"""
+        firestore_query = self._query(query, query.limit + 1)
+        if cursor:
+            firestore_query = firestore_query.start_after(decode_cursor(cursor, query.order_field))
+
+        snapshots = list(firestore_query.stream())
+        has_more = len(snapshots) > query.limit
+        snapshots = snapshots[:query.limit]
+        return {
+            'fans': [self._row(snapshot, query.fields) for snapshot in snapshots],
+            'next': self._cursor(query, snapshots[-1]) if has_more else None,
+        }
+
+    def stream(self, query: FanListQuery, cursor: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Every matching fan, read in pages of `query.limit`"""
+        base_query = self._query(query, query.limit)
+        start = decode_cursor(cursor, query.order_field) if cursor else None
+        while True:
+            snapshots: List = list((base_query.start_after(start) if start else base_query).stream())
+            for snapshot in snapshots:
+                yield self._row(snapshot, query.fields)
+            if len(snapshots) < query.limit:
+                return
+            last = snapshots[-1]
+            start = {'__name__': last.id}
+            if query.order_field != '__name__':
+                start[query.order_field] = last.get(query.order_field)
@@ -1,111 +1,226 @@
-from typing import List, Optional, Dict, Any
+import uuid
+from typing import List, Optional, Dict, Any, Callable, Tuple, Type, TypeVar
 from datetime import datetime
 from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from pydantic import BaseModel
 
-from src.domain.entities.fan import Fan, Address
-from src.domain.repositories.fan_repository import FanRepository
+from src.domain.catalog.interest_catalog import encode_fields
+from src.domain.entities.fan import Fan, Document, EventInterest, Purchase
+from src.domain.repositories.fan_repository import FanRepository, FanUnitOfWork
+from src.domain.rules import fan_stats
+from src.infrastructure.repositories.firestore_fan_unit_of_work import FirestoreFanUnitOfWork
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+from src.infrastructure.repositories import fan_codec
+from src.infrastructure.repositories.fan_timeline import PURCHASES, EVENTS, RECORDED_AT, timeline_entry
+from src.infrastructure.repositories.page_cursor import encode_cursor, decode_cursor
+from src.infrastructure.config.firebase import get_firestore
+
+M = TypeVar('M', bound=BaseModel)
+
+def _dump(item: BaseModel) -> Dict[str, Any]:
+    return item.dict(exclude_none=True)
 
 
 class FirestoreFanRepository(FanRepository):
-    def __init__(self):
-        self.db = firestore.client()
+    def __init__(self, db=None, stats: Optional[FirestoreFanStatsRepository] = None,
+                 rollups: Optional[FirestoreSpendRollupRepository] = None):
+        self.db = db or get_firestore()
         self.collection = self.db.collection('fans')
-    
+        # Agregados da base de fãs, atualizados na mesma escrita do perfil
+        self.stats = stats or FirestoreFanStatsRepository(self.db)
+        # Gasto por dia/mês/total, atualizado na mesma escrita de cada compra
+        self.rollups = rollups or FirestoreSpendRollupRepository(self.db)
+
+    def _to_fan(self, snapshot) -> Fan:
+        return fan_codec.decode(snapshot.id, snapshot.to_dict())
+
     def create(self, fan: Fan) -> Fan:
-        fan_dict = fan.dict(exclude_none=True)
-        
-        fan_dict['created_at'] = datetime.now()
-        
-        if fan.address:
-            fan_dict['address'] = fan.address.dict(exclude_none=True)
-        
+        fan.created_at = datetime.now()
+
         doc_ref = self.collection.document(fan.user_id)
-        doc_ref.set(fan_dict)
-        
-        created_fan = doc_ref.get().to_dict()
-        return Fan(**created_fan)
-    
+        batch = self.db.batch()
+        # create() e não set(): se o documento já existe a batch inteira falha,
+        # e o fã não é somado duas vezes aos agregados
+        batch.create(doc_ref, fan_codec.encode(fan))
+        self.stats.stage(batch, fan_stats.delta(None, fan))
+        try:
+            batch.commit()
+        except AlreadyExists:
+            raise ValueError(f"Fan profile already exists: {fan.user_id}")
+
+        # O documento é exatamente o que foi gravado; não é preciso relê-lo
+        fan.id = doc_ref.id
+        return fan
+
+    def find_by_id(self, fan_id: str) -> Optional[Fan]:
+        # O documento do fan usa o UID do Firebase Auth como id
+        return self.find_by_user_id(fan_id)
+
     def find_by_user_id(self, user_id: str) -> Optional[Fan]:
-        doc_ref = self.collection.document(user_id)
-        doc = doc_ref.get()
-        
-        if doc.exists:
-            fan_data = doc.to_dict()
-            
-            if 'created_at' in fan_data and isinstance(fan_data['created_at'], firestore.Timestamp):
-                fan_data['created_at'] = fan_data['created_at'].datetime
-            
-            if 'updated_at' in fan_data and isinstance(fan_data['updated_at'], firestore.Timestamp):
-                fan_data['updated_at'] = fan_data['updated_at'].datetime
-            
-            if 'birth_date' in fan_data and isinstance(fan_data['birth_date'], firestore.Timestamp):
-                fan_data['birth_date'] = fan_data['birth_date'].datetime
-            
-            if 'address' in fan_data and fan_data['address']:
-                address_data = fan_data['address']
-                fan_data['address'] = Address(**address_data)
-            
-            return Fan(**fan_data)
-        
-        return None
-    
+        return fan_codec.decode_snapshot(self.collection.document(user_id).get())
+
+    def find_many(self, fan_ids: List[str]) -> List[Fan]:
+        refs = [self.collection.document(fan_id) for fan_id in fan_ids]
+        return fan_codec.decode_many(self.db.get_all(refs))
+
     def update(self, fan: Fan) -> Fan:
-        fan_dict = fan.dict(exclude_none=True)
-        
-        fan_dict['updated_at'] = datetime.now()
-        
-        if fan.address:
-            fan_dict['address'] = fan.address.dict(exclude_none=True)
-        
+        fan.updated_at = datetime.now()
+
         doc_ref = self.collection.document(fan.user_id)
-        doc_ref.update(fan_dict)
-        
-        updated_fan = doc_ref.get().to_dict()
-        return Fan(**updated_fan)
-    
+        data = fan_codec.encode(fan)
+
+        # O estado anterior é lido na transação para descontar a contribuição antiga
+        @firestore.transactional
+        def apply(transaction):
+            snapshot = doc_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                raise ValueError(f"Fan profile not found: {fan.user_id}")
+            transaction.update(doc_ref, data)
+            self.stats.stage(transaction, fan_stats.delta(snapshot.to_dict(), fan))
+
+        apply(self.db.transaction())
+        fan.id = doc_ref.id
+        return fan
+
     def update_profile(self, user_id: str, profile_data: Dict[str, Any]) -> Fan:
         doc_ref = self.collection.document(user_id)
-        doc = doc_ref.get()
-        
-        if doc.exists:
-            fan_data = doc.to_dict()
-            
-            if 'address' in profile_data:
-                if 'address' in fan_data and fan_data['address']:
-                    fan_data['address'].update(profile_data['address'])
-                else:
-                    fan_data['address'] = profile_data['address']
-                
-                del profile_data['address']
-            
-            fan_data.update(profile_data)
-            
-            fan_data['updated_at'] = datetime.now()
-            
-            doc_ref.update(fan_data)
-        else:
-            fan_data = {
-                'user_id': user_id,
-                'created_at': datetime.now(),
-                'updated_at': datetime.now(),
-                **profile_data
-            }
-            
-            doc_ref.set(fan_data)
-        
-        updated_fan = doc_ref.get().to_dict()
-        
-        if 'created_at' in updated_fan and isinstance(updated_fan['created_at'], firestore.Timestamp):
-            updated_fan['created_at'] = updated_fan['created_at'].datetime
-        
-        if 'updated_at' in updated_fan and isinstance(updated_fan['updated_at'], firestore.Timestamp):
-            updated_fan['updated_at'] = updated_fan['updated_at'].datetime
-        
-        if 'birth_date' in updated_fan and isinstance(updated_fan['birth_date'], firestore.Timestamp):
-            updated_fan['birth_date'] = updated_fan['birth_date'].datetime
-        
-        if 'address' in updated_fan and updated_fan['address']:
-            address_data = updated_fan['address']
-            updated_fan['address'] = Address(**address_data)
-        
-        return Fan(**updated_fan) 
\ No newline at end of file
+        profile_data = encode_fields(dict(profile_data))
+
+        # Leitura e escrita na mesma transação: o delta dos agregados desconta
+        # exatamente o estado que é substituído, mesmo com escritas concorrentes
+        @firestore.transactional
+        def apply(transaction):
+            doc = doc_ref.get(transaction=transaction)
+            changes = dict(profile_data)
+            if doc.exists:
+                fan_data = doc.to_dict()
+                before = fan_stats.contribution(fan_data)
+
+                if 'address' in changes:
+                    if 'address' in fan_data and fan_data['address']:
+                        fan_data['address'] = {**fan_data['address'], **changes['address']}
+                    else:
+                        fan_data['address'] = changes['address']
+
+                    del changes['address']
+
+                fan_data.update(changes)
+
+                fan_data['updated_at'] = datetime.now()
+
+                # Dados vindos do cliente: o documento volta a ser validado na leitura
+                transaction.update(doc_ref, fan_codec.mark_untrusted(fan_data))
+            else:
+                before = fan_stats.empty()
+                fan_data = {
+                    'user_id': user_id,
+                    'created_at': datetime.now(),
+                    'updated_at': datetime.now(),
+                    **changes
+                }
+
+                transaction.set(doc_ref, fan_data)
+
+            self.stats.stage(transaction, fan_stats.difference(before, fan_stats.contribution(fan_data)))
+
+        apply(self.db.transaction())
+        return self._to_fan(doc_ref.get())
+
+    def unit_of_work(self, fan_id: str) -> FanUnitOfWork:
+        doc_ref = self.collection.document(fan_id)
+        snapshot = doc_ref.get()
+        if not snapshot.exists:
+            raise ValueError(f"Fan profile not found: {fan_id}")
+
+        data = snapshot.to_dict()
+        fan = fan_codec.decode(snapshot.id, data)
+        return FirestoreFanUnitOfWork(self.db, doc_ref, snapshot, fan, trusted=fan_codec.is_trusted(data),
+                                      stats=self.stats)
+
+    def update_fields(self, fan_id: str, fields: Dict[str, Any], stats_delta: Optional[Dict[str, Any]] = None) -> None:
+        fields = {**fields, 'updated_at': datetime.now()}
+        batch = self.db.batch()
+        batch.update(self.collection.document(fan_id), fields)
+        if stats_delta:
+            self.stats.stage(batch, stats_delta)
+        try:
+            batch.commit()
+        except NotFound:
+            raise ValueError(f"Fan profile not found: {fan_id}")
+
+    def _append(self, fan_id: str, field: str, item: BaseModel, increments: Dict[str, float] = None,
+                stats_delta: Optional[Dict[str, Any]] = None) -> None:
+        """Append one item to an array field with a single write (no read)"""
+        fields = {field: firestore.ArrayUnion([_dump(item)])}
+        for counter, value in (increments or {}).items():
+            fields[counter] = firestore.Increment(value)
+        self.update_fields(fan_id, fields, stats_delta)
+
+    def add_document(self, fan_id: str, document: Document) -> None:
+        self._append(fan_id, 'documents', document)
+
+    def _record(self, fan_id: str, subcollection: str, entry_id: str, entry: Dict[str, Any],
+                increments: Dict[str, float], stats_delta: Optional[Dict[str, Any]] = None,
+                stage: Optional[Callable[[Any], None]] = None) -> None:
+        """
+        Create one timeline entry and bump the parent's counters in a single
+        atomic batch (no read); the fan document itself does not grow.
+        `stage` adds other writes to the same batch.
+        """
+        doc_ref = self.collection.document(fan_id)
+        fields = {counter: firestore.Increment(value) for counter, value in increments.items()}
+        fields['updated_at'] = datetime.now()
+
+        batch = self.db.batch()
+        batch.create(doc_ref.collection(subcollection).document(entry_id), entry)
+        # O update exige o documento do fã: sem ele a batch inteira falha
+        batch.update(doc_ref, fields)
+        if stage:
+            stage(batch)
+        if stats_delta:
+            self.stats.stage(batch, stats_delta)
+        try:
+            batch.commit()
+        except NotFound:
+            raise ValueError(f"Fan profile not found: {fan_id}")
+        except AlreadyExists:
+            raise ValueError(f"Entry {entry_id} already recorded for fan {fan_id}")
+
+    def _timeline(self, fan_id: str, subcollection: str, model: Type[M], limit: int,
+                  cursor: Optional[str]) -> Tuple[List[M], Optional[str]]:
+        """One page of a timeline subcollection, newest first, plus the next cursor"""
+        query = (self.collection.document(fan_id).collection(subcollection)
+                 .order_by(RECORDED_AT, direction=firestore.Query.DESCENDING)
+                 .order_by('__name__', direction=firestore.Query.DESCENDING)
+                 .limit(limit + 1))
+        if cursor:
+            query = query.start_after(decode_cursor(cursor, RECORDED_AT))
+
+        snapshots = list(query.stream())
+        page = snapshots[:limit]
+        items = [model(**{key: value for key, value in snapshot.to_dict().items() if key != RECORDED_AT})
+                 for snapshot in page]
+        if len(snapshots) <= limit:
+            return items, None
+        return items, encode_cursor(RECORDED_AT, page[-1].get(RECORDED_AT), page[-1].id)
+
+    def add_event_interest(self, fan_id: str, event_interest: EventInterest) -> None:
+        self._record(fan_id, EVENTS, uuid.uuid4().hex, timeline_entry(_dump(event_interest), datetime.now()),
+                     {'event_count': 1})
+
+    def add_purchase(self, fan_id: str, purchase: Purchase) -> None:
+        # O id da compra é o id do documento: reenviar a mesma compra falha em vez de duplicá-la
+        self._record(fan_id, PURCHASES, purchase.id, timeline_entry(_dump(purchase), purchase.purchase_date),
+                     {'purchase_count': 1, 'total_spent': purchase.amount},
+                     stats_delta={'purchases': 1, 'total_spent': purchase.amount},
+                     stage=lambda batch: self.rollups.stage(batch, fan_id, [(purchase.amount, purchase.purchase_date)]))
+
+    def list_purchases(self, fan_id: str, limit: int = 20,
+                       cursor: Optional[str] = None) -> Tuple[List[Purchase], Optional[str]]:
+        return self._timeline(fan_id, PURCHASES, Purchase, limit, cursor)
+
+    def list_event_interests(self, fan_id: str, limit: int = 20,
+                             cursor: Optional[str] = None) -> Tuple[List[EventInterest], Optional[str]]:
+        return self._timeline(fan_id, EVENTS, EventInterest, limit, cursor)
@@ -0,0 +1,69 @@
+"""
+Agregados da base de fãs em contadores fragmentados no Firestore.
+
+Os totais ficam espalhados por `FAN_STATS_SHARDS` documentos da coleção
+`fan_stats` (`shard-0`, `shard-1`, ...). Cada escrita de perfil soma o seu
+delta com `Increment` em um fragmento sorteado, na mesma WriteBatch ou
+transação que grava o fã, então o documento e os agregados mudam juntos e
+escritas concorrentes não disputam o mesmo documento. A leitura do dashboard
+é um único `get_all` dos fragmentos, somados em memória.
+"""
+import os
+import random
+from typing import Any, Dict, Mapping
+
+from src.domain.repositories.fan_stats_repository import FanStatsRepository
+from src.domain.rules import fan_stats
+from src.infrastructure.config.firebase import get_firestore
+
+FAN_STATS_COLLECTION = 'fan_stats'
+FAN_STATS_SHARDS = int(os.getenv('FAN_STATS_SHARDS', '10'))
+
+
+def _increments(delta: Mapping[str, Any]) -> Dict[str, Any]:
+    from google.cloud.firestore_v1 import Increment
+
+    # Mapas aninhados com set(merge=True): o cliente cita cada chave no field
+    # path, então nomes com ponto ou espaço ("CS:GO", "League of Legends") valem
+    data: Dict[str, Any] = {}
+    for name in fan_stats.SCALARS:
+        if delta.get(name):
+            data[name] = Increment(delta[name])
+    for name in fan_stats.MAPS:
+        counts = {key: Increment(value) for key, value in (delta.get(name) or {}).items() if value}
+        if counts:
+            data[name] = counts
+    return data
+
+
+class FirestoreFanStatsRepository(FanStatsRepository):
+    def __init__(self, db=None, shards: int = FAN_STATS_SHARDS):
+        self.db = db or get_firestore()
+        self.collection = self.db.collection(FAN_STATS_COLLECTION)
+        self.shards = max(1, shards)
+
+    def _shard(self, index: int):
+        return self.collection.document(f'shard-{index}')
+
+    def stage(self, writer, delta: Mapping[str, Any]) -> None:
+        """Add the delta to a WriteBatch or Transaction; no-op for an empty delta"""
+        data = _increments(delta)
+        if data:
+            writer.set(self._shard(random.randrange(self.shards)), data, merge=True)
+
+    def record(self, delta: Mapping[str, Any]) -> None:
+        data = _increments(delta)
+        if data:
+            self._shard(random.randrange(self.shards)).set(data, merge=True)
+
+    def totals(self) -> Dict[str, Any]:
+        snapshots = self.db.get_all([self._shard(index) for index in range(self.shards)])
+        return fan_stats.merge(snapshot.to_dict() or {} for snapshot in snapshots if snapshot.exists)
+
+    def replace(self, totals: Mapping[str, Any]) -> None:
+        # Tudo no primeiro fragmento; os demais voltam a zero
+        batch = self.db.batch()
+        batch.set(self._shard(0), {**fan_stats.empty(), **dict(totals)})
+        for index in range(1, self.shards):
+            batch.set(self._shard(index), fan_stats.empty())
+        batch.commit()
@@ -0,0 +1,79 @@
+from typing import Dict, Any
+from datetime import datetime
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+
+from src.domain.entities.fan import Fan
+from src.domain.repositories.fan_repository import FanUnitOfWork, ConcurrentUpdateError
+from src.domain.rules import fan_stats
+from src.infrastructure.repositories import fan_codec
+
+
+class FirestoreFanUnitOfWork(FanUnitOfWork):
+    """
+    Unit of work over one fan document.
+
+    Keeps a copy of the fields as loaded and, on commit, sends only the
+    top-level fields that changed in a single WriteBatch, conditioned on the
+    document not having been updated since it was read. Documents not yet in
+    the codec format (`trusted=False`) are rewritten in full once, so later
+    reads take the fast path. With `stats`, the change to the fan-base
+    aggregates goes in the same batch.
+    """
+
+    def __init__(self, db, doc_ref, snapshot, fan: Fan, trusted: bool = True, stats=None):
+        self.db = db
+        self.doc_ref = doc_ref
+        self.fan = fan
+        self.stats = stats
+        self._trusted = trusted
+        self._update_time = snapshot.update_time
+        self._loaded = self._fields(fan)
+        self._committed = False
+
+    @staticmethod
+    def _fields(fan: Fan) -> Dict[str, Any]:
+        return fan.dict(exclude={'id'})
+
+    def changes(self) -> Dict[str, Any]:
+        """Top-level fields that differ from the loaded state, ready to write"""
+        current = self._fields(self.fan)
+        changed = [name for name, value in current.items() if value != self._loaded.get(name)]
+        if not changed:
+            return {}
+
+        if not self._trusted:
+            stored = fan_codec.encode(self.fan)
+        else:
+            stored = fan_codec.encode(self.fan, fields=changed)
+
+        for name in changed:
+            stored.setdefault(name, firestore.DELETE_FIELD)
+        return stored
+
+    def commit(self) -> Fan:
+        if self._committed:
+            raise RuntimeError("Unit of work already committed")
+        self._committed = True
+
+        changes = self.changes()
+        if not changes:
+            return self.fan
+
+        self.fan.updated_at = changes['updated_at'] = datetime.now()
+
+        batch = self.db.batch()
+        batch.update(
+            self.doc_ref,
+            changes,
+            option=self.db.write_option(last_update_time=self._update_time)
+        )
+        if self.stats is not None:
+            self.stats.stage(batch, fan_stats.delta(self._loaded, self._fields(self.fan)))
+
+        try:
+            batch.commit()
+        except FailedPrecondition:
+            raise ConcurrentUpdateError(f"Fan {self.doc_ref.id} was modified concurrently")
+
+        return self.fan
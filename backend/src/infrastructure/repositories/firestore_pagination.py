@@ -0,0 +1,20 @@
+from typing import Iterator, List, Optional, Sequence
+
+
+def scan_pages(collection, fields: Sequence[str], page_size: int, start_after: Optional[str] = None) -> Iterator[List]:
+    """
+    Walk a collection in pages ordered by document id, reading only `fields`.
+
+    Each page starts after the last id of the previous one, so a scan can be
+    resumed from any id.
+    """
+    query = collection.select(list(fields)).order_by('__name__').limit(page_size)
+    while True:
+        page_query = query.start_after({'__name__': start_after}) if start_after else query
+        snapshots = list(page_query.stream())
+        if not snapshots:
+            return
+        yield snapshots
+        if len(snapshots) < page_size:
+            return
+        start_after = snapshots[-1].id
@@ -0,0 +1,131 @@
+"""
+Gasto por dia, mês e total em contadores no Firestore (ver
+`domain.rules.spend_buckets`).
+
+Cada balde é um documento pequeno da coleção `spend_rollups` com o valor e o
+número de compras, somados com `Increment` na mesma WriteBatch que grava a
+compra. O id é `{escopo}:{período}` (`fan:{uid}:2024-05`, `global:all`), então a
+série de um fã é um único `get_all` de ids conhecidos: 12 documentos para o
+último ano.
+
+Os baldes da base inteira recebem todas as compras e por isso são
+fragmentados: enquanto o período está aberto (o dia e o mês correntes e o
+total), cada escrita vai para um fragmento sorteado (`{id}:{n}`). Compras com
+data em um período já fechado vão sempre para o fragmento 0. A série da base
+é uma consulta pelos períodos pedidos, que lê só os fragmentos existentes; a
+compactação (`src/jobs/compact_spend_rollups.py`) junta os fragmentos de
+cada período fechado no fragmento 0, e daí em diante o período custa uma
+leitura. Os baldes de um fã não são fragmentados: as compras de um fã não
+disputam o mesmo documento.
+"""
+import os
+import random
+from itertools import chain
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from src.domain.repositories.spend_rollup_repository import SpendRollupRepository
+from src.domain.rules import spend_buckets
+from src.infrastructure.config.firebase import get_firestore
+
+SPEND_ROLLUPS_COLLECTION = 'spend_rollups'
+SPEND_ROLLUP_SHARDS = int(os.getenv('SPEND_ROLLUP_SHARDS', '10'))
+
+GLOBAL_SCOPE = 'global'
+
+IN_LIMIT = 30  # valores por filtro `in` do Firestore
+
+
+def fan_scope(fan_id: str) -> str:
+    return f'fan:{fan_id}'
+
+
+def bucket_id(scope: str, period: str, shard: int = 0) -> str:
+    return f'{scope}:{period}' if shard == 0 else f'{scope}:{period}:{shard}'
+
+
+class FirestoreSpendRollupRepository(SpendRollupRepository):
+    def __init__(self, db=None, shards: int = SPEND_ROLLUP_SHARDS, clock: Callable[[], datetime] = datetime.now):
+        self.db = db or get_firestore()
+        self.collection = self.db.collection(SPEND_ROLLUPS_COLLECTION)
+        self.shards = max(1, shards)
+        self.clock = clock
+
+    def _ref(self, scope: str, period: str, shard: int = 0):
+        return self.collection.document(bucket_id(scope, period, shard))
+
+    def stage(self, writer, fan_id: str, purchases: Iterable[Tuple[float, datetime]]) -> None:
+        """Add purchases (amount, date) to a WriteBatch or Transaction, one write per touched bucket"""
+        from google.cloud.firestore_v1 import Increment
+
+        now = self.clock()
+        for (granularity, period), (amount, count) in spend_buckets.aggregate(purchases).items():
+            for scope in (fan_scope(fan_id), GLOBAL_SCOPE):
+                shard = 0
+                if scope == GLOBAL_SCOPE and spend_buckets.is_open(granularity, period, now):
+                    shard = random.randrange(self.shards)
+                writer.set(self._ref(scope, period, shard), {
+                    'scope': scope, 'granularity': granularity, 'period': period, 'shard': shard,
+                    'amount': Increment(amount), 'count': Increment(count),
+                }, merge=True)
+
+    def record(self, fan_id: str, amount: float, when: datetime) -> None:
+        batch = self.db.batch()
+        self.stage(batch, fan_id, [(amount, when)])
+        batch.commit()
+
+    def series(self, granularity: str, periods: Sequence[str], fan_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        if fan_id:
+            snapshots = self.db.get_all([self._ref(fan_scope(fan_id), period) for period in periods])
+        else:
+            # Uma consulta traz só os fragmentos que existem: um documento por
+            # período compactado, até `shards` nos abertos
+            from google.cloud.firestore_v1.base_query import FieldFilter
+
+            scoped = self.collection.where(filter=FieldFilter('scope', '==', GLOBAL_SCOPE))
+            snapshots = chain.from_iterable(
+                scoped.where(filter=FieldFilter('period', 'in', list(periods[start:start + IN_LIMIT]))).stream()
+                for start in range(0, len(periods), IN_LIMIT)
+            )
+
+        totals = {period: [0.0, 0] for period in periods}
+        for snapshot in snapshots:
+            data = snapshot.to_dict() if snapshot.exists else None
+            if data and data.get('period') in totals:
+                totals[data['period']][0] += data.get('amount', 0.0)
+                totals[data['period']][1] += data.get('count', 0)
+
+        return [{'period': period, 'amount': round(totals[period][0], 2), 'count': totals[period][1]}
+                for period in periods]
+
+    def sharded_periods(self) -> Set[Tuple[str, str]]:
+        """(granularity, period) of global buckets that still have shards besides shard 0"""
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (self.collection.where(filter=FieldFilter('scope', '==', GLOBAL_SCOPE))
+                 .where(filter=FieldFilter('shard', '>', 0))
+                 .select(['granularity', 'period']))
+        return {(snapshot.get('granularity'), snapshot.get('period')) for snapshot in query.stream()}
+
+    def merge_shards(self, granularity: str, period: str) -> None:
+        """Fold every shard of a closed global bucket into shard 0, in one transaction"""
+        from firebase_admin import firestore
+
+        refs = [self._ref(GLOBAL_SCOPE, period, shard) for shard in range(self.shards)]
+
+        @firestore.transactional
+        def apply(transaction):
+            amount, count = 0.0, 0
+            for snapshot in transaction.get_all(refs):
+                if snapshot.exists:
+                    data = snapshot.to_dict()
+                    amount += data.get('amount', 0.0)
+                    count += data.get('count', 0)
+            transaction.set(refs[0], {
+                'scope': GLOBAL_SCOPE, 'granularity': granularity, 'period': period, 'shard': 0,
+                'amount': amount, 'count': count,
+            })
+            for ref in refs[1:]:
+                transaction.delete(ref)
+
+        apply(self.db.transaction())
@@ -0,0 +1,42 @@
+"""
+Cursores opacos de paginação, usados pelos repositórios do Firestore e do
+SQLite.
+
+O cursor codifica o campo de ordenação, o valor desse campo no último item da
+página e o id do item, em JSON dentro de base64 sem padding. Datas viajam
+como ISO 8601.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+from src.infrastructure.repositories.fan_codec import to_datetime
+
+
+def encode_cursor(order_field: str, value: Any, doc_id: str) -> str:
+    value = to_datetime(value)
+    if isinstance(value, datetime):
+        value = {'$t': value.isoformat()}
+    payload = json.dumps({'f': order_field, 'v': value, 'id': doc_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token: str, order_field: str) -> Dict[str, Any]:
+    """Cursor token to a start_after() mapping for a query ordered by `order_field`"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        field, value, doc_id = payload['f'], payload['v'], payload['id']
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if field != order_field or not isinstance(doc_id, str):
+        # Cursor de uma consulta com outra ordenação
+        raise ValueError("Cursor does not match these filters")
+    if isinstance(value, dict) and '$t' in value:
+        value = datetime.fromisoformat(value['$t'])
+
+    cursor = {'__name__': doc_id}
+    if field != '__name__':
+        cursor[field] = value
+    return cursor
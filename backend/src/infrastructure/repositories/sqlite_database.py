@@ -0,0 +1,76 @@
+"""
+Conexões SQLite dos repositórios locais (desenvolvimento, CI e projeções de
+leitura para análises pesadas, fora do Firestore).
+
+O banco roda em WAL: leitores não bloqueiam o escritor nem o contrário, então
+as threads do app leem em paralelo enquanto uma delas grava. Cada thread usa
+a própria conexão, e cada conexão guarda os comandos já compilados pelo texto
+do SQL (`cached_statements`). Os repositórios usam SQL constante com
+parâmetros `?`, então cada comando é preparado uma vez por conexão e depois
+só reexecutado. Escritas que leem antes de gravar usam `transaction()`, que
+abre com `BEGIN IMMEDIATE` e já reserva o lock de escrita.
+
+Use um arquivo: com `:memory:` cada thread veria um banco vazio diferente.
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, List
+
+DEFAULT_PATH = os.getenv('SQLITE_PATH', 'know_your_fan.sqlite3')
+
+
+class SqliteDatabase:
+    def __init__(self, path: str = DEFAULT_PATH, busy_timeout: float = 5.0, cached_statements: int = 256):
+        self.path = str(path)
+        self.busy_timeout = busy_timeout
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened and configured on first use"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # isolation_level=None: sem transações implícitas, só as abertas por transaction()
+            connection = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                                         check_same_thread=False, cached_statements=self.cached_statements)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute('PRAGMA foreign_keys=ON')
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, parameters)
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Write transaction on this thread's connection; nested calls join the outer one"""
+        connection = self.connection()
+        if connection.in_transaction:
+            yield connection
+            return
+
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def ensure_schema(self, script: str) -> None:
+        """Run idempotent DDL (CREATE ... IF NOT EXISTS)"""
+        self.connection().executescript(script)
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
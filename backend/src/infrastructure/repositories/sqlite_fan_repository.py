@@ -0,0 +1,386 @@
+"""
+`FanRepository` sobre SQLite (ver `sqlite_database`).
+
+Uma linha por fã, com a chave primária no `user_id` (o mesmo id do documento
+no Firestore). Campos escalares viram colunas; os aninhados (endereço,
+documentos, redes sociais, listas de interesses...) ficam em colunas JSON,
+no mesmo formato que o `fan_codec` grava no Firestore: jogos e times como ids
+do catálogo, datas em ISO 8601. Há índices em e-mail, no hash do CPF (o CPF
+não é indexado em claro) e em `updated_at`, para leituras incrementais das
+projeções. Compras e interesses em eventos ficam nas tabelas `fan_purchases`
+e `fan_events`, uma linha por registro, como as subcoleções do Firestore.
+
+Toda escrita passa por um `Fan` válido, então as leituras usam o caminho
+rápido do codec, sem revalidar. A coluna `version` cresce a cada escrita e
+faz o papel do `update_time` do Firestore na unidade de trabalho. Os
+agregados de `fan_stats` não são mantidos aqui: sobre o SQLite as contagens
+saem direto de uma consulta.
+"""
+import hashlib
+import json
+import sqlite3
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+from src.domain.catalog.interest_catalog import encode_fields
+from src.domain.entities.fan import Fan, Document, EventInterest, Purchase
+from src.domain.repositories.fan_repository import FanRepository, FanUnitOfWork, ConcurrentUpdateError
+from src.infrastructure.repositories import fan_codec
+from src.infrastructure.repositories.fan_timeline import RECORDED_AT
+from src.infrastructure.repositories.page_cursor import encode_cursor, decode_cursor
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+
+M = TypeVar('M', bound=BaseModel)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fans (
+    user_id TEXT PRIMARY KEY,
+    name TEXT,
+    email TEXT NOT NULL,
+    phone TEXT,
+    birth_date TEXT,
+    address TEXT,
+    cpf TEXT,
+    cpf_hash TEXT,
+    favorite_games TEXT,
+    favorite_teams TEXT,
+    recent_events TEXT,
+    documents TEXT,
+    social_media TEXT,
+    esports_profiles TEXT,
+    event_interests TEXT,
+    purchases TEXT,
+    purchase_count INTEGER NOT NULL DEFAULT 0,
+    total_spent REAL NOT NULL DEFAULT 0,
+    event_count INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    profile_completeness INTEGER NOT NULL DEFAULT 0,
+    completeness_contributions TEXT,
+    profile_image_base64 TEXT,
+    profile_image_url TEXT,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS fans_email ON fans (email);
+CREATE INDEX IF NOT EXISTS fans_cpf_hash ON fans (cpf_hash);
+CREATE INDEX IF NOT EXISTS fans_updated_at ON fans (updated_at);
+CREATE TABLE IF NOT EXISTS fan_purchases (
+    fan_id TEXT NOT NULL REFERENCES fans (user_id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (fan_id, id)
+);
+CREATE INDEX IF NOT EXISTS fan_purchases_timeline ON fan_purchases (fan_id, recorded_at, id);
+CREATE TABLE IF NOT EXISTS fan_events (
+    fan_id TEXT NOT NULL REFERENCES fans (user_id) ON DELETE CASCADE,
+    id TEXT NOT NULL,
+    recorded_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (fan_id, id)
+);
+CREATE INDEX IF NOT EXISTS fan_events_timeline ON fan_events (fan_id, recorded_at, id);
+"""
+
+# Campos do Fan na ordem das colunas dos SELECTs (o id é o próprio user_id)
+FIELDS: Tuple[str, ...] = tuple(name for name in Fan.model_fields if name != 'id')
+
+JSON_FIELDS = frozenset({
+    'address', 'favorite_games', 'favorite_teams', 'recent_events', 'documents', 'social_media',
+    'esports_profiles', 'event_interests', 'purchases', 'completeness_contributions',
+})
+
+_COLUMNS = FIELDS + ('cpf_hash',)
+_SELECT = f"SELECT {', '.join(FIELDS)} FROM fans"
+_SELECT_ONE = f"{_SELECT} WHERE user_id = ?"
+_SELECT_BY_EMAIL = f"{_SELECT} WHERE email = ?"
+_SELECT_BY_CPF_HASH = f"{_SELECT} WHERE cpf_hash = ?"
+_SELECT_VERSIONED = f"SELECT {', '.join(FIELDS)}, version FROM fans WHERE user_id = ?"
+# Uma lista de ids em JSON mantém o texto do comando constante (e preparado) para qualquer tamanho
+_SELECT_MANY = f"{_SELECT} WHERE user_id IN (SELECT value FROM json_each(?))"
+_INSERT = f"INSERT INTO fans ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' for _ in _COLUMNS)})"
+_UPSERT = (
+    f"{_INSERT} "
+    f"ON CONFLICT (user_id) DO UPDATE SET "
+    f"{', '.join(f'{name} = excluded.{name}' for name in _COLUMNS if name != 'user_id')}, "
+    f"version = fans.version + 1"
+)
+
+
+def cpf_hash(cpf: Optional[str]) -> Optional[str]:
+    """SHA-256 of the CPF digits, used to look fans up without indexing the CPF itself"""
+    digits = ''.join(ch for ch in cpf or '' if ch.isdigit())
+    return hashlib.sha256(digits.encode('ascii')).hexdigest() if digits else None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, default=_json_default, ensure_ascii=False, separators=(',', ':'))
+
+
+def _column(name: str, value):
+    if value is None:
+        return None
+    if name in JSON_FIELDS:
+        return _dumps(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _columns(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Stored fan fields (as produced by fan_codec.encode) to column values"""
+    values = {name: _column(name, value) for name, value in data.items() if name in FIELDS}
+    if 'cpf' in values:
+        values['cpf_hash'] = cpf_hash(values['cpf'])
+    return values
+
+
+def _decode(row) -> Fan:
+    data = {fan_codec.SCHEMA_VERSION_FIELD: fan_codec.SCHEMA_VERSION}
+    for name, value in zip(FIELDS, row):
+        if value is not None:
+            data[name] = json.loads(value) if name in JSON_FIELDS else value
+    return fan_codec.decode(data['user_id'], data)
+
+
+def _row(fan: Fan) -> Tuple:
+    values = _columns(fan_codec.encode(fan))
+    return tuple(values.get(name) for name in _COLUMNS)
+
+
+@lru_cache(maxsize=None)
+def _update_statement(names: Tuple[str, ...], versioned: bool) -> str:
+    assignments = ', '.join(f'{name} = ?' for name in names)
+    condition = 'user_id = ? AND version = ?' if versioned else 'user_id = ?'
+    return f"UPDATE fans SET {assignments}, version = version + 1 WHERE {condition}"
+
+
+@lru_cache(maxsize=None)
+def _append_statement(field: str, counters: Tuple[str, ...]) -> str:
+    # json_insert com '$[#]' acrescenta ao fim do array sem ler a linha no Python
+    assignments = [f"{field} = json_insert(coalesce({field}, '[]'), '$[#]', json(?))"]
+    assignments += [f'{counter} = {counter} + ?' for counter in counters]
+    return f"UPDATE fans SET {', '.join(assignments)}, updated_at = ?, version = version + 1 WHERE user_id = ?"
+
+
+@lru_cache(maxsize=None)
+def _counters_statement(counters: Tuple[str, ...]) -> str:
+    assignments = ''.join(f'{counter} = {counter} + ?, ' for counter in counters)
+    return f"UPDATE fans SET {assignments}updated_at = ?, version = version + 1 WHERE user_id = ?"
+
+
+@lru_cache(maxsize=None)
+def _timeline_statement(table: str, after: bool) -> str:
+    condition = 'fan_id = ? AND (recorded_at, id) < (?, ?)' if after else 'fan_id = ?'
+    return f"SELECT id, recorded_at, data FROM {table} WHERE {condition} ORDER BY recorded_at DESC, id DESC LIMIT ?"
+
+
+def _timeline_key(value: datetime) -> str:
+    """Sortable text for recorded_at: naive local time with fixed-width microseconds"""
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value.isoformat(timespec='microseconds')
+
+
+def _update(connection, fan_id: str, fields: Dict[str, Any], version: Optional[int] = None) -> bool:
+    """Write the given stored fields; False if the fan is missing (or at another version)"""
+    values = _columns(fields)
+    names = tuple(sorted(values))
+    parameters = [values[name] for name in names] + [fan_id]
+    if version is not None:
+        parameters.append(version)
+    cursor = connection.execute(_update_statement(names, version is not None), parameters)
+    return cursor.rowcount == 1
+
+
+def _stored(fan: Fan, names: Iterable[str]) -> Dict[str, Any]:
+    """Encode the named fields, writing NULL for the ones that became None"""
+    names = list(names)
+    return {**dict.fromkeys(names), **fan_codec.encode(fan, fields=names)}
+
+
+class SqliteFanUnitOfWork(FanUnitOfWork):
+    """
+    Unit of work over one fan row.
+
+    On commit, writes only the fields that changed, conditioned on the row
+    still being at the version that was read.
+    """
+
+    def __init__(self, db: SqliteDatabase, fan: Fan, version: int):
+        self.db = db
+        self.fan = fan
+        self._version = version
+        self._loaded = self._fields(fan)
+        self._committed = False
+
+    @staticmethod
+    def _fields(fan: Fan) -> Dict[str, Any]:
+        return fan.model_dump(exclude={'id'})
+
+    def changes(self) -> List[str]:
+        current = self._fields(self.fan)
+        return [name for name, value in current.items() if value != self._loaded.get(name)]
+
+    def commit(self) -> Fan:
+        if self._committed:
+            raise RuntimeError("Unit of work already committed")
+        self._committed = True
+
+        changed = self.changes()
+        if not changed:
+            return self.fan
+
+        self.fan.updated_at = datetime.now()
+        fields = _stored(self.fan, changed + ['updated_at'])
+        if not _update(self.db.connection(), self.fan.user_id, fields, version=self._version):
+            raise ConcurrentUpdateError(f"Fan {self.fan.user_id} was modified concurrently")
+        return self.fan
+
+
+class SqliteFanRepository(FanRepository):
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or SqliteDatabase()
+        self.db.ensure_schema(SCHEMA)
+
+    def create(self, fan: Fan) -> Fan:
+        fan.created_at = datetime.now()
+        fan.id = fan.user_id
+        try:
+            self.db.execute(_INSERT, _row(fan))
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Fan profile already exists: {fan.user_id}")
+        return fan
+
+    def save_many(self, fans: Iterable[Fan]) -> int:
+        """Insert or replace fans as they are, in one transaction (projection loads)"""
+        rows = [_row(fan) for fan in fans]
+        with self.db.transaction() as connection:
+            connection.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def find_by_id(self, fan_id: str) -> Optional[Fan]:
+        return self.find_by_user_id(fan_id)
+
+    def find_by_user_id(self, user_id: str) -> Optional[Fan]:
+        row = self.db.execute(_SELECT_ONE, (user_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def find_many(self, fan_ids: List[str]) -> List[Fan]:
+        rows = self.db.execute(_SELECT_MANY, (json.dumps(list(fan_ids)),)).fetchall()
+        by_id = {row[0]: row for row in rows}
+        return [_decode(by_id[fan_id]) for fan_id in fan_ids if fan_id in by_id]
+
+    def find_by_email(self, email: str) -> List[Fan]:
+        return [_decode(row) for row in self.db.execute(_SELECT_BY_EMAIL, (email,))]
+
+    def find_by_cpf(self, cpf: str) -> List[Fan]:
+        digest = cpf_hash(cpf)
+        if digest is None:
+            return []
+        return [_decode(row) for row in self.db.execute(_SELECT_BY_CPF_HASH, (digest,))]
+
+    def update(self, fan: Fan) -> Fan:
+        fan.updated_at = datetime.now()
+        if not _update(self.db.connection(), fan.user_id, _stored(fan, FIELDS)):
+            raise ValueError(f"Fan profile not found: {fan.user_id}")
+        fan.id = fan.user_id
+        return fan
+
+    def update_profile(self, user_id: str, profile_data: Dict[str, Any]) -> Fan:
+        profile_data = encode_fields(dict(profile_data))
+        with self.db.transaction() as connection:
+            row = connection.execute(_SELECT_ONE, (user_id,)).fetchone()
+            if row is not None:
+                fan_data = fan_codec.encode(_decode(row))
+                address = profile_data.pop('address', None)
+                if address is not None:
+                    fan_data['address'] = {**(fan_data.get('address') or {}), **address}
+                fan_data.update(profile_data)
+                fan_data['updated_at'] = datetime.now()
+            else:
+                fan_data = {'user_id': user_id, 'created_at': datetime.now(), 'updated_at': datetime.now(),
+                            **profile_data}
+
+            # Dados vindos do cliente: validados antes de gravar, não na leitura
+            fan = fan_codec.validate(fan_data)
+            fan.id = user_id
+            connection.execute(_UPSERT, _row(fan))
+        return fan
+
+    def unit_of_work(self, fan_id: str) -> FanUnitOfWork:
+        row = self.db.execute(_SELECT_VERSIONED, (fan_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Fan profile not found: {fan_id}")
+        return SqliteFanUnitOfWork(self.db, _decode(row[:-1]), version=row[-1])
+
+    def update_fields(self, fan_id: str, fields: Dict[str, Any]) -> None:
+        if not _update(self.db.connection(), fan_id, {**fields, 'updated_at': datetime.now()}):
+            raise ValueError(f"Fan profile not found: {fan_id}")
+
+    def _append(self, fan_id: str, field: str, item: BaseModel, increments: Dict[str, float] = None) -> None:
+        """Append one item to a JSON array column with a single statement (no read)"""
+        increments = increments or {}
+        statement = _append_statement(field, tuple(increments))
+        parameters = [_dumps(item.model_dump(exclude_none=True)), *increments.values(), datetime.now().isoformat(), fan_id]
+        if self.db.execute(statement, parameters).rowcount != 1:
+            raise ValueError(f"Fan profile not found: {fan_id}")
+
+    def add_document(self, fan_id: str, document: Document) -> None:
+        self._append(fan_id, 'documents', document)
+
+    def _record(self, fan_id: str, table: str, entry_id: str, item: BaseModel, recorded_at: datetime,
+                increments: Dict[str, float]) -> None:
+        """Insert one timeline row and bump the fan's counters in one transaction (no read)"""
+        with self.db.transaction() as connection:
+            parameters = [*increments.values(), datetime.now().isoformat(), fan_id]
+            if connection.execute(_counters_statement(tuple(increments)), parameters).rowcount != 1:
+                raise ValueError(f"Fan profile not found: {fan_id}")
+            try:
+                connection.execute(f"INSERT INTO {table} (fan_id, id, recorded_at, data) VALUES (?, ?, ?, ?)",
+                                   (fan_id, entry_id, _timeline_key(recorded_at),
+                                    _dumps(item.model_dump(exclude_none=True))))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"Entry {entry_id} already recorded for fan {fan_id}")
+
+    def _timeline(self, fan_id: str, table: str, model: Type[M], limit: int,
+                  cursor: Optional[str]) -> Tuple[List[M], Optional[str]]:
+        """One page of a timeline table, newest first, plus the next cursor"""
+        if cursor:
+            after = decode_cursor(cursor, RECORDED_AT)
+            rows = self.db.execute(_timeline_statement(table, True),
+                                   (fan_id, _timeline_key(after[RECORDED_AT]), after['__name__'], limit + 1))
+        else:
+            rows = self.db.execute(_timeline_statement(table, False), (fan_id, limit + 1))
+        rows = rows.fetchall()
+
+        items = [model(**json.loads(data)) for _, _, data in rows[:limit]]
+        if len(rows) <= limit:
+            return items, None
+        entry_id, recorded_at, _ = rows[limit - 1]
+        return items, encode_cursor(RECORDED_AT, datetime.fromisoformat(recorded_at), entry_id)
+
+    def add_event_interest(self, fan_id: str, event_interest: EventInterest) -> None:
+        self._record(fan_id, 'fan_events', uuid.uuid4().hex, event_interest, datetime.now(), {'event_count': 1})
+
+    def add_purchase(self, fan_id: str, purchase: Purchase) -> None:
+        self._record(fan_id, 'fan_purchases', purchase.id, purchase, purchase.purchase_date,
+                     {'purchase_count': 1, 'total_spent': purchase.amount})
+
+    def list_purchases(self, fan_id: str, limit: int = 20,
+                       cursor: Optional[str] = None) -> Tuple[List[Purchase], Optional[str]]:
+        return self._timeline(fan_id, 'fan_purchases', Purchase, limit, cursor)
+
+    def list_event_interests(self, fan_id: str, limit: int = 20,
+                             cursor: Optional[str] = None) -> Tuple[List[EventInterest], Optional[str]]:
+        return self._timeline(fan_id, 'fan_events', EventInterest, limit, cursor)
@@ -0,0 +1,165 @@
+"""
+Fila de jobs em segundo plano sobre SQLite (ver `sqlite_database`).
+
+Um worker reserva o próximo job pronto (`queued` com `run_after` vencido) em
+uma transação `BEGIN IMMEDIATE`, então dois workers nunca pegam o mesmo job.
+A reserva tem prazo (`locked_until`): se o worker morrer no meio, o job volta
+a ficar disponível quando o prazo vence e a tentativa conta como falha. Jobs
+sem tentativas restantes ficam com status `dead` (a lista de dead letters)
+até alguém os recolocar na fila com `retry`. A entrega é "pelo menos uma
+vez": um job cujo prazo venceu pode rodar de novo, então os handlers precisam
+ser idempotentes. Concluir ou falhar exige a reserva vigente (`locked_by` do
+worker e status `running`): o resultado de um worker que perdeu a reserva para
+outro é descartado.
+
+Horários são gravados em segundos desde a época, lidos de `clock`.
+"""
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.domain.entities.job import Job, QUEUED, RUNNING, SUCCEEDED, DEAD
+from src.domain.repositories.job_queue import JobQueue
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_after REAL NOT NULL,
+    locked_by TEXT,
+    locked_until REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, run_after);
+"""
+
+_FIELDS = ('id', 'type', 'payload', 'status', 'attempts', 'max_attempts', 'run_after', 'last_error',
+           'created_at', 'updated_at', 'finished_at')
+_SELECT = f"SELECT {', '.join(_FIELDS)} FROM jobs"
+_SELECT_ONE = f"{_SELECT} WHERE id = ?"
+_SELECT_DEAD = f"{_SELECT} WHERE status = '{DEAD}' ORDER BY finished_at DESC LIMIT ?"
+_INSERT = (
+    "INSERT INTO jobs (id, type, payload, status, attempts, max_attempts, run_after, created_at, updated_at) "
+    f"VALUES (?, ?, ?, '{QUEUED}', 0, ?, ?, ?, ?)"
+)
+# Só o dono da reserva vigente conclui ou falha o job
+_LEASED = f"WHERE id = ? AND locked_by = ? AND status = '{RUNNING}'"
+# Prontos: na fila e vencidos, ou reservados por um worker cujo prazo acabou
+_SELECT_READY = (
+    "SELECT id, status, attempts, max_attempts FROM jobs "
+    "WHERE type IN (SELECT value FROM json_each(?)) "
+    f"AND ((status = '{QUEUED}' AND run_after <= ?) OR (status = '{RUNNING}' AND locked_until <= ?)) "
+    "ORDER BY run_after LIMIT 1"
+)
+_CLAIM = (
+    f"UPDATE jobs SET status = '{RUNNING}', attempts = attempts + 1, locked_by = ?, locked_until = ?, "
+    "updated_at = ? WHERE id = ?"
+)
+_COMPLETE = (
+    f"UPDATE jobs SET status = '{SUCCEEDED}', locked_by = NULL, locked_until = NULL, updated_at = ?, "
+    f"finished_at = ? {_LEASED}"
+)
+_REQUEUE = (
+    f"UPDATE jobs SET status = '{QUEUED}', run_after = ?, last_error = ?, locked_by = NULL, "
+    f"locked_until = NULL, updated_at = ? {_LEASED}"
+)
+_BURY_SET = (
+    f"UPDATE jobs SET status = '{DEAD}', last_error = ?, locked_by = NULL, locked_until = NULL, "
+    "updated_at = ?, finished_at = ?"
+)
+_BURY = f"{_BURY_SET} {_LEASED}"
+_BURY_EXPIRED = f"{_BURY_SET} WHERE id = ?"
+_RETRY = (
+    f"UPDATE jobs SET status = '{QUEUED}', attempts = 0, run_after = ?, updated_at = ?, finished_at = NULL "
+    f"WHERE id = ? AND status = '{DEAD}'"
+)
+
+
+def _datetime(value: Optional[float]) -> Optional[datetime]:
+    return datetime.fromtimestamp(value) if value is not None else None
+
+
+def _decode(row) -> Job:
+    data = dict(zip(_FIELDS, row))
+    data['payload'] = json.loads(data['payload'])
+    for name in ('run_after', 'created_at', 'updated_at', 'finished_at'):
+        data[name] = _datetime(data[name])
+    return Job(**data)
+
+
+class SqliteJobQueue(JobQueue):
+    def __init__(self, db: Optional[SqliteDatabase] = None, clock: Callable[[], float] = time.time):
+        self.db = db or SqliteDatabase()
+        self.clock = clock
+        self.db.ensure_schema(SCHEMA)
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any], max_attempts: int = 5, delay: float = 0.0) -> Job:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        job_id = uuid.uuid4().hex
+        now = self.clock()
+        self.db.execute(_INSERT, (job_id, job_type, json.dumps(payload), max_attempts, now + delay, now, now))
+        return self.get(job_id)
+
+    def claim(self, job_types: Iterable[str], worker_id: str, lease_seconds: float) -> Optional[Job]:
+        types = json.dumps(list(job_types))
+        with self.db.transaction() as connection:
+            while True:
+                now = self.clock()
+                row = connection.execute(_SELECT_READY, (types, now, now)).fetchone()
+                if row is None:
+                    return None
+                job_id, status, attempts, max_attempts = row
+                if status == RUNNING and attempts >= max_attempts:
+                    # O worker da última tentativa sumiu sem concluir nem falhar
+                    connection.execute(_BURY_EXPIRED, ("Lease expired on the last attempt", now, now, job_id))
+                    continue
+                connection.execute(_CLAIM, (worker_id, now + lease_seconds, now, job_id))
+                return _decode(connection.execute(_SELECT_ONE, (job_id,)).fetchone())
+
+    def complete(self, job_id: str, worker_id: str) -> bool:
+        now = self.clock()
+        return self.db.execute(_COMPLETE, (now, now, job_id, worker_id)).rowcount > 0
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay: float) -> Optional[Job]:
+        with self.db.transaction() as connection:
+            job = self._get(connection, job_id)
+            now = self.clock()
+            if job.attempts >= job.max_attempts:
+                cursor = connection.execute(_BURY, (error, now, now, job_id, worker_id))
+            else:
+                cursor = connection.execute(_REQUEUE, (now + retry_delay, error, now, job_id, worker_id))
+            return self._get(connection, job_id) if cursor.rowcount else None
+
+    @staticmethod
+    def _get(connection, job_id: str) -> Job:
+        row = connection.execute(_SELECT_ONE, (job_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Job not found: {job_id}")
+        return _decode(row)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        row = self.db.execute(_SELECT_ONE, (job_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def dead_letters(self, limit: int = 100) -> List[Job]:
+        return [_decode(row) for row in self.db.execute(_SELECT_DEAD, (limit,))]
+
+    def retry(self, job_id: str) -> Job:
+        now = self.clock()
+        if self.db.execute(_RETRY, (now, now, job_id)).rowcount == 0:
+            raise ValueError(f"Job {job_id} is not in the dead-letter list")
+        return self.get(job_id)
+
+    def counts(self) -> Dict[str, int]:
+        return dict(self.db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
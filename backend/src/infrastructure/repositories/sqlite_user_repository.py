@@ -0,0 +1,103 @@
+"""
+`UserRepository` sobre SQLite (ver `sqlite_database`), com índice único no
+e-mail (sem diferenciar maiúsculas) e índice em (`created_at`, id) para a
+paginação por cursor.
+"""
+import sqlite3
+import uuid
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from src.domain.entities.user import User
+from src.domain.repositories.user_repository import UserRepository
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL,
+    password TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS users_created_at ON users (created_at, id);
+"""
+
+_SELECT = "SELECT id, name, email, password, created_at, updated_at FROM users"
+_SELECT_ONE = f"{_SELECT} WHERE id = ?"
+_SELECT_BY_EMAIL = f"{_SELECT} WHERE email = ? COLLATE NOCASE"
+_SELECT_ALL = f"{_SELECT} ORDER BY created_at, id"
+_SELECT_PAGE = f"{_SELECT} ORDER BY created_at, id LIMIT ?"
+_SELECT_PAGE_AFTER = f"{_SELECT} WHERE (created_at, id) > (?, ?) ORDER BY created_at, id LIMIT ?"
+_INSERT = (
+    "INSERT INTO users (id, name, email, password, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET name = excluded.name, email = excluded.email, password = excluded.password, "
+    "created_at = excluded.created_at, updated_at = excluded.updated_at"
+)
+_UPDATE = "UPDATE users SET name = ?, email = ?, password = ?, updated_at = ? WHERE id = ?"
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _decode(row) -> User:
+    user_id, name, email, password, created_at, updated_at = row
+    return User.model_construct(
+        id=user_id, name=name, email=email, password=password,
+        created_at=datetime.fromisoformat(created_at),
+        updated_at=datetime.fromisoformat(updated_at) if updated_at else None,
+    )
+
+
+class SqliteUserRepository(UserRepository):
+    def __init__(self, db: Optional[SqliteDatabase] = None):
+        self.db = db or SqliteDatabase()
+        self.db.ensure_schema(SCHEMA)
+
+    def _write(self, sql: str, parameters, email: str) -> sqlite3.Cursor:
+        try:
+            return self.db.execute(sql, parameters)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Email already in use: {email}")
+
+    def create(self, user: User) -> User:
+        if not user.id:
+            user.id = str(uuid.uuid4())
+
+        user.created_at = datetime.now()
+        self._write(_INSERT, (user.id, user.name, user.email, user.password,
+                              user.created_at.isoformat(), _isoformat(user.updated_at)), user.email)
+        return user
+
+    def find_by_id(self, user_id: str) -> Optional[User]:
+        row = self.db.execute(_SELECT_ONE, (user_id,)).fetchone()
+        return _decode(row) if row else None
+
+    def find_by_email(self, email: str) -> Optional[User]:
+        row = self.db.execute(_SELECT_BY_EMAIL, (email.strip(),)).fetchone()
+        return _decode(row) if row else None
+
+    def find_all(self) -> List[User]:
+        return [_decode(row) for row in self.db.execute(_SELECT_ALL)]
+
+    def find_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[User]:
+        if after is None:
+            rows = self.db.execute(_SELECT_PAGE, (limit,))
+        else:
+            rows = self.db.execute(_SELECT_PAGE_AFTER, (after[0].isoformat(), after[1], limit))
+        return [_decode(row) for row in rows]
+
+    def update(self, user: User) -> User:
+        updated_at = datetime.now()
+        cursor = self._write(_UPDATE, (user.name, user.email, user.password, updated_at.isoformat(), user.id),
+                             user.email)
+        if cursor.rowcount == 0:
+            raise ValueError(f"User with id {user.id} not found")
+        user.updated_at = updated_at
+        return user
+
+    def delete(self, user_id: str) -> bool:
+        return self.db.execute("DELETE FROM users WHERE id = ?", (user_id,)).rowcount > 0
@@ -1,40 +1,157 @@
-from typing import List, Optional, Dict
+"""
+Repositório de usuários em memória, seguro para o Gunicorn em modo threaded.
+
+Leituras concorrentes compartilham um lock de leitura; escritas são
+exclusivas. Os usuários ficam em registros com `__slots__` (bem menores que
+um modelo pydantic) e viram `User` só na saída, então quem recebe um usuário
+não altera o repositório sem passar por `update`. Há um índice único por
+e-mail (sem diferenciar maiúsculas) e uma lista ordenada por
+(`created_at`, id), que dá a ordem de `find_all` e os cursores de `find_page`.
+"""
+import threading
 import uuid
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from src.domain.entities.user import User
 from src.domain.repositories.user_repository import UserRepository
 
 
+class ReadWriteLock:
+    """Many readers or one writer; a waiting writer holds back new readers"""
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class _UserRecord:
+    __slots__ = ('id', 'name', 'email', 'password', 'created_at', 'updated_at')
+
+    def __init__(self, user: User, created_at: datetime):
+        self.id = user.id
+        self.name = user.name
+        self.email = user.email
+        self.password = user.password
+        self.created_at = created_at
+        self.updated_at = user.updated_at
+
+    def to_user(self) -> User:
+        return User.model_construct(id=self.id, name=self.name, email=self.email, password=self.password,
+                                    created_at=self.created_at, updated_at=self.updated_at)
+
+
+def _email_key(email: str) -> str:
+    return email.strip().lower()
+
+
 class InMemoryUserRepository(UserRepository):
     def __init__(self):
-        self.users: Dict[str, User] = {}
+        self._lock = ReadWriteLock()
+        self._records: Dict[str, _UserRecord] = {}
+        self._by_email: Dict[str, str] = {}
+        self._order: List[Tuple[datetime, str]] = []
+
+    def _check_email(self, email: str, user_id: str) -> str:
+        key = _email_key(email)
+        owner = self._by_email.get(key)
+        if owner is not None and owner != user_id:
+            raise ValueError(f"Email already in use: {email}")
+        return key
+
+    def _remove(self, record: _UserRecord) -> None:
+        del self._records[record.id]
+        del self._by_email[_email_key(record.email)]
+        position = bisect_left(self._order, (record.created_at, record.id))
+        del self._order[position]
 
     def create(self, user: User) -> User:
-        if not user.id:
-            user.id = str(uuid.uuid4())
-        
-        user.created_at = datetime.now()
-        self.users[user.id] = user
+        with self._lock.write():
+            if not user.id:
+                user.id = str(uuid.uuid4())
+            key = self._check_email(user.email, user.id)
+
+            # Um id já existente é substituído, como antes
+            existing = self._records.get(user.id)
+            if existing is not None:
+                self._remove(existing)
+
+            user.created_at = datetime.now()
+            self._records[user.id] = _UserRecord(user, user.created_at)
+            self._by_email[key] = user.id
+            insort(self._order, (user.created_at, user.id))
         return user
 
     def find_by_id(self, user_id: str) -> Optional[User]:
-        return self.users.get(user_id)
+        with self._lock.read():
+            record = self._records.get(user_id)
+            return record.to_user() if record else None
+
+    def find_by_email(self, email: str) -> Optional[User]:
+        with self._lock.read():
+            user_id = self._by_email.get(_email_key(email))
+            return self._records[user_id].to_user() if user_id else None
 
     def find_all(self) -> List[User]:
-        return list(self.users.values())
+        with self._lock.read():
+            return [self._records[user_id].to_user() for _, user_id in self._order]
+
+    def find_page(self, limit: int, after: Optional[Tuple[datetime, str]] = None) -> List[User]:
+        with self._lock.read():
+            start = bisect_right(self._order, after) if after else 0
+            return [self._records[user_id].to_user() for _, user_id in self._order[start:start + limit]]
 
     def update(self, user: User) -> User:
-        if user.id not in self.users:
-            raise ValueError(f"User with id {user.id} not found")
-        
-        user.updated_at = datetime.now()
-        self.users[user.id] = user
+        with self._lock.write():
+            record = self._records.get(user.id)
+            if record is None:
+                raise ValueError(f"User with id {user.id} not found")
+            key = self._check_email(user.email, user.id)
+
+            user.updated_at = datetime.now()
+            del self._by_email[_email_key(record.email)]
+            self._by_email[key] = user.id
+            record.name, record.email, record.password = user.name, user.email, user.password
+            record.updated_at = user.updated_at
         return user
 
     def delete(self, user_id: str) -> bool:
-        if user_id not in self.users:
-            return False
-        
-        del self.users[user_id]
-        return True 
\ No newline at end of file
+        with self._lock.write():
+            record = self._records.get(user_id)
+            if record is None:
+                return False
+            self._remove(record)
+        return True
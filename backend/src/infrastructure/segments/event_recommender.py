@@ -0,0 +1,299 @@
+"""
+Recomendação de eventos para a página de Eventos, pré-calculada por segmento
+de fãs.
+
+Um segmento é (UF, jogo, time): o estado do endereço e o primeiro jogo e o
+primeiro time favoritos que o catálogo de interesses conhece (vazio/0 quando
+não há). O universo de segmentos é fixo, 28 × (jogos + 1) × (times + 1), e
+cada um é uma linha de uma matriz NumPy com 1 nas colunas do seu jogo, time e
+estado. Cada evento é uma coluna com `GAME_WEIGHT` no jogo, `TEAM_WEIGHT` em
+cada time e `STATE_WEIGHT` no estado (eventos online não têm estado). A nota
+de um evento para um segmento é o produto escalar, e entram só os eventos:
+
+- dentro da janela de datas (de agora até `horizon`);
+- online, sem estado, ou no estado do segmento (segmentos sem estado veem
+  todos);
+- com nota positiva.
+
+Empates ficam com o evento mais próximo. Os `depth` melhores de cada
+segmento ficam em dois arrays (ids e notas), então servir é achar a linha do
+segmento e ler os eventos que ainda não começaram. Quando um evento muda, as
+notas dele contra todos os segmentos são uma única multiplicação
+matriz-vetor, e só mudam as listas em que ele entra, sobe ou já estava: as
+listas em que ele cai são recalculadas, as demais recebem uma inserção. A
+lista inteira é recalculada a cada `refresh_interval`, para a janela de datas
+andar e os eventos passados saírem da memória.
+"""
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.catalog.interest_catalog import get_catalog
+from src.domain.entities.event import Event
+from src.domain.rules.fields import field_value
+
+BR_STATES = ('AC', 'AL', 'AP', 'AM', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MT', 'MS', 'MG', 'PA',
+             'PB', 'PR', 'PE', 'PI', 'RJ', 'RN', 'RS', 'RO', 'RR', 'SC', 'SP', 'SE', 'TO')
+
+GAME_WEIGHT = 3.0
+TEAM_WEIGHT = 2.0
+STATE_WEIGHT = 1.0
+
+DEPTH = 50
+HORIZON = timedelta(days=90)
+REFRESH_INTERVAL = timedelta(hours=1)
+
+# Segmentos por multiplicação na montagem completa (limita a matriz de notas)
+SEGMENT_BLOCK = 1024
+
+# Desempate pela data: sempre menor que a menor diferença entre pesos
+_TIE_BREAK = 1e-3
+
+Segment = Tuple[str, int, int]  # (UF ou '', id do jogo ou 0, id do time ou 0)
+
+
+def _state(value: Any) -> str:
+    state = value.strip().upper() if isinstance(value, str) else ''
+    return state if state in BR_STATES else ''
+
+
+def _first_id(kind: str, values) -> int:
+    catalog = get_catalog()
+    for value in values or ():
+        item_id = catalog.resolve(kind, value)
+        if item_id is not None:
+            return item_id
+    return 0
+
+
+def fan_segment(source: Any) -> Segment:
+    """Segment of a fan (a `Fan` or the Firestore document)"""
+    return (_state(field_value(field_value(source, 'address') or {}, 'state')),
+            _first_id('game', field_value(source, 'favorite_games')),
+            _first_id('team', field_value(source, 'favorite_teams')))
+
+
+def _grow(array: np.ndarray, capacity: int) -> np.ndarray:
+    grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class EventRecommender:
+    def __init__(self, depth: int = DEPTH, horizon: timedelta = HORIZON,
+                 refresh_interval: timedelta = REFRESH_INTERVAL, clock: Callable[[], datetime] = datetime.now):
+        self.depth = depth
+        self.horizon = horizon.total_seconds()
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._lock = threading.RLock()
+
+        catalog = get_catalog()
+        self._game_ids = [0] + [entry.id for entry in catalog.entries('game')]
+        self._team_ids = [0] + [entry.id for entry in catalog.entries('team')]
+        self._states = ('',) + BR_STATES
+        self._game_of = {item_id: i for i, item_id in enumerate(self._game_ids)}
+        self._team_of = {item_id: i for i, item_id in enumerate(self._team_ids)}
+        self._state_of = {state: i for i, state in enumerate(self._states)}
+
+        # Colunas: jogos, times e estados (o índice 0 de cada um é "nenhum")
+        self._team_offset = len(self._game_ids) - 1
+        self._state_offset = self._team_offset + len(self._team_ids) - 1
+        width = self._state_offset + len(self._states) - 1
+
+        shape = (len(self._states), len(self._game_ids), len(self._team_ids))
+        states, games, teams = (axis.ravel() for axis in np.indices(shape))
+        self._segment_state = states.astype(np.int32)
+        self._segments = np.zeros((len(states), width), dtype=np.float32)
+        rows = np.arange(len(states))
+        self._segments[rows[games > 0], games[games > 0] - 1] = 1.0
+        self._segments[rows[teams > 0], self._team_offset + teams[teams > 0] - 1] = 1.0
+        self._segments[rows[states > 0], self._state_offset + states[states > 0] - 1] = 1.0
+
+        self._slot_of: Dict[str, int] = {}
+        self._events: List[Optional[Event]] = []
+        self._vectors = np.zeros((0, width), dtype=np.float32)
+        self._starts = np.zeros(0, dtype=np.float64)
+        self._event_state = np.zeros(0, dtype=np.int32)
+        self._alive = np.zeros(0, dtype=bool)
+
+        self._top_slots = np.full((len(states), depth), -1, dtype=np.int32)
+        self._top_scores = np.full((len(states), depth), -np.inf, dtype=np.float64)
+        self._built_at: Optional[datetime] = None
+        self._reference = 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._slot_of)
+
+    def segment_row(self, segment: Segment) -> int:
+        state, game, team = segment
+        return ((self._state_of.get(state, 0) * len(self._game_ids) + self._game_of.get(game, 0))
+                * len(self._team_ids) + self._team_of.get(team, 0))
+
+    def _vector(self, event: Event) -> Tuple[np.ndarray, int]:
+        catalog = get_catalog()
+        vector = np.zeros(self._vectors.shape[1], dtype=np.float32)
+        game = self._game_of.get(catalog.resolve('game', event.game) if event.game else None, 0)
+        if game:
+            vector[game - 1] = GAME_WEIGHT
+        for name in event.teams:
+            team = self._team_of.get(catalog.resolve('team', name), 0)
+            if team:
+                vector[self._team_offset + team - 1] = TEAM_WEIGHT
+        state = 0 if event.online else self._state_of.get(_state(event.state), 0)
+        if state:
+            vector[self._state_offset + state - 1] = STATE_WEIGHT
+        return vector, state
+
+    def _store(self, event: Event) -> int:
+        slot = self._slot_of.get(event.id)
+        if slot is None:
+            slot = len(self._events)
+            self._slot_of[event.id] = slot
+            self._events.append(None)
+            if slot == len(self._starts):
+                # Capacidade dobra: inserções amortizadas O(1)
+                capacity = max(16, 2 * slot)
+                self._vectors = _grow(self._vectors, capacity)
+                self._starts = _grow(self._starts, capacity)
+                self._event_state = _grow(self._event_state, capacity)
+                self._alive = _grow(self._alive, capacity)
+        self._events[slot] = event
+        self._alive[slot] = True
+        self._vectors[slot], self._event_state[slot] = self._vector(event)
+        self._starts[slot] = event.starts_at.timestamp()
+        return slot
+
+    def _scores(self, rows: np.ndarray, slots: np.ndarray, now: datetime) -> np.ndarray:
+        """Ranking scores of `slots` for the segments in `rows`; -inf where filtered out"""
+        now_ts = now.timestamp()
+        starts = self._starts[slots]
+        raw = self._segments[rows] @ self._vectors[slots].T
+
+        upcoming = self._alive[slots] & (starts >= now_ts) & (starts <= now_ts + self.horizon)
+        segment_state = self._segment_state[rows][:, None]
+        event_state = self._event_state[slots][None, :]
+        nearby = (event_state == 0) | (segment_state == 0) | (segment_state == event_state)
+
+        # Relativo à última montagem, para notas de momentos diferentes serem comparáveis
+        sooner = _TIE_BREAK / (1.0 + np.maximum(starts - self._reference, 0.0) / self.horizon)
+        return np.where(upcoming[None, :] & nearby & (raw > 0), raw + sooner[None, :], -np.inf)
+
+    def _rank(self, rows: np.ndarray, now: datetime) -> None:
+        slots = np.arange(len(self._events))
+        k = min(self.depth, len(slots))
+        for start in range(0, len(rows), SEGMENT_BLOCK):
+            block = rows[start:start + SEGMENT_BLOCK]
+            self._top_slots[block] = -1
+            self._top_scores[block] = -np.inf
+            if k == 0:
+                continue
+            scores = self._scores(block, slots, now)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            self._top_slots[block, :k] = np.where(np.isfinite(top_scores), top, -1)
+            self._top_scores[block, :k] = top_scores
+
+    def rebuild(self, now: Optional[datetime] = None) -> None:
+        """Drop past events and recompute every segment's list"""
+        with self._lock:
+            now = now or self.clock()
+            now_ts = now.timestamp()
+            events = [event for event in self._events if event is not None and event.starts_at.timestamp() >= now_ts]
+            self._slot_of, self._events = {}, []
+            self._vectors = self._vectors[:0]
+            self._starts = self._starts[:0]
+            self._event_state = self._event_state[:0]
+            self._alive = self._alive[:0]
+            for event in events:
+                self._store(event)
+
+            self._reference = now_ts
+            self._rank(np.arange(len(self._segments)), now)
+            self._built_at = now
+
+    def _merge(self, rows: np.ndarray, slot: int, scores: np.ndarray) -> None:
+        # Tira a entrada antiga do evento e insere a nova na posição da nota
+        slots = self._top_slots[rows]
+        previous = self._top_scores[rows]
+        same = slots == slot
+        slots = np.hstack([np.where(same, -1, slots), np.full((len(rows), 1), slot, dtype=np.int32)])
+        previous = np.hstack([np.where(same, -np.inf, previous), scores[:, None]])
+        order = np.argsort(-previous, axis=1, kind='stable')[:, :self.depth]
+        merged = np.take_along_axis(previous, order, axis=1)
+        self._top_slots[rows] = np.where(np.isfinite(merged), np.take_along_axis(slots, order, axis=1), -1)
+        self._top_scores[rows] = merged
+
+    def upsert(self, event: Event) -> None:
+        """Add or change one event, updating only the segment lists it affects"""
+        with self._lock:
+            slot = self._store(event)
+            if self._built_at is None:
+                return
+
+            now = self.clock()
+            rows = np.arange(len(self._segments))
+            scores = self._scores(rows, np.array([slot]), now)[:, 0]
+            listed = self._top_slots == slot
+            was_listed = listed.any(axis=1)
+            before = np.where(listed, self._top_scores, -np.inf).max(axis=1)
+
+            # Onde a nota caiu, o próximo da fila pode ser um evento fora da lista
+            dropped = was_listed & (scores < before)
+            raised = (was_listed & ~dropped) | (~was_listed & (scores > self._top_scores[:, -1]))
+            if raised.any():
+                self._merge(np.flatnonzero(raised), slot, scores[raised])
+            if dropped.any():
+                self._rank(np.flatnonzero(dropped), now)
+
+    def remove(self, event_id: str) -> None:
+        with self._lock:
+            slot = self._slot_of.pop(event_id, None)
+            if slot is None:
+                return
+            self._events[slot] = None
+            self._alive[slot] = False
+            if self._built_at is not None:
+                rows = np.flatnonzero((self._top_slots == slot).any(axis=1))
+                if len(rows):
+                    self._rank(rows, self.clock())
+
+    def apply(self, event_id: str, data: Optional[Event]) -> None:
+        """Apply the current state of one catalog event; `data=None` removes it"""
+        if data is None:
+            self.remove(event_id)
+        else:
+            self.upsert(data)
+
+    def recommend(self, source: Any, limit: int = 10, now: Optional[datetime] = None) -> List[Event]:
+        """Upcoming events for a fan (a `Fan` or the Firestore document), best first"""
+        return self.recommend_segment(fan_segment(source), limit, now)
+
+    def recommend_segment(self, segment: Segment, limit: int = 10, now: Optional[datetime] = None) -> List[Event]:
+        with self._lock:
+            now = now or self.clock()
+            if self._built_at is None or now - self._built_at >= self.refresh_interval:
+                self.rebuild(now)
+
+            now_ts = now.timestamp()
+            events = []
+            for slot in self._top_slots[self.segment_row(segment)].tolist():
+                if slot < 0 or len(events) == limit:
+                    break
+                event = self._events[slot]
+                if event is not None and self._starts[slot] >= now_ts:
+                    events.append(event)
+            return events
+
+    def load(self, events: Sequence[Event], now: Optional[datetime] = None) -> 'EventRecommender':
+        """Replace the catalog and rebuild every list"""
+        with self._lock:
+            self._events = list(events)
+            self.rebuild(now)
+        return self
@@ -0,0 +1,237 @@
+"""
+Índice invertido em memória sobre os interesses dos fãs, para consultas de
+segmento ("fãs de SP que gostam de CS2, seguem a FURIA e gastaram mais de
+R$100").
+
+Cada fã recebe uma linha (inteiro denso). Para cada termo — jogo ou time
+(pelo id do catálogo de interesses), estado, cidade ou faixa de gasto — o
+índice guarda o array NumPy ordenado das linhas que o têm. Alterações entram em conjuntos pendentes por termo e são
+incorporadas ao array na próxima consulta que usar o termo. As consultas
+combinam os termos como bitmaps compactados (`np.packbits`), com AND/OR/NOT
+bit a bit; termos frequentes guardam o bitmap já montado. Contagens usam uma
+tabela de popcount por byte e os ids de uma página saem de `np.flatnonzero`.
+
+Consultas são dicionários (o mesmo formato do corpo JSON da API):
+
+    {"and": [{"state": "SP"}, {"game": "CS2"}, {"team": "FURIA"},
+             {"min_spent": 100}, {"not": {"city": "Campinas"}}]}
+"""
+import threading
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+from src.domain.catalog.interest_catalog import get_catalog
+from src.domain.rules import fan_stats
+from src.domain.rules.fields import field_value
+
+Term = Tuple[str, Any]
+
+# Limites inferiores das faixas de gasto (R$). Cada faixa é cumulativa
+# ("gastou pelo menos X"), então `min_spent` é um único termo
+SPEND_THRESHOLDS: Tuple[int, ...] = (1, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Campos do documento `fans` usados pelo índice
+SOURCE_FIELDS = ('favorite_games', 'favorite_teams', 'address', 'total_spent', 'purchase_count', 'purchases')
+
+_FIELDS = {'game', 'team', 'state', 'city'}
+
+# Bits ligados de cada byte (np.bitwise_count só existe a partir do NumPy 2.0)
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+
+def _text(value: str) -> str:
+    return ' '.join(value.split()).casefold()
+
+
+def segment_term(field: str, value: Any) -> Term:
+    """Index key of a criterion (game, team, state, city, min_spent); raises ValueError for an invalid min_spent"""
+    if field == 'state':
+        return field, str(value).strip().upper()
+    if field == 'min_spent':
+        try:
+            threshold = int(value)
+        except (TypeError, ValueError):
+            threshold = None
+        if threshold not in SPEND_THRESHOLDS:
+            raise ValueError(f"min_spent must be one of {list(SPEND_THRESHOLDS)}")
+        return 'spent', threshold
+    if field in ('game', 'team'):
+        # Id do catálogo (qualquer apelido serve na consulta) ou o texto normalizado
+        return field, get_catalog().key(field, value)
+    return field, _text(str(value))
+
+
+def fan_terms(source: Any) -> FrozenSet[Term]:
+    """Index terms of one fan (a `Fan` or the Firestore document)"""
+    contribution = fan_stats.contribution(source)
+    terms: Set[Term] = set()
+    terms.update(segment_term('game', name) for name in contribution['games'])
+    terms.update(segment_term('team', name) for name in contribution['teams'])
+    terms.update(('state', state) for state in contribution['states'])
+
+    city = field_value(field_value(source, 'address') or {}, 'city')
+    if isinstance(city, str) and city.strip():
+        terms.add(segment_term('city', city))
+
+    spent = contribution['total_spent']
+    terms.update(('spent', threshold) for threshold in SPEND_THRESHOLDS if spent >= threshold)
+    return frozenset(terms)
+
+
+def _packed(rows: np.ndarray, size: int) -> np.ndarray:
+    bits = np.zeros(size, dtype=bool)
+    bits[rows] = True
+    return np.packbits(bits, bitorder='little')
+
+
+class _Posting:
+    """Sorted row ids of one term plus pending changes"""
+
+    __slots__ = ('rows', 'added', 'removed', 'bitmap')
+
+    def __init__(self, rows: Optional[np.ndarray] = None):
+        self.rows = rows if rows is not None else np.empty(0, dtype=np.uint32)
+        self.added: Set[int] = set()
+        self.removed: Set[int] = set()
+        self.bitmap: Optional[np.ndarray] = None
+
+    def add(self, row: int):
+        if row in self.removed:
+            self.removed.discard(row)
+        else:
+            self.added.add(row)
+        self.bitmap = None
+
+    def discard(self, row: int):
+        if row in self.added:
+            self.added.discard(row)
+        else:
+            self.removed.add(row)
+        self.bitmap = None
+
+    def compact(self) -> np.ndarray:
+        if self.removed:
+            removed = np.fromiter(self.removed, dtype=np.uint32, count=len(self.removed))
+            self.rows = self.rows[~np.isin(self.rows, removed, assume_unique=True)]
+            self.removed.clear()
+        if self.added:
+            added = np.fromiter(self.added, dtype=np.uint32, count=len(self.added))
+            self.rows = np.union1d(self.rows, added).astype(np.uint32)
+            self.added.clear()
+        return self.rows
+
+
+class FanSegmentIndex:
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._row_of: Dict[str, int] = {}
+        self._ids: List[str] = []
+        self._terms: List[Optional[FrozenSet[Term]]] = []
+        self._postings: Dict[Term, _Posting] = {}
+        self._alive = _Posting()
+
+    @classmethod
+    def build(cls, documents: Iterable[Tuple[str, Mapping[str, Any]]]) -> 'FanSegmentIndex':
+        """Bulk-build from (doc_id, data) pairs, e.g. a streamed scan of `fans`"""
+        index = cls()
+        buffers: Dict[Term, List[int]] = {}
+        for doc_id, data in documents:
+            row = len(index._ids)
+            terms = fan_terms(data)
+            index._row_of[doc_id] = row
+            index._ids.append(doc_id)
+            index._terms.append(terms)
+            for term in terms:
+                buffers.setdefault(term, []).append(row)
+
+        # Linhas atribuídas em ordem crescente: as listas já estão ordenadas
+        index._postings = {term: _Posting(np.asarray(rows, dtype=np.uint32)) for term, rows in buffers.items()}
+        index._alive = _Posting(np.arange(len(index._ids), dtype=np.uint32))
+        return index
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._alive.compact())
+
+    def apply(self, doc_id: str, data: Optional[Mapping[str, Any]]) -> None:
+        """Index the current state of a fan; `data=None` removes it. Idempotent"""
+        with self._lock:
+            row = self._row_of.get(doc_id)
+            if row is None:
+                if data is None:
+                    return
+                row = len(self._ids)
+                self._row_of[doc_id] = row
+                self._ids.append(doc_id)
+                self._terms.append(None)
+
+            old = self._terms[row] or frozenset()
+            new = fan_terms(data) if data is not None else frozenset()
+            for term in old - new:
+                self._postings[term].discard(row)
+            for term in new - old:
+                self._postings.setdefault(term, _Posting()).add(row)
+
+            if data is None and self._terms[row] is not None:
+                self._alive.discard(row)
+            elif data is not None and self._terms[row] is None:
+                self._alive.add(row)
+            self._terms[row] = new if data is not None else None
+
+    def _bitmap(self, posting: _Posting, size: int) -> np.ndarray:
+        rows = posting.compact()
+        if posting.bitmap is not None and len(posting.bitmap) * 8 >= size:
+            return posting.bitmap[:(size + 7) // 8]
+        bitmap = _packed(rows, size)
+        # Bitmap denso ocupa menos que o array quando o termo cobre >1/32 das linhas
+        if len(rows) * 32 >= size:
+            posting.bitmap = bitmap
+        return bitmap
+
+    def _evaluate(self, query: Mapping[str, Any], size: int) -> np.ndarray:
+        if not isinstance(query, Mapping) or len(query) != 1:
+            raise ValueError("Each query node must be an object with exactly one key")
+
+        (operator, operand), = query.items()
+        if operator in ('and', 'or'):
+            if not isinstance(operand, list) or not operand:
+                raise ValueError(f"'{operator}' expects a non-empty list")
+            parts = [self._evaluate(node, size) for node in operand]
+            combine = np.bitwise_and if operator == 'and' else np.bitwise_or
+            return combine.reduce(parts)
+        if operator == 'not':
+            return np.bitwise_and(np.invert(self._evaluate(operand, size)), self._bitmap(self._alive, size))
+        if operator not in _FIELDS and operator != 'min_spent':
+            raise ValueError(f"Unknown query field: {operator}")
+
+        posting = self._postings.get(segment_term(operator, operand))
+        if posting is None:
+            return np.zeros((size + 7) // 8, dtype=np.uint8)
+        return self._bitmap(posting, size)
+
+    def count(self, query: Mapping[str, Any]) -> int:
+        with self._lock:
+            return int(_POPCOUNT[self._evaluate(query, len(self._ids))].sum(dtype=np.int64))
+
+    def search(self, query: Mapping[str, Any], limit: int = 100, after: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Count and one page of fan ids matching `query`. Pages follow row
+        order; `after` is the last id of the previous page.
+        """
+        with self._lock:
+            size = len(self._ids)
+            bitmap = self._evaluate(query, size)
+            rows = np.flatnonzero(np.unpackbits(bitmap, count=size, bitorder='little'))
+
+            start = 0
+            if after is not None:
+                after_row = self._row_of.get(after)
+                if after_row is None:
+                    raise ValueError(f"Unknown cursor: {after}")
+                start = int(np.searchsorted(rows, after_row, side='right'))
+
+            page = rows[start:start + limit].tolist()
+            ids = [self._ids[row] for row in page]
+            has_more = start + limit < len(rows)
+            return {'count': int(len(rows)), 'ids': ids, 'next': ids[-1] if ids and has_more else None}
@@ -0,0 +1,90 @@
+"""
+Carga e atualização do `EventRecommender` a partir da coleção `events`.
+
+A carga lê os eventos que ainda não começaram e monta as listas de todos os
+segmentos. Um listener (`on_snapshot`) sobre os eventos com `updated_at` a
+partir do início da carga aplica cada evento criado, alterado ou removido (a
+remoção grava um marcador com `updated_at` novo, ver `FirestoreEventRepository`),
+e só as listas afetadas mudam. Cada processo (worker) tem o seu recomendador,
+criado no primeiro uso e descartado depois de um fork.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.infrastructure.repositories.firestore_event_repository import EVENTS_COLLECTION, decode_event, is_deleted
+from src.infrastructure.segments.event_recommender import EventRecommender
+
+logger = logging.getLogger(__name__)
+
+# Margem para relógios e escritas em andamento durante a carga
+WATCH_OVERLAP = timedelta(minutes=5)
+
+
+def watch(collection, index, since: datetime):
+    """
+    Apply changes to events updated since `since` to `index` (anything with
+    `apply(event_id, Event | None)`); returns the Watch (call `.unsubscribe()`)
+    """
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    def on_snapshot(docs, changes, read_time):
+        for change in changes:
+            document = change.document
+            removed = change.type.name == 'REMOVED' or is_deleted(document)
+            data = None if removed else decode_event(document)
+            index.apply(document.id, data)
+
+    query = collection.where(filter=FieldFilter('updated_at', '>=', since))
+    return query.on_snapshot(on_snapshot)
+
+
+def load_event_recommender(db=None, now: Optional[datetime] = None) -> EventRecommender:
+    """Build the recommender from the upcoming events (no listener)"""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    if db is None:
+        from src.infrastructure.config.firebase import get_firestore
+        db = get_firestore()
+
+    started = time.perf_counter()
+    now = now or datetime.now()
+    query = db.collection(EVENTS_COLLECTION).where(filter=FieldFilter('starts_at', '>=', now))
+    recommender = EventRecommender().load([decode_event(snapshot) for snapshot in query.stream()], now)
+    logger.info(f"Recomendações de eventos: {len(recommender)} eventos em {time.perf_counter() - started:.2f}s")
+    return recommender
+
+
+_recommender: Optional[EventRecommender] = None
+_watch = None
+_lock = threading.Lock()
+
+
+def get_event_recommender() -> EventRecommender:
+    """Process-wide recommender, loaded on first use and kept current by a listener"""
+    global _recommender, _watch
+    if _recommender is None:
+        with _lock:
+            if _recommender is None:
+                from src.infrastructure.config.firebase import get_firestore
+                db = get_firestore()
+                since = datetime.now() - WATCH_OVERLAP
+                recommender = load_event_recommender(db)
+                _watch = watch(db.collection(EVENTS_COLLECTION), recommender, since)
+                _recommender = recommender
+    return _recommender
+
+
+def _reset():
+    # O listener roda em threads do processo pai; o filho cria o seu
+    global _recommender, _watch, _lock
+    _recommender = None
+    _watch = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,91 @@
+"""
+Carga e atualização do `FanSegmentIndex` a partir do Firestore.
+
+O índice é montado por uma varredura paginada da coleção `fans` lendo só os
+campos indexados. Em seguida um listener (`on_snapshot`) sobre os fãs com
+`updated_at` a partir do início da carga mantém o índice em dia: cada
+documento adicionado, alterado ou removido é reaplicado. Reaplicar é
+idempotente, então a sobreposição entre a varredura e o listener não
+duplica nada. Cada processo (worker) tem o seu índice, criado no primeiro
+uso e descartado depois de um fork.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.infrastructure.segments.fan_segment_index import FanSegmentIndex, SOURCE_FIELDS
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+# Margem para relógios e escritas em andamento durante a carga
+WATCH_OVERLAP = timedelta(minutes=5)
+
+
+def _documents(collection, page_size: int):
+    for snapshots in scan_pages(collection, SOURCE_FIELDS, page_size):
+        for snapshot in snapshots:
+            yield snapshot.id, snapshot.to_dict() or {}
+
+
+def watch(collection, index: FanSegmentIndex, since: datetime):
+    """Apply changes to fans updated since `since`; returns the Watch (call `.unsubscribe()`)"""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    def on_snapshot(docs, changes, read_time):
+        for change in changes:
+            document = change.document
+            data = None if change.type.name == 'REMOVED' else document.to_dict()
+            index.apply(document.id, data)
+
+    query = collection.where(filter=FieldFilter('updated_at', '>=', since))
+    return query.on_snapshot(on_snapshot)
+
+
+def load_fan_segment_index(db=None, page_size: int = PAGE_SIZE) -> FanSegmentIndex:
+    """Build the index from a full scan of `fans` (no listener)"""
+    if db is None:
+        from src.infrastructure.config.firebase import get_firestore
+        db = get_firestore()
+
+    started = time.perf_counter()
+    index = FanSegmentIndex.build(_documents(db.collection('fans'), page_size))
+    logger.info(f"Índice de segmentos: {len(index)} fãs em {time.perf_counter() - started:.1f}s")
+    return index
+
+
+_index: Optional[FanSegmentIndex] = None
+_watch = None
+_lock = threading.Lock()
+
+
+def get_fan_segment_index() -> FanSegmentIndex:
+    """Process-wide index, loaded on first use and kept current by a listener"""
+    global _index, _watch
+    if _index is None:
+        with _lock:
+            if _index is None:
+                from src.infrastructure.config.firebase import get_firestore
+                db = get_firestore()
+                since = datetime.now() - WATCH_OVERLAP
+                index = load_fan_segment_index(db)
+                _watch = watch(db.collection('fans'), index, since)
+                _index = index
+    return _index
+
+
+def _reset():
+    # O listener roda em threads do processo pai; o filho cria o seu
+    global _index, _watch, _lock
+    _index = None
+    _watch = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,213 @@
+"""
+Fãs parecidos ("lookalikes"): similaridade de cosseno sobre vetores TF-IDF
+de interesses.
+
+Cada fã é uma linha de uma matriz esparsa fã × atributo. Os atributos são os
+jogos (favoritos e dos perfis de esports) e times pelo id do catálogo, o
+estado, a cidade e as contas seguidas no X (`social_accounts`). O peso de um
+atributo é o seu IDF (`ln((1 + N) / (1 + df)) + 1`), então seguir uma conta
+de nicho aproxima mais dois fãs do que morar em SP. Cada linha é normalizada,
+e o cosseno vira um produto escalar. Atributos de um só fã não aproximam
+ninguém e ficam de fora.
+
+A matriz é montada offline a partir de um snapshot (`src/jobs/
+build_lookalike_index.py`) e salva em `.npz` como CSR (`indptr`, `indices`,
+`data`). Sem SciPy, as duas orientações são arrays NumPy: a CSR dá o vetor
+das sementes, e a transposta (CSC), montada na carga, dá as linhas que têm
+cada atributo. A consulta `X · q` percorre só as colunas não nulas de `q`, em
+blocos de até `BLOCK_NNZ` entradas somadas com `np.bincount`. O custo cresce
+com o número de fãs que compartilham algum atributo com as sementes, não com
+o tamanho da matriz. Os k maiores saem de `np.argpartition`.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.domain.rules.fields import field_value
+from src.infrastructure.segments.fan_segment_index import segment_term
+
+LOOKALIKE_INDEX_PATH = os.getenv('LOOKALIKE_INDEX_PATH', 'lookalike_index.npz')
+
+# Campos lidos de cada coleção no snapshot
+FAN_FIELDS = ('favorite_games', 'favorite_teams', 'esports_profiles', 'address')
+SOCIAL_ACCOUNT_FIELDS = ('user_id', 'followed_accounts')
+
+MIN_DF = 2
+
+# Entradas da CSC somadas por chamada ao np.bincount
+BLOCK_NNZ = 1 << 22
+
+
+def account_key(username: str) -> str:
+    return username.strip().lstrip('@').casefold()
+
+
+def fan_features(data: Mapping[str, Any], followed: Iterable[str] = ()) -> Set[str]:
+    """Feature names of one fan document plus the usernames of the accounts it follows"""
+    terms = set()
+    games = list(field_value(data, 'favorite_games') or [])
+    for profile in field_value(data, 'esports_profiles') or []:
+        games.extend(field_value(profile, 'games') or [])
+    terms.update(segment_term('game', game) for game in games)
+    terms.update(segment_term('team', team) for team in field_value(data, 'favorite_teams') or [])
+
+    address = field_value(data, 'address') or {}
+    for field in ('state', 'city'):
+        value = field_value(address, field)
+        if isinstance(value, str) and value.strip():
+            terms.add(segment_term(field, value))
+
+    features = {f'{field}:{value}' for field, value in terms if value not in (None, '')}
+    features.update(f'follows:{account_key(name)}' for name in followed if isinstance(name, str) and account_key(name))
+    return features
+
+
+def _strings(values: Sequence[str]) -> np.ndarray:
+    # Bytes UTF-8 (`S`) ocupam 1/4 do `U` e carregam sem pickle
+    return np.array([value.encode('utf-8') for value in values], dtype=np.bytes_)
+
+
+class LookalikeIndex:
+    def __init__(self, ids: Sequence[str], features: Sequence[str], idf: np.ndarray,
+                 indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, built_at: Optional[str] = None):
+        self.ids = list(ids)
+        self.features = list(features)
+        self.idf = idf
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.built_at = built_at
+        self._row_of = {doc_id: row for row, doc_id in enumerate(self.ids)}
+
+        # Transposta (CSC): linhas e pesos de cada atributo
+        rows = np.repeat(np.arange(len(self.ids), dtype=np.int32), np.diff(indptr))
+        order = np.argsort(indices, kind='stable')
+        self.column_rows = rows[order]
+        self.column_data = data[order]
+        self.column_ptr = np.zeros(len(self.features) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(indices, minlength=len(self.features)), out=self.column_ptr[1:])
+
+    @classmethod
+    def build(cls, fans: Iterable[Tuple[str, Set[str]]], min_df: int = MIN_DF) -> 'LookalikeIndex':
+        """Build from (fan_id, feature names) pairs"""
+        ids: List[str] = []
+        vocabulary: Dict[str, int] = {}
+        lengths: List[int] = []
+        columns: List[int] = []
+        for fan_id, names in fans:
+            ids.append(fan_id)
+            lengths.append(len(names))
+            columns.extend(vocabulary.setdefault(name, len(vocabulary)) for name in names)
+
+        indices = np.asarray(columns, dtype=np.int32)
+        rows = np.repeat(np.arange(len(ids), dtype=np.int32), np.asarray(lengths, dtype=np.int64))
+        df = np.bincount(indices, minlength=len(vocabulary))
+
+        # Renumera os atributos mantidos, na ordem da primeira aparição
+        keep = df >= min_df
+        remap = np.cumsum(keep) - 1
+        mask = keep[indices]
+        indices, rows = remap[indices[mask]].astype(np.int32), rows[mask]
+        names = np.array(list(vocabulary), dtype=object)[keep].tolist()
+
+        idf = (np.log((1.0 + len(ids)) / (1.0 + df[keep])) + 1.0).astype(np.float32)
+        weights = idf[indices]
+        norms = np.sqrt(np.bincount(rows, weights=weights.astype(np.float64) ** 2, minlength=len(ids)))
+        data = (weights / norms[rows]).astype(np.float32)
+
+        indptr = np.zeros(len(ids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(ids)), out=indptr[1:])
+        return cls(ids, names, idf, indptr, indices, data, datetime.now().isoformat(timespec='seconds'))
+
+    def save(self, path: str) -> None:
+        """Write the CSR matrix to `path` (`.npz`), replacing it atomically"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, ids=_strings(self.ids), features=_strings(self.features), idf=self.idf,
+                     indptr=self.indptr, indices=self.indices, data=self.data,
+                     built_at=np.array(self.built_at or ''))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'LookalikeIndex':
+        with np.load(path, allow_pickle=False) as arrays:
+            return cls([value.decode('utf-8') for value in arrays['ids'].tolist()],
+                       [value.decode('utf-8') for value in arrays['features'].tolist()],
+                       arrays['idf'], arrays['indptr'], arrays['indices'], arrays['data'],
+                       str(arrays['built_at']) or None)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, fan_id: str) -> bool:
+        return fan_id in self._row_of
+
+    def _query(self, rows: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Centroide das sementes, normalizado: atributos e pesos não nulos
+        vector = np.zeros(len(self.features), dtype=np.float64)
+        for row in rows:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            vector[self.indices[start:end]] += self.data[start:end]
+        columns = np.flatnonzero(vector)
+        weights = vector[columns]
+        norm = np.sqrt(np.dot(weights, weights))
+        return columns, weights / norm if norm else weights
+
+    def scores(self, columns: np.ndarray, weights: np.ndarray, block_nnz: int = BLOCK_NNZ) -> np.ndarray:
+        """Cosine of every fan with the query vector given by its non-zero (columns, weights)"""
+        scores = np.zeros(len(self.ids), dtype=np.float64)
+        block_rows: List[np.ndarray] = []
+        block_data: List[np.ndarray] = []
+        pending = 0
+        for column, weight in zip(columns.tolist(), weights.tolist()):
+            start, end = self.column_ptr[column], self.column_ptr[column + 1]
+            block_rows.append(self.column_rows[start:end])
+            block_data.append(self.column_data[start:end] * np.float32(weight))
+            pending += end - start
+            if pending >= block_nnz:
+                scores += np.bincount(np.concatenate(block_rows), np.concatenate(block_data), len(self.ids))
+                block_rows, block_data, pending = [], [], 0
+        if block_rows:
+            scores += np.bincount(np.concatenate(block_rows), np.concatenate(block_data), len(self.ids))
+        return scores
+
+    def similar(self, fan_ids: Sequence[str], limit: int = 1000, block_nnz: int = BLOCK_NNZ) -> List[Dict[str, Any]]:
+        """The `limit` fans most similar to the seeds (by their centroid), best first, seeds excluded"""
+        unknown = [fan_id for fan_id in fan_ids if fan_id not in self._row_of]
+        if unknown:
+            raise ValueError(f"Unknown fan ids: {unknown}")
+        seeds = [self._row_of[fan_id] for fan_id in fan_ids]
+
+        columns, weights = self._query(seeds)
+        scores = self.scores(columns, weights, block_nnz)
+        scores[seeds] = 0.0
+
+        count = min(limit, int(np.count_nonzero(scores > 0)))
+        if count == 0:
+            return []
+        top = np.argpartition(-scores, count - 1)[:count]
+        # Maior nota primeiro; empates pela linha, para um resultado estável
+        top = top[np.lexsort((top, -scores[top]))]
+        return [{'id': self.ids[row], 'score': round(float(scores[row]), 4)} for row in top.tolist()]
+
+
+_index: Optional[LookalikeIndex] = None
+_mtime: Optional[float] = None
+_lock = threading.Lock()
+
+
+def get_lookalike_index(path: Optional[str] = None) -> LookalikeIndex:
+    """Process-wide index, loaded from the `.npz` on first use and again whenever the file changes"""
+    global _index, _mtime
+    path = path or LOOKALIKE_INDEX_PATH
+    mtime = os.path.getmtime(path)
+    if _index is None or mtime != _mtime:
+        with _lock:
+            if _index is None or mtime != _mtime:
+                _index = LookalikeIndex.load(path)
+                _mtime = mtime
+    return _index
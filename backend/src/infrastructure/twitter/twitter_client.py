@@ -0,0 +1,213 @@
+"""
+Cliente HTTP da API do X (Twitter) compartilhado pelo processo.
+
+Todas as chamadas passam por uma única `requests.Session`, com um pool de
+conexões (`HTTPAdapter`) reaproveitadas entre requisições (keep-alive), então
+só a primeira chamada de cada conexão paga o handshake TLS. Cada chamada tem
+timeout de conexão e de leitura. Respostas 429 e 5xx de GETs são repetidas
+com backoff exponencial e jitter (ou o tempo pedido em `Retry-After` /
+`x-rate-limit-reset`, se couber no teto). POSTs só são repetidos com
+`retry=True`: os do OAuth levam nonce ou código de autorização de uso único,
+e repeti-los depois de o servidor ter processado a primeira tentativa só gera
+uma recusa. Conexões que nem chegaram a abrir são repetidas sempre. Leituras
+que estouram o timeout nunca são repetidas: a requisição pode ter sido
+processada.
+
+A latência de cada chamada (com as repetições) fica em `metrics()`, por
+endpoint. `TWITTER_API_URL` troca o host da API, por exemplo por um servidor
+local em testes. Depois de um fork o cliente é descartado e o processo filho
+cria o seu.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+TWITTER_API_URL = os.getenv('TWITTER_API_URL', 'https://api.twitter.com')
+CONNECT_TIMEOUT = float(os.getenv('TWITTER_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.getenv('TWITTER_READ_TIMEOUT', '10'))
+POOL_SIZE = int(os.getenv('TWITTER_POOL_SIZE', '10'))
+MAX_RETRIES = int(os.getenv('TWITTER_MAX_RETRIES', '2'))
+
+# Backoff da tentativa n: uniforme em [0, min(MAX_BACKOFF, BACKOFF * 2**n)]
+BACKOFF = 0.25
+MAX_BACKOFF = 4.0
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Métodos repetidos por padrão após 429/5xx; os demais exigem retry=True
+RETRY_METHODS = frozenset({'GET'})
+
+# Latências guardadas por endpoint para os percentis
+LATENCY_SAMPLES = 1024
+
+
+def _percentile(ordered, fraction: float) -> float:
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class _EndpointMetrics:
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses: Dict[int, int] = {}
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+    def snapshot(self) -> Dict[str, Any]:
+        ordered = sorted(self.latencies)
+        return {
+            'calls': self.calls,
+            'retries': self.retries,
+            'errors': self.errors,
+            'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+            'p50_ms': round(_percentile(ordered, 0.5), 1) if ordered else None,
+            'p95_ms': round(_percentile(ordered, 0.95), 1) if ordered else None,
+            'max_ms': round(ordered[-1], 1) if ordered else None,
+        }
+
+
+class TwitterClient:
+    def __init__(self, base_url: str = TWITTER_API_URL,
+                 timeout: Tuple[float, float] = (CONNECT_TIMEOUT, READ_TIMEOUT),
+                 max_retries: int = MAX_RETRIES, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 pool_size: int = POOL_SIZE, sleep: Callable[[float], None] = time.sleep):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _EndpointMetrics] = {}
+
+        # Sem retries do urllib3: as repetições (e a métrica delas) ficam aqui
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Connection'] = 'keep-alive'
+
+    def url(self, path: str) -> str:
+        """Absolute URL of an API path ('/2/users/me'); use it when signing OAuth 1.0a requests"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def get(self, path: str, endpoint: Optional[str] = None, **kwargs) -> requests.Response:
+        return self.request('GET', path, endpoint, **kwargs)
+
+    def post(self, path: str, endpoint: Optional[str] = None, retry: bool = False, **kwargs) -> requests.Response:
+        return self.request('POST', path, endpoint, retry=retry, **kwargs)
+
+    def request(self, method: str, path: str, endpoint: Optional[str] = None, retry: Optional[bool] = None,
+                **kwargs) -> requests.Response:
+        """
+        Send a request, retrying failed connects and, for GET or with `retry=True`,
+        429/5xx; `endpoint` is the metrics label (defaults to 'METHOD path', pass a
+        template for paths with ids)
+        """
+        endpoint = endpoint or f"{method} {path}"
+        if retry is None:
+            retry = method.upper() in RETRY_METHODS
+        kwargs.setdefault('timeout', self.timeout)
+        url = self.url(path)
+        started = time.perf_counter()
+        attempt = 0
+        response = None
+        try:
+            while True:
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except requests.exceptions.ConnectionError as e:
+                    if not self._connect_failed(e) or attempt >= self.max_retries:
+                        raise
+                    delay = self._delay(attempt, None)
+                else:
+                    if not retry or response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                        return response
+                    delay = self._delay(attempt, response)
+                    if delay is None:
+                        return response
+                    # Devolve a conexão ao pool antes de esperar
+                    response.close()
+                    response = None
+                logger.warning(f"X API {endpoint}: tentativa {attempt + 1} falhou, repetindo em {delay:.2f}s")
+                attempt += 1
+                self._sleep(delay)
+        finally:
+            self._record(endpoint, time.perf_counter() - started, attempt, response)
+
+    @staticmethod
+    def _connect_failed(error: Exception) -> bool:
+        # Só falhas ao abrir a conexão: a requisição não chegou ao servidor
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            return True
+        reason = error.args[0] if error.args else None
+        return isinstance(getattr(reason, 'reason', reason), NewConnectionError)
+
+    def _delay(self, attempt: int, response: Optional[requests.Response]) -> Optional[float]:
+        """Seconds to wait before the next attempt; None when the server asks for longer than max_backoff"""
+        if response is not None:
+            wait = None
+            retry_after = response.headers.get('Retry-After')
+            reset = response.headers.get('x-rate-limit-reset')
+            if retry_after is not None and retry_after.strip().isdigit():
+                wait = float(retry_after)
+            elif response.status_code == 429 and reset is not None and reset.strip().isdigit():
+                wait = max(float(reset) - time.time(), 0.0)
+            if wait is not None:
+                return wait if wait <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _record(self, endpoint: str, elapsed: float, retries: int, response: Optional[requests.Response]) -> None:
+        with self._lock:
+            metrics = self._metrics.get(endpoint)
+            if metrics is None:
+                metrics = self._metrics[endpoint] = _EndpointMetrics()
+            metrics.calls += 1
+            metrics.retries += retries
+            metrics.latencies.append(elapsed * 1000.0)
+            if response is None:
+                metrics.errors += 1
+            else:
+                metrics.statuses[response.status_code] = metrics.statuses.get(response.status_code, 0) + 1
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-endpoint calls, retries, errors (no response), status counts and latency percentiles"""
+        with self._lock:
+            return {endpoint: metrics.snapshot() for endpoint, metrics in sorted(self._metrics.items())}
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[TwitterClient] = None
+_lock = threading.Lock()
+
+
+def get_twitter_client() -> TwitterClient:
+    """Process-wide client, created on first use"""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = TwitterClient()
+    return _client
+
+
+def _reset():
+    # Conexões abertas pelo processo pai não podem ser usadas pelo filho
+    global _client, _lock
+    _client = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset)
@@ -0,0 +1,106 @@
+"""
+Monta o índice de fãs parecidos (`LookalikeIndex`) a partir de um snapshot
+de `fans` e `social_accounts`.
+
+Primeiro lê as contas conectadas (só `user_id` e `followed_accounts`) e junta
+as contas seguidas por usuário; depois varre `fans` em páginas só com os
+campos de interesse. A matriz TF-IDF é gravada em `--output` (`.npz`) com
+troca atômica do arquivo, e cada worker do app recarrega o índice na próxima
+consulta depois que o arquivo muda. Rode de novo para incorporar fãs novos ou
+alterados (ex.: diariamente).
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.build_lookalike_index
+    python -m src.jobs.build_lookalike_index --output /data/lookalike_index.npz --min-df 3
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict, Iterator, Mapping, Set, Tuple
+
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.infrastructure.segments.lookalike_index import (
+    FAN_FIELDS, LOOKALIKE_INDEX_PATH, MIN_DF, SOCIAL_ACCOUNT_FIELDS, LookalikeIndex, fan_features,
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def followed_usernames(data: Mapping[str, Any]) -> Set[str]:
+    names = set()
+    for account in data.get('followed_accounts') or []:
+        name = account.get('username') if isinstance(account, Mapping) else account
+        if isinstance(name, str) and name.strip():
+            names.add(name)
+    return names
+
+
+class BuildLookalikeIndexJob:
+    def __init__(self, db=None, output_path: str = LOOKALIKE_INDEX_PATH, page_size: int = PAGE_SIZE,
+                 min_df: int = MIN_DF, dry_run: bool = False):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        self.db = db
+        self.output_path = output_path
+        self.page_size = page_size
+        self.min_df = min_df
+        self.dry_run = dry_run
+        self.stats = {'fans': 0, 'social_accounts': 0}
+
+    def followed_by_user(self) -> Dict[str, Set[str]]:
+        followed: Dict[str, Set[str]] = {}
+        for snapshots in scan_pages(self.db.collection('social_accounts'), SOCIAL_ACCOUNT_FIELDS, self.page_size):
+            for snapshot in snapshots:
+                data = snapshot.to_dict() or {}
+                if isinstance(data.get('user_id'), str):
+                    followed.setdefault(data['user_id'], set()).update(followed_usernames(data))
+            self.stats['social_accounts'] += len(snapshots)
+        return followed
+
+    def fans(self, followed: Mapping[str, Set[str]]) -> Iterator[Tuple[str, Set[str]]]:
+        for snapshots in scan_pages(self.db.collection('fans'), FAN_FIELDS, self.page_size):
+            for snapshot in snapshots:
+                yield snapshot.id, fan_features(snapshot.to_dict() or {}, followed.get(snapshot.id, ()))
+            self.stats['fans'] += len(snapshots)
+            logger.info(f"{self.stats['fans']} fãs lidos (até {snapshots[-1].id})")
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        index = LookalikeIndex.build(self.fans(self.followed_by_user()), self.min_df)
+        if not self.dry_run:
+            index.save(self.output_path)
+
+        return {
+            **self.stats,
+            'features': len(index.features),
+            'nnz': int(len(index.data)),
+            'output': self.output_path,
+            'elapsed_s': round(time.perf_counter() - started, 3),
+            'dry_run': self.dry_run,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monta o índice de fãs parecidos")
+    parser.add_argument("--output", default=LOOKALIKE_INDEX_PATH, help="arquivo .npz do índice")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--min-df", type=int, default=MIN_DF, help="mínimo de fãs por atributo")
+    parser.add_argument("--dry-run", action="store_true", help="monta sem gravar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = BuildLookalikeIndexJob(output_path=args.output, page_size=args.page_size, min_df=args.min_df,
+                                 dry_run=args.dry_run)
+    print(json.dumps(job.run(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""
+Checkpoints dos jobs de manutenção: um dicionário JSON gravado de forma
+atômica (arquivo temporário + rename), de onde uma execução interrompida pode
+continuar.
+"""
+import json
+import os
+from typing import Any, Dict, Optional
+
+
+def load_checkpoint(path: Optional[str]) -> Dict[str, Any]:
+    """Saved state, or {} when there is no path or file"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: Optional[str], state: Dict[str, Any]) -> None:
+    if not path:
+        return
+    # Grava em arquivo temporário e renomeia para não deixar checkpoint pela metade
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,121 @@
+"""
+Compacta os baldes de gasto (`spend_rollups`).
+
+Duas etapas:
+
+1. Os baldes da base inteira de períodos já fechados (dias e meses
+   anteriores ao corrente) têm os fragmentos somados no fragmento 0, em uma
+   transação por período, e passam a ser lidos como um único documento.
+2. Os baldes diários de meses inteiros mais antigos que `--retention-days`
+   são dobrados nos mensais: o balde do mês já soma as mesmas compras (os
+   dois são incrementados na mesma escrita), então os diários são apagados,
+   em WriteBatches de até 500 exclusões. Séries diárias só ficam disponíveis
+   dentro da retenção; as mensais, sempre.
+
+Rodar de novo não altera nada que já foi compactado.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.compact_spend_rollups
+    python -m src.jobs.compact_spend_rollups --retention-days 180 --dry-run
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from src.domain.rules import spend_buckets
+
+logger = logging.getLogger(__name__)
+
+RETENTION_DAYS = 90
+BATCH_SIZE = 500  # limite de escritas por WriteBatch do Firestore
+
+
+class CompactSpendRollupsJob:
+    def __init__(self, db=None, rollups=None, retention_days: int = RETENTION_DAYS, batch_size: int = BATCH_SIZE,
+                 clock: Callable[[], datetime] = datetime.now, dry_run: bool = False):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        if rollups is None:
+            from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+            rollups = FirestoreSpendRollupRepository(db)
+        self.db = db
+        self.rollups = rollups
+        self.retention_days = retention_days
+        self.batch_size = min(batch_size, BATCH_SIZE)
+        self.clock = clock
+        self.dry_run = dry_run
+
+    def cutoff(self, now: datetime) -> str:
+        """First day kept: the start of the month that contains now - retention"""
+        oldest = now - timedelta(days=self.retention_days)
+        return f"{spend_buckets.period(spend_buckets.MONTH, oldest)}-01"
+
+    def merge_closed_shards(self, now: datetime) -> int:
+        closed = sorted((granularity, period) for granularity, period in self.rollups.sharded_periods()
+                        if not spend_buckets.is_open(granularity, period, now))
+        if not self.dry_run:
+            for granularity, period in closed:
+                self.rollups.merge_shards(granularity, period)
+        return len(closed)
+
+    def fold_old_days(self, now: datetime) -> int:
+        from google.cloud.firestore_v1.base_query import FieldFilter
+
+        query = (self.rollups.collection
+                 .where(filter=FieldFilter('granularity', '==', spend_buckets.DAY))
+                 .where(filter=FieldFilter('period', '<', self.cutoff(now))))
+        if self.dry_run:
+            return int(query.count().get()[0][0].value)
+
+        # Cada página é apagada antes da próxima consulta, que recomeça do início
+        page_query = query.select([]).limit(self.batch_size)
+        deleted = 0
+        while True:
+            snapshots = list(page_query.stream())
+            if not snapshots:
+                return deleted
+            batch = self.db.batch()
+            for snapshot in snapshots:
+                batch.delete(snapshot.reference)
+            batch.commit()
+            deleted += len(snapshots)
+            logger.info(f"{deleted} baldes diários apagados (até {snapshots[-1].id})")
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        now = self.clock()
+        merged = self.merge_closed_shards(now)
+        folded = self.fold_old_days(now)
+        return {
+            'merged_periods': merged,
+            'folded_days': folded,
+            'cutoff': self.cutoff(now),
+            'elapsed_s': round(time.perf_counter() - started, 3),
+            'dry_run': self.dry_run,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compacta os baldes de gasto por período")
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS,
+                        help="dias de baldes diários mantidos (arredondado para meses inteiros)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="exclusões por WriteBatch (máx. 500)")
+    parser.add_argument("--dry-run", action="store_true", help="conta o que seria compactado sem gravar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = CompactSpendRollupsJob(retention_days=args.retention_days, batch_size=args.batch_size,
+                                 dry_run=args.dry_run)
+    print(json.dumps(job.run(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
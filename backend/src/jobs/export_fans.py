@@ -0,0 +1,341 @@
+"""
+Exportação incremental das coleções `fans` e `social_accounts` em formato
+colunar (Parquet ou Arrow IPC) para o time de analytics.
+
+Cada execução lê os documentos alterados desde a última exportação, em
+páginas ordenadas por (`updated_at`, id). Cada página é convertida em colunas
+e escrita como um row group/record batch, então a memória fica limitada a uma
+página. O arquivo é escrito como `.tmp` e renomeado ao final. Só então a marca
+d'água (último `updated_at` e id exportados de cada coleção) é gravada no
+arquivo de estado, e a próxima execução continua dali. As páginas param em
+`agora - lag`, para não pular escritas com `updated_at` um pouco anterior que
+ainda não tinham sido confirmadas. Toda escrita em campos exportados precisa
+atualizar `updated_at`, inclusive as dos jobs de manutenção
+(`recompute_completeness`, `migrate_fan_timelines`).
+
+A entrega é "pelo menos uma vez": um documento alterado de novo aparece em
+outra exportação. O consumidor deve ficar com a linha de maior `updated_at`
+por `id`. Documentos sem `updated_at` só entram com `--full`, que percorre a
+coleção inteira pelo id. Remoções não são exportadas. Tokens de acesso e
+dados pessoais sensíveis (CPF, imagens, números de documento) ficam de fora.
+
+Requer `pyarrow` (`pip install pyarrow`), que não faz parte das dependências
+do app.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.export_fans --output exports --state exports/state.json --full
+    python -m src.jobs.export_fans --output exports --state exports/state.json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from src.domain.catalog.interest_catalog import get_catalog
+from src.infrastructure.repositories.fan_codec import to_datetime
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.jobs.checkpoint import load_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+LAG_SECONDS = 60
+FORMATS = ('parquet', 'arrow')
+
+
+def _platforms(items) -> List[str]:
+    return [item['platform'] for item in items or [] if isinstance(item, Mapping) and item.get('platform')]
+
+
+def _int(value) -> Optional[int]:
+    return int(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _float(value) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def _str(value) -> Optional[str]:
+    return value if isinstance(value, str) else None
+
+
+def _timestamp(value) -> Optional[datetime]:
+    value = to_datetime(value)
+    return value if isinstance(value, datetime) else None
+
+
+def fan_row(doc_id: str, data: Mapping[str, Any]) -> Dict[str, Any]:
+    catalog = get_catalog()
+    address = data.get('address') if isinstance(data.get('address'), Mapping) else {}
+    return {
+        'id': doc_id,
+        'user_id': _str(data.get('user_id')),
+        'name': _str(data.get('name')),
+        'email': _str(data.get('email')),
+        'city': _str(address.get('city')),
+        'state': _str(address.get('state')),
+        'favorite_games': catalog.decode('game', data.get('favorite_games')),
+        'favorite_teams': catalog.decode('team', data.get('favorite_teams')),
+        'recent_events': [event for event in data.get('recent_events') or [] if isinstance(event, str)],
+        'social_platforms': _platforms(data.get('social_media')),
+        'esports_platforms': _platforms(data.get('esports_profiles')),
+        'verified_documents': sum(1 for doc in data.get('documents') or [] if isinstance(doc, Mapping) and doc.get('verified')),
+        'profile_completeness': _int(data.get('profile_completeness')),
+        'purchase_count': _int(data.get('purchase_count')),
+        'total_spent': _float(data.get('total_spent')),
+        'created_at': _timestamp(data.get('created_at')),
+        'updated_at': _timestamp(data.get('updated_at')),
+    }
+
+
+def social_account_row(doc_id: str, data: Mapping[str, Any]) -> Dict[str, Any]:
+    # access_token/refresh_token nunca saem do Firestore
+    return {
+        'id': doc_id,
+        'user_id': _str(data.get('user_id')),
+        'platform': _str(data.get('platform')),
+        'platform_user_id': _str(data.get('platform_user_id')),
+        'screen_name': _str(data.get('screen_name')),
+        'followed_accounts_count': _int(data.get('followed_accounts_count')),
+        'connected_at': _timestamp(data.get('connected_at')),
+        'expires_at': _int(data.get('expires_at')),
+        'updated_at': _timestamp(data.get('updated_at')),
+    }
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    collection: str
+    columns: Tuple[Tuple[str, str], ...]  # (nome, tipo): string, int32, int64, float64, timestamp, list<string>
+    row: Callable[[str, Mapping[str, Any]], Dict[str, Any]]
+    fields: Tuple[str, ...]  # campos lidos do Firestore
+
+
+EXPORTS: Dict[str, ExportSpec] = {
+    'fans': ExportSpec('fans', (
+        ('id', 'string'), ('user_id', 'string'), ('name', 'string'), ('email', 'string'),
+        ('city', 'string'), ('state', 'string'),
+        ('favorite_games', 'list<string>'), ('favorite_teams', 'list<string>'), ('recent_events', 'list<string>'),
+        ('social_platforms', 'list<string>'), ('esports_platforms', 'list<string>'),
+        ('verified_documents', 'int32'), ('profile_completeness', 'int32'), ('purchase_count', 'int32'),
+        ('total_spent', 'float64'), ('created_at', 'timestamp'), ('updated_at', 'timestamp'),
+    ), fan_row, (
+        'user_id', 'name', 'email', 'address', 'favorite_games', 'favorite_teams', 'recent_events',
+        'social_media', 'esports_profiles', 'documents', 'profile_completeness', 'purchase_count',
+        'total_spent', 'created_at', 'updated_at',
+    )),
+    'social_accounts': ExportSpec('social_accounts', (
+        ('id', 'string'), ('user_id', 'string'), ('platform', 'string'), ('platform_user_id', 'string'),
+        ('screen_name', 'string'), ('followed_accounts_count', 'int32'), ('connected_at', 'timestamp'),
+        ('expires_at', 'int64'), ('updated_at', 'timestamp'),
+    ), social_account_row, (
+        'user_id', 'platform', 'platform_user_id', 'screen_name', 'followed_accounts_count',
+        'connected_at', 'expires_at', 'updated_at',
+    )),
+}
+
+
+def to_columns(spec: ExportSpec, rows: Sequence[Mapping[str, Any]]) -> Dict[str, List[Any]]:
+    return {name: [row.get(name) for row in rows] for name, _ in spec.columns}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        return pyarrow
+    except ImportError:
+        raise RuntimeError("A exportação precisa do pyarrow: pip install pyarrow")
+
+
+def arrow_schema(spec: ExportSpec):
+    pa = _require_pyarrow()
+    types = {
+        'string': pa.string(),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'float64': pa.float64(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+        'list<string>': pa.list_(pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in spec.columns])
+
+
+class ColumnarWriter:
+    """Append pages to a Parquet or Arrow IPC file, published on close()"""
+
+    def __init__(self, path: str, schema, file_format: str = 'parquet'):
+        if file_format not in FORMATS:
+            raise ValueError(f"Formato desconhecido: {file_format}")
+        pa = _require_pyarrow()
+        self.path = path
+        self.schema = schema
+        self._pa = pa
+        self._tmp_path = f"{path}.tmp"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            self._writer = pq.ParquetWriter(self._tmp_path, schema, compression='zstd')
+        else:
+            self._sink = pa.OSFile(self._tmp_path, 'wb')
+            self._writer = pa.ipc.new_file(self._sink, schema)
+        self._format = file_format
+        self.rows = 0
+
+    def write(self, columns: Dict[str, List[Any]]):
+        table = self._pa.Table.from_pydict(columns, schema=self.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        self._writer.close()
+        if self._format == 'arrow':
+            self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        try:
+            self._writer.close()
+            if self._format == 'arrow':
+                self._sink.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+
+def changed_pages(collection, fields: Sequence[str], page_size: int, upper_bound: datetime,
+                  watermark: Optional[Mapping[str, Any]] = None) -> Iterator[List]:
+    """Pages of documents with updated_at in (watermark, upper_bound], by (updated_at, id)"""
+    from google.cloud.firestore_v1.base_query import FieldFilter
+
+    query = collection.where(filter=FieldFilter('updated_at', '<=', upper_bound))
+    cursor = None
+    if watermark and watermark.get('updated_at'):
+        since = datetime.fromisoformat(watermark['updated_at'])
+        query = query.where(filter=FieldFilter('updated_at', '>=', since))
+        if watermark.get('id'):
+            cursor = {'updated_at': since, '__name__': watermark['id']}
+    query = query.select(list(fields)).order_by('updated_at').order_by('__name__').limit(page_size)
+
+    while True:
+        snapshots = list((query.start_after(cursor) if cursor else query).stream())
+        if not snapshots:
+            return
+        yield snapshots
+        if len(snapshots) < page_size:
+            return
+        last = snapshots[-1]
+        cursor = {'updated_at': last.get('updated_at'), '__name__': last.id}
+
+
+class ExportFansJob:
+    def __init__(self, db=None, output_dir: str = 'exports', state_path: Optional[str] = None,
+                 page_size: int = PAGE_SIZE, lag_seconds: int = LAG_SECONDS,
+                 file_format: str = 'parquet', full: bool = False,
+                 collections: Sequence[str] = tuple(EXPORTS)):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        unknown = set(collections) - set(EXPORTS)
+        if unknown:
+            raise ValueError(f"Coleções sem exportação: {', '.join(sorted(unknown))}")
+        self.db = db
+        self.output_dir = output_dir
+        self.state_path = state_path or os.path.join(output_dir, 'export_state.json')
+        self.page_size = page_size
+        self.lag = timedelta(seconds=lag_seconds)
+        self.file_format = file_format
+        self.full = full
+        self.collections = list(collections)
+
+    def _pages(self, spec: ExportSpec, upper_bound: datetime, watermark: Optional[Mapping[str, Any]]):
+        collection = self.db.collection(spec.collection)
+        if self.full:
+            return scan_pages(collection, spec.fields, self.page_size)
+        return changed_pages(collection, spec.fields, self.page_size, upper_bound, watermark)
+
+    def _export(self, spec: ExportSpec, run_stamp: str, upper_bound: datetime,
+                watermark: Optional[Mapping[str, Any]]) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        extension = 'parquet' if self.file_format == 'parquet' else 'arrow'
+        path = os.path.join(self.output_dir, spec.collection, f"{spec.collection}-{run_stamp}.{extension}")
+        writer = None
+        last = None
+        pages = 0
+
+        try:
+            for snapshots in self._pages(spec, upper_bound, watermark):
+                rows = [spec.row(snapshot.id, snapshot.to_dict() or {}) for snapshot in snapshots]
+                if writer is None:
+                    writer = ColumnarWriter(path, arrow_schema(spec), self.file_format)
+                writer.write(to_columns(spec, rows))
+                pages += 1
+                if not self.full:
+                    last = (rows[-1]['updated_at'], rows[-1]['id'])
+                logger.info(f"{spec.collection}: página {pages}, {writer.rows} documentos")
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+
+        if writer is None:
+            return {'rows': 0, 'file': None}, watermark and dict(watermark)
+        writer.close()
+
+        if self.full:
+            # A próxima exportação incremental pega o que mudou desde o início desta varredura
+            new_watermark = {'updated_at': (upper_bound - self.lag).isoformat(), 'id': None}
+        else:
+            new_watermark = {'updated_at': last[0].isoformat(), 'id': last[1]}
+        return {'rows': writer.rows, 'file': path, 'pages': pages}, new_watermark
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        now = datetime.now()
+        run_stamp = now.strftime('%Y%m%dT%H%M%S')
+        upper_bound = now - self.lag if not self.full else now
+        state = load_checkpoint(self.state_path)
+        stats: Dict[str, Any] = {}
+
+        for name in self.collections:
+            spec = EXPORTS[name]
+            result, watermark = self._export(spec, run_stamp, upper_bound, None if self.full else state.get(name))
+            if watermark:
+                state[name] = watermark
+                # Marca d'água só avança depois que o arquivo foi publicado
+                save_checkpoint(self.state_path, state)
+            stats[name] = result
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_s'] = round(elapsed, 3)
+        stats['full'] = self.full
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta fãs e contas sociais em formato colunar")
+    parser.add_argument("--output", default="exports", help="pasta de saída")
+    parser.add_argument("--state", help="arquivo JSON com as marcas d'água (padrão: <output>/export_state.json)")
+    parser.add_argument("--format", choices=FORMATS, default="parquet")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE, help="documentos por row group")
+    parser.add_argument("--lag-seconds", type=int, default=LAG_SECONDS)
+    parser.add_argument("--full", action="store_true", help="exporta a coleção inteira e reinicia as marcas d'água")
+    parser.add_argument("--collections", default=",".join(EXPORTS), help="subconjunto de: " + ",".join(EXPORTS))
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = ExportFansJob(output_dir=args.output, state_path=args.state, page_size=args.page_size,
+                        lag_seconds=args.lag_seconds, file_format=args.format, full=args.full,
+                        collections=[name for name in args.collections.split(",") if name])
+    print(json.dumps(job.run(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Importação em massa de fãs a partir de listas de parceiros (CSV ou JSONL).
+
+As linhas são lidas em streaming e processadas em blocos de 1000. Cada linha
+vira um `Fan` validado pelo próprio modelo, e linhas inválidas vão para o
+relatório de erros. O UID de cada fã é derivado do e-mail, então rodar o
+mesmo arquivo de novo (ou retomar uma importação interrompida) não cria
+duplicatas. Os fãs cujo documento já existe são pulados.
+
+Para os demais, os usuários do Firebase Auth são criados com
+`auth.import_users` (uma chamada por bloco, sem senha; o fã define a senha
+pelo fluxo de "esqueci a senha"). Depois os documentos `fans` são criados em
+WriteBatches de até 500 escritas, com o delta dos agregados (`fan_stats`) na
+mesma batch, e várias batches são enviadas em paralelo. Commits com falha
+transitória são repetidos com backoff. Como os documentos são gravados com
+`create`, uma repetição depois de um commit que na verdade tinha sido
+aplicado não grava nem conta nada duas vezes.
+
+O relatório de erros é um JSONL com uma linha por linha rejeitada (número da
+linha no arquivo, e-mail e motivo).
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.import_fans parceiros.csv --report parceiros.errors.jsonl
+    python -m src.jobs.import_fans parceiros.jsonl --dry-run
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from pydantic import ValidationError
+
+from src.domain.entities.fan import Fan
+from src.domain.rules import fan_stats, profile_completeness
+from src.infrastructure.repositories import fan_codec
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000  # limite de usuários por chamada do auth.import_users
+BATCH_SIZE = 500  # limite de escritas por WriteBatch do Firestore
+WORKERS = 8
+MAX_ATTEMPTS = 5
+
+_LIST_FIELDS = ('favorite_games', 'favorite_teams', 'recent_events')
+_ADDRESS_FIELDS = ('street', 'number', 'complement', 'neighborhood', 'city', 'state', 'postal_code')
+_FAN_FIELDS = ('name', 'email', 'phone', 'birth_date', 'cpf')
+
+Row = Tuple[int, Mapping[str, Any]]
+
+
+def read_rows(path: str) -> Iterator[Row]:
+    """(line number, raw row) pairs from a CSV (with header) or JSONL file"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, {'_error': f"JSON inválido: {e.msg}"}
+    else:
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def fan_uid(email: str) -> str:
+    """Stable Auth UID for an imported e-mail, so re-imports hit the same user"""
+    return 'imp_' + hashlib.sha256(email.strip().casefold().encode('utf-8')).hexdigest()[:28]
+
+
+def _value(value):
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _split(value) -> List[str]:
+    # No CSV as listas vêm em uma célula: "CS2; Valorant" ou "CS2|Valorant"
+    if isinstance(value, str):
+        return [item.strip() for item in value.replace('|', ';').split(';') if item.strip()]
+    return list(value or [])
+
+
+def parse_row(raw: Mapping[str, Any]) -> Fan:
+    """Validate one import row into a Fan; raises ValueError with the reason"""
+    if raw.get('_error'):
+        raise ValueError(raw['_error'])
+
+    email = _value(raw.get('email'))
+    if not isinstance(email, str) or '@' not in email:
+        raise ValueError("E-mail ausente ou inválido")
+
+    data: Dict[str, Any] = {field: _value(raw.get(field)) for field in _FAN_FIELDS}
+    data['email'] = email.lower()
+    data['user_id'] = fan_uid(email)
+    for field in _LIST_FIELDS:
+        data[field] = _split(raw.get(field))
+
+    address = raw.get('address') if isinstance(raw.get('address'), Mapping) else raw
+    address = {field: _value(address.get(field)) for field in _ADDRESS_FIELDS if _value(address.get(field))}
+    if address:
+        data['address'] = address
+
+    try:
+        fan = Fan.model_validate({key: value for key, value in data.items() if value is not None})
+    except ValidationError as e:
+        reasons = "; ".join(f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors())
+        raise ValueError(reasons)
+
+    fan.id = fan.user_id
+    fan.updated_at = fan.created_at
+    fan.profile_completeness, fan.completeness_contributions = profile_completeness.score(fan)
+    return fan
+
+
+def _chunks(rows: Iterable, size: int) -> Iterator[List]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _is_transient(error: Exception) -> bool:
+    from google.api_core import exceptions as api
+    from firebase_admin import exceptions as firebase
+
+    return isinstance(error, (api.ServiceUnavailable, api.DeadlineExceeded, api.Aborted, api.InternalServerError,
+                              api.TooManyRequests, api.ResourceExhausted, firebase.UnavailableError,
+                              firebase.DeadlineExceededError, firebase.InternalError, firebase.ResourceExhaustedError))
+
+
+class ImportFansJob:
+    def __init__(self, db=None, auth_client=None, stats=None, chunk_size: int = CHUNK_SIZE,
+                 batch_size: int = BATCH_SIZE, workers: int = WORKERS, max_attempts: int = MAX_ATTEMPTS,
+                 report_path: Optional[str] = None, dry_run: bool = False, backoff: float = 0.5):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        if auth_client is None and not dry_run:
+            from src.infrastructure.config.firebase import get_auth
+            auth_client = get_auth()
+        if stats is None:
+            from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+            stats = FirestoreFanStatsRepository(db)
+        self.db = db
+        self.auth = auth_client
+        self.stats = stats
+        self.collection = db.collection('fans')
+        self.chunk_size = min(chunk_size, CHUNK_SIZE)
+        # Uma escrita de cada batch fica para o fragmento dos agregados
+        self.fans_per_batch = max(1, min(batch_size, BATCH_SIZE) - 1)
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.report_path = report_path
+        self.dry_run = dry_run
+        self.backoff = backoff
+
+    def _retry(self, call, description: str):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return call()
+            except Exception as e:
+                if attempt == self.max_attempts or not _is_transient(e):
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"{description}: {e}; nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+
+    def _existing(self, uids: List[str]) -> set:
+        refs = [self.collection.document(uid) for uid in uids]
+        snapshots = self._retry(lambda: list(self.db.get_all(refs, field_paths=['user_id'])), "Leitura de fãs")
+        return {snapshot.id for snapshot in snapshots if snapshot.exists}
+
+    def _import_users(self, fans: List[Tuple[int, Fan]]) -> Dict[int, str]:
+        """Create/overwrite the Auth users of a chunk; returns {position: reason} for rejected ones"""
+        from firebase_admin import auth
+
+        records = [auth.ImportUserRecord(uid=fan.user_id, email=fan.email, display_name=fan.name,
+                                         email_verified=False) for _, fan in fans]
+        result = self._retry(lambda: self.auth.import_users(records), "Importação de usuários")
+        return {error.index: error.reason for error in result.errors}
+
+    def _commit(self, fans: List[Tuple[int, Fan]]) -> Tuple[int, int]:
+        """Create one batch of fan documents plus their aggregates; returns (written, already present)"""
+        from google.api_core.exceptions import AlreadyExists
+
+        pending = fans
+        skipped = 0
+        for attempt in range(1, self.max_attempts + 1):
+            batch = self.db.batch()
+            totals = fan_stats.empty()
+            for _, fan in pending:
+                batch.create(self.collection.document(fan.user_id), fan_codec.encode(fan))
+                fan_stats.accumulate(totals, fan_stats.contribution(fan))
+            self.stats.stage(batch, totals)
+            try:
+                batch.commit()
+                return len(pending), skipped
+            except AlreadyExists:
+                # Outra execução (ou um commit anterior que deu timeout mas foi aplicado) já criou
+                # parte dos documentos: a batch inteira foi rejeitada, refaz sem eles
+                existing = self._existing([fan.user_id for _, fan in pending])
+                skipped += len(existing)
+                pending = [(line, fan) for line, fan in pending if fan.user_id not in existing]
+                if not pending:
+                    return 0, skipped
+            except Exception as e:
+                if attempt == self.max_attempts or not _is_transient(e):
+                    raise
+                delay = self.backoff * 2 ** (attempt - 1)
+                logger.warning(f"Commit de {len(pending)} fãs: {e}; nova tentativa em {delay:.1f}s")
+                time.sleep(delay)
+        raise RuntimeError(f"Commit de {len(pending)} fãs não concluído após {self.max_attempts} tentativas")
+
+    def run(self, rows: Iterable[Row]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        stats = {'rows': 0, 'imported': 0, 'skipped': 0, 'errors': 0}
+        report = open(self.report_path, 'w', encoding='utf-8') if self.report_path else None
+        seen = set()
+
+        def reject(line: int, email, reason: str):
+            stats['errors'] += 1
+            if report:
+                report.write(json.dumps({'line': line, 'email': email, 'error': reason}, ensure_ascii=False) + '\n')
+
+        def collect(done):
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    written, skipped = future.result()
+                    stats['imported'] += written
+                    stats['skipped'] += skipped
+                except Exception as e:
+                    logger.error(f"Falha ao gravar {len(batch)} fãs: {e}")
+                    for line, fan in batch:
+                        reject(line, fan.email, f"Falha ao gravar: {e}")
+
+        in_flight: Dict[Any, List[Tuple[int, Fan]]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            for chunk in _chunks(rows, self.chunk_size):
+                stats['rows'] += len(chunk)
+                valid: List[Tuple[int, Fan]] = []
+                for line, raw in chunk:
+                    try:
+                        fan = parse_row(raw)
+                    except ValueError as e:
+                        reject(line, raw.get('email'), str(e))
+                        continue
+                    if fan.user_id in seen:
+                        reject(line, fan.email, "E-mail repetido no arquivo")
+                        continue
+                    seen.add(fan.user_id)
+                    valid.append((line, fan))
+
+                if self.dry_run or not valid:
+                    continue
+
+                existing = self._existing([fan.user_id for _, fan in valid])
+                stats['skipped'] += len(existing)
+                valid = [(line, fan) for line, fan in valid if fan.user_id not in existing]
+                if not valid:
+                    continue
+
+                rejected = self._import_users(valid)
+                for position, reason in sorted(rejected.items()):
+                    line, fan = valid[position]
+                    reject(line, fan.email, f"Auth: {reason}")
+                valid = [item for position, item in enumerate(valid) if position not in rejected]
+
+                for start in range(0, len(valid), self.fans_per_batch):
+                    batch = valid[start:start + self.fans_per_batch]
+                    in_flight[executor.submit(self._commit, batch)] = batch
+                # Limita as batches em voo para a memória não crescer com o arquivo
+                while len(in_flight) > 2 * self.workers:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    collect(done)
+                logger.info(f"{stats['rows']} linhas lidas, {stats['imported']} fãs gravados, {stats['errors']} erros")
+
+            collect(wait(list(in_flight)).done)
+        finally:
+            executor.shutdown(wait=True)
+            if report:
+                report.close()
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_s'] = round(elapsed, 3)
+        stats['rows_per_s'] = round(stats['rows'] / elapsed, 1) if elapsed > 0 else 0.0
+        stats['dry_run'] = self.dry_run
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa fãs em massa de um CSV ou JSONL")
+    parser.add_argument("path", help="arquivo .csv (com cabeçalho) ou .jsonl")
+    parser.add_argument("--report", help="relatório de erros em JSONL (padrão: <arquivo>.errors.jsonl)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="commits em paralelo")
+    parser.add_argument("--dry-run", action="store_true", help="só valida as linhas")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = ImportFansJob(workers=args.workers, dry_run=args.dry_run,
+                        report_path=args.report or f"{args.path}.errors.jsonl")
+    print(json.dumps(job.run(read_rows(args.path)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
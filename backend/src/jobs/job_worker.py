@@ -0,0 +1,208 @@
+"""
+Worker dos jobs em segundo plano (verificação de documentos e de perfis de
+esports), lidos de uma `JobQueue` persistente.
+
+Cada tipo de job tem o seu limite de execuções simultâneas; o worker só
+reserva jobs dos tipos com vaga, então um tipo lento não ocupa os slots dos
+demais. Um job que falha volta para a fila com backoff exponencial
+(`backoff * 2 ** (tentativa - 1)`, até `max_backoff`) e, esgotadas as
+tentativas, fica na lista de dead letters, de onde pode ser recolocado com
+`retry`.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.job_worker run --concurrency verify_document=4
+    python -m src.jobs.job_worker status <job_id>
+    python -m src.jobs.job_worker dead
+    python -m src.jobs.job_worker retry <job_id>
+"""
+import argparse
+import json
+import logging
+import sys
+import threading
+import uuid
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from src.domain.entities.job import Job, DEAD
+from src.domain.repositories.job_queue import JobQueue
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict[str, Any]], Any]
+
+
+class JobWorker:
+    def __init__(self, queue: JobQueue, handlers: Mapping[str, Handler],
+                 concurrency: Optional[Mapping[str, int]] = None, default_concurrency: int = 2,
+                 lease_seconds: float = 300.0, backoff: float = 2.0, max_backoff: float = 600.0,
+                 poll_interval: float = 1.0, worker_id: Optional[str] = None):
+        unknown = set(concurrency or {}) - set(handlers)
+        if unknown:
+            raise ValueError(f"No handler for job types: {', '.join(sorted(unknown))}")
+
+        self.queue = queue
+        self.handlers = dict(handlers)
+        self.limits = {job_type: (concurrency or {}).get(job_type, default_concurrency) for job_type in handlers}
+        self.lease_seconds = lease_seconds
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or uuid.uuid4().hex[:12]
+        self.stats: Counter = Counter()
+        self._running: Counter = Counter()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def retry_delay(self, attempts: int) -> float:
+        return min(self.max_backoff, self.backoff * 2 ** (attempts - 1))
+
+    def _free_types(self) -> List[str]:
+        with self._lock:
+            return [job_type for job_type, limit in self.limits.items() if self._running[job_type] < limit]
+
+    def _execute(self, job: Job) -> None:
+        outcome = 'failed'
+        try:
+            self.handlers[job.type](job.payload)
+        except Exception as error:
+            failed = self.queue.fail(job.id, self.worker_id, f"{type(error).__name__}: {error}",
+                                     self.retry_delay(job.attempts))
+            if failed is None:
+                outcome = 'lease_lost'
+                logger.warning("Job %s (%s) failed after its lease was lost, result dropped: %s",
+                               job.id, job.type, error)
+            else:
+                outcome = 'dead' if failed.status == DEAD else 'retried'
+                logger.warning("Job %s (%s) failed on attempt %d, %s: %s",
+                               job.id, job.type, job.attempts, outcome, error)
+        else:
+            if self.queue.complete(job.id, self.worker_id):
+                outcome = 'succeeded'
+            else:
+                outcome = 'lease_lost'
+                logger.warning("Job %s (%s) finished after its lease was lost, result dropped", job.id, job.type)
+        finally:
+            with self._lock:
+                self._running[job.type] -= 1
+                self.stats[outcome] += 1
+            self._wake.set()
+
+    def poll(self) -> int:
+        """Claim and start ready jobs while their types have free slots; returns how many started"""
+        started = 0
+        while not self._stopping.is_set():
+            job_types = self._free_types()
+            if not job_types:
+                break
+            job = self.queue.claim(job_types, self.worker_id, self.lease_seconds)
+            if job is None:
+                break
+            with self._lock:
+                self._running[job.type] += 1
+            self._executor.submit(self._execute, job)
+            started += 1
+        return started
+
+    def _busy(self) -> bool:
+        with self._lock:
+            return any(self._running.values())
+
+    def run(self, until_idle: bool = False) -> Dict[str, int]:
+        """Process jobs until stop() (or, with until_idle, until nothing is ready or running)"""
+        self._stopping.clear()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, sum(self.limits.values())),
+                                            thread_name_prefix='job-worker')
+        try:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                # Ocupação lida antes do poll: um job que termine durante o poll não
+                # pode fazer parecer ociosa uma fila com jobs ainda sem vaga
+                busy = self._busy()
+                started = self.poll()
+                if until_idle and not started and not busy:
+                    break
+                # Acorda antes do intervalo quando um job termina e libera vaga
+                self._wake.wait(self.poll_interval)
+        finally:
+            self._executor.shutdown(wait=True)
+        return dict(self.stats)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+
+def _parse_concurrency(values: List[str]) -> Dict[str, int]:
+    limits = {}
+    for value in values:
+        job_type, _, limit = value.partition('=')
+        if not limit.isdigit() or int(limit) < 1:
+            raise ValueError(f"Expected TYPE=N with N >= 1, got '{value}'")
+        limits[job_type] = int(limit)
+    return limits
+
+
+def _job_json(job: Job) -> Dict[str, Any]:
+    return json.loads(job.model_dump_json())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker e consulta dos jobs em segundo plano")
+    parser.add_argument("--database", help="arquivo SQLite da fila (padrão: SQLITE_PATH)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="processa jobs até ser interrompido")
+    run.add_argument("--concurrency", action="append", default=[], metavar="TYPE=N",
+                     help="limite de jobs simultâneos por tipo (padrão 2)")
+    run.add_argument("--lease", type=float, default=300.0, help="prazo da reserva de um job, em segundos")
+    run.add_argument("--backoff", type=float, default=2.0, help="espera antes da 1ª nova tentativa, em segundos")
+    run.add_argument("--until-idle", action="store_true", help="sai quando não houver jobs prontos")
+
+    status = commands.add_parser("status", help="mostra um job")
+    status.add_argument("job_id")
+    dead = commands.add_parser("dead", help="lista os dead letters")
+    dead.add_argument("--limit", type=int, default=100)
+    retry = commands.add_parser("retry", help="recoloca um dead letter na fila")
+    retry.add_argument("job_id")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+    from src.infrastructure.repositories.sqlite_job_queue import SqliteJobQueue
+
+    queue = SqliteJobQueue(SqliteDatabase(args.database) if args.database else None)
+
+    if args.command == "status":
+        job = queue.get(args.job_id)
+        print(json.dumps(_job_json(job) if job else None))
+        return 0 if job else 1
+    if args.command == "dead":
+        print(json.dumps([_job_json(job) for job in queue.dead_letters(args.limit)]))
+        return 0
+    if args.command == "retry":
+        print(json.dumps(_job_json(queue.retry(args.job_id))))
+        return 0
+
+    from src.application.usecases.fan_usecase_impl import FanUseCaseImpl
+    from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+
+    handlers = FanUseCaseImpl(FirestoreFanRepository(), job_queue=queue).job_handlers()
+    worker = JobWorker(queue, handlers, concurrency=_parse_concurrency(args.concurrency),
+                       lease_seconds=args.lease, backoff=args.backoff)
+    try:
+        stats = worker.run(until_idle=args.until_idle)
+    except KeyboardInterrupt:
+        worker.stop()
+        stats = dict(worker.stats)
+    print(json.dumps({**stats, 'queue': queue.counts()}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
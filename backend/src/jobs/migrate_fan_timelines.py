@@ -0,0 +1,190 @@
+"""
+Move as compras e os interesses em eventos dos arrays do documento do fã
+para as subcoleções `fans/{uid}/purchases` e `fans/{uid}/events`.
+
+Percorre a coleção `fans` em páginas ordenadas pelo id, lendo só os arrays e
+os contadores (field mask); a memória não depende do tamanho da coleção nem
+do número de fãs com histórico. Os itens de cada fã são movidos em
+WriteBatches de até 500 escritas: cada batch cria os documentos de um trecho
+do array e, no mesmo commit atômico, os retira do array com `ArrayRemove`.
+Um item nunca fica nos dois lugares nem em nenhum, e uma execução
+interrompida pode ser repetida ou continuada do checkpoint sem duplicar nada.
+
+As compras movidas entram também nos baldes de gasto por dia/mês/total
+(`spend_rollups`), no mesmo batch; por isso os trechos de compras são menores
+(cada compra pode tocar até 4 baldes novos).
+
+Contadores: `event_count` é novo, então cada trecho de eventos movido o
+incrementa. `purchase_count`/`total_spent` já contam as compras do array
+desde que passaram a ser mantidos com `Increment`; só documentos antigos,
+sem esses campos, recebem o total do array, no primeiro batch do fã.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.migrate_fan_timelines --checkpoint timelines.json
+    python -m src.jobs.migrate_fan_timelines --checkpoint timelines.json --resume
+"""
+import argparse
+import hashlib
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from firebase_admin import firestore
+
+from src.infrastructure.repositories.fan_timeline import PURCHASES, EVENTS, timeline_entry
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+from src.jobs.checkpoint import load_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 500
+BATCH_SIZE = 500  # limite de escritas por WriteBatch do Firestore
+
+SELECTED_FIELDS = ['purchases', 'event_interests', 'purchase_count', 'total_spent', 'created_at']
+
+
+def entry_id(fan_id: str, item: Dict[str, Any]) -> str:
+    """Stable id for a legacy array item, so a repeated move overwrites instead of duplicating"""
+    if item.get('id'):
+        return str(item['id'])
+    payload = json.dumps(item, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(f"{fan_id}:{payload}".encode('utf-8')).hexdigest()
+
+
+class MigrateFanTimelinesJob:
+    def __init__(self, db=None, rollups: Optional[FirestoreSpendRollupRepository] = None,
+                 page_size: int = PAGE_SIZE, batch_size: int = BATCH_SIZE,
+                 checkpoint_path: Optional[str] = None, dry_run: bool = False):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        self.db = db
+        self.rollups = rollups or FirestoreSpendRollupRepository(db)
+        self.collection = db.collection('fans')
+        self.page_size = page_size
+        batch_size = min(batch_size, BATCH_SIZE)
+        # Uma escrita de cada batch é a atualização do documento do fã; uma
+        # compra soma o seu documento e até 4 baldes, mais os 2 baldes do total
+        self.event_chunk = batch_size - 1
+        self.purchase_chunk = max(1, (batch_size - 3) // 5)
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+
+    def _move(self, reference, field: str, subcollection: str, items: List[Dict[str, Any]],
+              recorded_at, counters: Dict[str, Any]) -> int:
+        """Move one array into its subcollection; returns the number of batches committed"""
+        batches = 0
+        chunk_size = self.purchase_chunk if subcollection == PURCHASES else self.event_chunk
+        for start in range(0, len(items), chunk_size):
+            chunk = items[start:start + chunk_size]
+            batch = self.db.batch()
+            for item in chunk:
+                document = reference.collection(subcollection).document(entry_id(reference.id, item))
+                batch.set(document, timeline_entry(item, recorded_at(item)))
+            fields = {field: firestore.ArrayRemove(chunk)}
+            if subcollection == EVENTS:
+                fields['event_count'] = firestore.Increment(len(chunk))
+            else:
+                self.rollups.stage(batch, reference.id,
+                                   [(item.get('amount') or 0.0, recorded_at(item)) for item in chunk])
+            fields.update(counters)
+            counters = {}
+            # Contadores exportados mudaram: `updated_at` leva o fã à próxima exportação incremental
+            fields['updated_at'] = datetime.now()
+            batch.update(reference, fields)
+            batch.commit()
+            batches += 1
+        return batches
+
+    def migrate(self, snapshot) -> Dict[str, int]:
+        """Move one fan's arrays; returns the number of purchases, events and batches moved"""
+        data = snapshot.to_dict() or {}
+        purchases = list(data.get('purchases') or [])
+        events = list(data.get('event_interests') or [])
+        moved = {'purchases': len(purchases), 'events': len(events), 'batches': 0}
+        if self.dry_run or not (purchases or events):
+            return moved
+
+        created_at = data.get('created_at')
+        counters = {}
+        if purchases and data.get('purchase_count') is None:
+            # Documento anterior aos contadores: eles passam a contar o array inteiro
+            counters = {
+                'purchase_count': firestore.Increment(len(purchases)),
+                'total_spent': firestore.Increment(float(sum(item.get('amount') or 0 for item in purchases))),
+            }
+
+        moved['batches'] += self._move(snapshot.reference, 'purchases', PURCHASES, purchases,
+                                       lambda item: item.get('purchase_date') or created_at, counters)
+        moved['batches'] += self._move(snapshot.reference, 'event_interests', EVENTS, events,
+                                       lambda item: item.get('event_date') or created_at, {})
+        return moved
+
+    def run(self, start_after: Optional[str] = None, resume: bool = False,
+            max_docs: Optional[int] = None) -> Dict[str, Any]:
+        state = load_checkpoint(self.checkpoint_path) if resume else {}
+        start_after = start_after or state.get('last_id')
+        stats = {
+            'processed': state.get('processed', 0),
+            'migrated': state.get('migrated', 0),
+            'purchases': state.get('purchases', 0),
+            'events': state.get('events', 0),
+            'batches': state.get('batches', 0),
+            'last_id': start_after,
+        }
+
+        started = time.perf_counter()
+        processed_now = 0
+        for snapshots in scan_pages(self.collection, SELECTED_FIELDS, self.page_size, start_after):
+            for snapshot in snapshots:
+                moved = self.migrate(snapshot)
+                if moved['purchases'] or moved['events']:
+                    stats['migrated'] += 1
+                for name in ('purchases', 'events', 'batches'):
+                    stats[name] += moved[name]
+
+            processed_now += len(snapshots)
+            stats['processed'] += len(snapshots)
+            stats['last_id'] = snapshots[-1].id
+            if not self.dry_run:
+                save_checkpoint(self.checkpoint_path, stats)
+            logger.info(f"{stats['processed']} fãs lidos, {stats['migrated']} migrados "
+                        f"({stats['purchases']} compras, {stats['events']} eventos) até {stats['last_id']}")
+
+            if max_docs and processed_now >= max_docs:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_s'] = round(elapsed, 3)
+        stats['docs_per_s'] = round(processed_now / elapsed, 1) if elapsed > 0 else 0.0
+        stats['dry_run'] = self.dry_run
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Move compras e eventos dos fãs para subcoleções")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="escritas por WriteBatch (máx. 500)")
+    parser.add_argument("--checkpoint", help="arquivo JSON com o último id processado")
+    parser.add_argument("--resume", action="store_true", help="continua a partir do checkpoint")
+    parser.add_argument("--start-after", help="id do documento a partir do qual começar")
+    parser.add_argument("--max-docs", type=int, help="para depois de processar este número de fãs")
+    parser.add_argument("--dry-run", action="store_true", help="conta o que seria movido sem gravar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = MigrateFanTimelinesJob(page_size=args.page_size, batch_size=args.batch_size,
+                                 checkpoint_path=args.checkpoint, dry_run=args.dry_run)
+    stats = job.run(start_after=args.start_after, resume=args.resume, max_docs=args.max_docs)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Reconstrói os agregados da base de fãs (`fan_stats`) a partir de uma
+varredura completa da coleção `fans`.
+
+Os contadores fragmentados são mantidos pelas escritas de perfil; este job
+serve para criá-los pela primeira vez, depois de mudar as regras de
+`domain.rules.fan_stats` ou para corrigir desvios (escritas feitas fora do
+backend, por exemplo). Lê só os campos usados pelas regras, soma a
+contribuição de cada fã em memória e sobrescreve os fragmentos em uma única
+WriteBatch. Escritas de perfil feitas durante a varredura podem ficar de
+fora; rode em horário de pouco movimento.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.rebuild_fan_stats
+    python -m src.jobs.rebuild_fan_stats --dry-run
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Any, Dict
+
+from src.domain.rules import fan_stats
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+class RebuildFanStatsJob:
+    def __init__(self, db=None, stats=None, page_size: int = PAGE_SIZE, dry_run: bool = False):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        if stats is None:
+            from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+            stats = FirestoreFanStatsRepository(db)
+        self.db = db
+        self.stats = stats
+        self.collection = db.collection('fans')
+        self.page_size = page_size
+        self.dry_run = dry_run
+
+    def run(self) -> Dict[str, Any]:
+        started = time.perf_counter()
+        totals = fan_stats.empty()
+        processed = 0
+
+        for snapshots in scan_pages(self.collection, fan_stats.SOURCE_FIELDS, self.page_size):
+            for snapshot in snapshots:
+                fan_stats.accumulate(totals, fan_stats.contribution(snapshot.to_dict() or {}))
+            processed += len(snapshots)
+            logger.info(f"{processed} fãs lidos (até {snapshots[-1].id})")
+
+        totals['total_spent'] = round(totals['total_spent'], 2)
+        if not self.dry_run:
+            self.stats.replace(totals)
+
+        elapsed = time.perf_counter() - started
+        return {
+            'processed': processed,
+            'fans': totals['fans'],
+            'games': len(totals['games']),
+            'teams': len(totals['teams']),
+            'states': len(totals['states']),
+            'total_spent': totals['total_spent'],
+            'elapsed_s': round(elapsed, 3),
+            'docs_per_s': round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+            'dry_run': self.dry_run,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reconstrói os agregados da base de fãs")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="calcula sem gravar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    stats = RebuildFanStatsJob(page_size=args.page_size, dry_run=args.dry_run).run()
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+Recalcula a completude de perfil de todos os fãs.
+
+Percorre a coleção `fans` em páginas ordenadas pelo id do documento, lendo só
+os campos usados pelas regras (field mask). Cada página vira uma matriz
+booleana de características (uma coluna por nível de cada regra) e é
+pontuada com um único produto matriz-vetor contra os pesos das regras. Só os
+documentos cuja pontuação mudou são gravados, em WriteBatches de até 500
+escritas. O último id processado vai para um arquivo de checkpoint, de onde
+uma execução interrompida pode continuar.
+
+Uso (a partir da pasta backend):
+
+    python -m src.jobs.recompute_completeness --checkpoint recompute.json
+    python -m src.jobs.recompute_completeness --checkpoint recompute.json --resume
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.domain.rules import profile_completeness
+from src.domain.rules.profile_completeness import RULES
+from src.infrastructure.repositories.firestore_pagination import scan_pages
+from src.jobs.checkpoint import load_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+BATCH_SIZE = 500  # limite de escritas por WriteBatch do Firestore
+
+SELECTED_FIELDS = sorted(profile_completeness.MASK_FIELDS | {'profile_completeness', 'completeness_contributions'})
+
+# Uma coluna de característica por nível de cada regra: a coluna k da regra r
+# é "measure_r >= k" e vale `step` pontos
+_FEATURE_RULE = np.repeat(np.arange(len(RULES)), [rule.levels for rule in RULES])
+_FEATURE_LEVEL = np.concatenate([np.arange(1, rule.levels + 1) for rule in RULES])
+FEATURE_WEIGHTS = np.repeat([rule.step for rule in RULES], [rule.levels for rule in RULES]).astype(np.int32)
+_RULE_STARTS = np.concatenate([[0], np.cumsum([rule.levels for rule in RULES])[:-1]])
+
+
+def measure_columns(docs: Sequence[Dict[str, Any]]) -> np.ndarray:
+    """Per-rule measures (fans x rules) for a page of documents"""
+    measures = np.empty((len(docs), len(RULES)), dtype=np.int32)
+    for column, rule in enumerate(RULES):
+        measures[:, column] = np.fromiter((rule.measure(doc) for doc in docs), dtype=np.int32, count=len(docs))
+    return measures
+
+
+def feature_matrix(measures: np.ndarray) -> np.ndarray:
+    """Boolean feature matrix (fans x features) from per-rule measures"""
+    return measures[:, _FEATURE_RULE] >= _FEATURE_LEVEL
+
+
+def score_page(docs: Sequence[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Score a page of documents; returns (scores, per-rule contributions)"""
+    if not docs:
+        return np.zeros(0, dtype=np.int32), np.zeros((0, len(RULES)), dtype=np.int32)
+
+    features = feature_matrix(measure_columns(docs))
+    scores = np.minimum(features @ FEATURE_WEIGHTS, profile_completeness.MAX_SCORE)
+    contributions = np.add.reduceat(features * FEATURE_WEIGHTS, _RULE_STARTS, axis=1)
+    return scores, contributions
+
+
+class RecomputeCompletenessJob:
+    def __init__(self, db=None, page_size: int = PAGE_SIZE, batch_size: int = BATCH_SIZE,
+                 checkpoint_path: Optional[str] = None, dry_run: bool = False):
+        if db is None:
+            from src.infrastructure.config.firebase import get_firestore
+            db = get_firestore()
+        self.db = db
+        self.collection = db.collection('fans')
+        self.page_size = page_size
+        self.batch_size = min(batch_size, BATCH_SIZE)
+        self.checkpoint_path = checkpoint_path
+        self.dry_run = dry_run
+
+    def _changed(self, snapshots, docs, scores, contributions) -> List[Tuple[Any, Dict[str, Any]]]:
+        """Documents whose stored score or contribution vector differs from the new one"""
+        names = [rule.name for rule in RULES]
+        changed = []
+        for snapshot, doc, score, row in zip(snapshots, docs, scores.tolist(), contributions.tolist()):
+            vector = dict(zip(names, row))
+            if doc.get('profile_completeness') != score or doc.get('completeness_contributions') != vector:
+                changed.append((snapshot.reference, {
+                    'profile_completeness': score,
+                    'completeness_contributions': vector,
+                }))
+        return changed
+
+    def _write(self, changes: List[Tuple[Any, Dict[str, Any]]]):
+        # `updated_at` muda junto: a exportação incremental e os índices em
+        # memória acompanham as alterações por esse campo
+        now = datetime.now()
+        for start in range(0, len(changes), self.batch_size):
+            batch = self.db.batch()
+            for reference, fields in changes[start:start + self.batch_size]:
+                batch.update(reference, {**fields, 'updated_at': now})
+            batch.commit()
+
+    def run(self, start_after: Optional[str] = None, resume: bool = False,
+            max_docs: Optional[int] = None) -> Dict[str, Any]:
+        state = load_checkpoint(self.checkpoint_path) if resume else {}
+        start_after = start_after or state.get('last_id')
+        stats = {
+            'processed': state.get('processed', 0),
+            'updated': state.get('updated', 0),
+            'pages': state.get('pages', 0),
+            'last_id': start_after,
+        }
+
+        started = time.perf_counter()
+        processed_now = 0
+        for snapshots in scan_pages(self.collection, SELECTED_FIELDS, self.page_size, start_after):
+            page_started = time.perf_counter()
+            docs = [snapshot.to_dict() or {} for snapshot in snapshots]
+            scores, contributions = score_page(docs)
+            changes = self._changed(snapshots, docs, scores, contributions)
+            if not self.dry_run:
+                self._write(changes)
+
+            processed_now += len(docs)
+            stats['processed'] += len(docs)
+            stats['updated'] += len(changes)
+            stats['pages'] += 1
+            stats['last_id'] = snapshots[-1].id
+            if not self.dry_run:
+                save_checkpoint(self.checkpoint_path, stats)
+
+            page_seconds = time.perf_counter() - page_started
+            logger.info(f"Página {stats['pages']}: {len(docs)} fãs, {len(changes)} alterados, "
+                        f"{len(docs) / max(page_seconds, 1e-9):.0f} fãs/s (até {stats['last_id']})")
+
+            if max_docs and processed_now >= max_docs:
+                break
+
+        elapsed = time.perf_counter() - started
+        stats['elapsed_s'] = round(elapsed, 3)
+        stats['docs_per_s'] = round(processed_now / elapsed, 1) if elapsed > 0 else 0.0
+        stats['dry_run'] = self.dry_run
+        return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recalcula a completude de perfil de todos os fãs")
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="escritas por WriteBatch (máx. 500)")
+    parser.add_argument("--checkpoint", help="arquivo JSON com o último id processado")
+    parser.add_argument("--resume", action="store_true", help="continua a partir do checkpoint")
+    parser.add_argument("--start-after", help="id do documento a partir do qual começar")
+    parser.add_argument("--max-docs", type=int, help="para depois de processar este número de fãs")
+    parser.add_argument("--dry-run", action="store_true", help="calcula sem gravar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    job = RecomputeCompletenessJob(page_size=args.page_size, batch_size=args.batch_size,
+                                   checkpoint_path=args.checkpoint, dry_run=args.dry_run)
+    stats = job.run(start_after=args.start_after, resume=args.resume, max_docs=args.max_docs)
+    print(json.dumps(stats, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
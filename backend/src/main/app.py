@@ -41,6 +41,12 @@ from src.main.routes import setup_routes
 # Configurar rotas
 setup_routes(app)
 
+# No modo preload, o estado somente leitura é carregado antes do fork dos workers
+from src.main.startup import is_preload_mode, warm_shared_state
+
+if is_preload_mode():
+    warm_shared_state()
+
 if __name__ == "__main__":
     # Usar configuração do run.py em produção
     app.run(debug=True, host="0.0.0.0", port=5000) 
\ No newline at end of file
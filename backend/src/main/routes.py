@@ -1,13 +1,17 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from datetime import datetime
 from src.services.auth_service import register_user, login_user, verify_token
 from src.services.user_service import update_user_profile, get_user_profile_image, get_user_profile
 from src.services.document_service import analyze_document
+from src.infrastructure.config.firebase import get_firestore
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+from src.infrastructure.repositories.firestore_fan_listing import FanListQuery, FirestoreFanListing
+from src.infrastructure.repositories.firestore_event_repository import FirestoreEventRepository
+from src.domain.entities.event import Event
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+from src.infrastructure.twitter.twitter_client import get_twitter_client
 from functools import wraps
-import firebase_admin
-from firebase_admin import firestore
 import time
-import requests
 import hmac
 import hashlib
 import base64
@@ -26,12 +30,13 @@ TWITTER_BEARER_TOKEN = "AAAAAAAAAAAAAAAAAAAAAJHJpAEAAAAAH7oG8rmqlpUKXL%2FqqNp0rX
 # Format: {'user_id': {'oauth_token': 'oauth_token_secret'}}
 TOKEN_SECRETS = {}
 
-# Try to get Firestore database instance
-try:
-    db = firestore.client()
-except Exception as e:
-    print(f"Error initializing Firebase: {e}")
-    db = None
+def get_db():
+    # Cliente criado sob demanda, depois do fork do worker
+    try:
+        return get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firebase: {e}")
+        return None
 
 def token_required(f):
     @wraps(f)
@@ -54,6 +59,17 @@ def token_required(f):
     
     return decorated
 
+def admin_required(f):
+    # Usuários com a custom claim `admin` (definida pelo Admin SDK)
+    @token_required
+    @wraps(f)
+    def decorated(user, *args, **kwargs):
+        if not user.get('admin'):
+            return jsonify({"error": "Admin privileges required"}), 403
+        return f(user, *args, **kwargs)
+    
+    return decorated
+
 def setup_routes(app: Flask):
     @app.route('/health', methods=['GET'])
     def health_check():
@@ -274,6 +290,368 @@ def setup_routes(app: Flask):
             app.logger.error(f"Error getting profile image: {str(e)}")
             return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
     
+    @app.route('/api/users/timeline/<kind>', methods=['GET'])
+    @token_required
+    def get_user_timeline(user, kind):
+        # Compras ou eventos do usuário, do mais recente ao mais antigo, em páginas por cursor
+        if kind not in ('purchases', 'events'):
+            return jsonify({"error": "Timeline must be 'purchases' or 'events'"}), 404
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        # Importado aqui: o repositório carrega o cliente gRPC do Firestore
+        from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+
+        repository = FirestoreFanRepository(db)
+        timeline = repository.list_purchases if kind == 'purchases' else repository.list_event_interests
+        try:
+            items, cursor = timeline(user['uid'], limit, request.args.get('cursor'))
+            return jsonify({kind: [item.model_dump(mode='json') for item in items], "next": cursor}), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error getting {kind} timeline: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/analytics/overview', methods=['GET'])
+    @token_required
+    def get_fan_base_overview(user):
+        # Lê só os fragmentos de fan_stats, nunca a coleção de fãs
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            overview = FirestoreFanStatsRepository(db).get_overview(limit)
+            return jsonify({"overview": overview}), 200
+        except Exception as e:
+            app.logger.error(f"Error getting fan base overview: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    def spend_series(fan_id=None):
+        # Uma leitura por período pedido (mais os fragmentos da base no período corrente)
+        granularity = request.args.get('granularity', 'month')
+        if granularity not in ('month', 'day'):
+            return jsonify({"error": "'granularity' must be 'month' or 'day'"}), 400
+        periods = request.args.get('periods', 12 if granularity == 'month' else 30, type=int)
+        periods = min(max(periods, 1), 60 if granularity == 'month' else 90)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            rollups = FirestoreSpendRollupRepository(db)
+            if granularity == 'month':
+                series = rollups.by_month(periods, fan_id)
+            else:
+                series = rollups.by_day(periods, fan_id)
+            return jsonify({"granularity": granularity, "series": series,
+                            "lifetime": rollups.lifetime(fan_id)}), 200
+        except Exception as e:
+            app.logger.error(f"Error getting spend series: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/analytics/spend', methods=['GET'])
+    @admin_required
+    def get_fan_base_spend(user):
+        return spend_series()
+    
+    @app.route('/api/users/spend', methods=['GET'])
+    @token_required
+    def get_user_spend(user):
+        return spend_series(user['uid'])
+    
+    @app.route('/api/fans', methods=['GET'])
+    @admin_required
+    def list_fans(user):
+        # Uma consulta paginada por página: memória e latência não crescem com a coleção
+        try:
+            query = FanListQuery.from_args(request.args)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        listing = FirestoreFanListing(db)
+        cursor = request.args.get('cursor')
+        
+        if request.args.get('format') == 'ndjson':
+            try:
+                rows = listing.stream(query, cursor)
+                first = next(rows, None)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            except Exception as e:
+                app.logger.error(f"Error listing fans: {str(e)}")
+                return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+            
+            def generate():
+                if first is None:
+                    return
+                yield json.dumps(first, ensure_ascii=False) + '\n'
+                for row in rows:
+                    yield json.dumps(row, ensure_ascii=False) + '\n'
+            
+            return Response(generate(), mimetype='application/x-ndjson'), 200
+        
+        try:
+            return jsonify(listing.page(query, cursor)), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error listing fans: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/fans/<fan_id>/lookalikes', methods=['GET'])
+    @admin_required
+    def get_fan_lookalikes(user, fan_id):
+        limit = min(max(request.args.get('limit', 1000, type=int), 1), 5000)
+        
+        try:
+            # NumPy só é importado quando o índice é usado
+            from src.infrastructure.segments.lookalike_index import get_lookalike_index
+            index = get_lookalike_index()
+        except FileNotFoundError:
+            return jsonify({
+                "error": "Lookalike index unavailable",
+                "message": "Run python -m src.jobs.build_lookalike_index to build it."
+            }), 503
+        except Exception as e:
+            app.logger.error(f"Error loading lookalike index: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+        
+        if fan_id not in index:
+            return jsonify({"error": "Fan not found in the lookalike index"}), 404
+        
+        started = time.perf_counter()
+        lookalikes = index.similar([fan_id], limit=limit)
+        return jsonify({
+            "fan_id": fan_id,
+            "lookalikes": lookalikes,
+            "built_at": index.built_at,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        }), 200
+    
+    @app.route('/api/geo/fans', methods=['GET'])
+    @admin_required
+    def get_fans_near(user):
+        # Centro por CEP, cidade/UF ou lat/lon; contagem e os fãs mais próximos
+        radius_km = min(max(request.args.get('radius_km', 50.0, type=float), 1.0), 500.0)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        
+        if get_db() is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            # NumPy só é importado quando o índice é usado
+            from src.infrastructure.geo.cep_table import get_cep_table
+            from src.infrastructure.geo.firestore_geo_index import get_fan_geo_index
+            
+            lat, lon = request.args.get('lat', type=float), request.args.get('lon', type=float)
+            if lat is not None and lon is not None:
+                center = (lat, lon)
+            else:
+                center = get_cep_table().locate(request.args.get('state'), request.args.get('city'),
+                                                request.args.get('cep'))
+            if center is None:
+                return jsonify({"error": "Informe 'cep', 'city' e 'state' conhecidos ou 'lat' e 'lon'"}), 400
+            
+            index = get_fan_geo_index()
+            started = time.perf_counter()
+            result = index.within(*center, radius_km, limit=limit)
+        except Exception as e:
+            app.logger.error(f"Error searching fans by location: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+        
+        result.update({"center": {"lat": center[0], "lon": center[1]}, "radius_km": radius_km,
+                       "took_ms": round((time.perf_counter() - started) * 1000, 2)})
+        return jsonify(result), 200
+    
+    @app.route('/api/segments/search', methods=['POST'])
+    @admin_required
+    def search_fan_segment(user):
+        body = request.json if request.is_json else {}
+        query = body.get('query')
+        if not query:
+            return jsonify({"error": "Campo 'query' é obrigatório"}), 400
+        
+        try:
+            limit = min(max(int(body.get('limit', 100)), 1), 1000)
+        except (TypeError, ValueError):
+            return jsonify({"error": "Campo 'limit' inválido"}), 400
+        
+        try:
+            # NumPy só é importado quando o índice é usado
+            from src.infrastructure.segments.firestore_fan_segment_index import get_fan_segment_index
+            index = get_fan_segment_index()
+        except Exception as e:
+            app.logger.error(f"Error loading segment index: {str(e)}")
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            started = time.perf_counter()
+            result = index.search(query, limit=limit, after=body.get('after'))
+            result['took_ms'] = round((time.perf_counter() - started) * 1000, 2)
+            return jsonify(result), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+    
+    @app.route('/api/events', methods=['GET'])
+    @token_required
+    def list_events(user):
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 100)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            events = FirestoreEventRepository(db).list_upcoming(datetime.now(), limit)
+            return jsonify({"events": [event.model_dump(mode='json') for event in events]}), 200
+        except Exception as e:
+            app.logger.error(f"Error listing events: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/events', methods=['POST'])
+    @app.route('/api/events/<event_id>', methods=['PUT'])
+    @admin_required
+    def save_event(user, event_id=None):
+        body = request.json if request.is_json else None
+        if not isinstance(body, dict):
+            return jsonify({"error": "Formato inválido. Esperado JSON."}), 400
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        repository = FirestoreEventRepository(db)
+        try:
+            if event_id is not None:
+                current = repository.find_by_id(event_id)
+                if current is None:
+                    return jsonify({"error": "Event not found"}), 404
+                body = {**body, 'id': event_id, 'created_at': current.created_at}
+            event = repository.save(Event(**body))
+            # O listener de cada worker aplica a mudança às recomendações
+            return jsonify({"event": event.model_dump(mode='json')}), 200 if event_id else 201
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        except Exception as e:
+            app.logger.error(f"Error saving event: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/events/<event_id>', methods=['DELETE'])
+    @admin_required
+    def delete_event(user, event_id):
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            if not FirestoreEventRepository(db).delete(event_id):
+                return jsonify({"error": "Event not found"}), 404
+            return jsonify({"success": True}), 200
+        except Exception as e:
+            app.logger.error(f"Error deleting event: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/events/nearby', methods=['GET'])
+    @token_required
+    def get_nearby_events(user):
+        # Centro no endereço do fã; o índice só calcula distâncias para os baldes candidatos
+        radius_km = min(max(request.args.get('radius_km', 100.0, type=float), 1.0), 1000.0)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 50)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            # NumPy só é importado quando o índice é usado
+            from src.infrastructure.geo.cep_table import get_cep_table
+            from src.infrastructure.geo.firestore_geo_index import get_event_geo_index
+            
+            snapshot = db.collection('fans').document(user['uid']).get(field_paths=['address'])
+            address = ((snapshot.to_dict() or {}).get('address') if snapshot.exists else None) or {}
+            center = get_cep_table().locate(address.get('state'), address.get('city'), address.get('postal_code'))
+            if center is None:
+                return jsonify({"error": "Could not locate the user's address (CEP or city)"}), 400
+            
+            # Eventos já começados podem seguir no índice até a próxima carga
+            nearby = get_event_geo_index().within(*center, radius_km, limit=limit * 4)['items']
+            distance = {item['id']: item['distance_km'] for item in nearby}
+            now = datetime.now()
+            events = [event for event in FirestoreEventRepository(db).find_many(list(distance))
+                      if event.starts_at.timestamp() >= now.timestamp()][:limit]
+            return jsonify({"events": [{**event.model_dump(mode='json'), "distance_km": distance[event.id]}
+                                       for event in events]}), 200
+        except Exception as e:
+            app.logger.error(f"Error getting nearby events: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
+    @app.route('/api/events/recommendations', methods=['GET'])
+    @token_required
+    def get_event_recommendations(user):
+        # Uma leitura do perfil (só os campos do segmento) e uma consulta à lista pré-calculada
+        limit = min(max(request.args.get('limit', 10, type=int), 1), 50)
+        
+        db = get_db()
+        if db is None:
+            return jsonify({
+                "error": "Database service unavailable",
+                "message": "Could not access Firestore database. Please check your Firebase settings."
+            }), 503
+        
+        try:
+            # NumPy só é importado quando o recomendador é usado
+            from src.infrastructure.segments.firestore_event_recommender import get_event_recommender
+            recommender = get_event_recommender()
+            snapshot = db.collection('fans').document(user['uid']).get(
+                field_paths=['favorite_games', 'favorite_teams', 'address'])
+            events = recommender.recommend(snapshot.to_dict() if snapshot.exists else {}, limit)
+            return jsonify({"events": [event.model_dump(mode='json') for event in events]}), 200
+        except Exception as e:
+            app.logger.error(f"Error getting event recommendations: {str(e)}")
+            return jsonify({"error": "An unexpected error occurred. Please try again later."}), 500
+    
     @app.route('/api/document/analyze', methods=['POST'])
     @token_required
     def analyze_user_document(user):
@@ -360,7 +738,8 @@ def setup_routes(app: Flask):
             }
             
             # Criar a string base para assinatura
-            base_url = 'https://api.twitter.com/oauth/request_token'
+            twitter = get_twitter_client()
+            base_url = twitter.url('/oauth/request_token')
             method = 'POST'
             
             # Combinar e ordenar os parâmetros
@@ -398,8 +777,8 @@ def setup_routes(app: Flask):
             
             # Fazer a requisição para o Twitter
             app.logger.info(f"Sending request to Twitter API: {base_url}")
-            response = requests.post(
-                base_url,
+            response = twitter.post(
+                '/oauth/request_token',
                 headers={'Authorization': auth_header}
             )
             
@@ -531,7 +910,8 @@ def setup_routes(app: Flask):
                     }
                     
                     # URL da API para obter o access token
-                    access_token_url = 'https://api.twitter.com/oauth/access_token'
+                    twitter = get_twitter_client()
+                    access_token_url = twitter.url('/oauth/access_token')
                     method = 'POST'
                     
                     # Combinar e ordenar os parâmetros
@@ -565,8 +945,8 @@ def setup_routes(app: Flask):
                     ])
                     
                     # Fazer a requisição para o Twitter
-                    response = requests.post(
-                        access_token_url,
+                    response = twitter.post(
+                        '/oauth/access_token',
                         headers={'Authorization': auth_header}
                     )
                     
@@ -670,7 +1050,8 @@ def setup_routes(app: Flask):
     def get_twitter_followed_accounts(access_token, access_token_secret, user_id):
         try:
             # URL para buscar contas seguidas
-            friends_url = 'https://api.twitter.com/1.1/friends/list.json'
+            twitter = get_twitter_client()
+            friends_url = twitter.url('/1.1/friends/list.json')
             method = 'GET'
             
             # Parâmetros da requisição
@@ -703,9 +1084,6 @@ def setup_routes(app: Flask):
                 for k, v in sorted(all_params.items())
             ])
             
-            # URL com query params para a assinatura
-            url_with_params = f"{friends_url}?{urllib.parse.urlencode(params)}"
-            
             # Criar a string base para assinatura
             signature_base = f"{method}&{urllib.parse.quote(friends_url)}&{urllib.parse.quote(param_string)}"
             
@@ -731,8 +1109,9 @@ def setup_routes(app: Flask):
             ])
             
             # Fazer a requisição para o Twitter
-            response = requests.get(
-                url_with_params,
+            response = twitter.get(
+                '/1.1/friends/list.json',
+                params=params,
                 headers={'Authorization': auth_header}
             )
             
@@ -874,7 +1253,6 @@ def setup_routes(app: Flask):
                 return jsonify({"error": "Invalid OAuth flow. Code verifier is required."}), 400
             
             # Preparar requisição para obter o token
-            token_url = 'https://api.twitter.com/2/oauth2/token'
             redirect_uri = data.get('redirect_uri')
             
             app.logger.info(f"Callback redirect URI: {redirect_uri}")
@@ -899,8 +1277,8 @@ def setup_routes(app: Flask):
             
             # Solicitar o token
             token_headers = {'Content-Type': 'application/x-www-form-urlencoded'}
-            response = requests.post(
-                token_url,
+            response = get_twitter_client().post(
+                '/2/oauth2/token',
                 data=token_params,
                 headers=token_headers
             )
@@ -977,6 +1355,7 @@ def setup_routes(app: Flask):
                 app.logger.warning(f"Could not get Firebase user ID: {e}")
             
             # Aqui você deve armazenar o token no banco de dados (Firestore)
+            db = get_db()
             if db:
                 try:
                     # Create document data
@@ -990,7 +1369,11 @@ def setup_routes(app: Flask):
                         'expires_in': expires_in,
                         'expires_at': int(time.time()) + expires_in,
                         'connected_at': datetime.now().isoformat(),
-                        'followed_accounts_count': len(followed_accounts)
+                        'updated_at': datetime.now(),
+                        'followed_accounts_count': len(followed_accounts),
+                        # Usernames seguidos, lidos pelo índice de fãs parecidos
+                        'followed_accounts': [account.get('username') for account in followed_accounts
+                                              if account.get('username')]
                     }
                     
                     # Simplified storage approach - always create a new document
@@ -1026,8 +1409,6 @@ def setup_routes(app: Flask):
     # Função auxiliar para obter informações do usuário via OAuth 2.0
     def get_twitter_user_info_oauth2(access_token):
         try:
-            user_url = 'https://api.twitter.com/2/users/me'
-            
             # Request more fields for detailed user information
             params = {
                 'user.fields': 'id,name,username,profile_image_url,public_metrics,verified,description,created_at,location,url,entities'
@@ -1038,7 +1419,7 @@ def setup_routes(app: Flask):
             }
             
             app.logger.info(f"Requesting detailed user info from Twitter API with fields: {params['user.fields']}")
-            response = requests.get(user_url, params=params, headers=headers)
+            response = get_twitter_client().get('/2/users/me', params=params, headers=headers)
             
             if response.status_code == 200:
                 user_data = response.json()
@@ -1090,8 +1471,6 @@ def setup_routes(app: Flask):
             user_id = user_info['userId']
             
             # Agora podemos obter os seguidores
-            follows_url = f'https://api.twitter.com/2/users/{user_id}/following'
-            
             params = {
                 'max_results': 50,  # Aumentado para 50 (máximo permitido pela API)
                 'user.fields': 'id,name,username,profile_image_url,public_metrics,verified,description'
@@ -1102,7 +1481,8 @@ def setup_routes(app: Flask):
             }
             
             app.logger.info(f"Buscando contas seguidas para o usuário {user_id}")
-            response = requests.get(follows_url, params=params, headers=headers)
+            response = get_twitter_client().get(f'/2/users/{user_id}/following', endpoint='GET /2/users/:id/following',
+                                                params=params, headers=headers)
             
             app.logger.info(f"Resposta da API do Twitter (following): {response.status_code}")
             
@@ -1144,6 +1524,7 @@ def setup_routes(app: Flask):
     @token_required
     def get_current_x_user(user):
         try:
+            db = get_db()
             if not db:
                 return jsonify({"error": "Database connection is not available"}), 500
                 
@@ -1274,4 +1655,13 @@ def setup_routes(app: Flask):
                 "success": False,
                 "error": "Failed to retrieve X account information",
                 "details": str(e)
-            }), 500
\ No newline at end of file
+            }), 500
+
+    @app.route('/api/oauth/x/metrics', methods=['GET'])
+    @admin_required
+    def get_x_api_metrics(user):
+        # Métricas do worker que atendeu a requisição
+        return jsonify({
+            "pid": os.getpid(),
+            "endpoints": get_twitter_client().metrics()
+        }), 200
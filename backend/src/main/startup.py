@@ -0,0 +1,44 @@
+"""
+Modos de inicialização do backend.
+
+- lazy (padrão): nenhum módulo pesado (OpenCV, NumPy, PIL, PyMuPDF) é
+  importado na carga do app; cada worker importa o que precisar na primeira
+  requisição que usar.
+- preload: usado com `preload_app` do gunicorn. O processo master aquece o
+  estado compartilhado e somente leitura (bibliotecas de imagem, cascade de
+  faces, modelo de classificação, credenciais do Firebase) antes do fork. Os
+  clientes gRPC do Firestore continuam sendo criados só depois do fork.
+"""
+import logging
+import os
+import time
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MODE = os.getenv('STARTUP_MODE', 'lazy').lower()
+
+
+def is_preload_mode() -> bool:
+    return STARTUP_MODE == 'preload'
+
+
+def warm_shared_state() -> Dict[str, Any]:
+    """Load read-only state that can be shared by forked workers"""
+    timings = {}
+
+    started = time.perf_counter()
+    try:
+        from src.infrastructure.config.firebase import initialize_firebase
+        initialize_firebase()
+    except Exception as e:
+        logger.warning(f"Firebase não inicializado no preload: {e}")
+    timings['firebase_credentials_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    started = time.perf_counter()
+    from src.services.document_service import warm_up
+    status = warm_up()
+    timings['document_service_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    logger.info(f"Estado compartilhado aquecido: {timings} {status}")
+    return {**timings, **status}
@@ -1,14 +1,9 @@
-import firebase_admin
-from firebase_admin import credentials, auth
 import os
 import requests
 import json
 from typing import Dict, Any
 from firebase_admin.exceptions import FirebaseError
-from src.config.firebase import initialize_firebase
-
-# Inicializa o Firebase usando nossa configuração baseada em variáveis de ambiente
-initialize_firebase()
+from src.infrastructure.config.firebase import get_auth, get_firestore
 
 def get_firebase_web_api_key():
     api_key = os.environ.get('FIREBASE_WEB_API_KEY')
@@ -20,14 +15,14 @@ def get_firebase_web_api_key():
 def register_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         try:
-            user = auth.create_user(
+            user = get_auth().create_user(
                 email=user_data['email'],
                 password=user_data['password'],
                 display_name=user_data.get('display_name', None),
                 email_verified=False
             )
             
-            token = auth.create_custom_token(user.uid)
+            token = get_auth().create_custom_token(user.uid)
             
             user_data.pop('password')
             
@@ -51,17 +46,16 @@ def register_user(user_data: Dict[str, Any]) -> Dict[str, Any]:
 def login_user(email: str, password: str) -> Dict[str, Any]:
     try:
         try:
-            user = auth.get_user_by_email(email)
+            user = get_auth().get_user_by_email(email)
         except Exception as e:
             print(f"Error getting user by email: {e}")
             raise ValueError("Invalid email or password")
             
-        token = auth.create_custom_token(user.uid)
+        token = get_auth().create_custom_token(user.uid)
         
         profile_complete = False
         try:
-            from firebase_admin import firestore
-            db = firestore.client()
+            db = get_firestore()
             fan_ref = db.collection('fans').document(user.uid)
             fan_doc = fan_ref.get()
             
@@ -88,15 +82,16 @@ def login_user(email: str, password: str) -> Dict[str, Any]:
 def verify_token(token: str) -> Dict[str, Any]:
     try:
         try:
-            decoded_token = auth.verify_id_token(token)
+            decoded_token = get_auth().verify_id_token(token)
             
-            user = auth.get_user(decoded_token['uid'])
+            user = get_auth().get_user(decoded_token['uid'])
             
             return {
                 "uid": user.uid,
                 "email": user.email,
                 "display_name": user.display_name,
-                "email_verified": user.email_verified
+                "email_verified": user.email_verified,
+                "admin": bool((user.custom_claims or {}).get('admin'))
             }
         except Exception as e:
             if not token or not isinstance(token, str) or token.count('.') != 2:
@@ -105,7 +100,7 @@ def verify_token(token: str) -> Dict[str, Any]:
             try:
                 user_lookup = None
                 
-                for user in auth.list_users().iterate_all():
+                for user in get_auth().list_users().iterate_all():
                     user_lookup = user
                     break
                 
@@ -114,7 +109,9 @@ def verify_token(token: str) -> Dict[str, Any]:
                         "uid": user_lookup.uid,
                         "email": user_lookup.email,
                         "display_name": user_lookup.display_name,
-                        "email_verified": user_lookup.email_verified
+                        "email_verified": user_lookup.email_verified,
+                        # Sem token verificado não há claims de administrador
+                        "admin": False
                     }
                 else:
                     raise ValueError("No users found in Firebase")
@@ -0,0 +1,217 @@
+"""
+Classificador de tipo de documento baseado no conteúdo da imagem.
+
+Extrai um vetor pequeno de características (proporção, histogramas de cor e
+layout) de uma versão reduzida da imagem já decodificada e compara com os
+centróides do modelo em `document_classifier_model.json`. O nome do arquivo
+só é usado para desempatar quando o classificador fica indeciso.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from src.config.lazy_import import lazy_import
+
+np = lazy_import('numpy')
+cv2 = lazy_import('cv2')
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.getenv(
+    'DOCUMENT_CLASSIFIER_MODEL',
+    str(Path(__file__).with_name('document_classifier_model.json'))
+)
+
+# Maior lado da imagem reduzida usada para extrair as características
+TARGET_SIZE = 192
+
+# Diferença mínima de probabilidade entre as duas melhores classes para que o
+# resultado do classificador prevaleça sobre o nome do arquivo
+TIE_MARGIN = 0.15
+
+DOCUMENT_TYPE_DISPLAY = {
+    "rg": "RG",
+    "cnh": "CNH",
+    "address_proof": "Comprovante de Residência",
+    "profile_photo": "Foto de Perfil",
+    "unknown": "Tipo Desconhecido"
+}
+
+# Termos curtos só contam como token inteiro ("id" não casa com "video");
+# termos longos podem aparecer dentro de outras palavras
+FILENAME_TERMS = {
+    "rg": (["rg", "id"], ["identidade"]),
+    "cnh": (["cnh"], ["motorista", "habilitacao", "habilitação"]),
+    "address_proof": ([], ["endereco", "endereço", "comprovante", "residencia", "residência"]),
+    "profile_photo": (["foto"], ["selfie", "face", "perfil", "profile"]),
+}
+
+
+class DocumentClassifierModel:
+    def __init__(self, classes, centroids: np.ndarray, scales: np.ndarray, temperature: float):
+        self.classes = classes
+        self.centroids = centroids
+        self.inv_scales = 1.0 / scales
+        self.temperature = temperature
+
+    @classmethod
+    def from_file(cls, path: str) -> 'DocumentClassifierModel':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        classes = list(data['classes'].keys())
+        centroids = np.array([data['classes'][name] for name in classes], dtype=np.float32)
+        scales = np.array(data['scales'], dtype=np.float32)
+
+        if centroids.shape[1] != len(data['features']) or scales.shape[0] != len(data['features']):
+            raise ValueError(f"Modelo de classificação inválido: {path}")
+
+        return cls(classes, centroids, scales, float(data.get('temperature', 1.0)))
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        # Distância quadrática normalizada para cada centróide, em uma única operação
+        diff = (self.centroids - features) * self.inv_scales
+        logits = -0.5 * np.einsum('ij,ij->i', diff, diff) / self.temperature
+        logits -= logits.max()
+        probs = np.exp(logits)
+        return probs / probs.sum()
+
+
+@lru_cache(maxsize=1)
+def cv_available() -> bool:
+    """Whether OpenCV can be imported; checked once per process"""
+    try:
+        cv2._load()
+        logger.info("OpenCV disponível - análise básica de imagem ativada")
+        return True
+    except ImportError as e:
+        logger.warning(f"Erro ao importar OpenCV: {e}")
+        return False
+
+
+@lru_cache(maxsize=1)
+def get_model() -> DocumentClassifierModel:
+    """Load the classifier model once per process"""
+    return DocumentClassifierModel.from_file(MODEL_PATH)
+
+
+def filename_hint(file_name: str) -> str:
+    """Guess the document type from the file name"""
+    file_lower = (file_name or "").lower()
+    tokens = set(re.split(r'[^0-9a-zà-ÿ]+', file_lower))
+
+    for doc_type, (whole_tokens, substrings) in FILENAME_TERMS.items():
+        if any(term in tokens for term in whole_tokens):
+            return doc_type
+        if any(term in file_lower for term in substrings):
+            return doc_type
+
+    return "unknown"
+
+
+def _downscale(image: np.ndarray) -> np.ndarray:
+    height, width = image.shape[:2]
+    scale = TARGET_SIZE / float(max(height, width))
+    if scale >= 1.0:
+        return image
+
+    # Amostragem por passo antes do INTER_AREA para não processar a imagem inteira
+    step = max(1, int(1.0 / scale) // 2)
+    if step > 1:
+        image = image[::step, ::step]
+        height, width = image.shape[:2]
+        scale = TARGET_SIZE / float(max(height, width))
+
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+
+def extract_features(image: np.ndarray, has_face: bool = False) -> np.ndarray:
+    """Compute the classifier feature vector for a BGR (or grayscale) image"""
+    height, width = image.shape[:2]
+    small = _downscale(image)
+
+    if small.ndim == 2:
+        small = cv2.cvtColor(small, cv2.COLOR_GRAY2BGR)
+    elif small.shape[2] == 4:
+        small = cv2.cvtColor(small, cv2.COLOR_BGRA2BGR)
+
+    hsv = cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    hue = hsv[..., 0]
+    sat = hsv[..., 1].astype(np.float32)
+    val = hsv[..., 2].astype(np.float32)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    colored = sat > 40
+    white_fraction = np.mean((val > 200) & (sat < 40))
+    dark_fraction = np.mean(val < 70)
+    green_fraction = np.mean(colored & (hue >= 35) & (hue < 85))
+    yellow_fraction = np.mean(colored & (hue >= 20) & (hue < 35))
+    blue_fraction = np.mean(colored & (hue >= 90) & (hue < 130))
+    skin_fraction = np.mean((hue < 25) & (sat >= 40) & (sat <= 170) & (val > 80))
+
+    # Densidade de bordas pelo gradiente horizontal e vertical
+    grad_x = np.abs(np.diff(gray, axis=1))
+    grad_y = np.abs(np.diff(gray, axis=0))
+    edge_density = 0.5 * (np.mean(grad_x > 40) + np.mean(grad_y > 40))
+
+    # Linhas de texto: alternância entre linhas com e sem tinta
+    ink_rows = np.mean(gray < 100, axis=1) > 0.02
+    text_rows = min(1.0, np.count_nonzero(ink_rows[1:] != ink_rows[:-1]) / float(len(ink_rows)))
+
+    return np.array([
+        np.log(width / float(height)),
+        white_fraction,
+        dark_fraction,
+        sat.mean() / 255.0,
+        green_fraction,
+        yellow_fraction,
+        blue_fraction,
+        skin_fraction,
+        edge_density,
+        text_rows,
+        1.0 if has_face else 0.0
+    ], dtype=np.float32)
+
+
+def classify_document(image: Optional[np.ndarray], file_name: str = "", has_face: bool = False) -> Dict[str, Any]:
+    """Classify the document type from image content, using the file name as tiebreaker"""
+    hint = filename_hint(file_name)
+
+    if image is None or not cv_available():
+        return {
+            "document_type": hint,
+            "document_type_display": DOCUMENT_TYPE_DISPLAY.get(hint, "Tipo Desconhecido"),
+            "confidence": 0.6,
+            "extracted_from": "filename_analysis"
+        }
+
+    started = time.perf_counter()
+    model = get_model()
+    probs = model.predict_proba(extract_features(image, has_face))
+
+    order = np.argsort(probs)[::-1]
+    best, runner_up = model.classes[order[0]], model.classes[order[1]]
+    doc_type = best
+    extracted_from = "image_classifier"
+
+    if probs[order[0]] - probs[order[1]] < TIE_MARGIN and hint in (best, runner_up):
+        doc_type = hint
+        extracted_from = "image_classifier+filename"
+
+    return {
+        "document_type": doc_type,
+        "document_type_display": DOCUMENT_TYPE_DISPLAY.get(doc_type, "Tipo Desconhecido"),
+        "confidence": round(float(probs[model.classes.index(doc_type)]), 3),
+        "extracted_from": extracted_from,
+        "filename_hint": hint,
+        "scores": {name: round(float(p), 3) for name, p in zip(model.classes, probs)},
+        "classification_ms": round((time.perf_counter() - started) * 1000, 2)
+    }
@@ -1,30 +1,67 @@
+from __future__ import annotations
+
 import base64
 import io
+import logging
+import threading
 import traceback
 from datetime import datetime
-from typing import Dict, Any, Tuple, Optional
+from functools import lru_cache
+from typing import Dict, Any, Tuple, Optional, TYPE_CHECKING
+
+from src.config.lazy_import import lazy_import
+from src.services.document_classifier import classify_document, cv_available, filename_hint, DOCUMENT_TYPE_DISPLAY
+
+if TYPE_CHECKING:
+    from PIL import Image as _PILImage
+
+# Bibliotecas pesadas só são importadas no primeiro uso (ou em warm_up)
+np = lazy_import('numpy')
+cv2 = lazy_import('cv2')
+fitz = lazy_import('fitz')
+Image = lazy_import('PIL.Image')
+
+logger = logging.getLogger(__name__)
+
+_face_cascades = threading.local()
+
+
+@lru_cache(maxsize=1)
+def pdf_support() -> bool:
+    if fitz.available():
+        logger.info(f"PyMuPDF disponível (versão {fitz.version[0]}) - suporte a PDF ativado")
+        return True
+    logger.warning("PyMuPDF não disponível - suporte a PDF desativado")
+    return False
 
-from PIL import Image
-import numpy as np
 
-try:
-    import fitz
-    PDF_SUPPORT = True
-    print(f"PyMuPDF disponível (versão {fitz.version[0]}) - suporte a PDF ativado")
-except ImportError:
-    PDF_SUPPORT = False
-    print("PyMuPDF não disponível - suporte a PDF desativado")
+def _get_face_cascade():
+    # CascadeClassifier não é garantidamente thread-safe; mantemos uma instância por thread
+    cascade = getattr(_face_cascades, 'cascade', None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        _face_cascades.cascade = cascade
+    return cascade
 
-try:
-    import cv2
-    CV_AVAILABLE = True
-    print("OpenCV disponível - análise básica de imagem ativada")
-except ImportError as e:
-    print(f"Erro ao importar OpenCV: {e}")
-    CV_AVAILABLE = False
 
-def pdf_to_image(pdf_bytes: bytes) -> Tuple[Optional[Image.Image], Optional[bytes]]:
-    if not PDF_SUPPORT:
+def warm_up() -> Dict[str, Any]:
+    """Import image libraries and load read-only models ahead of the first request"""
+    from src.services.document_classifier import get_model
+
+    np._load()
+    Image._load()
+    status = {
+        "cv_available": cv_available(),
+        "pdf_support": pdf_support()
+    }
+    if status["cv_available"]:
+        # Só carrega os arquivos; nenhuma operação paralela do OpenCV roda antes do fork
+        _get_face_cascade()
+        get_model()
+    return status
+
+def pdf_to_image(pdf_bytes: bytes) -> Tuple[Optional[_PILImage.Image], Optional[bytes]]:
+    if not pdf_support():
         print("Suporte a PDF não disponível (PyMuPDF não instalado)")
         return None, None
         
@@ -54,7 +91,7 @@ def pdf_to_image(pdf_bytes: bytes) -> Tuple[Optional[Image.Image], Optional[byte
         traceback.print_exc()
         return None, None
 
-def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.ndarray], Optional[Image.Image]]:
+def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.ndarray], Optional[_PILImage.Image]]:
     try:
         if not base64_str:
             print("String base64 vazia")
@@ -91,7 +128,7 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
             
             if is_pdf:
                 print("Processando conteúdo PDF")
-                if not PDF_SUPPORT:
+                if not pdf_support():
                     print("Suporte a PDF não disponível")
                     return None, None
                     
@@ -102,7 +139,7 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
                     
                 print(f"PDF convertido para imagem: {pil_image.format}, size: {pil_image.size}")
                 
-                if CV_AVAILABLE:
+                if cv_available():
                     img_array = np.array(pil_image)
                     if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
                         cv_image = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
@@ -117,7 +154,7 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
                     pil_image = Image.open(io.BytesIO(img_bytes))
                     print(f"PIL image loaded successfully: {pil_image.format}, size: {pil_image.size}")
                     
-                    if CV_AVAILABLE:
+                    if cv_available():
                         img_array = np.array(pil_image)
                         if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
                             cv_image = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
@@ -147,7 +184,7 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
                     if pil_img is None:
                         return None, None
                     
-                    if CV_AVAILABLE:
+                    if cv_available():
                         img_array = np.array(pil_img)
                         if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
                             cv_image = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
@@ -160,7 +197,7 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
                     pil_img = Image.open(io.BytesIO(img_bytes))
                     print(f"PIL image loaded with padding adjustment: {pil_img.format}, size: {pil_img.size}")
                     
-                    if CV_AVAILABLE:
+                    if cv_available():
                         img_array = np.array(pil_img)
                         if len(img_array.shape) == 3 and img_array.shape[2] >= 3:
                             cv_image = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
@@ -179,11 +216,11 @@ def base64_to_image(base64_str: str, is_pdf: bool = False) -> Tuple[Optional[np.
         return None, None
 
 def extract_face_from_image(image: np.ndarray) -> Optional[np.ndarray]:
-    if not CV_AVAILABLE or image is None:
+    if not cv_available() or image is None:
         return None
     
     try:
-        face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+        face_cascade = _get_face_cascade()
         
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
         
@@ -202,7 +239,7 @@ def extract_face_from_image(image: np.ndarray) -> Optional[np.ndarray]:
         return None
 
 def compare_faces_simple(face1: np.ndarray, face2: np.ndarray) -> Dict[str, Any]:
-    if not CV_AVAILABLE or face1 is None or face2 is None:
+    if not cv_available() or face1 is None or face2 is None:
         return {
             "verified": False,
             "distance": None,
@@ -247,7 +284,7 @@ def compare_faces_simple(face1: np.ndarray, face2: np.ndarray) -> Dict[str, Any]
         }
 
 def analyze_image_quality(image: np.ndarray) -> Dict[str, Any]:
-    if not CV_AVAILABLE or image is None:
+    if not cv_available() or image is None:
         return {
             "quality": "desconhecida",
             "blur_score": None, 
@@ -285,27 +322,8 @@ def analyze_image_quality(image: np.ndarray) -> Dict[str, Any]:
         }
 
 def extract_document_info(file_name: str) -> Dict[str, Any]:
-    file_lower = file_name.lower()
-    
-    document_type_mapping = {
-        "rg": "RG",
-        "cnh": "CNH",
-        "address_proof": "Comprovante de Residência",
-        "profile_photo": "Foto de Perfil",
-        "unknown": "Tipo Desconhecido" 
-    }
-    
-    doc_type = "unknown"
-    if any(term in file_lower for term in ["rg", "identidade", "id"]):
-        doc_type = "rg"
-    elif any(term in file_lower for term in ["cnh", "motorista", "habilitacao", "habilitação"]):
-        doc_type = "cnh"
-    elif any(term in file_lower for term in ["endereco", "endereço", "comprovante", "residencia", "residência"]):
-        doc_type = "address_proof"
-    elif any(term in file_lower for term in ["selfie", "face", "foto", "perfil", "profile"]):
-        doc_type = "profile_photo"
-    
-    display_type = document_type_mapping.get(doc_type, "Tipo Desconhecido")
+    doc_type = filename_hint(file_name)
+    display_type = DOCUMENT_TYPE_DISPLAY.get(doc_type, "Tipo Desconhecido")
     
     return {
         "document_type": doc_type,
@@ -352,7 +370,7 @@ def analyze_document(document_data: Dict[str, Any], selfie_data: Optional[Dict[s
             "message": f"Formato de arquivo não suportado: {file_ext}. Use JPG, PNG, PDF ou similar."
         }
     
-    if is_pdf and not PDF_SUPPORT:
+    if is_pdf and not pdf_support():
         return {
             "success": False,
             "message": "Arquivos PDF não são suportados neste servidor (PyMuPDF não instalado)."
@@ -376,12 +394,12 @@ def analyze_document(document_data: Dict[str, Any], selfie_data: Optional[Dict[s
         },
         "detection_info": basic_doc_info,
         "image_analysis": {},
-        "cv_available": CV_AVAILABLE,
+        "cv_available": cv_available(),
         "timestamp": current_time.isoformat()
     }
     
     try:
-        if not CV_AVAILABLE:
+        if not cv_available():
             result["message"] = "Análise básica disponível (sem OpenCV)"
             result["image_analysis"] = {"status": "unavailable", "reason": "OpenCV não disponível"}
             return result
@@ -439,7 +457,11 @@ def analyze_document(document_data: Dict[str, Any], selfie_data: Optional[Dict[s
             result["has_face"] = False
             result["extracted_data"]["face_detected"] = False
         
-        doc_type = basic_doc_info.get("document_type", "unknown")
+        doc_info = classify_document(doc_image, file_name, has_face=doc_face is not None)
+        result["detection_info"] = doc_info
+        result["extracted_data"]["tipo_documento"] = doc_info.get("document_type_display", "Tipo Desconhecido")
+        
+        doc_type = doc_info.get("document_type", "unknown")
         additional_data = extract_document_data(doc_image, doc_type)
         
         result["extracted_data"].update(additional_data)
@@ -1,11 +1,15 @@
-import firebase_admin
-from firebase_admin import auth, firestore
 from typing import Dict, Any, Optional
 from datetime import datetime
 import base64
 import os
 import json
 
+from src.infrastructure.config.firebase import get_auth, get_firestore
+from src.infrastructure.repositories import fan_codec
+from src.domain.catalog.interest_catalog import encode_fields, decode_fields
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+from src.domain.rules import profile_completeness, fan_stats
+
 # Dictionary to temporarily store profile images if Firestore is not available
 # Key: user_id, Value: image_data
 profile_image_cache = {}
@@ -13,15 +17,16 @@ profile_image_cache = {}
 # Firestore document size limit (in bytes) - approx 1MB
 FIRESTORE_DOC_SIZE_LIMIT = 900000  # Using 900KB to be safe
 
-# Try to get Firestore database instance, but don't fail if not available
-try:
-    db = firestore.client()
-except Exception as e:
-    print(f"Error initializing Firestore client: {e}")
-    db = None
+def _get_db():
+    # Firestore é opcional aqui: sem ele, os dados ficam só no cache local
+    try:
+        return get_firestore()
+    except Exception as e:
+        print(f"Error initializing Firestore client: {e}")
+        return None
 
 def _format_user_response(uid: str, user_data: Dict[str, Any] = None, fan_data: Dict[str, Any] = None) -> Dict[str, Any]:
-    user = auth.get_user(uid)
+    user = get_auth().get_user(uid)
     
     response_data = {
         "uid": uid,
@@ -34,11 +39,14 @@ def _format_user_response(uid: str, user_data: Dict[str, Any] = None, fan_data:
         response_data["profileComplete"] = False
         return response_data
     
+    # Jogos e times ficam no documento como ids do catálogo
+    fan_data = decode_fields(dict(fan_data))
+    
     if fan_data.get('has_profile_image') == True:
         response_data['has_profile_image'] = True
     
     for key, value in fan_data.items():
-        if key not in ['user_id', 'created_at', 'updated_at', 'address', 'profile_image_base64']:
+        if key not in ['user_id', 'created_at', 'updated_at', 'address', 'profile_image_base64', 'completeness_contributions']:
             response_data[key] = value
     
     if 'address' in fan_data and fan_data['address']:
@@ -69,8 +77,9 @@ def update_user_profile(uid: str, profile_data: Dict[str, Any], profile_image=No
             auth_update['display_name'] = profile_data['display_name']
             
         if auth_update:
-            auth.update_user(uid, **auth_update)
+            get_auth().update_user(uid, **auth_update)
         
+        db = _get_db()
         if db is None:
             print("Firestore database is not available. Profile data will not be stored.")
             
@@ -78,7 +87,7 @@ def update_user_profile(uid: str, profile_data: Dict[str, Any], profile_image=No
                 profile_image_cache[uid] = profile_image
                 print(f"Cached profile image for user {uid}")
             
-            user = auth.get_user(uid)
+            user = get_auth().get_user(uid)
             response_data = _format_user_response(uid)
             
             if profile_image:
@@ -92,7 +101,6 @@ def update_user_profile(uid: str, profile_data: Dict[str, Any], profile_image=No
             return response_data
         
         fan_ref = db.collection('fans').document(uid)
-        fan_doc = fan_ref.get()
         
         field_mapping = {
             'cpf': 'cpf',
@@ -113,7 +121,6 @@ def update_user_profile(uid: str, profile_data: Dict[str, Any], profile_image=No
         fan_data = {
             'user_id': uid,
             'updated_at': datetime.now(),
-            'profile_completeness': 100,
         }
         
         if profile_image and isinstance(profile_image, str):
@@ -154,20 +161,48 @@ def update_user_profile(uid: str, profile_data: Dict[str, Any], profile_image=No
                 else:
                     fan_data[backend_key] = value
         
-        if address_fields:
-            if fan_doc.exists and fan_doc.to_dict().get('address'):
-                existing_address = fan_doc.to_dict().get('address', {})
-                address_fields = {**existing_address, **address_fields}
+        encode_fields(fan_data)
+        stats = FirestoreFanStatsRepository(db)
+        
+        # Importado só aqui: carrega o cliente gRPC do Firestore
+        from firebase_admin import firestore
+
+        # Leitura e escrita na mesma transação (repetida se o documento mudar no
+        # meio): o delta dos agregados parte do estado que é de fato substituído
+        @firestore.transactional
+        def apply(transaction):
+            fan_doc = fan_ref.get(transaction=transaction)
+            existing_fan = fan_doc.to_dict() if fan_doc.exists else {}
+            changes = dict(fan_data)
+            
+            if address_fields:
+                changes['address'] = {**(existing_fan.get('address') or {}), **address_fields}
+            
+            if not fan_doc.exists:
+                changes['created_at'] = datetime.now()
+                user = get_auth().get_user(uid)
+                changes['email'] = user.email
+            
+            # Mesmas regras de completude do FanUseCaseImpl, reavaliando só os campos enviados
+            changes['profile_completeness'], changes['completeness_contributions'] = profile_completeness.rescore(
+                {**existing_fan, **changes},
+                existing_fan.get('completeness_contributions'),
+                changes.keys()
+            )
+            
+            if fan_doc.exists:
+                # Campos gravados fora do codec: a próxima leitura valida o documento
+                transaction.update(fan_ref, fan_codec.mark_untrusted(changes))
+            else:
+                transaction.set(fan_ref, changes)
             
-            fan_data['address'] = address_fields
+            # Agregados da base de fãs (dashboard) mudam na mesma escrita do perfil
+            stats.stage(
+                transaction,
+                fan_stats.delta(existing_fan if fan_doc.exists else None, {**existing_fan, **changes})
+            )
         
-        if fan_doc.exists:
-            fan_ref.update(fan_data)
-        else:
-            fan_data['created_at'] = datetime.now()
-            user = auth.get_user(uid)
-            fan_data['email'] = user.email
-            fan_ref.set(fan_data)
+        apply(db.transaction())
         
         updated_fan = fan_ref.get().to_dict()
         return _format_user_response(uid, profile_data, updated_fan)
@@ -181,6 +216,7 @@ def get_user_profile_image(uid: str) -> str:
             print(f"Using cached profile image for user {uid}")
             return profile_image_cache[uid]
             
+        db = _get_db()
         if db is not None:
             fan_doc = db.collection('fans').document(uid).get()
             if fan_doc.exists:
@@ -203,6 +239,7 @@ def get_user_profile_image(uid: str) -> str:
 
 def get_user_profile(uid: str) -> Dict[str, Any]:
     try:
+        db = _get_db()
         if db is None:
             print("Firestore database is not available. Only basic profile data will be returned.")
             return _format_user_response(uid)
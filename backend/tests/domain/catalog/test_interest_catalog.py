@@ -0,0 +1,46 @@
+import pytest
+
+from src.domain.catalog.interest_catalog import CatalogEntry, InterestCatalog, get_catalog
+from src.domain.entities.fan import Fan
+from src.infrastructure.repositories import fan_codec
+
+
+def test_spellings_resolve_to_one_id():
+    catalog = get_catalog()
+
+    ids = {catalog.resolve('game', name) for name in ['CSGO', 'cs go', 'CS:GO', 'Counter-Strike 2', 'counter strike 2']}
+
+    assert ids == {1}
+    assert catalog.resolve('team', 'Furia Esports') == catalog.resolve('team', 'FURIA') == 1
+    assert catalog.resolve('game', 'Jogo Indie') is None
+
+
+def test_encode_keeps_unknown_text_and_deduplicates():
+    catalog = get_catalog()
+
+    stored = catalog.encode('game', ['CS:GO', 'Valorant', 'csgo', ' Jogo  Indie ', 'jogo indie', ''])
+
+    assert stored == [1, 2, 'Jogo Indie']
+    assert catalog.decode('game', stored) == ['Counter-Strike 2', 'Valorant', 'Jogo Indie']
+    assert catalog.merge('team', ['FURIA'], ['furia', 'LOUD']) == ['FURIA', 'LOUD']
+
+
+def test_ambiguous_alias_is_rejected():
+    with pytest.raises(ValueError):
+        InterestCatalog([
+            CatalogEntry(1, 'game', 'Overwatch 2', ('OW',)),
+            CatalogEntry(2, 'game', 'Old World', ('ow',)),
+        ])
+
+
+def test_codec_stores_ids_and_reads_names():
+    fan = Fan(user_id='uid-1', email='fan@example.com', favorite_games=['CS:GO', 'Jogo Indie'],
+              favorite_teams=['FURIA CS:GO'])
+
+    data = fan_codec.encode(fan)
+    decoded = fan_codec.decode('uid-1', data)
+
+    assert data['favorite_games'] == [1, 'Jogo Indie']
+    assert data['favorite_teams'] == [1]
+    assert decoded.favorite_games == ['Counter-Strike 2', 'Jogo Indie']
+    assert decoded.favorite_teams == ['FURIA']
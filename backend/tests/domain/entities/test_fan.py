@@ -0,0 +1,11 @@
+from src.domain.entities.fan import SocialMedia, replace_by_platform
+
+
+def test_replace_by_platform_keeps_one_entry_per_platform():
+    old = SocialMedia(platform="twitter", profile_url="https://x.com/old")
+    other = SocialMedia(platform="instagram", profile_url="https://instagram.com/fan")
+    new = SocialMedia(platform="twitter", profile_url="https://x.com/new", connected=True)
+
+    result = replace_by_platform([old, other], new)
+
+    assert result == [other, new]
@@ -0,0 +1,62 @@
+import random
+
+from src.domain.entities.fan import Fan, Address, Purchase
+from src.domain.rules import fan_stats
+
+
+def test_new_fan_adds_one_to_each_distinct_name():
+    fan = Fan(user_id='uid-1', email='fan@example.com', address=Address(state=' sp '),
+              favorite_games=['CS:GO', 'Valorant', 'CS:GO'], favorite_teams=['FURIA'])
+
+    assert fan_stats.delta(None, fan) == {
+        'fans': 1,
+        'games': {'Counter-Strike 2': 1, 'Valorant': 1},
+        'teams': {'FURIA': 1},
+        'states': {'SP': 1},
+    }
+
+
+def test_edit_only_touches_changed_names():
+    before = {'favorite_games': ['CS:GO', 'Valorant'], 'address': {'state': 'SP'}}
+    after = {'favorite_games': ['CS:GO', 'Dota 2'], 'address': {'state': 'RJ'}}
+
+    assert fan_stats.delta(before, after) == {
+        'games': {'Valorant': -1, 'Dota 2': 1},
+        'states': {'SP': -1, 'RJ': 1},
+    }
+    assert fan_stats.delta(after, dict(after)) == {}
+
+
+def test_legacy_document_counts_purchase_list():
+    purchases = [Purchase(item_name='Camisa', amount=249.9), Purchase(item_name='Boné', amount=80.0)]
+
+    contribution = fan_stats.contribution({'purchases': [p.model_dump() for p in purchases]})
+
+    assert contribution['purchases'] == 2
+    assert contribution['total_spent'] == 329.9
+
+
+def test_applied_deltas_equal_contributions_of_final_states():
+    rng = random.Random(3)
+    games, states = ['CS:GO', 'Valorant', 'League of Legends', 'Dota 2'], ['SP', 'RJ', 'MG', None]
+    fans = {}
+    totals = fan_stats.empty()
+
+    for _ in range(500):
+        fan_id = rng.randrange(40)
+        after = None if rng.random() < 0.1 else {
+            'favorite_games': rng.sample(games, rng.randint(0, 3)),
+            'address': {'state': rng.choice(states)},
+            'purchase_count': rng.randint(0, 3),
+            'total_spent': rng.choice([0.0, 99.9, 250.0]),
+        }
+        fan_stats.accumulate(totals, fan_stats.delta(fans.get(fan_id), after))
+        fans[fan_id] = after
+
+    expected = fan_stats.merge(fan_stats.contribution(doc) for doc in fans.values() if doc is not None)
+    merged = fan_stats.merge([totals])
+    assert fan_stats.top(merged['games'], 10) == fan_stats.top(expected['games'], 10)
+    assert fan_stats.top(merged['states'], 10) == fan_stats.top(expected['states'], 10)
+    assert merged['fans'] == expected['fans']
+    assert merged['purchases'] == expected['purchases']
+    assert merged['total_spent'] == expected['total_spent']
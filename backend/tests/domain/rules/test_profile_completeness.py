@@ -0,0 +1,66 @@
+from src.domain.entities.fan import Fan, Address, Document, SocialMedia
+from src.domain.rules import profile_completeness
+
+
+def _fan(**overrides):
+    data = dict(
+        user_id='uid-1',
+        email='fan@example.com',
+        name='Fan',
+        address=Address(city='São Paulo'),
+        favorite_teams=['FURIA', 'paiN'],
+        documents=[Document(doc_type='RG', doc_number='1', verified=True)],
+        social_media=[SocialMedia(platform='twitter', profile_url='https://x.com/fan', connected=True)],
+    )
+    data.update(overrides)
+    return Fan(**data)
+
+
+def test_fan_and_document_dict_score_the_same():
+    fan = _fan()
+
+    from_model, contributions = profile_completeness.score(fan)
+    from_dict, _ = profile_completeness.score(fan.model_dump())
+
+    # nome 10 + email 5 + endereço 10 + documento 10 + rede social 5 + times 2
+    assert from_model == from_dict == 42
+    assert contributions['social_media'] == 5
+    assert contributions['phone'] == 0
+
+
+def test_rescore_only_reevaluates_rules_of_changed_fields():
+    fan = _fan()
+    _, contributions = profile_completeness.score(fan)
+
+    # Valor guardado desatualizado para uma regra que não foi tocada
+    contributions['name'] = 0
+    fan.phone = '11999999999'
+
+    total, updated = profile_completeness.rescore(fan, contributions, {'phone'})
+
+    assert updated['phone'] == 5
+    assert updated['name'] == 0
+    assert total == 42 - 10 + 5
+
+
+def test_rescore_evaluates_rules_missing_from_stored_vector():
+    fan = _fan()
+    _, contributions = profile_completeness.score(fan)
+    del contributions['address']
+
+    total, updated = profile_completeness.rescore(fan, contributions, set())
+
+    assert updated['address'] == 10
+    assert total == 42
+
+
+def test_rule_points_are_capped():
+    many = [SocialMedia(platform=f'p{i}', profile_url='u', connected=True) for i in range(6)]
+    _, contributions = profile_completeness.score(_fan(social_media=many, favorite_games=list('abcdefgh')))
+
+    assert contributions['social_media'] == 15
+    assert contributions['favorite_games'] == 5
+
+
+def test_rule_table_adds_up_to_max_score():
+    assert sum(rule.points for rule in profile_completeness.RULES) == profile_completeness.MAX_SCORE
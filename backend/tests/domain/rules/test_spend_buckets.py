@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from src.domain.rules import spend_buckets
+
+
+def test_periods_sort_chronologically_across_years():
+    assert spend_buckets.last_months(datetime(2024, 2, 10), 4) == ['2023-11', '2023-12', '2024-01', '2024-02']
+    assert spend_buckets.last_days(datetime(2024, 3, 1), 2) == ['2024-02-29', '2024-03-01']
+    assert spend_buckets.buckets(datetime(2024, 5, 17, 23, 59)) == [
+        ('day', '2024-05-17'), ('month', '2024-05'), ('lifetime', 'all')]
+
+
+def test_aggregate_sums_each_bucket_once():
+    totals = spend_buckets.aggregate([(10.0, datetime(2024, 5, 1)), (5.0, datetime(2024, 5, 2)),
+                                      (1.0, datetime(2024, 6, 1))])
+
+    assert totals[('month', '2024-05')] == (15.0, 2)
+    assert totals[('day', '2024-05-02')] == (5.0, 1)
+    assert totals[('lifetime', 'all')] == (16.0, 3)
+    assert spend_buckets.is_open('month', '2024-05', datetime(2024, 5, 31))
+    assert not spend_buckets.is_open('day', '2024-05-30', datetime(2024, 5, 31))
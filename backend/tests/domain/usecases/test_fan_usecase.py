@@ -0,0 +1,70 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.application.usecases.fan_usecase_impl import FanUseCaseImpl
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+
+
+@pytest.fixture
+def db():
+    snapshot = MagicMock()
+    snapshot.exists = True
+    snapshot.id = 'uid-1'
+    snapshot.update_time = 't0'
+    snapshot.to_dict.return_value = {
+        'user_id': 'uid-1',
+        'email': 'fan@example.com',
+        'name': 'Fan',
+        'favorite_teams': [],
+    }
+
+    db = MagicMock()
+    db.collection.return_value.document.return_value.get.return_value = snapshot
+    return db
+
+
+@pytest.fixture
+def fan_usecase(db):
+    return FanUseCaseImpl(FirestoreFanRepository(db=db))
+
+
+def _round_trips(db):
+    doc_ref = db.collection.return_value.document.return_value
+    writes = db.batch.return_value.commit.call_count + doc_ref.update.call_count + doc_ref.set.call_count
+    return doc_ref.get.call_count, writes
+
+
+def test_connect_social_media_is_one_read_and_one_write(fan_usecase, db):
+    fan_usecase.connect_social_media('uid-1', 'twitter', 'https://x.com/fan')
+
+    assert _round_trips(db) == (1, 1)
+
+    _, fields = db.batch.return_value.update.call_args.args
+    assert fields['social_media'][0]['platform'] == 'twitter'
+    # Ids do catálogo de interesses: FURIA, Team Liquid, G2 Esports
+    assert fields['favorite_teams'] == [1, 6, 7]
+    assert fields['profile_completeness'] > 0
+
+
+def test_add_esports_profile_verifies_in_the_same_write(fan_usecase, db):
+    fan_usecase.add_esports_profile('uid-1', 'steam', 'https://steamcommunity.com/id/fan', 'fan')
+
+    assert _round_trips(db) == (1, 1)
+
+    _, fields = db.batch.return_value.update.call_args.args
+    assert fields['esports_profiles'][0]['verified'] is True
+    # Counter-Strike 2 (detectado como "CS:GO") e Dota 2
+    assert fields['favorite_games'] == [1, 4]
+
+
+def test_upload_document_is_one_read_and_one_write(fan_usecase, db, monkeypatch):
+    monkeypatch.setattr(fan_usecase, '_upload_file_to_storage', lambda *args: 'https://storage/doc.jpg')
+
+    document = fan_usecase.upload_document('uid-1', 'RG', '123456789', b'jpeg')
+
+    assert document.document_url == 'https://storage/doc.jpg'
+    assert _round_trips(db) == (1, 1)
+
+    _, fields = db.batch.return_value.update.call_args.args
+    assert fields['documents'][0]['verified'] is True
@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+from src.infrastructure.config.firebase import FirebaseProvider
+
+
+class _CountingFactory:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, app):
+        self.calls += 1
+        return object()
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    provider = FirebaseProvider()
+    monkeypatch.setattr(provider, 'initialize', lambda: None)
+    return provider
+
+
+def test_clients_are_created_once_and_shared(provider):
+    factory = _CountingFactory()
+
+    first = provider._get('firestore', factory)
+    second = provider._get('firestore', factory)
+
+    assert first is second
+    assert factory.calls == 1
+
+
+def test_reset_drops_cached_clients(provider):
+    factory = _CountingFactory()
+    first = provider._get('firestore', factory)
+
+    provider.reset()
+
+    assert provider._get('firestore', factory) is not first
+    assert factory.calls == 2
+
+
+def test_override_replaces_client_only_inside_block(provider):
+    fake = object()
+    factory = _CountingFactory()
+
+    with provider.override(firestore=fake):
+        assert provider._get('firestore', factory) is fake
+    assert factory.calls == 0
+
+    assert provider._get('firestore', factory) is not fake
+    assert factory.calls == 1
+
+
+def test_override_rejects_unknown_clients(provider):
+    with pytest.raises(ValueError):
+        with provider.override(database=object()):
+            pass
+
+
+def test_client_from_other_process_is_not_reused(provider):
+    factory = _CountingFactory()
+    first = provider._get('firestore', factory)
+
+    # Simula um processo filho que herdou o provedor sem passar pelo hook de fork
+    provider._pid = os.getpid() + 1
+
+    assert provider._get('firestore', factory) is not first
+    assert factory.calls == 2
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork indisponível")
+def test_fork_child_creates_its_own_clients():
+    from src.infrastructure.config import firebase
+
+    parent_client = object()
+    firebase.firebase_provider._clients['firestore'] = parent_client
+    read_fd, write_fd = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        inherited = firebase.firebase_provider._clients.get('firestore') is parent_client
+        os.write(write_fd, b'1' if inherited else b'0')
+        os._exit(0)
+
+    os.close(write_fd)
+    try:
+        assert os.read(read_fd, 1) == b'0'
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+        firebase.firebase_provider.reset()
@@ -0,0 +1,30 @@
+import pytest
+from firebase_admin import auth
+
+from src.infrastructure.fakes.fake_auth import FakeAuthClient
+from src.services import auth_service
+from src.infrastructure.config.firebase import firebase_provider
+
+
+def test_verify_token_reads_admin_claim_from_fake_auth():
+    client = FakeAuthClient()
+    client.add_user('uid-1', 'Fan@Example.com', custom_claims={'admin': True})
+
+    with firebase_provider.override(auth=client):
+        user = auth_service.verify_token(FakeAuthClient.id_token('uid-1'))
+
+    assert user['uid'] == 'uid-1' and user['email'] == 'fan@example.com' and user['admin'] is True
+    assert client.calls == {'verify_id_token': 1, 'get_user': 1}
+
+
+def test_import_users_overwrites_by_uid_and_rejects_taken_emails():
+    client = FakeAuthClient()
+    client.add_user('other', 'taken@example.com')
+
+    result = client.import_users([auth.ImportUserRecord(uid='a', email='new@example.com'),
+                                  auth.ImportUserRecord(uid='b', email='taken@example.com')])
+
+    assert [(error.index, error.reason) for error in result.errors] == [(1, 'EMAIL_EXISTS')]
+    assert client.get_user_by_email('new@example.com').uid == 'a'
+    with pytest.raises(auth.UserNotFoundError):
+        client.get_user('b')
@@ -0,0 +1,139 @@
+from datetime import datetime, timezone
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists, NotFound
+from google.cloud.firestore_v1.base_query import FieldFilter, Or
+
+from src.domain.entities.fan import Fan, Purchase
+from src.domain.repositories.fan_repository import ConcurrentUpdateError
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+
+
+@pytest.fixture
+def db():
+    return FakeFirestoreClient()
+
+
+def test_writes_apply_transforms_and_field_paths(db):
+    ref = db.collection('fans').document('uid-1')
+    ref.set({'name': 'Fan', 'address': {'city': 'São Paulo', 'state': 'SP'}, 'tags': ['a'],
+             'created_at': datetime(2026, 1, 1)})
+
+    ref.update({'address.city': 'Campinas', 'tags': firestore.ArrayUnion(['a', 'b']),
+                'count': firestore.Increment(2), 'name': firestore.DELETE_FIELD,
+                'seen_at': firestore.SERVER_TIMESTAMP})
+    ref.set({'stats': {'CS:GO': firestore.Increment(1)}, 'count': firestore.Increment(3)}, merge=True)
+
+    snapshot = ref.get()
+    assert snapshot.to_dict()['address'] == {'city': 'Campinas', 'state': 'SP'}
+    assert snapshot.get('tags') == ['a', 'b']
+    assert snapshot.get('count') == 5
+    assert snapshot.get('stats') == {'CS:GO': 1}
+    assert 'name' not in snapshot.to_dict()
+    assert snapshot.get('created_at') == datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert snapshot.create_time < snapshot.get('seen_at') < snapshot.update_time
+
+    with pytest.raises(NotFound):
+        db.collection('fans').document('missing').update({'name': 'x'})
+    with pytest.raises(AlreadyExists):
+        ref.create({'name': 'again'})
+
+
+def test_queries_filter_order_project_and_page(db):
+    db.load('fans', {
+        f'uid-{i}': {'state': 'SP' if i % 2 else 'RJ', 'score': i * 10, 'games': [i % 3], 'email': f'{i}@x.com'}
+        for i in range(10)
+    })
+    db.load('fans', {'uid-no-score': {'state': 'SP'}})
+    fans = db.collection('fans')
+
+    query = fans.where(filter=FieldFilter('state', '==', 'SP')).order_by('score', direction='DESCENDING').limit(2)
+    first = query.get()
+    second = query.start_after(first[-1]).get()
+    assert [s.id for s in first + second] == ['uid-9', 'uid-7', 'uid-5', 'uid-3']
+
+    masked = fans.select(['email']).where('score', '>=', 80).stream()
+    assert [s.to_dict() for s in masked] == [{'email': '8@x.com'}, {'email': '9@x.com'}]
+
+    either = fans.where(filter=Or([FieldFilter('score', '<', 20), FieldFilter('games', 'array_contains', 2)]))
+    assert sorted(s.id for s in either.stream()) == ['uid-0', 'uid-1', 'uid-2', 'uid-5', 'uid-8']
+
+    by_id = fans.order_by('__name__').start_after({'__name__': 'uid-7'}).get()
+    assert [s.id for s in by_id] == ['uid-8', 'uid-9', 'uid-no-score']
+
+    aggregate = fans.where('state', '==', 'SP').count(alias='fans').sum('score', alias='score').get()[0]
+    assert {r.alias: r.value for r in aggregate} == {'fans': 6, 'score': 250}
+
+
+def test_batches_are_all_or_nothing(db):
+    db.load('fans', {'uid-1': {'name': 'Fan'}})
+    batch = db.batch()
+    batch.set(db.collection('fans').document('uid-2'), {'name': 'Novo'})
+    batch.create(db.collection('fans').document('uid-1'), {'name': 'Duplicado'})
+
+    with pytest.raises(AlreadyExists):
+        batch.commit()
+    assert set(db.dump('fans')) == {'uid-1'}
+
+
+def test_transactions_retry_on_contention(db):
+    db.load('counters', {'c': {'value': 0}})
+    ref = db.collection('counters').document('c')
+    attempts = []
+
+    @firestore.transactional
+    def increment(transaction):
+        value = ref.get(transaction=transaction).get('value')
+        if not attempts:
+            ref.update({'value': 10})  # escrita concorrente entre a leitura e o commit
+        attempts.append(value)
+        transaction.update(ref, {'value': value + 1})
+
+    increment(db.transaction())
+
+    assert attempts == [0, 10]
+    assert ref.get().get('value') == 11
+
+
+def test_counts_calls_and_injects_latency():
+    slept = []
+    db = FakeFirestoreClient(latency={'commit': 0.02, 'get': 0.01}, latency_per_document=0.001, sleep=slept.append)
+    db.load('fans', {'uid-1': {'name': 'Fan'}})
+
+    db.collection('fans').document('uid-1').get()
+    db.collection('fans').where('name', '==', 'nobody').get()
+    batch = db.batch()
+    batch.set(db.collection('fans').document('uid-2'), {'name': 'B'})
+    batch.delete(db.collection('fans').document('uid-1'))
+    batch.commit()
+
+    assert db.counters() == {'calls': {'get': 1, 'run_query': 1, 'commit': 1}, 'reads': 2, 'writes': 1, 'deletes': 1}
+    assert slept == pytest.approx([0.011, 0.001, 0.022])
+
+
+def test_fan_repository_runs_offline(db):
+    repository = FirestoreFanRepository(db=db, stats=FirestoreFanStatsRepository(db, shards=2))
+    repository.create(Fan(user_id='uid-1', email='fan@example.com', favorite_games=['CS:GO'],
+                          address={'state': 'sp'}))
+    db.reset_counters()
+
+    repository.add_purchase('uid-1', Purchase(item_name='Camisa', amount=200.0))
+
+    # Compra: uma única escrita, sem leitura
+    assert db.counters()['calls'] == {'commit': 1}
+    fan = repository.find_by_id('uid-1')
+    assert (fan.purchase_count, fan.total_spent, fan.favorite_games) == (1, 200.0, ['Counter-Strike 2'])
+    assert FirestoreFanStatsRepository(db, shards=2).get_overview(5)['total_spent'] == 200.0
+
+    with repository.unit_of_work('uid-1') as uow:
+        uow.fan.name = 'Fan Atualizado'
+    assert repository.find_by_id('uid-1').name == 'Fan Atualizado'
+
+    uow = repository.unit_of_work('uid-1')
+    repository.update_fields('uid-1', {'phone': '11999999999'})
+    uow.fan.name = 'Conflito'
+    with pytest.raises(ConcurrentUpdateError):
+        uow.commit()
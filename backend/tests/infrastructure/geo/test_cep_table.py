@@ -0,0 +1,21 @@
+import pytest
+
+from src.infrastructure.geo.cep_table import cep_prefix, get_cep_table
+
+
+def test_cep_prefix_accepts_common_formats():
+    assert cep_prefix('01310-100') == cep_prefix('01310100') == cep_prefix(1310100) == 1310
+    assert cep_prefix('1310-100') is None and cep_prefix(None) is None
+
+
+def test_locate_prefers_city_level_coordinates():
+    table = get_cep_table()
+    sao_paulo = table.locate(postal_code='01310-100')
+    assert sao_paulo == pytest.approx((-23.5505, -46.6333))
+    # Campinas tem faixa própria; Bauru (17000) só tem a do estado
+    assert table.locate('SP', 'Campinas', '13010-000') == pytest.approx((-22.9099, -47.0626))
+    assert table.locate(postal_code='17010-000') == pytest.approx((-22.19, -48.79))
+    # Sem CEP (ou com CEP só no nível do estado), vale o nome da cidade
+    assert table.locate('sp', 'sao paulo') == sao_paulo
+    assert table.locate('SP', 'Santos', '17010-000') == pytest.approx((-23.9608, -46.3336))
+    assert table.locate('SP', 'Cidade Desconhecida') is None
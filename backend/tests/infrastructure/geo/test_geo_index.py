@@ -0,0 +1,73 @@
+import random
+from datetime import datetime
+
+import numpy as np
+
+from src.domain.entities.event import Event
+from src.infrastructure.geo.cep_table import get_cep_table
+from src.infrastructure.geo.geo_index import GeoIndex, haversine_km
+
+# (UF, cidade, CEP): capitais, região metropolitana de SP e interior só com a faixa do estado
+PLACES = [
+    ('SP', 'São Paulo', '01310-100'), ('SP', 'São Paulo', '04538-133'), ('SP', 'Guarulhos', '07010-000'),
+    ('SP', 'Santo André', '09010-000'), ('SP', 'Campinas', '13010-000'), ('SP', 'Santos', '11010-000'),
+    ('SP', 'Bauru', '17010-000'), ('RJ', 'Rio de Janeiro', '20040-000'), ('MG', 'Belo Horizonte', '30110-000'),
+    ('PR', 'Curitiba', '80010-000'), ('SP', 'São Paulo', None), ('SP', None, None),
+]
+
+
+def _fan(rng):
+    state, city, cep = rng.choice(PLACES)
+    return {'address': {'state': state, 'city': city, 'postal_code': cep}}
+
+
+def test_radius_queries_match_brute_force_after_updates():
+    rng = random.Random(3)
+    fans = {f'uid-{i:03d}': _fan(rng) for i in range(300)}
+    index = GeoIndex.build(fans.items())
+    for _ in range(100):
+        fan_id = f'uid-{rng.randrange(320):03d}'
+        fans[fan_id] = _fan(rng) if rng.random() < 0.8 else None
+        index.apply(fan_id, fans[fan_id])
+
+    table = get_cep_table()
+    center = table.locate('SP', 'São Paulo')
+    for radius in (10, 50, 120, 500):
+        expected = {}
+        for fan_id, data in fans.items():
+            located = data and table.locate(data['address']['state'], data['address']['city'],
+                                            data['address']['postal_code'])
+            if located:
+                distance = float(haversine_km(*center, np.array([located[0]]), np.array([located[1]]))[0])
+                if distance <= radius:
+                    expected[fan_id] = distance
+
+        result = index.within(*center, radius, limit=1000)
+        assert result['count'] == len(expected)
+        assert {item['id'] for item in result['items']} == set(expected)
+        distances = [item['distance_km'] for item in result['items']]
+        assert distances == sorted(distances)
+
+    assert index.within(*center, 50, limit=5)['items'][0]['distance_km'] == 0.0
+    assert len(index.within(*center, 50, limit=5)['items']) == 5
+
+
+def test_region_lookup_and_events():
+    index = GeoIndex.build([
+        ('a', {'address': {'state': 'SP', 'city': 'São Paulo', 'postal_code': '01310-100'}}),
+        ('b', {'address': {'state': 'sp', 'city': 'sao paulo', 'postal_code': '04538133'}}),
+        ('c', {'address': {'state': 'SP', 'city': 'Campinas'}}),
+        ('d', {'address': {'city': 'Sem UF'}}),
+    ])
+    assert index.region('SP') == ['a', 'b', 'c']
+    assert index.region('SP', 'São Paulo') == ['a', 'b']
+    assert index.region('SP', 'São Paulo', '04538-000') == ['b']
+    assert len(index) == 3
+
+    events = GeoIndex.build([
+        ('show', Event(title='Show', state='RJ', city='Rio de Janeiro', starts_at=datetime(2024, 6, 1))),
+        ('live', Event(title='Live', online=True, starts_at=datetime(2024, 6, 1))),
+    ])
+    rio = get_cep_table().locate('RJ', 'Rio de Janeiro')
+    assert events.within(*rio, 10)['items'] == [{'id': 'show', 'distance_km': 0.0}]
+    assert len(events) == 1
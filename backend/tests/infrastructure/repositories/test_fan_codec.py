@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from google.protobuf.timestamp_pb2 import Timestamp
+from pydantic import ValidationError
+
+from src.domain.entities.fan import Fan, Address, Purchase
+from src.infrastructure.repositories import fan_codec
+
+
+def _snapshot(doc_id, data, exists=True):
+    return SimpleNamespace(id=doc_id, exists=exists, to_dict=lambda: dict(data))
+
+
+@pytest.fixture
+def fan():
+    return Fan(
+        user_id='uid-1',
+        email='fan@example.com',
+        name='Fan',
+        birth_date=datetime(1998, 5, 17),
+        address=Address(city='São Paulo', state='SP'),
+        favorite_teams=['FURIA'],
+        purchases=[Purchase(item_name='Camisa', amount=249.9)],
+    )
+
+
+def test_trusted_round_trip_matches_validated_decode(fan):
+    data = fan_codec.encode(fan)
+    assert data['schema_version'] == fan_codec.SCHEMA_VERSION
+
+    trusted = fan_codec.decode('uid-1', data)
+    validated = fan_codec.validate({**data, 'id': 'uid-1'})
+
+    assert trusted == validated
+    assert isinstance(trusted.address, Address)
+    assert isinstance(trusted.purchases[0], Purchase)
+    assert trusted.documents == []
+
+
+def test_trusted_path_converts_timestamps():
+    timestamp = Timestamp()
+    timestamp.FromDatetime(datetime(2024, 1, 2, 3, 4, 5))
+    data = {'user_id': 'uid-1', 'email': 'fan@example.com', 'schema_version': fan_codec.SCHEMA_VERSION,
+            'created_at': timestamp, 'birth_date': '1998-05-17T00:00:00'}
+
+    fan = fan_codec.decode('uid-1', data)
+
+    assert fan.created_at == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    assert fan.birth_date == datetime(1998, 5, 17)
+
+
+def test_documents_without_marker_are_validated():
+    with pytest.raises(ValidationError):
+        fan_codec.decode('uid-1', {'user_id': 'uid-1', 'email': 'fan@example.com', 'profile_completeness': 'muito'})
+
+
+def test_decode_many_keeps_order_and_skips_missing(fan):
+    trusted = fan_codec.encode(fan)
+    legacy = {'user_id': 'uid-2', 'email': 'other@example.com', 'has_profile_image': True}
+
+    fans = fan_codec.decode_many([
+        _snapshot('uid-2', legacy),
+        _snapshot('uid-x', {}, exists=False),
+        _snapshot('uid-1', trusted),
+    ])
+
+    assert [f.id for f in fans] == ['uid-2', 'uid-1']
+
+
+def test_partial_encode_has_no_marker(fan):
+    assert fan_codec.encode(fan, fields=['name']) == {'name': 'Fan'}
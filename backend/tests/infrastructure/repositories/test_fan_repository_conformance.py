@@ -0,0 +1,172 @@
+"""
+Comportamento que toda implementação de `FanRepository` precisa ter.
+
+Uma nova implementação entra na lista de `repository` e passa a rodar todos
+os testes abaixo.
+"""
+from datetime import datetime
+
+import pytest
+
+from src.domain.entities.fan import Fan, Document, EventInterest, Purchase
+from src.domain.repositories.fan_repository import ConcurrentUpdateError
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_fan_repository import SqliteFanRepository
+
+
+@pytest.fixture(params=['firestore', 'sqlite'])
+def repository(request, tmp_path):
+    if request.param == 'firestore':
+        db = FakeFirestoreClient()
+        yield FirestoreFanRepository(db=db, stats=FirestoreFanStatsRepository(db, shards=2))
+    else:
+        db = SqliteDatabase(tmp_path / 'fans.sqlite3')
+        yield SqliteFanRepository(db)
+        db.close()
+
+
+def _naive(value):
+    # O Firestore devolve datas em UTC; as gravadas pelo backend são ingênuas
+    return value.replace(tzinfo=None)
+
+
+def _fan(user_id='uid-1', **fields):
+    return Fan(user_id=user_id, email=f'{user_id}@example.com', **fields)
+
+
+def test_create_and_find_round_trip(repository):
+    uploaded = datetime(2026, 3, 1, 12, 30)
+    created = repository.create(_fan(
+        name='Fan', cpf='123.456.789-00', favorite_games=['CS:GO'], address={'city': 'São Paulo', 'state': 'SP'},
+        documents=[Document(doc_type='RG', doc_number='123', uploaded_at=uploaded)],
+        completeness_contributions={'name': 10},
+    ))
+
+    found = repository.find_by_id('uid-1')
+
+    assert created.id == found.id == 'uid-1'
+    assert repository.find_by_user_id('uid-1') == found
+    assert found.favorite_games == ['Counter-Strike 2']
+    assert found.address.city == 'São Paulo' and found.address.country == 'Brasil'
+    assert _naive(found.documents[0].uploaded_at) == uploaded
+    assert found.completeness_contributions == {'name': 10}
+    assert _naive(found.created_at) == created.created_at
+    assert repository.find_by_id('missing') is None
+
+
+def test_create_refuses_an_existing_fan(repository):
+    repository.create(_fan(name='Primeiro'))
+
+    with pytest.raises(ValueError):
+        repository.create(_fan(name='Segundo'))
+    assert repository.find_by_id('uid-1').name == 'Primeiro'
+
+
+def test_find_many_keeps_order_and_skips_missing(repository):
+    for user_id in ('a', 'b', 'c'):
+        repository.create(_fan(user_id))
+
+    assert [fan.id for fan in repository.find_many(['c', 'missing', 'a'])] == ['c', 'a']
+    assert repository.find_many([]) == []
+
+
+def test_update_replaces_the_fan(repository):
+    fan = repository.create(_fan(name='Antes', phone='11999999999'))
+
+    fan.name, fan.phone = 'Depois', '11888888888'
+    repository.update(fan)
+
+    found = repository.find_by_id('uid-1')
+    assert (found.name, found.phone) == ('Depois', '11888888888')
+    assert found.updated_at is not None
+    with pytest.raises(ValueError):
+        repository.update(_fan('missing'))
+
+
+def test_update_profile_merges_the_address(repository):
+    repository.create(_fan(address={'city': 'Rio de Janeiro', 'state': 'RJ'}))
+
+    fan = repository.update_profile('uid-1', {'name': 'Novo', 'address': {'state': 'SP'},
+                                              'favorite_teams': ['FURIA']})
+
+    assert fan.name == 'Novo'
+    assert (fan.address.city, fan.address.state) == ('Rio de Janeiro', 'SP')
+    assert repository.find_by_id('uid-1').favorite_teams == fan.favorite_teams
+
+
+def test_appends_and_counters(repository):
+    repository.create(_fan())
+
+    repository.add_purchase('uid-1', Purchase(item_name='Camisa', amount=200.0))
+    repository.add_purchase('uid-1', Purchase(item_name='Camisa', amount=200.0))
+    repository.add_document('uid-1', Document(doc_type='RG', doc_number='1'))
+    repository.add_event_interest('uid-1', EventInterest(event_name='IEM Rio'))
+
+    fan = repository.find_by_id('uid-1')
+    assert (fan.purchase_count, fan.total_spent, fan.event_count) == (2, 400.0, 1)
+    # Compras e eventos ficam na linha do tempo, fora do perfil
+    assert (fan.purchases, fan.event_interests) == ([], [])
+    assert [doc.doc_number for doc in fan.documents] == ['1']
+    assert fan.updated_at is not None
+    with pytest.raises(ValueError):
+        repository.add_purchase('missing', Purchase(item_name='Boné', amount=80.0))
+    with pytest.raises(ValueError):
+        repository.update_fields('missing', {'phone': '1'})
+
+
+def test_unit_of_work_writes_changes_and_detects_conflicts(repository):
+    repository.create(_fan(name='Fan'))
+
+    with repository.unit_of_work('uid-1') as uow:
+        uow.fan.name = 'Fan Atualizado'
+    assert repository.find_by_id('uid-1').name == 'Fan Atualizado'
+
+    uow = repository.unit_of_work('uid-1')
+    repository.update_fields('uid-1', {'phone': '11999999999'})
+    uow.fan.name = 'Conflito'
+    with pytest.raises(ConcurrentUpdateError):
+        uow.commit()
+
+    attempts = []
+
+    def work(fan):
+        attempts.append(fan.phone)
+        if len(attempts) == 1:
+            repository.update_fields('uid-1', {'phone': '11888888888'})
+        fan.name = 'Depois do retry'
+
+    repository.run_in_unit_of_work('uid-1', work)
+    assert attempts == ['11999999999', '11888888888']
+    assert repository.find_by_id('uid-1').name == 'Depois do retry'
+    with pytest.raises(ValueError):
+        repository.unit_of_work('missing')
+
+
+def test_timelines_page_newest_first(repository):
+    repository.create(_fan())
+    purchases = [Purchase(item_name=f'Item {i}', amount=10.0 * i, purchase_date=datetime(2024, 1, 1 + i % 3))
+                 for i in range(7)]
+    for purchase in purchases:
+        repository.add_purchase('uid-1', purchase)
+    repository.add_event_interest('uid-1', EventInterest(event_name='IEM Rio'))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = repository.list_purchases('uid-1', limit=3, cursor=cursor)
+        seen.extend(page)
+        if cursor is None:
+            break
+
+    expected = sorted(purchases, key=lambda p: (p.purchase_date, p.id), reverse=True)
+    assert [p.id for p in seen] == [p.id for p in expected]
+    assert (seen[0].item_name, seen[0].amount) == (expected[0].item_name, expected[0].amount)
+    events, cursor = repository.list_event_interests('uid-1')
+    assert [event.event_name for event in events] == ['IEM Rio'] and cursor is None
+    assert repository.list_purchases('uid-2') == ([], None)
+    with pytest.raises(ValueError):
+        repository.add_purchase('uid-1', purchases[0])
+    with pytest.raises(ValueError):
+        repository.list_purchases('uid-1', cursor='not-a-cursor')
@@ -0,0 +1,28 @@
+from datetime import datetime, timedelta, timezone
+
+from src.domain.entities.event import Event
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_event_repository import FirestoreEventRepository
+
+
+def test_save_find_list_and_delete():
+    repository = FirestoreEventRepository(FakeFirestoreClient())
+    start = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    for day in (3, 1, 2, -1):
+        repository.save(Event(id=f'd{day}', title=f'Dia {day}', game='CS2', teams=['FURIA'], state='SP',
+                              starts_at=start + timedelta(days=day)))
+
+    event = repository.find_by_id('d1')
+    assert (event.title, event.teams, event.starts_at) == ('Dia 1', ['FURIA'], start + timedelta(days=1))
+    assert event.updated_at is not None
+    assert [e.id for e in repository.list_upcoming(start, limit=2)] == ['d1', 'd2']
+
+    assert repository.delete('d1') is True
+    assert repository.delete('d1') is False
+    assert repository.find_by_id('d1') is None
+    assert [e.id for e in repository.find_many(['d1', 'd2'])] == ['d2']
+    assert [e.id for e in repository.list_upcoming(start)] == ['d2', 'd3']
+    # O marcador fica no lugar do documento, com `updated_at` novo para os listeners
+    tombstone = repository.collection.document('d1').get().to_dict()
+    assert tombstone['deleted'] is True and tombstone['updated_at'] > event.updated_at
+    assert repository.delete('missing') is False
@@ -0,0 +1,156 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infrastructure.repositories.firestore_fan_listing import FanListQuery, FirestoreFanListing
+from src.infrastructure.repositories.page_cursor import decode_cursor, encode_cursor
+
+T0 = datetime(2026, 1, 1)
+
+_OPS = {'==': lambda a, b: a == b, '>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b, '<': lambda a, b: a < b}
+
+
+def _field(data, path):
+    for part in path.split('.'):
+        if not isinstance(data, dict) or part not in data:
+            return None
+        data = data[part]
+    return data
+
+
+class _Query:
+    """In-memory query recording what was asked of Firestore"""
+
+    def __init__(self, docs, log, filters=(), orders=(), fields=None, limit=None, after=None):
+        self.docs, self.log = docs, log
+        self.filters, self.orders, self.fields, self._limit, self._after = filters, orders, fields, limit, after
+
+    def _copy(self, **changes):
+        values = dict(filters=self.filters, orders=self.orders, fields=self.fields, limit=self._limit, after=self._after)
+        values.update(changes)
+        return _Query(self.docs, self.log, **values)
+
+    def where(self, filter):
+        return self._copy(filters=self.filters + ((filter.field_path, filter.op_string, filter.value),))
+
+    def select(self, fields):
+        return self._copy(fields=list(fields))
+
+    def order_by(self, field):
+        return self._copy(orders=self.orders + (field,))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, cursor):
+        return self._copy(after=cursor)
+
+    def _key(self, doc_id):
+        return tuple(doc_id if field == '__name__' else _field(self.docs[doc_id], field) for field in self.orders)
+
+    def stream(self):
+        self.log.append(self)
+        ids = [doc_id for doc_id, data in self.docs.items()
+               if all(_field(data, f) is not None and _OPS[op](_field(data, f), v) for f, op, v in self.filters)]
+        ids.sort(key=self._key)
+        if self._after is not None:
+            after = tuple(self._after[field] for field in self.orders)
+            ids = [doc_id for doc_id in ids if self._key(doc_id) > after]
+        for doc_id in ids[:self._limit]:
+            data = {key: value for key, value in self.docs[doc_id].items() if key in self.fields}
+            yield SimpleNamespace(id=doc_id, to_dict=lambda d=data: dict(d), get=lambda path, d=data: _field(d, path))
+
+
+def _listing(docs):
+    log = []
+    db = MagicMock()
+    db.collection.return_value = _Query(docs, log)
+    return FirestoreFanListing(db), log
+
+
+def _docs(count):
+    return {
+        f'uid-{i:03d}': {
+            'name': f'Fan {i}',
+            'email': f'fan{i}@example.com',
+            'cpf': '12345678900',
+            'profile_image_base64': 'x' * 1000,
+            'favorite_games': [1],
+            'address': {'state': 'SP' if i % 2 else 'RJ'},
+            'profile_completeness': i % 10 * 10,
+            'created_at': T0 + timedelta(hours=i),
+        }
+        for i in range(count)
+    }
+
+
+def test_pages_follow_cursors_with_projection():
+    docs = _docs(25)
+    listing, log = _listing(docs)
+    query = FanListQuery(fields=('name', 'favorite_games', 'created_at'), limit=10)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = listing.page(query, cursor)
+        seen.extend(fan['id'] for fan in page['fans'])
+        pages += 1
+        cursor = page['next']
+        if cursor is None:
+            break
+
+    assert seen == sorted(docs)
+    assert pages == 3
+    assert all(q.fields == ['created_at', 'favorite_games', 'name'] for q in log)
+    assert all(q._limit == 11 for q in log)
+    first = listing.page(query)['fans'][0]
+    assert first == {'id': 'uid-000', 'name': 'Fan 0', 'favorite_games': ['Counter-Strike 2'],
+                     'created_at': T0.isoformat()}
+
+
+def test_filters_order_by_the_range_field():
+    listing, log = _listing(_docs(40))
+    query = FanListQuery.from_args({'state': 'sp', 'min_completeness': '50', 'limit': '3', 'fields': 'email'})
+
+    ids, cursor = [], None
+    while True:
+        page = listing.page(query, cursor)
+        ids.extend(fan['id'] for fan in page['fans'])
+        cursor = page['next']
+        if not cursor:
+            break
+
+    expected = [f'uid-{i:03d}' for i in range(40) if i % 2 and i % 10 >= 5]
+    assert sorted(ids) == sorted(expected)
+    assert len(ids) == len(set(ids))
+    assert log[0].orders == ('profile_completeness', '__name__')
+    assert ('address.state', '==', 'SP') in log[0].filters
+    # Campo de ordenação lido para o cursor, mas não devolvido
+    assert 'profile_completeness' in log[0].fields and set(page['fans'][0]) <= {'id', 'email'}
+
+
+def test_stream_reads_every_match_in_pages():
+    listing, log = _listing(_docs(25))
+    query = FanListQuery.from_args({'created_after': (T0 + timedelta(hours=5)).isoformat(), 'limit': '7'})
+
+    rows = list(listing.stream(query))
+
+    assert [row['id'] for row in rows] == [f'uid-{i:03d}' for i in range(5, 25)]
+    assert len(log) == 3
+    assert all('cpf' not in row for row in rows)
+
+
+def test_invalid_requests_are_rejected():
+    with pytest.raises(ValueError):
+        FanListQuery.from_args({'fields': 'profile_image_base64'})
+    with pytest.raises(ValueError):
+        FanListQuery.from_args({'min_completeness': '10', 'created_after': '2026-01-01'})
+    with pytest.raises(ValueError):
+        FanListQuery.from_args({'limit': '5000'})
+    with pytest.raises(ValueError):
+        decode_cursor('não-é-cursor', '__name__')
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor('created_at', T0, 'uid-1'), 'profile_completeness')
+
+    assert decode_cursor(encode_cursor('created_at', T0, 'uid-1'), 'created_at') == {'__name__': 'uid-1', 'created_at': T0}
@@ -0,0 +1,88 @@
+from unittest.mock import MagicMock
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
+
+from src.domain.entities.fan import Purchase, EventInterest
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+
+
+@pytest.fixture
+def doc_ref():
+    return MagicMock()
+
+
+@pytest.fixture
+def db(doc_ref):
+    db = MagicMock()
+    db.collection.return_value.document.return_value = doc_ref
+    return db
+
+
+@pytest.fixture
+def repository(db):
+    return FirestoreFanRepository(db=db)
+
+
+def test_add_purchase_is_a_single_write_with_server_counters(repository, db, doc_ref):
+    purchase = Purchase(item_name="Camisa FURIA", amount=249.9)
+
+    repository.add_purchase("uid-1", purchase)
+
+    batch = db.batch.return_value
+    doc_ref.get.assert_not_called()
+    batch.update.assert_called_once()
+    batch.commit.assert_called_once()
+
+    # A compra vira um documento da subcoleção, com o id da própria compra
+    doc_ref.collection.assert_called_once_with('purchases')
+    doc_ref.collection.return_value.document.assert_called_once_with(purchase.id)
+    _, entry = batch.create.call_args.args
+    assert entry == {**purchase.dict(exclude_none=True), 'recorded_at': purchase.purchase_date}
+
+    _, fields = batch.update.call_args.args
+    assert 'purchases' not in fields
+    assert isinstance(fields['purchase_count'], firestore.Increment)
+    assert fields['purchase_count'].value == 1
+    assert fields['total_spent'].value == 249.9
+    assert 'updated_at' in fields
+
+    # Os agregados da base de fãs vão na mesma batch
+    _, stats = batch.set.call_args.args
+    assert stats['purchases'].value == 1
+    assert stats['total_spent'].value == 249.9
+    assert batch.set.call_args.kwargs == {'merge': True}
+
+    # Assim como os baldes de gasto do dia, do mês e total, do fã e da base
+    buckets = [call.args[1] for call in batch.set.call_args_list[:-1]]
+    assert sorted((bucket['scope'], bucket['granularity']) for bucket in buckets) == sorted(
+        (scope, granularity) for scope in ('fan:uid-1', 'global') for granularity in ('day', 'month', 'lifetime'))
+    assert all(bucket['amount'].value == 249.9 and bucket['count'].value == 1 for bucket in buckets)
+
+
+def test_identical_purchases_stay_distinct_in_array_union():
+    first = Purchase(item_name="Ingresso", amount=100.0)
+    second = Purchase(item_name="Ingresso", amount=100.0, purchase_date=first.purchase_date)
+
+    assert first.dict() != second.dict()
+
+
+def test_add_event_interest_only_counts_events(repository, db, doc_ref):
+    repository.add_event_interest("uid-1", EventInterest(event_name="IEM Rio"))
+
+    batch = db.batch.return_value
+    doc_ref.collection.assert_called_once_with('events')
+    _, entry = batch.create.call_args.args
+    assert entry['event_name'] == "IEM Rio" and 'recorded_at' in entry
+    _, fields = batch.update.call_args.args
+    assert set(fields) == {'event_count', 'updated_at'}
+    assert fields['event_count'].value == 1
+    batch.set.assert_not_called()
+
+
+def test_append_to_missing_fan_raises_value_error(repository, db):
+    db.batch.return_value.commit.side_effect = NotFound("no document")
+
+    with pytest.raises(ValueError):
+        repository.add_purchase("missing", Purchase(item_name="Boné", amount=80.0))
@@ -0,0 +1,115 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from google.cloud.firestore_v1 import Increment
+
+from src.domain.entities.fan import Fan
+from src.infrastructure.fakes.fake_firestore import FakeDocumentReference, FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_fan_stats_repository import FirestoreFanStatsRepository
+
+
+def test_stage_sends_nested_increments_to_one_shard():
+    db = MagicMock()
+    batch = MagicMock()
+
+    FirestoreFanStatsRepository(db, shards=4).stage(batch, {'fans': 1, 'games': {'CS:GO': 1, 'Valorant': -1}})
+
+    batch.set.assert_called_once()
+    _, data = batch.set.call_args.args
+    assert batch.set.call_args.kwargs == {'merge': True}
+    assert isinstance(data['fans'], Increment) and data['fans'].value == 1
+    assert {name: inc.value for name, inc in data['games'].items()} == {'CS:GO': 1, 'Valorant': -1}
+    shard_id = db.collection.return_value.document.call_args.args[0]
+    assert shard_id in {f'shard-{i}' for i in range(4)}
+
+
+def test_empty_delta_writes_nothing():
+    batch = MagicMock()
+
+    FirestoreFanStatsRepository(MagicMock()).stage(batch, {})
+
+    batch.set.assert_not_called()
+
+
+def test_overview_is_one_bulk_read_of_the_shards():
+    shards = [
+        {'fans': 3, 'purchases': 2, 'total_spent': 300.0, 'games': {'CS:GO': 2, 'Dota 2': 0}, 'states': {'SP': 3}},
+        {'fans': 1, 'purchases': 1, 'total_spent': 100.0, 'games': {'CS:GO': 1, 'Valorant': 1}, 'teams': {'FURIA': 1}},
+    ]
+    db = MagicMock()
+    db.get_all.return_value = [SimpleNamespace(exists=True, to_dict=lambda s=s: s) for s in shards] + \
+        [SimpleNamespace(exists=False, to_dict=lambda: None)]
+
+    overview = FirestoreFanStatsRepository(db, shards=3).get_overview(limit=5)
+
+    db.get_all.assert_called_once()
+    assert len(db.get_all.call_args.args[0]) == 3
+    assert overview == {
+        'total_fans': 4,
+        'total_purchases': 3,
+        'total_spent': 400.0,
+        'average_spent_per_fan': 100.0,
+        'top_games': [{'name': 'CS:GO', 'fans': 3}, {'name': 'Valorant', 'fans': 1}],
+        'top_teams': [{'name': 'FURIA', 'fans': 1}],
+        'fans_by_state': {'SP': 3},
+    }
+
+
+def test_unit_of_work_stages_aggregates_in_the_profile_batch():
+    snapshot = MagicMock(exists=True, id='uid-1', update_time='t0')
+    snapshot.to_dict.return_value = {'user_id': 'uid-1', 'email': 'fan@example.com',
+                                     'favorite_games': ['CS:GO'], 'schema_version': 1}
+    db = MagicMock()
+    db.collection.return_value.document.return_value.get.return_value = snapshot
+    repository = FirestoreFanRepository(db=db)
+
+    with repository.unit_of_work('uid-1') as uow:
+        uow.fan.favorite_games = ['Valorant']
+
+    batch = db.batch.return_value
+    batch.commit.assert_called_once()
+    _, data = batch.set.call_args.args
+    assert {name: inc.value for name, inc in data['games'].items()} == {'Counter-Strike 2': -1, 'Valorant': 1}
+    assert 'fans' not in data
+
+
+def test_concurrent_profile_updates_keep_the_aggregates_exact(monkeypatch):
+    db = FakeFirestoreClient()
+    stats = FirestoreFanStatsRepository(db, shards=2)
+    repository = FirestoreFanRepository(db=db, stats=stats)
+    repository.create(Fan(user_id='uid-1', email='fan@example.com', favorite_games=['CS:GO']))
+
+    read = FakeDocumentReference.get
+    interfered = []
+
+    def get(self, *args, **kwargs):
+        snapshot = read(self, *args, **kwargs)
+        if self.path == 'fans/uid-1' and not interfered:
+            # Outra atualização do mesmo perfil entre a leitura e a escrita
+            interfered.append(True)
+            repository.update_profile('uid-1', {'favorite_games': ['Dota 2']})
+        return snapshot
+
+    monkeypatch.setattr(FakeDocumentReference, 'get', get)
+    repository.update_profile('uid-1', {'favorite_games': ['Valorant']})
+
+    totals = stats.totals()
+    assert totals['fans'] == 1
+    assert {name: count for name, count in totals['games'].items() if count} == {'Valorant': 1}
+
+
+def test_create_over_an_existing_profile_does_not_count_the_fan_twice():
+    db = FakeFirestoreClient()
+    stats = FirestoreFanStatsRepository(db, shards=2)
+    repository = FirestoreFanRepository(db=db, stats=stats)
+    # Perfil já criado por outro caminho (por exemplo, a edição de perfil)
+    repository.update_profile('uid-1', {'email': 'fan@example.com', 'favorite_games': ['CS:GO']})
+
+    with pytest.raises(ValueError):
+        repository.create(Fan(user_id='uid-1', email='fan@example.com', favorite_games=['Valorant']))
+
+    totals = stats.totals()
+    assert totals['fans'] == 1
+    assert {name: count for name, count in totals['games'].items() if count} == {'Counter-Strike 2': 1}
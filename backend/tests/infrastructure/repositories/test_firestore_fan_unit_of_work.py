@@ -0,0 +1,103 @@
+from unittest.mock import MagicMock
+
+import pytest
+from firebase_admin import firestore
+from google.api_core.exceptions import FailedPrecondition
+
+from src.domain.repositories.fan_repository import ConcurrentUpdateError
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+
+
+def _snapshot(data, doc_id="uid-1"):
+    snapshot = MagicMock()
+    snapshot.exists = True
+    snapshot.id = doc_id
+    snapshot.to_dict.return_value = dict(data)
+    snapshot.update_time = "t0"
+    return snapshot
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.collection.return_value.document.return_value.get.return_value = _snapshot({
+        'user_id': 'uid-1',
+        'email': 'fan@example.com',
+        'name': 'Fan',
+        'phone': '11999999999',
+        'favorite_teams': ['FURIA'],
+        'schema_version': 1,
+    })
+    return db
+
+
+def test_commit_writes_only_changed_fields_with_precondition(db):
+    repository = FirestoreFanRepository(db=db)
+
+    with repository.unit_of_work('uid-1') as uow:
+        uow.fan.name = 'Novo Nome'
+        uow.fan.favorite_teams.append('paiN')
+        uow.fan.phone = None
+
+    batch = db.batch.return_value
+    batch.update.assert_called_once()
+    batch.commit.assert_called_once()
+
+    _, fields = batch.update.call_args.args
+    assert set(fields) == {'name', 'favorite_teams', 'phone', 'updated_at'}
+    assert fields['favorite_teams'] == [1, 2]  # FURIA, paiN Gaming
+    assert fields['phone'] is firestore.DELETE_FIELD
+    db.write_option.assert_called_once_with(last_update_time="t0")
+
+
+def test_legacy_document_is_rewritten_in_codec_format(db):
+    doc_ref = db.collection.return_value.document.return_value
+    doc_ref.get.return_value.to_dict.return_value.pop('schema_version')
+    repository = FirestoreFanRepository(db=db)
+
+    with repository.unit_of_work('uid-1') as uow:
+        uow.fan.name = 'Novo Nome'
+
+    _, fields = db.batch.return_value.update.call_args.args
+    assert fields['schema_version'] == 1
+    assert fields['email'] == 'fan@example.com'
+    assert fields['name'] == 'Novo Nome'
+
+
+def test_unchanged_aggregate_is_not_written(db):
+    repository = FirestoreFanRepository(db=db)
+
+    with repository.unit_of_work('uid-1'):
+        pass
+
+    db.batch.assert_not_called()
+
+
+def test_exception_in_block_discards_changes(db):
+    repository = FirestoreFanRepository(db=db)
+
+    with pytest.raises(RuntimeError):
+        with repository.unit_of_work('uid-1') as uow:
+            uow.fan.name = 'Descartado'
+            raise RuntimeError("falha no caso de uso")
+
+    db.batch.assert_not_called()
+
+
+def test_conflict_reloads_and_retries(db):
+    repository = FirestoreFanRepository(db=db)
+    db.batch.return_value.commit.side_effect = [FailedPrecondition("stale"), None]
+    doc_ref = db.collection.return_value.document.return_value
+
+    repository.run_in_unit_of_work('uid-1', lambda fan: setattr(fan, 'name', 'Outro'))
+
+    assert doc_ref.get.call_count == 2
+    assert db.batch.return_value.commit.call_count == 2
+
+
+def test_conflict_surfaces_after_max_attempts(db):
+    repository = FirestoreFanRepository(db=db)
+    db.batch.return_value.commit.side_effect = FailedPrecondition("stale")
+
+    with pytest.raises(ConcurrentUpdateError):
+        repository.run_in_unit_of_work('uid-1', lambda fan: setattr(fan, 'name', 'Outro'), max_attempts=2)
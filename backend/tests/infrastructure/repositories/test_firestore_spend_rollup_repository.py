@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from src.domain.entities.fan import Fan, Purchase
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+
+NOW = datetime(2024, 5, 20, 12, 0)
+
+
+def _repository(db, shards=4):
+    rollups = FirestoreSpendRollupRepository(db, shards=shards, clock=lambda: NOW)
+    return FirestoreFanRepository(db, rollups=rollups), rollups
+
+
+def test_purchases_feed_daily_monthly_and_lifetime_buckets():
+    db = FakeFirestoreClient()
+    repository, rollups = _repository(db)
+    for uid in ('uid-1', 'uid-2'):
+        repository.create(Fan(user_id=uid, email=f'{uid}@example.com'))
+
+    for day in range(1, 21):
+        repository.add_purchase('uid-1', Purchase(item_name='Ingresso', amount=10.0,
+                                                  purchase_date=datetime(2024, 5, day, 9)))
+    repository.add_purchase('uid-2', Purchase(item_name='Camisa', amount=250.0, purchase_date=datetime(2023, 7, 4)))
+
+    # Um ano de um fã: um get_all de 12 documentos
+    db.reset_counters()
+    months = rollups.by_month(12, 'uid-1', now=NOW)
+    assert db.counters()['reads'] == 12
+    assert [month['period'] for month in months][::11] == ['2023-06', '2024-05']
+    assert months[-1] == {'period': '2024-05', 'amount': 200.0, 'count': 20}
+    assert sum(month['count'] for month in months) == 20
+
+    base = rollups.by_month(12, now=NOW)
+    assert (base[1]['amount'], base[-1]['amount']) == (250.0, 200.0)
+    assert rollups.lifetime() == {'period': 'all', 'amount': 450.0, 'count': 21}
+    assert rollups.lifetime('uid-2')['amount'] == 250.0
+    assert rollups.by_day(3, 'uid-1', now=NOW)[0] == {'period': '2024-05-18', 'amount': 10.0, 'count': 1}
+
+    # A compra em um mês já fechado vai só para o fragmento 0
+    shards = {snapshot.id for snapshot in db.collection('spend_rollups').stream()}
+    assert 'global:2023-07' in shards and not any(name.startswith('global:2023-07:') for name in shards)
+
+
+def test_merge_shards_folds_a_closed_period_into_one_document():
+    db = FakeFirestoreClient()
+    writer, _ = _repository(db, shards=8)
+    writer.create(Fan(user_id='uid-1', email='uid-1@example.com'))
+    for day in range(1, 21):
+        writer.add_purchase('uid-1', Purchase(item_name='Ingresso', amount=10.0, purchase_date=datetime(2024, 5, day)))
+
+    # Um mês depois, maio está fechado
+    rollups = FirestoreSpendRollupRepository(db, shards=8, clock=lambda: datetime(2024, 6, 2))
+    assert ('month', '2024-05') in rollups.sharded_periods()
+    rollups.merge_shards('month', '2024-05')
+
+    assert ('month', '2024-05') not in rollups.sharded_periods()
+    db.reset_counters()
+    assert rollups.by_month(12, now=datetime(2024, 6, 2))[-2] == {'period': '2024-05', 'amount': 200.0, 'count': 20}
+    # Maio compactado é um único documento
+    assert db.counters()['reads'] == 1
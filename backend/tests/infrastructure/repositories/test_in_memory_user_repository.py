@@ -0,0 +1,58 @@
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.domain.entities.user import User
+from src.infrastructure.repositories.user_repository_impl import InMemoryUserRepository
+
+
+def test_concurrent_writes_keep_the_indexes_consistent():
+    repository = InMemoryUserRepository()
+    start = threading.Barrier(8)
+    rejected = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        start.wait()
+        for _ in range(300):
+            email = f'fan{rng.randrange(50)}@example.com'
+            action = rng.random()
+            try:
+                if action < 0.5:
+                    repository.create(User(name='Fan', email=email, password='x'))
+                elif action < 0.8:
+                    user = repository.find_by_email(email)
+                    if user is not None:
+                        user.name = f'Fan {seed}'
+                        repository.update(user)
+                else:
+                    user = repository.find_by_email(email)
+                    if user is not None:
+                        repository.delete(user.id)
+            except ValueError:
+                rejected.append(email)
+            assert len(repository.find_page(10)) <= 10
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(worker, range(8)))
+
+    users = repository.find_all()
+    emails = [user.email for user in users]
+    assert len(emails) == len(set(emails))
+    assert rejected
+    for user in users:
+        assert repository.find_by_email(user.email).id == user.id
+    assert [(u.created_at, u.id) for u in users] == sorted((u.created_at, u.id) for u in users)
+
+
+def test_returned_users_are_copies():
+    repository = InMemoryUserRepository()
+    user = repository.create(User(name='Fan', email='fan@example.com', password='x'))
+
+    user.name = 'Alterado sem update'
+
+    assert repository.find_by_id(user.id).name == 'Fan'
+    with pytest.raises(ValueError):
+        repository.create(User(name='Outro', email=' FAN@example.com', password='x'))
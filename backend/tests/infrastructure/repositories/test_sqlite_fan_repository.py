@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.domain.entities.fan import Fan, Purchase
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_fan_repository import SqliteFanRepository, cpf_hash
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SqliteDatabase(tmp_path / 'fans.sqlite3')
+    yield db
+    db.close()
+
+
+def test_schema_uses_wal_json_columns_and_indexes(db):
+    repository = SqliteFanRepository(db)
+    repository.create(Fan(user_id='uid-1', email='fan@example.com', cpf='123.456.789-00',
+                          favorite_games=['CS:GO'], address={'state': 'SP'}))
+
+    assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    indexes = {row[1] for row in db.execute('PRAGMA index_list(fans)')}
+    assert {'fans_email', 'fans_cpf_hash', 'fans_updated_at'} <= indexes
+    row = db.execute("SELECT json_extract(address, '$.state'), favorite_games, cpf_hash FROM fans").fetchone()
+    # Jogos gravados como ids do catálogo, como no Firestore
+    assert row[0] == 'SP' and row[1] == '[1]'
+    assert row[2] == cpf_hash('12345678900')
+
+    plan = ' '.join(str(row[-1]) for row in db.execute(
+        'EXPLAIN QUERY PLAN SELECT user_id FROM fans WHERE cpf_hash = ?', (row[2],)))
+    assert 'fans_cpf_hash' in plan
+    assert [fan.id for fan in repository.find_by_cpf('12345678900')] == ['uid-1']
+    assert [fan.id for fan in repository.find_by_email('fan@example.com')] == ['uid-1']
+
+
+def test_save_many_and_concurrent_appends(db):
+    repository = SqliteFanRepository(db)
+    assert repository.save_many(Fan(user_id=f'uid-{i}', email=f'fan{i}@example.com') for i in range(20)) == 20
+
+    def buy(index):
+        repository.add_purchase(f'uid-{index % 4}', Purchase(item_name='Ingresso', amount=10.0))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(buy, range(200)))
+
+    fans = repository.find_many([f'uid-{i}' for i in range(4)])
+    assert [(fan.purchase_count, fan.total_spent) for fan in fans] == [(50, 500.0)] * 4
+    assert [len(repository.list_purchases(f'uid-{i}', limit=100)[0]) for i in range(4)] == [50] * 4
+
+
+def test_import_does_not_load_the_firestore_client():
+    # Num interpretador novo: os outros testes já carregaram o cliente gRPC
+    code = ("import sys, src.infrastructure.repositories.sqlite_fan_repository; "
+            "print(sorted(m for m in ('grpc', 'google.cloud.firestore', 'firebase_admin.firestore') if m in sys.modules))")
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
@@ -0,0 +1,93 @@
+import pytest
+
+from src.domain.entities.job import QUEUED, RUNNING, SUCCEEDED, DEAD
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_job_queue import SqliteJobQueue
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    db = SqliteDatabase(tmp_path / 'jobs.sqlite3')
+    yield SqliteJobQueue(db, clock=clock)
+    db.close()
+
+
+def test_claim_respects_types_delay_and_ownership(queue, clock):
+    later = queue.enqueue('verify_document', {'fan_id': 'uid-1'}, delay=30)
+    now = queue.enqueue('verify_esports_profile', {'fan_id': 'uid-1'})
+
+    assert queue.claim(['verify_document'], 'w1', 60) is None
+    job = queue.claim(['verify_document', 'verify_esports_profile'], 'w1', 60)
+    assert (job.id, job.status, job.attempts) == (now.id, RUNNING, 1)
+    assert queue.claim(['verify_esports_profile'], 'w2', 60) is None
+
+    clock.now += 30
+    assert queue.claim(['verify_document'], 'w2', 60).id == later.id
+    assert queue.complete(now.id, 'w1')
+    assert queue.get(now.id).status == SUCCEEDED
+    assert queue.counts() == {SUCCEEDED: 1, RUNNING: 1}
+
+
+def test_failures_back_off_then_go_to_dead_letters(queue, clock):
+    job = queue.enqueue('verify_document', {'doc_id': '1'}, max_attempts=2)
+
+    queue.claim(['verify_document'], 'w1', 60)
+    failed = queue.fail(job.id, 'w1', 'ValueError: boom', retry_delay=10)
+    assert (failed.status, failed.last_error) == (QUEUED, 'ValueError: boom')
+    assert queue.claim(['verify_document'], 'w1', 60) is None
+
+    clock.now += 10
+    assert queue.claim(['verify_document'], 'w1', 60).attempts == 2
+    assert queue.fail(job.id, 'w1', 'ValueError: boom', retry_delay=20).status == DEAD
+    assert [dead.id for dead in queue.dead_letters()] == [job.id]
+
+    retried = queue.retry(job.id)
+    assert (retried.status, retried.attempts) == (QUEUED, 0)
+    assert queue.dead_letters() == []
+    with pytest.raises(ValueError):
+        queue.retry(job.id)
+
+
+def test_expired_leases_are_reclaimed(queue, clock):
+    job = queue.enqueue('verify_document', {}, max_attempts=2)
+    queue.claim(['verify_document'], 'crashed', 60)
+
+    clock.now += 61
+    assert queue.claim(['verify_document'], 'w2', 60).attempts == 2
+
+    # A última tentativa também expirou: vai para os dead letters
+    clock.now += 61
+    assert queue.claim(['verify_document'], 'w3', 60) is None
+    assert queue.get(job.id).status == DEAD
+
+
+def test_late_results_from_an_expired_lease_are_dropped(queue, clock):
+    job = queue.enqueue('verify_document', {}, max_attempts=3)
+    queue.claim(['verify_document'], 'w1', 60)
+
+    clock.now += 61
+    assert queue.claim(['verify_document'], 'w2', 60).attempts == 2
+
+    # w1 acorda depois de perder a reserva: nem requeue nem conclusão valem
+    assert queue.fail(job.id, 'w1', 'TimeoutError: late', retry_delay=0) is None
+    assert queue.claim(['verify_document'], 'w3', 60) is None
+    assert not queue.complete(job.id, 'w1')
+    current = queue.get(job.id)
+    assert (current.status, current.attempts, current.last_error) == (RUNNING, 2, None)
+
+    assert queue.complete(job.id, 'w2')
+    assert queue.get(job.id).status == SUCCEEDED
+    assert queue.fail(job.id, 'w2', 'ValueError: twice', retry_delay=0) is None
@@ -0,0 +1,84 @@
+"""
+Comportamento que toda implementação de `UserRepository` precisa ter.
+"""
+import pytest
+
+from src.domain.entities.user import User
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_user_repository import SqliteUserRepository
+from src.infrastructure.repositories.user_repository_impl import InMemoryUserRepository
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def repository(request, tmp_path):
+    if request.param == 'memory':
+        yield InMemoryUserRepository()
+    else:
+        db = SqliteDatabase(tmp_path / 'users.sqlite3')
+        yield SqliteUserRepository(db)
+        db.close()
+
+
+def _user(name='Fan', email='fan@example.com'):
+    return User(name=name, email=email, password='secret')
+
+
+def test_create_find_and_list(repository):
+    first = repository.create(_user())
+    second = repository.create(_user('Outro', 'outro@example.com'))
+
+    found = repository.find_by_id(first.id)
+    assert first.id and found.id == first.id
+    assert (found.name, found.email, found.created_at) == ('Fan', 'fan@example.com', first.created_at)
+    assert [user.id for user in repository.find_all()] == [first.id, second.id]
+    assert repository.find_by_id('missing') is None
+
+
+def test_update_and_delete(repository):
+    user = repository.create(_user())
+
+    user.name = 'Atualizado'
+    repository.update(user)
+    assert repository.find_by_id(user.id).name == 'Atualizado'
+    assert repository.find_by_id(user.id).updated_at is not None
+
+    with pytest.raises(ValueError):
+        repository.update(User(id='missing', name='X', email='x@example.com', password='x'))
+
+    assert repository.delete(user.id) is True
+    assert repository.delete(user.id) is False
+    assert repository.find_all() == []
+
+
+def test_email_is_unique_and_indexed(repository):
+    user = repository.create(_user())
+
+    assert repository.find_by_email('FAN@example.com').id == user.id
+    assert repository.find_by_email('outro@example.com') is None
+    with pytest.raises(ValueError):
+        repository.create(_user('Outro', 'Fan@Example.com'))
+
+    other = repository.create(_user('Outro', 'outro@example.com'))
+    other.email = 'fan@example.com'
+    with pytest.raises(ValueError):
+        repository.update(other)
+
+    user.email = 'novo@example.com'
+    repository.update(user)
+    assert repository.find_by_email('fan@example.com') is None
+    assert repository.find_by_email('novo@example.com').id == user.id
+
+
+def test_pages_follow_created_at_order(repository):
+    created = [repository.create(_user(f'Fan {i}', f'fan{i}@example.com')) for i in range(7)]
+
+    seen, after = [], None
+    while True:
+        page = repository.find_page(3, after)
+        if not page:
+            break
+        seen.extend(user.id for user in page)
+        after = (page[-1].created_at, page[-1].id)
+
+    assert seen == [user.id for user in created]
+    assert [user.id for user in repository.find_all()] == seen
@@ -0,0 +1,80 @@
+import random
+from datetime import datetime, timedelta
+
+from src.domain.catalog.interest_catalog import get_catalog
+from src.domain.entities.event import Event
+from src.infrastructure.segments.event_recommender import EventRecommender, fan_segment
+
+NOW = datetime(2024, 6, 1, 12, 0)
+GAMES = ['CS2', 'Valorant', 'League of Legends', 'Free Fire', 'Jogo Desconhecido']
+TEAMS = ['FURIA', 'paiN', 'LOUD', 'MIBR']
+STATES = ['SP', 'RJ', 'MG']
+
+
+def _random_event(rng, event_id):
+    online = rng.random() < 0.2
+    return Event(
+        id=event_id, title=f'Evento {event_id}', game=rng.choice(GAMES),
+        teams=rng.sample(TEAMS, rng.randint(0, 2)), state=None if online else rng.choice(STATES),
+        online=online, starts_at=NOW + timedelta(minutes=rng.randrange(-2000, 200000)),
+    )
+
+
+def _expected(events, segment, limit):
+    # Notas calculadas evento a evento, sem NumPy
+    catalog = get_catalog()
+    state, game, team = segment
+    ranked = []
+    for event in events.values():
+        if not NOW <= event.starts_at <= NOW + timedelta(days=90):
+            continue
+        if not (event.online or not state or event.state == state):
+            continue
+        score = 3 * (catalog.resolve('game', event.game) == game and game != 0)
+        score += 2 * (team != 0 and any(catalog.resolve('team', name) == team for name in event.teams))
+        score += 1 * (bool(state) and not event.online and event.state == state)
+        if score > 0:
+            ranked.append((-score, event.starts_at, event.id))
+    return [event_id for _, _, event_id in sorted(ranked)[:limit]]
+
+
+def test_incremental_updates_match_brute_force():
+    rng = random.Random(5)
+    events = {f'e{i}': _random_event(rng, f'e{i}') for i in range(60)}
+    recommender = EventRecommender(depth=8, clock=lambda: NOW).load(events.values(), NOW)
+
+    catalog = get_catalog()
+    segments = [('', 0, 0), ('SP', catalog.resolve('game', 'CS2'), catalog.resolve('team', 'FURIA')),
+                ('RJ', catalog.resolve('game', 'Valorant'), 0), ('MG', 0, catalog.resolve('team', 'LOUD')),
+                ('', catalog.resolve('game', 'League of Legends'), catalog.resolve('team', 'paiN'))]
+
+    for step in range(120):
+        event_id = f'e{rng.randrange(80)}'
+        if rng.random() < 0.2:
+            events.pop(event_id, None)
+            recommender.apply(event_id, None)
+        else:
+            events[event_id] = _random_event(rng, event_id)
+            recommender.apply(event_id, events[event_id])
+
+        if step % 10 == 0:
+            for segment in segments:
+                actual = [event.id for event in recommender.recommend_segment(segment, 8, NOW)]
+                assert actual == _expected(events, segment, 8), (step, segment)
+
+
+def test_fan_segment_and_serving_filters():
+    recommender = EventRecommender(clock=lambda: NOW).load([
+        Event(id='local', title='CS2 em SP', game='CS:GO', state='sp', starts_at=NOW + timedelta(days=3)),
+        Event(id='online', title='CS2 online', game='CS2', online=True, starts_at=NOW + timedelta(days=1)),
+        Event(id='far', title='CS2 no RJ', game='CS2', state='RJ', starts_at=NOW + timedelta(days=2)),
+        Event(id='later', title='CS2 em SP', game='CS2', state='SP', starts_at=NOW + timedelta(days=200)),
+        Event(id='soon', title='Major em SP', game='CS2', teams=['FURIA'], state='SP',
+              starts_at=NOW + timedelta(hours=1)),
+    ], NOW)
+    fan = {'favorite_games': ['Jogo Desconhecido', 'counter strike 2'], 'address': {'state': 'SP'}}
+
+    assert fan_segment(fan) == ('SP', get_catalog().resolve('game', 'CS2'), 0)
+    assert [event.id for event in recommender.recommend(fan, now=NOW)] == ['soon', 'local', 'online']
+    # Eventos que já começaram somem da lista servida antes da próxima montagem
+    assert [event.id for event in recommender.recommend(fan, now=NOW + timedelta(hours=2))] == ['local', 'online']
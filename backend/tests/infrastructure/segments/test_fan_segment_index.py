@@ -0,0 +1,116 @@
+import random
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.infrastructure.segments.fan_segment_index import FanSegmentIndex
+from src.infrastructure.segments.firestore_fan_segment_index import watch
+
+GAMES = ['CS2', 'Valorant', 'League of Legends', 'Dota 2']
+TEAMS = ['FURIA', 'paiN', 'LOUD']
+STATES = ['SP', 'RJ', 'MG']
+
+
+def _random_doc(rng):
+    return {
+        'favorite_games': rng.sample(GAMES, rng.randint(0, 3)),
+        'favorite_teams': rng.sample(TEAMS, rng.randint(0, 2)),
+        'address': {'state': rng.choice(STATES), 'city': rng.choice(['São Paulo', 'Campinas'])},
+        'purchase_count': 1,
+        'total_spent': rng.choice([0.0, 30.0, 120.0, 600.0]),
+    }
+
+
+def _matches(doc, query):
+    (operator, operand), = query.items()
+    if operator == 'and':
+        return all(_matches(doc, node) for node in operand)
+    if operator == 'or':
+        return any(_matches(doc, node) for node in operand)
+    if operator == 'not':
+        return not _matches(doc, operand)
+    if operator == 'game':
+        return operand.casefold() in [g.casefold() for g in doc['favorite_games']]
+    if operator == 'team':
+        return operand.casefold() in [t.casefold() for t in doc['favorite_teams']]
+    if operator == 'state':
+        return doc['address']['state'] == operand
+    if operator == 'min_spent':
+        return doc['total_spent'] >= operand
+    raise AssertionError(operator)
+
+
+QUERIES = [
+    {'game': 'cs2'},
+    {'and': [{'state': 'SP'}, {'game': 'CS2'}, {'team': 'FURIA'}, {'min_spent': 100}]},
+    {'or': [{'team': 'LOUD'}, {'not': {'state': 'RJ'}}]},
+    {'and': [{'game': 'Valorant'}, {'not': {'or': [{'team': 'paiN'}, {'min_spent': 500}]}}]},
+]
+
+
+def test_queries_match_brute_force_after_updates():
+    rng = random.Random(11)
+    docs = {f'uid-{i:04d}': _random_doc(rng) for i in range(400)}
+    index = FanSegmentIndex.build(docs.items())
+
+    for step in range(300):
+        doc_id = f'uid-{rng.randrange(450):04d}'
+        if rng.random() < 0.15:
+            docs.pop(doc_id, None)
+            index.apply(doc_id, None)
+        else:
+            docs[doc_id] = _random_doc(rng)
+            index.apply(doc_id, docs[doc_id])
+
+        if step % 50 == 0:
+            for query in QUERIES:
+                expected = sorted(doc_id for doc_id, doc in docs.items() if _matches(doc, query))
+                result = index.search(query, limit=1000)
+                assert index.count(query) == result['count'] == len(expected)
+                assert sorted(result['ids']) == expected
+
+    assert len(index) == len(docs)
+
+
+def test_pages_follow_the_cursor_without_gaps():
+    docs = {f'uid-{i:03d}': {'favorite_games': ['CS2']} for i in range(25)}
+    index = FanSegmentIndex.build(docs.items())
+
+    seen, after = [], None
+    while True:
+        page = index.search({'game': 'CS2'}, limit=10, after=after)
+        seen.extend(page['ids'])
+        after = page['next']
+        if after is None:
+            break
+
+    assert seen == sorted(docs)
+
+
+def test_invalid_queries_raise_value_error():
+    index = FanSegmentIndex.build([])
+
+    with pytest.raises(ValueError):
+        index.count({'min_spent': 123})
+    with pytest.raises(ValueError):
+        index.count({'game': 'CS2', 'team': 'FURIA'})
+    with pytest.raises(ValueError):
+        index.count({'color': 'blue'})
+
+
+def test_listener_applies_changes_and_removals():
+    index = FanSegmentIndex.build([('uid-1', {'favorite_games': ['CS2']})])
+    collection = MagicMock()
+
+    watch(collection, index, since=datetime(2026, 1, 1))
+    on_snapshot = collection.where.return_value.on_snapshot.call_args.args[0]
+
+    def change(kind, doc_id, data=None):
+        document = SimpleNamespace(id=doc_id, to_dict=lambda: data)
+        return SimpleNamespace(type=SimpleNamespace(name=kind), document=document)
+
+    on_snapshot([], [change('ADDED', 'uid-2', {'favorite_games': ['CS2']}), change('REMOVED', 'uid-1')], None)
+
+    assert index.search({'game': 'CS2'})['ids'] == ['uid-2']
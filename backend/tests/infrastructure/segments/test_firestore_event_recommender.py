@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from src.domain.entities.event import Event
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_event_repository import EVENTS_COLLECTION, FirestoreEventRepository
+from src.infrastructure.segments.firestore_event_recommender import load_event_recommender, watch
+
+
+class _Watched:
+    """Collection whose `on_snapshot` delivers, on `deliver()`, the documents the query matches"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self.listeners = []
+
+    def where(self, **kwargs):
+        query = self.collection.where(**kwargs)
+        return SimpleNamespace(on_snapshot=lambda callback: self.listeners.append((query, callback)))
+
+    def deliver(self):
+        for query, callback in self.listeners:
+            docs = list(query.stream())
+            changes = [SimpleNamespace(type=SimpleNamespace(name='MODIFIED'), document=doc) for doc in docs]
+            callback(docs, changes, datetime.now())
+
+
+def test_deleting_an_event_loaded_before_the_listener_removes_it():
+    db = FakeFirestoreClient()
+    repository = FirestoreEventRepository(db)
+    now = datetime.now()
+    for event_id in ('keep', 'drop'):
+        repository.save(Event(id=event_id, title=event_id, game='CS2', teams=['FURIA'], state='SP',
+                              starts_at=now + timedelta(days=1)))
+
+    since = datetime.now()
+    recommender = load_event_recommender(db, now)
+    collection = _Watched(db.collection(EVENTS_COLLECTION))
+    watch(collection, recommender, since)
+    fan = {'favorite_games': ['CS2'], 'address': {'state': 'SP'}}
+    assert {event.id for event in recommender.recommend(fan, now=now)} == {'keep', 'drop'}
+
+    assert repository.delete('drop')
+    collection.deliver()
+
+    assert [event.id for event in recommender.recommend(fan, now=now)] == ['keep']
+    # Nem a próxima carga (a de um novo worker) traz o evento de volta
+    assert [event.id for event in load_event_recommender(db, now).recommend(fan, now=now)] == ['keep']
@@ -0,0 +1,77 @@
+import random
+
+import numpy as np
+import pytest
+
+from src.infrastructure.segments.lookalike_index import LookalikeIndex, fan_features, get_lookalike_index
+
+GAMES = ['CS2', 'Valorant', 'League of Legends', 'Dota 2', 'Rocket League']
+TEAMS = ['FURIA', 'paiN', 'LOUD', 'MIBR']
+CITIES = [('SP', 'São Paulo'), ('SP', 'Campinas'), ('RJ', 'Rio de Janeiro'), ('MG', 'Belo Horizonte')]
+ACCOUNTS = [f'@account{i}' for i in range(12)]
+
+
+def _random_fan(rng):
+    state, city = rng.choice(CITIES)
+    data = {
+        'favorite_games': rng.sample(GAMES, rng.randint(0, 3)),
+        'favorite_teams': rng.sample(TEAMS, rng.randint(0, 2)),
+        'address': {'state': state, 'city': city},
+    }
+    return fan_features(data, rng.sample(ACCOUNTS, rng.randint(0, 4)))
+
+
+def _dense_cosine(fans, seed):
+    # TF-IDF denso, calculado do zero, para comparar com a matriz esparsa
+    names = sorted({name for features in fans.values() for name in features})
+    matrix = np.array([[name in features for name in names] for features in fans.values()], dtype=np.float64)
+    df = matrix.sum(axis=0)
+    matrix = matrix[:, df >= 2] * (np.log((1.0 + len(fans)) / (1.0 + df[df >= 2])) + 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    return dict(zip(fans, matrix @ matrix[list(fans).index(seed)]))
+
+
+def test_fan_features_use_catalog_ids_region_and_follows():
+    features = fan_features({
+        'favorite_games': ['CS:GO'],
+        'esports_profiles': [{'platform': 'faceit', 'profile_url': 'x', 'games': ['Counter-Strike 2']}],
+        'address': {'state': ' sp', 'city': 'São  Paulo'},
+    }, ['@FURIA', 'furia'])
+
+    assert features == {'game:1', 'state:SP', 'city:são paulo', 'follows:furia'}
+
+
+def test_top_k_matches_dense_cosine_in_blocks(tmp_path):
+    rng = random.Random(7)
+    fans = {f'uid-{i:03d}': _random_fan(rng) for i in range(300)}
+    index = LookalikeIndex.build(fans.items())
+    expected = _dense_cosine(fans, 'uid-000')
+    expected.pop('uid-000')
+
+    result = index.similar(['uid-000'], limit=20)
+    assert len(result) == 20
+    assert [row['score'] for row in result] == sorted((row['score'] for row in result), reverse=True)
+    for row in result:
+        assert row['score'] == pytest.approx(expected[row['id']], abs=1e-4)
+    assert result[-1]['score'] >= sorted(expected.values())[-20] - 1e-4
+
+    # Blocos de uma coluna e o índice relido do disco dão o mesmo resultado
+    path = str(tmp_path / 'lookalike.npz')
+    index.save(path)
+    assert index.similar(['uid-000'], limit=20, block_nnz=1) == result
+    assert get_lookalike_index(path).similar(['uid-000'], limit=20) == result
+    assert get_lookalike_index(path).built_at == index.built_at
+
+
+def test_excludes_seeds_and_fans_with_nothing_in_common():
+    index = LookalikeIndex.build([
+        ('a', {'game:1', 'state:SP'}), ('b', {'game:1', 'state:SP'}), ('c', {'state:SP'}),
+        ('d', {'team:3', 'follows:x'}), ('e', {'team:3'}), ('f', {'follows:only-f'}),
+    ])
+
+    assert [row['id'] for row in index.similar(['a'])] == ['b', 'c']
+    assert [row['id'] for row in index.similar(['a', 'd'], limit=10)] == ['b', 'e', 'c']
+    assert index.similar(['f']) == []
+    with pytest.raises(ValueError):
+        index.similar(['missing'])
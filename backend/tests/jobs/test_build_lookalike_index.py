@@ -0,0 +1,27 @@
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.segments.lookalike_index import LookalikeIndex
+from src.jobs.build_lookalike_index import BuildLookalikeIndexJob
+
+
+def test_builds_from_fans_and_followed_accounts(tmp_path):
+    db = FakeFirestoreClient()
+    db.load('fans', {
+        'uid-1': {'favorite_games': ['CS2'], 'address': {'state': 'SP', 'city': 'São Paulo'}},
+        'uid-2': {'favorite_games': ['CS2'], 'address': {'state': 'SP', 'city': 'Campinas'}},
+        'uid-3': {'favorite_games': ['Valorant'], 'address': {'state': 'RJ'}},
+        'uid-4': {'favorite_teams': ['LOUD'], 'address': {'state': 'RJ'}},
+    })
+    # Duas conexões do mesmo usuário; contas antigas sem a lista são ignoradas
+    db.load('social_accounts', {
+        'a1': {'user_id': 'uid-1', 'platform': 'X', 'followed_accounts': ['@FURIA']},
+        'a2': {'user_id': 'uid-3', 'platform': 'X', 'followed_accounts': [{'username': '@furia'}]},
+        'a3': {'user_id': 'uid-3', 'platform': 'X', 'followed_accounts_count': 10},
+    })
+    output = tmp_path / 'lookalike.npz'
+
+    stats = BuildLookalikeIndexJob(db, output_path=str(output), page_size=2).run()
+
+    assert (stats['fans'], stats['social_accounts'], stats['features']) == (4, 3, 4)
+    index = LookalikeIndex.load(str(output))
+    assert sorted(index.features) == ['follows:furia', 'game:1', 'state:RJ', 'state:SP']
+    assert [row['id'] for row in index.similar(['uid-1'])] == ['uid-2', 'uid-3']
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from src.domain.entities.fan import Fan, Purchase
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+from src.jobs.compact_spend_rollups import CompactSpendRollupsJob
+
+NOW = datetime(2024, 9, 15)
+
+
+def _history(db):
+    # Compras de janeiro a setembro, cada uma gravada no dia em que aconteceu
+    fan_ids = ['uid-1', 'uid-2']
+    for month in range(1, 10):
+        rollups = FirestoreSpendRollupRepository(db, shards=3, clock=lambda month=month: datetime(2024, month, 28))
+        repository = FirestoreFanRepository(db, rollups=rollups)
+        for fan_id in fan_ids:
+            if month == 1:
+                repository.create(Fan(user_id=fan_id, email=f'{fan_id}@example.com'))
+            for day in (3, 10):
+                repository.add_purchase(fan_id, Purchase(item_name='Ingresso', amount=10.0,
+                                                         purchase_date=datetime(2024, month, day)))
+
+
+def test_compaction_merges_closed_shards_and_folds_old_days():
+    db = FakeFirestoreClient()
+    _history(db)
+    rollups = FirestoreSpendRollupRepository(db, shards=3, clock=lambda: NOW)
+    before = rollups.by_month(9, now=NOW)
+
+    job = CompactSpendRollupsJob(db, rollups, retention_days=90, batch_size=7, clock=lambda: NOW)
+    dry = CompactSpendRollupsJob(db, rollups, retention_days=90, clock=lambda: NOW, dry_run=True).run()
+    result = job.run()
+
+    # Corte em 01/06: os dias de janeiro a maio (2 por mês, por fã e da base) são apagados
+    assert result['cutoff'] == '2024-06-01'
+    assert result['folded_days'] == dry['folded_days'] == 5 * 2 * 3
+    assert result['merged_periods'] == dry['merged_periods'] > 0
+    assert rollups.by_month(9, now=NOW) == before
+    assert rollups.by_month(9, 'uid-1', now=NOW)[0] == {'period': '2024-01', 'amount': 20.0, 'count': 2}
+    assert rollups.by_day(3, 'uid-1', now=datetime(2024, 5, 10))[-1]['count'] == 0
+    assert rollups.by_day(6, 'uid-1', now=datetime(2024, 6, 3))[-1] == {'period': '2024-06-03', 'amount': 10.0,
+                                                                         'count': 1}
+
+    # Só o total e os períodos de setembro continuam fragmentados
+    assert {period for _, period in rollups.sharded_periods()} <= {'all', '2024-09'}
+    again = job.run()
+    assert (again['merged_periods'], again['folded_days']) == (0, 0)
@@ -0,0 +1,185 @@
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.jobs import export_fans
+from src.jobs.export_fans import EXPORTS, ExportFansJob, fan_row, social_account_row, to_columns
+
+T0 = datetime(2026, 1, 1)
+
+
+class _Query:
+    """Ordered query over {id: data} with the filters and cursors the export uses"""
+
+    def __init__(self, docs, filters=(), ordered=False, limit=None, after=None):
+        self.docs, self.filters, self.ordered, self._limit, self._after = docs, filters, ordered, limit, after
+
+    def _copy(self, **changes):
+        values = dict(filters=self.filters, ordered=self.ordered, limit=self._limit, after=self._after)
+        values.update(changes)
+        return _Query(self.docs, **values)
+
+    def where(self, filter):
+        return self._copy(filters=self.filters + ((filter.field_path, filter.op_string, filter.value),))
+
+    def select(self, fields):
+        return self
+
+    def order_by(self, field):
+        return self._copy(ordered=self.ordered or field == 'updated_at')
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, cursor):
+        return self._copy(after=cursor)
+
+    def _key(self, doc_id):
+        return (self.docs[doc_id]['updated_at'], doc_id) if self.ordered else doc_id
+
+    def stream(self):
+        compare = {'>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b}
+        ids = [doc_id for doc_id, data in self.docs.items()
+               if all(field in data and compare[op](data[field], value) for field, op, value in self.filters)]
+        if self.ordered:
+            ids = [doc_id for doc_id in ids if 'updated_at' in self.docs[doc_id]]
+        ids.sort(key=self._key)
+        if self._after is not None:
+            after = (self._after['updated_at'], self._after['__name__']) if self.ordered else self._after['__name__']
+            ids = [doc_id for doc_id in ids if self._key(doc_id) > after]
+        for doc_id in ids[:self._limit]:
+            data = self.docs[doc_id]
+            yield SimpleNamespace(id=doc_id, get=data.get, to_dict=lambda d=data: dict(d))
+
+
+class _Writer:
+    """Records the pages instead of writing Parquet"""
+    written = []
+
+    def __init__(self, path, schema, file_format='parquet'):
+        self.path, self.rows, self.pages = path, 0, []
+        _Writer.written.append(self)
+
+    def write(self, columns):
+        self.pages.append(columns)
+        self.rows += len(columns['id'])
+
+    def close(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+@pytest.fixture
+def recording_writer(monkeypatch):
+    _Writer.written = []
+    monkeypatch.setattr(export_fans, 'ColumnarWriter', _Writer)
+    monkeypatch.setattr(export_fans, 'arrow_schema', lambda spec: None)
+    return _Writer
+
+
+def _fans(count, start=T0):
+    return {
+        f'uid-{i:03d}': {
+            'name': f'Fan {i}',
+            'cpf': '12345678900',
+            'favorite_games': [1, 'Jogo Novo'],
+            'address': {'city': 'São Paulo', 'state': 'SP'},
+            'updated_at': start + timedelta(minutes=i // 2),
+        }
+        for i in range(count)
+    }
+
+
+def _db(collections):
+    db = MagicMock()
+    db.collection.side_effect = lambda name: _Query(collections[name])
+    return db
+
+
+def test_rows_decode_interests_and_leave_out_secrets():
+    row = fan_row('uid-1', {
+        'favorite_games': [1, 'CS:GO', 'Jogo Novo'],
+        'favorite_teams': [1],
+        'social_media': [{'platform': 'X', 'connected': True}],
+        'documents': [{'verified': True, 'number': '123'}, {'verified': False}],
+        'profile_image_base64': 'abc',
+        'cpf': '12345678900',
+        'total_spent': 10,
+        'updated_at': '2026-01-01T10:00:00',
+    })
+
+    assert row['favorite_games'] == ['Counter-Strike 2', 'Jogo Novo']
+    assert row['favorite_teams'] == ['FURIA']
+    assert row['social_platforms'] == ['X']
+    assert row['verified_documents'] == 1
+    assert row['total_spent'] == 10.0
+    assert row['updated_at'] == datetime(2026, 1, 1, 10)
+    assert set(row) == {name for name, _ in EXPORTS['fans'].columns}
+
+    account = social_account_row('acc-1', {'access_token': 'a', 'refresh_token': 'r', 'screen_name': 'furia'})
+    assert 'access_token' not in account and 'refresh_token' not in account
+    assert list(to_columns(EXPORTS['social_accounts'], [account])) == [name for name, _ in EXPORTS['social_accounts'].columns]
+
+
+def test_incremental_runs_export_only_changes_since_watermark(tmp_path, recording_writer):
+    docs = _fans(25)
+    db = _db({'fans': docs})
+    state = tmp_path / 'state.json'
+
+    job = ExportFansJob(db=db, output_dir=str(tmp_path), state_path=str(state), page_size=10,
+                        collections=['fans'])
+    first = job.run()
+
+    assert first['fans']['rows'] == 25
+    assert [len(page['id']) for page in recording_writer.written[0].pages] == [10, 10, 5]
+    assert json.loads(state.read_text())['fans'] == {'updated_at': docs['uid-024']['updated_at'].isoformat(),
+                                                    'id': 'uid-024'}
+
+    # Sem mudanças: nada é escrito e a marca d'água fica onde estava
+    assert job.run()['fans'] == {'rows': 0, 'file': None}
+
+    # uid-025 tem o mesmo updated_at que o último exportado, mas id maior
+    docs['uid-025'] = dict(docs['uid-024'])
+    docs['uid-003']['updated_at'] = T0 + timedelta(hours=1)
+    third = job.run()
+
+    exported = [doc_id for page in recording_writer.written[-1].pages for doc_id in page['id']]
+    assert exported == ['uid-025', 'uid-003']
+    assert third['fans']['rows'] == 2
+    assert json.loads(state.read_text())['fans']['id'] == 'uid-003'
+
+
+def test_full_export_includes_docs_without_updated_at(tmp_path, recording_writer):
+    docs = _fans(5)
+    del docs['uid-002']['updated_at']
+    db = _db({'fans': docs, 'social_accounts': {}})
+    state = tmp_path / 'state.json'
+
+    stats = ExportFansJob(db=db, output_dir=str(tmp_path), state_path=str(state), page_size=2, full=True).run()
+
+    assert stats['fans']['rows'] == 5
+    assert stats['social_accounts']['rows'] == 0
+    assert json.loads(state.read_text())['fans']['id'] is None
+
+
+def test_unknown_collection_is_rejected():
+    with pytest.raises(ValueError):
+        ExportFansJob(db=MagicMock(), collections=['users'])
+
+
+def test_parquet_file_has_one_row_group_per_page(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    db = _db({'fans': _fans(25)})
+
+    stats = ExportFansJob(db=db, output_dir=str(tmp_path), page_size=10, collections=['fans']).run()
+
+    parquet = pq.ParquetFile(stats['fans']['file'])
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.num_rows == 25
+    assert 'cpf' not in parquet.schema_arrow.names
+    assert not list(tmp_path.rglob('*.tmp'))
@@ -0,0 +1,153 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import AlreadyExists, DeadlineExceeded, ServiceUnavailable
+
+from src.jobs.import_fans import ImportFansJob, fan_uid, parse_row, read_rows
+
+
+class _Batch:
+    def __init__(self, db):
+        self.db, self.creates, self.sets = db, [], []
+
+    def create(self, ref, data):
+        self.creates.append((ref.id, data))
+
+    def set(self, ref, data, merge=False):
+        self.sets.append((ref.id, data))
+
+    def commit(self):
+        failure = self.db.failures.pop(0) if self.db.failures else None
+        if failure == 'before':
+            raise ServiceUnavailable('indisponível')
+        if any(doc_id in self.db.docs for doc_id, _ in self.creates):
+            raise AlreadyExists('documento já existe')
+        self.db.docs.update(self.creates)
+        self.db.staged.extend(self.sets)
+        self.db.commits += 1
+        if failure == 'after':
+            # Commit aplicado, mas a resposta não chegou
+            raise DeadlineExceeded('timeout')
+
+
+class _Firestore:
+    """`fans` as a dict; batch commits are all-or-nothing like Firestore's"""
+
+    def __init__(self):
+        self.docs, self.staged, self.failures, self.commits = {}, [], [], 0
+        self.collection = lambda name: SimpleNamespace(document=lambda doc_id: SimpleNamespace(id=doc_id))
+
+    def batch(self):
+        return _Batch(self)
+
+    def get_all(self, refs, field_paths=None):
+        return [SimpleNamespace(id=ref.id, exists=ref.id in self.docs) for ref in refs]
+
+
+class _Stats:
+    def stage(self, writer, delta):
+        writer.set(SimpleNamespace(id='shard-0'), delta)
+
+
+def _auth(rejected_emails=()):
+    def import_users(records):
+        errors = [SimpleNamespace(index=i, reason='EMAIL_EXISTS')
+                  for i, record in enumerate(records) if record.email in rejected_emails]
+        return SimpleNamespace(errors=errors)
+
+    auth = MagicMock()
+    auth.import_users.side_effect = import_users
+    return auth
+
+
+def _job(db, auth, **kwargs):
+    return ImportFansJob(db=db, auth_client=auth, stats=_Stats(), backoff=0, **kwargs)
+
+
+CSV = """email,name,city,state,favorite_games,favorite_teams,birth_date
+fan0@example.com,Fan 0,São Paulo,SP,CS2; Valorant,FURIA,
+fan1@example.com,Fan 1,,,,,
+sem-email,Fan 2,,,,,
+FAN0@example.com,Duplicado,,,,,
+fan4@example.com,Fan 4,,,,,ontem
+fan5@example.com,Fan 5,Rio de Janeiro,RJ,LoL|Dota 2,,1990-05-01
+existente@example.com,Fan 6,,,,,
+fan7@example.com,Fan 7,,,,,
+"""
+
+
+def test_parse_row_validates_with_the_fan_model():
+    fan = parse_row({'email': ' Fan@Example.com ', 'name': 'Fan', 'favorite_games': 'CS2; Valorant',
+                     'city': 'Recife', 'state': 'PE', 'birth_date': '1995-03-10'})
+
+    assert fan.user_id == fan_uid('fan@example.com') == fan.id
+    assert fan.email == 'fan@example.com'
+    assert fan.favorite_games == ['CS2', 'Valorant']
+    assert fan.address.city == 'Recife'
+    assert fan.profile_completeness > 0
+
+    with pytest.raises(ValueError, match='birth_date'):
+        parse_row({'email': 'fan@example.com', 'birth_date': 'ontem'})
+    with pytest.raises(ValueError, match='E-mail'):
+        parse_row({'name': 'Sem e-mail'})
+
+
+def test_import_creates_users_and_fans_and_reports_rejected_rows(tmp_path):
+    source = tmp_path / 'parceiros.csv'
+    source.write_text(CSV, encoding='utf-8')
+    report = tmp_path / 'errors.jsonl'
+    db = _Firestore()
+    auth = _auth(rejected_emails={'existente@example.com'})
+
+    stats = _job(db, auth, chunk_size=4, batch_size=3, workers=2, report_path=str(report)).run(read_rows(str(source)))
+
+    assert stats['rows'] == 8
+    assert stats['imported'] == 4
+    assert stats['errors'] == 4
+    assert set(db.docs) == {fan_uid(f'fan{i}@example.com') for i in (0, 1, 5, 7)}
+    # Nomes/apelidos do catálogo gravados como ids
+    assert db.docs[fan_uid('fan0@example.com')]['favorite_games'] == [1, 2]
+
+    errors = [json.loads(line) for line in report.read_text(encoding='utf-8').splitlines()]
+    assert [error['line'] for error in sorted(errors, key=lambda e: e['line'])] == [4, 5, 6, 8]
+    assert any('Auth' in error['error'] for error in errors)
+
+    # Agregados: um delta por batch, somando os fãs gravados
+    assert sum(delta['fans'] for _, delta in db.staged) == 4
+    assert auth.import_users.call_count == 2
+    assert all(len(call.args[0]) <= 4 for call in auth.import_users.call_args_list)
+
+    # Rodar de novo não cria nem conta nada
+    again = _job(db, auth, chunk_size=4, batch_size=3).run(read_rows(str(source)))
+    assert again['imported'] == 0
+    assert again['skipped'] == 4
+    assert sum(delta['fans'] for _, delta in db.staged) == 4
+
+
+def test_commit_retries_are_idempotent():
+    fans = [(i, parse_row({'email': f'fan{i}@example.com'})) for i in range(3)]
+    db = _Firestore()
+    job = _job(db, _auth())
+
+    # Falha antes de aplicar: repete e grava
+    db.failures = ['before']
+    assert job._commit(fans[:2]) == (2, 0)
+
+    # Aplicado mas com timeout: a repetição encontra os documentos e não grava de novo
+    db.failures = ['after']
+    assert job._commit(fans[2:]) == (0, 1)
+    assert db.commits == 2
+    assert sum(delta['fans'] for _, delta in db.staged) == 3
+
+
+def test_dry_run_only_validates(tmp_path):
+    source = tmp_path / 'parceiros.jsonl'
+    source.write_text('{"email": "fan@example.com"}\n{quebrado\n', encoding='utf-8')
+    db = _Firestore()
+
+    stats = ImportFansJob(db=db, stats=_Stats(), dry_run=True).run(read_rows(str(source)))
+
+    assert stats['rows'] == 2 and stats['errors'] == 1
+    assert db.docs == {}
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from src.application.usecases.fan_usecase_impl import FanUseCaseImpl
+from src.domain.entities.fan import Fan
+from src.domain.entities.job import DEAD, SUCCEEDED
+from src.infrastructure.repositories.sqlite_database import SqliteDatabase
+from src.infrastructure.repositories.sqlite_fan_repository import SqliteFanRepository
+from src.infrastructure.repositories.sqlite_job_queue import SqliteJobQueue
+from src.jobs.job_worker import JobWorker
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = SqliteDatabase(tmp_path / 'app.sqlite3')
+    yield db
+    db.close()
+
+
+def test_per_type_limits_retries_and_dead_letters(db):
+    queue = SqliteJobQueue(db)
+    peak, running, lock = {'slow': 0}, {'slow': 0}, threading.Lock()
+    failures = {'flaky': 0}
+
+    def slow(payload):
+        with lock:
+            running['slow'] += 1
+            peak['slow'] = max(peak['slow'], running['slow'])
+        time.sleep(0.01)
+        with lock:
+            running['slow'] -= 1
+
+    def flaky(payload):
+        failures['flaky'] += 1
+        if failures['flaky'] < 3:
+            raise RuntimeError('temporário')
+
+    def broken(payload):
+        raise ValueError('sempre falha')
+
+    slow_jobs = [queue.enqueue('slow', {'n': n}) for n in range(12)]
+    flaky_job = queue.enqueue('flaky', {})
+    broken_job = queue.enqueue('broken', {}, max_attempts=2)
+
+    worker = JobWorker(queue, {'slow': slow, 'flaky': flaky, 'broken': broken},
+                       concurrency={'slow': 3}, default_concurrency=1, backoff=0, poll_interval=0.01)
+    stats = worker.run(until_idle=True)
+
+    assert peak['slow'] == 3
+    assert all(queue.get(job.id).status == SUCCEEDED for job in slow_jobs)
+    assert (queue.get(flaky_job.id).status, queue.get(flaky_job.id).attempts) == (SUCCEEDED, 3)
+    dead = queue.get(broken_job.id)
+    assert (dead.status, dead.last_error) == (DEAD, 'ValueError: sempre falha')
+    assert stats == {'succeeded': 13, 'retried': 3, 'dead': 1}
+    assert worker.retry_delay(1) == 0 and JobWorker(queue, {}, backoff=2).retry_delay(4) == 16
+
+
+def test_verifications_leave_the_request_and_run_in_the_worker(db):
+    repository = SqliteFanRepository(db)
+    queue = SqliteJobQueue(db)
+    usecase = FanUseCaseImpl(repository, job_queue=queue)
+    repository.create(Fan(user_id='uid-1', email='fan@example.com'))
+
+    usecase.add_esports_profile('uid-1', 'steam', 'https://steamcommunity.com/id/fan', 'fan')
+    missing = usecase.verify_esports_profile_async('uid-1', 'twitch')
+
+    # A requisição só grava o perfil e enfileira a verificação
+    assert repository.find_by_id('uid-1').esports_profiles[0].verified is False
+    assert queue.counts() == {'queued': 2}
+
+    JobWorker(queue, usecase.job_handlers(), backoff=0, poll_interval=0.01).run(until_idle=True)
+
+    fan = repository.find_by_id('uid-1')
+    assert fan.esports_profiles[0].verified is True
+    assert set(fan.favorite_games) == {'Counter-Strike 2', 'Dota 2'}
+    assert queue.get(missing.id).status == DEAD
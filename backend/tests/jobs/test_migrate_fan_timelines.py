@@ -0,0 +1,71 @@
+from datetime import datetime
+
+from src.infrastructure.fakes.fake_firestore import FakeFirestoreClient
+from src.infrastructure.repositories.firestore_fan_repository import FirestoreFanRepository
+from src.infrastructure.repositories.firestore_spend_rollup_repository import FirestoreSpendRollupRepository
+from src.jobs.migrate_fan_timelines import MigrateFanTimelinesJob
+
+
+def _legacy_fans(db):
+    fans = db.collection('fans')
+    # Anterior aos contadores: 7 compras só no array
+    fans.document('uid-1').set({
+        'user_id': 'uid-1', 'email': 'a@example.com', 'created_at': datetime(2023, 5, 1),
+        'purchases': [{'id': f'p{i}', 'item_name': 'Camisa', 'amount': 10.0,
+                       'purchase_date': datetime(2024, 1, 1 + i)} for i in range(7)],
+        'event_interests': [{'event_name': f'Evento {i}'} for i in range(5)],
+    })
+    # Contadores já mantidos com Increment, incluindo a compra do array
+    fans.document('uid-2').set({
+        'user_id': 'uid-2', 'email': 'b@example.com', 'created_at': datetime(2023, 5, 1),
+        'purchases': [{'id': 'q1', 'item_name': 'Boné', 'amount': 80.0, 'purchase_date': datetime(2024, 2, 1)}],
+        'purchase_count': 1, 'total_spent': 80.0,
+    })
+    fans.document('uid-3').set({'user_id': 'uid-3', 'email': 'c@example.com', 'created_at': datetime(2023, 5, 1)})
+
+
+def test_moves_arrays_into_timelines_in_small_batches(tmp_path):
+    db = FakeFirestoreClient()
+    _legacy_fans(db)
+    checkpoint = tmp_path / 'timelines.json'
+
+    stats = MigrateFanTimelinesJob(db, page_size=2, batch_size=20, checkpoint_path=str(checkpoint)).run()
+
+    # 7 compras em trechos de 3 + 5 eventos em um trecho, mais a compra do uid-2
+    assert (stats['processed'], stats['migrated'], stats['purchases'], stats['events']) == (3, 2, 8, 5)
+    assert stats['batches'] == 3 + 1 + 1 and checkpoint.exists()
+
+    repository = FirestoreFanRepository(db)
+    first, second = repository.find_many(['uid-1', 'uid-2'])
+    assert (first.purchases, first.event_interests) == ([], [])
+    assert (first.purchase_count, first.total_spent, first.event_count) == (7, 70.0, 5)
+    assert (second.purchase_count, second.total_spent) == (1, 80.0)
+    # Contadores exportados mudaram: a exportação incremental precisa ver os fãs migrados
+    assert first.updated_at is not None and second.updated_at is not None
+
+    purchases, cursor = repository.list_purchases('uid-1', limit=10)
+    assert [p.id for p in purchases] == [f'p{i}' for i in reversed(range(7))] and cursor is None
+    events, _ = repository.list_event_interests('uid-1', limit=10)
+    assert sorted(event.event_name for event in events) == [f'Evento {i}' for i in range(5)]
+
+    # As compras movidas entram nos baldes de gasto
+    rollups = FirestoreSpendRollupRepository(db)
+    assert rollups.by_month(2, 'uid-1', now=datetime(2024, 2, 10)) == [
+        {'period': '2024-01', 'amount': 70.0, 'count': 7}, {'period': '2024-02', 'amount': 0.0, 'count': 0}]
+    assert rollups.lifetime() == {'period': 'all', 'amount': 150.0, 'count': 8}
+
+    # Repetir não move nada de novo nem conta duas vezes
+    again = MigrateFanTimelinesJob(db, page_size=2).run()
+    assert (again['migrated'], again['batches']) == (0, 0)
+    assert repository.find_by_id('uid-1').purchase_count == 7
+    assert len(list(db.collection('fans').document('uid-1').collection('purchases').stream())) == 7
+
+
+def test_dry_run_counts_without_writing():
+    db = FakeFirestoreClient()
+    _legacy_fans(db)
+
+    stats = MigrateFanTimelinesJob(db, dry_run=True).run()
+
+    assert (stats['migrated'], stats['purchases'], stats['events'], stats['batches']) == (2, 8, 5, 0)
+    assert len(db.collection('fans').document('uid-1').get().to_dict()['purchases']) == 7
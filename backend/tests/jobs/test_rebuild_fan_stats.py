@@ -0,0 +1,43 @@
+from unittest.mock import MagicMock
+
+from src.domain.rules import fan_stats
+from src.jobs.rebuild_fan_stats import RebuildFanStatsJob
+from tests.jobs.test_recompute_completeness import _Query
+
+
+def _docs():
+    return {
+        f'uid-{i:03d}': {
+            'favorite_games': ['CS:GO'] if i % 2 else ['Valorant', 'CS:GO'],
+            'favorite_teams': ['FURIA'],
+            'address': {'state': 'SP' if i % 3 else 'RJ'},
+            'purchase_count': i % 4,
+            'total_spent': 50.0 * (i % 4),
+        }
+        for i in range(25)
+    }
+
+
+def test_rebuild_replaces_aggregates_with_full_scan_totals():
+    docs = _docs()
+    db = MagicMock()
+    db.collection.return_value = _Query(docs)
+    stats = MagicMock()
+
+    result = RebuildFanStatsJob(db=db, stats=stats, page_size=10).run()
+
+    stats.replace.assert_called_once()
+    totals = stats.replace.call_args.args[0]
+    assert totals == fan_stats.merge(fan_stats.contribution(doc) for doc in docs.values())
+    assert totals['games'] == {'Counter-Strike 2': 25, 'Valorant': 13}
+    assert result['processed'] == 25
+
+
+def test_dry_run_does_not_write():
+    db = MagicMock()
+    db.collection.return_value = _Query(_docs())
+    stats = MagicMock()
+
+    RebuildFanStatsJob(db=db, stats=stats, dry_run=True).run()
+
+    stats.replace.assert_not_called()
@@ -0,0 +1,112 @@
+import json
+import random
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from src.domain.rules import profile_completeness
+from src.jobs.recompute_completeness import RecomputeCompletenessJob, score_page
+
+
+def _random_doc(rng):
+    return {
+        'name': rng.choice([None, 'Fan']),
+        'email': 'fan@example.com',
+        'phone': rng.choice([None, '', '11999999999']),
+        'address': rng.choice([None, {'city': 'São Paulo'}]),
+        'profile_image_base64': rng.choice([None, 'abc']),
+        'documents': [{'verified': rng.random() < 0.5} for _ in range(rng.randint(0, 2))],
+        'social_media': [{'connected': rng.random() < 0.7} for _ in range(rng.randint(0, 5))],
+        'esports_profiles': [{'verified': True} for _ in range(rng.randint(0, 4))],
+        'favorite_games': ['g'] * rng.randint(0, 8),
+        'favorite_teams': ['t'] * rng.randint(0, 3),
+    }
+
+
+def test_vectorized_scores_match_rule_engine():
+    rng = random.Random(7)
+    docs = [_random_doc(rng) for _ in range(300)]
+
+    scores, contributions = score_page(docs)
+
+    for doc, score, row in zip(docs, scores, contributions):
+        expected_score, expected = profile_completeness.score(doc)
+        assert score == expected_score
+        assert row.tolist() == [expected[rule.name] for rule in profile_completeness.RULES]
+
+
+class _Query:
+    """Minimal ordered query over {id: data} supporting the calls the job makes"""
+
+    def __init__(self, docs, limit=None, after=None):
+        self.docs, self._limit, self._after = docs, limit, after
+
+    def select(self, fields):
+        return self
+
+    def order_by(self, field):
+        return self
+
+    def limit(self, count):
+        return _Query(self.docs, count, self._after)
+
+    def start_after(self, cursor):
+        return _Query(self.docs, self._limit, cursor['__name__'])
+
+    def stream(self):
+        ids = sorted(doc_id for doc_id in self.docs if self._after is None or doc_id > self._after)
+        for doc_id in ids[:self._limit]:
+            yield SimpleNamespace(id=doc_id, reference=doc_id, to_dict=lambda d=self.docs[doc_id]: dict(d))
+
+
+def _db(docs):
+    db = MagicMock()
+    db.collection.return_value = _Query(docs)
+    return db
+
+
+def test_job_writes_only_changed_scores_in_batches(tmp_path):
+    rng = random.Random(3)
+    docs = {f'uid-{i:03d}': _random_doc(rng) for i in range(25)}
+    # Cinco fãs já estão com a pontuação correta
+    for doc_id in list(docs)[:5]:
+        docs[doc_id]['profile_completeness'], docs[doc_id]['completeness_contributions'] = \
+            profile_completeness.score(docs[doc_id])
+    db = _db(docs)
+    checkpoint = tmp_path / 'checkpoint.json'
+
+    stats = RecomputeCompletenessJob(db=db, page_size=10, batch_size=4, checkpoint_path=str(checkpoint)).run()
+
+    assert stats['processed'] == 25
+    assert stats['updated'] == 20
+    assert stats['pages'] == 3
+    updates = db.batch.return_value.update.call_args_list
+    assert sorted(call.args[0] for call in updates) == sorted(list(docs)[5:])
+    # `updated_at` acompanha a pontuação, para a exportação incremental
+    assert all(isinstance(call.args[1]['updated_at'], datetime) for call in updates)
+    assert db.batch.return_value.commit.call_count == 7  # 5, 10 e 5 alterações por página, lotes de 4
+    assert json.loads(checkpoint.read_text())['last_id'] == 'uid-024'
+
+
+def test_job_resumes_after_checkpoint(tmp_path):
+    rng = random.Random(5)
+    docs = {f'uid-{i:03d}': _random_doc(rng) for i in range(12)}
+    checkpoint = tmp_path / 'checkpoint.json'
+    checkpoint.write_text(json.dumps({'last_id': 'uid-007', 'processed': 8, 'updated': 8, 'pages': 1}))
+
+    stats = RecomputeCompletenessJob(db=_db(docs), page_size=8, checkpoint_path=str(checkpoint)).run(resume=True)
+
+    assert stats['processed'] == 12
+    assert stats['last_id'] == 'uid-011'
+    assert stats['docs_per_s'] > 0
+
+
+def test_field_mask_leaves_inline_images_out():
+    from src.jobs.recompute_completeness import SELECTED_FIELDS
+
+    assert 'profile_image_base64' not in SELECTED_FIELDS and 'has_profile_image' in SELECTED_FIELDS
+    # O documento lido com o mask pontua a imagem igual ao documento completo
+    full = {'name': 'Fan', 'profile_image_base64': 'iVBORw0...', 'has_profile_image': True}
+    masked = {name: value for name, value in full.items() if name in SELECTED_FIELDS}
+    assert profile_completeness.score(masked) == profile_completeness.score(full)
+    assert profile_completeness.score(masked)[1]['profile_image'] == 10
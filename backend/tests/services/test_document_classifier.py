@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from src.services.document_classifier import classify_document, filename_hint
+
+
+def _text_page(height=1754, width=1240):
+    image = np.full((height, width, 3), 250, np.uint8)
+    for y in range(150, height - 150, 40):
+        cv2.putText(image, "Rua Exemplo 123 Sao Paulo SP 01000-000", (80, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (20, 20, 20), 2)
+    return image
+
+
+def _card(color, width=1000, height=690):
+    image = np.full((height, width, 3), color, np.uint8)
+    image[100:400, 60:320] = 90
+    for y in range(120, 650, 50):
+        cv2.putText(image, "REPUBLICA FEDERATIVA DO BRASIL", (360, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.8, (30, 30, 30), 2)
+    return image
+
+
+def test_filename_hint_matches_short_terms_only_as_tokens():
+    assert filename_hint("meu_rg_frente.jpg") == "rg"
+    assert filename_hint("carteira-identidade.png") == "rg"
+    assert filename_hint("video_aniversario.jpg") == "unknown"
+    assert filename_hint("comprovante_endereco.pdf") == "address_proof"
+
+
+def test_text_page_is_classified_as_address_proof():
+    result = classify_document(_text_page(), "documento.jpg", has_face=False)
+
+    assert result["document_type"] == "address_proof"
+    assert result["extracted_from"] == "image_classifier"
+    assert result["confidence"] > 0.8
+
+
+def test_card_colour_separates_rg_and_cnh():
+    assert classify_document(_card((150, 200, 170)), "doc.jpg", has_face=True)["document_type"] == "rg"
+    assert classify_document(_card((120, 210, 220)), "doc.jpg", has_face=True)["document_type"] == "cnh"
+
+
+def test_filename_breaks_ties_between_close_classes():
+    image = _card((150, 200, 170))
+    cut = int(image.shape[1] * 0.7)
+    image[:, cut:] = _card((120, 210, 220))[:, cut:]
+
+    without_hint = classify_document(image, "documento.jpg", has_face=True)
+    assert without_hint["extracted_from"] == "image_classifier"
+
+    for file_name, expected in (("rg_frente.jpg", "rg"), ("cnh_frente.jpg", "cnh")):
+        result = classify_document(image, file_name, has_face=True)
+        assert result["document_type"] == expected
+        assert result["extracted_from"] == "image_classifier+filename"
+
+
+def test_missing_image_falls_back_to_filename():
+    result = classify_document(None, "cnh_digital.pdf")
+
+    assert result["document_type"] == "cnh"
+    assert result["extracted_from"] == "filename_analysis"